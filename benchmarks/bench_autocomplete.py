@@ -0,0 +1,78 @@
+"""
+Benchmark the search-as-you-type Suggester behind /rest/autocomplete.
+
+For each size it builds the suggester from the corpus, then times
+suggest() for prefixes of 1 to 4 letters of the corpus words (and a
+prefix matching nothing), reporting the median and 99th percentile of
+single calls, and the time to re-index (add) and remove a recipe.  The
+"http" column is the median of whole /rest/autocomplete requests through
+the Flask test client.  No database is involved.
+
+$ python benchmarks/bench_autocomplete.py --sizes 10000 100000
+"""
+
+import statistics
+import time
+
+import corpus
+
+from pyrecipe.app import app
+import pyrecipe.config as config
+from pyrecipe.services.search import Suggester
+
+
+def latencies(func, args) -> list:
+    """Return the wall clock time in ms of func(arg) for each arg."""
+    times = []
+    for arg in args:
+        start = time.perf_counter()
+        func(arg)
+        times.append((time.perf_counter() - start) * 1000)
+    return sorted(times)
+
+
+def p99(times: list) -> float:
+    return times[min(len(times) - 1, int(len(times) * 0.99))]
+
+
+def main():
+    p = corpus.parser(__doc__)
+    p.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    p.add_argument("--calls", type=int, default=1000, help="calls per prefix length")
+    args = p.parse_args()
+
+    app.config.from_object(config.DevConfig)
+    client = app.test_client()
+    print("{:>8} {:>10} {:>8} {:>10} {:>10} {:>10} {:>10} {:>10}".format(
+        "total", "build (s)", "prefix", "p50 (ms)", "p99 (ms)", "http (ms)", "add (ms)",
+        "remove (ms)"))
+    for size in args.sizes:
+        docs = [{**doc, "_id": str(i)} for i, doc in enumerate(corpus.recipe_docs(size))]
+        start = time.perf_counter()
+        suggester = Suggester.build(docs)
+        build = time.perf_counter() - start
+        app.config["SUGGESTER"] = suggester
+
+        edits = [{**doc, "name": "edited " + doc["name"]} for doc in docs[:args.calls]]
+        add = latencies(suggester.add, edits)
+        remove = latencies(suggester.remove, [doc["_id"] for doc in edits])
+        for length in (1, 2, 3, 4, "none"):
+            if length == "none":
+                prefixes = ["zzq"] * args.calls
+            else:
+                prefixes = [
+                    corpus.WORDS[i % len(corpus.WORDS)][:length] for i in range(args.calls)
+                ]
+            times = latencies(suggester.suggest, prefixes)
+            http = latencies(
+                lambda prefix: client.get("/rest/autocomplete?q=" + prefix),
+                prefixes[:args.calls // 10],
+            )
+            print("{:>8} {:>10.2f} {:>8} {:>10.3f} {:>10.3f} {:>10.3f} {:>10.3f} {:>10.3f}".format(
+                size, build, length, statistics.median(times), p99(times),
+                statistics.median(http), statistics.median(add), statistics.median(remove)))
+    app.config["SUGGESTER"] = None
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark the "what can I cook?" PantryIndex against checking every
+recipe's ingredients one by one.
+
+For each size it builds the index from the corpus and, for a 12 ingredient
+pantry, times cookable() for recipes missing at most 0, 1 and 2
+ingredients, all of them and one page (limit), next to the scan.  The
+"rows" column is the number of recipes found, which the scan must match.
+No database is involved.
+
+$ python benchmarks/bench_cookable.py --sizes 10000 100000
+"""
+
+import time
+
+import corpus
+
+from pyrecipe.services.search import PantryIndex
+from pyrecipe.services.search.pantry import ingredient_key
+
+
+def scan(docs, have, missing):
+    """Check each recipe's ingredients against the pantry."""
+    have = {ingredient_key(i) for i in have} | PantryIndex.STAPLES
+    return [
+        doc["_id"] for doc in docs
+        if len({ingredient_key(i) for i in doc["ingredients"]} - have) <= missing
+    ]
+
+
+def main():
+    p = corpus.parser(__doc__)
+    p.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    p.add_argument("--page-size", type=int, default=24)
+    args = p.parse_args()
+
+    have = corpus.WORDS[:12]
+    print("{:>8} {:>10} {:>8} {:>10} {:>10} {:>10} {:>8}".format(
+        "total", "build (s)", "missing", "scan (ms)", "index (ms)", "page (ms)", "rows"))
+    for size in args.sizes:
+        docs = [{**doc, "_id": str(i)} for i, doc in enumerate(corpus.recipe_docs(size))]
+        start = time.perf_counter()
+        pantry = PantryIndex.build(docs)
+        build = time.perf_counter() - start
+        for missing in range(3):
+            scanned = corpus.timeit(lambda: scan(docs, have, missing), args.repeat)
+            index = corpus.timeit(lambda: pantry.cookable(have, missing=missing), args.repeat)
+            page = corpus.timeit(
+                lambda: pantry.cookable(have, missing=missing, limit=args.page_size), args.repeat
+            )
+            rows = len(pantry.cookable(have, missing=missing))
+            assert rows == len(scan(docs, have, missing))
+            print("{:>8} {:>10.2f} {:>8} {:>10.1f} {:>10.1f} {:>10.1f} {:>8}".format(
+                size, build, missing, scanned * 1000, index * 1000, page * 1000, rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Benchmark recipe creation throughput in recipes/sec.
+
+Compares one MongoDriver.recipe_create() round-trip per recipe against
+MongoDriver.recipe_create_many() with unordered insert_many chunks.
+
+$ python benchmarks/bench_create_many.py --host mongodb://localhost --num 10000
+"""
+
+import time
+
+import corpus
+
+from pyrecipe.storage.mongo import MongoDriver
+from pyrecipe.storage.mongo.recipe import Recipe
+
+KWARGS = ("name", "prep_time", "cook_time", "servings", "ingredients", "directions", "tags", "notes")
+
+
+def main():
+    p = corpus.parser(__doc__)
+    p.add_argument("--num", type=int, default=2000, help="recipes to create")
+    p.add_argument("--chunks", type=int, nargs="+", default=[100, 500, 1000])
+    args = p.parse_args()
+
+    corpus.connect(args.host, args.db)
+    batch = [{k: doc[k] for k in KWARGS} for doc in corpus.recipe_docs(args.num)]
+    collection = Recipe._get_collection()
+
+    print("{:>22} {:>10} {:>14}".format("method", "secs", "recipes/sec"))
+
+    collection.delete_many({})
+    start = time.perf_counter()
+    for kwargs in batch:
+        MongoDriver.recipe_create(**kwargs)
+    took = time.perf_counter() - start
+    print("{:>22} {:>10.2f} {:>14.0f}".format("recipe_create", took, args.num / took))
+
+    for chunk_size in args.chunks:
+        collection.delete_many({})
+        start = time.perf_counter()
+        results = MongoDriver.recipe_create_many(batch, chunk_size=chunk_size)
+        took = time.perf_counter() - start
+        assert all(r.ok for r in results)
+        print("{:>22} {:>10.2f} {:>14.0f}".format(
+            "create_many({})".format(chunk_size), took, args.num / took))
+
+    collection.delete_many({})
+
+
+if __name__ == "__main__":
+    main()
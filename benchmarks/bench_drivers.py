@@ -0,0 +1,104 @@
+"""
+Benchmark the same calls against MemoryDriver, SQLiteDriver and MongoDriver
+on the same synthetic corpus.
+
+MemoryDriver does no I/O, so its column is the python-side floor for each
+call (model conversion, pagination, ranking); the difference to the other
+columns is the time spent in the database and its client.  Text search
+needs a real mongo server, so it shows "-" for mongo on mongomock.
+
+$ python benchmarks/bench_drivers.py --host mongodb://localhost --size 50000
+"""
+
+import os
+import tempfile
+
+import bson
+
+import corpus
+
+from pyrecipe.storage.memory import MemoryDriver
+from pyrecipe.storage.mongo import MongoDriver
+from pyrecipe.storage.sqlite import SQLiteDriver
+from pyrecipe.storage.sqlite.sqlitedriver import INSERT_RECIPE
+
+
+def memory_load(docs):
+    """Load the raw corpus documents into a fresh in-memory database."""
+    MemoryDriver._stores.pop("pyrecipe_bench", None)
+    MemoryDriver.db_initialize(db_name="pyrecipe_bench")
+    recipes = MemoryDriver._db().recipes
+    for doc in docs:
+        recipes.insert({**doc, "_id": str(bson.ObjectId()), "rating": None})
+
+
+def sqlite_load(docs, path):
+    """Load the raw corpus documents into a fresh SQLite database at path."""
+    SQLiteDriver.db_initialize(db_name=path)
+    conn = SQLiteDriver._conn()
+    with conn:
+        conn.executemany(
+            INSERT_RECIPE,
+            (
+                SQLiteDriver._recipe_row({**doc, "_id": str(bson.ObjectId()), "rating": None})
+                for doc in docs
+            ),
+        )
+
+
+def main():
+    p = corpus.parser(__doc__)
+    p.add_argument("--size", type=int, default=10000)
+    p.add_argument("--page-size", type=int, default=24)
+    p.add_argument("--writes", type=int, default=500, help="recipes created per write row")
+    args = p.parse_args()
+
+    docs = corpus.recipe_docs(args.size, num_deleted=args.size // 10)
+    tmpdir = tempfile.TemporaryDirectory()
+    corpus.connect(args.host, args.db)
+    corpus.load(docs)
+    memory_load(docs)
+    sqlite_load(docs, os.path.join(tmpdir.name, "pyrecipe_bench.sqlite3"))
+
+    drivers = [MemoryDriver, SQLiteDriver, MongoDriver]
+    ids = {d: d.recipes_page(1).items[0].id for d in drivers}
+    new = [
+        {
+            "name": "bench {}".format(i),
+            "prep_time": 5,
+            "cook_time": 10,
+            "servings": "2",
+            "ingredients": ["1 cup rice", "2 cups water"],
+            "directions": ["boil", "simmer"],
+            "tags": ["quick"],
+        }
+        for i in range(args.writes)
+    ]
+    calls = [
+        ("recipe_find_by_id", lambda d: d.recipe_find_by_id(ids[d])),
+        ("recipes_page", lambda d: d.recipes_page(args.page_size)),
+        ("recipes_page(summary)", lambda d: d.recipes_page(args.page_size, summary=True)),
+        ("recipes_page(name)", lambda d: d.recipes_page(args.page_size, sort_by="name")),
+        ("recipes_find_by_tag", lambda d: d.recipes_find_by_tag(["quick", "spicy"])),
+        ("recipes_get_tags", lambda d: d.recipes_get_tags()),
+        ("recipes_search", lambda d: d.recipes_search("garlic basil")),
+        ("recipe_create x{}".format(args.writes), lambda d: [d.recipe_create(**r) for r in new]),
+        ("recipe_create_many({})".format(args.writes), lambda d: d.recipe_create_many(new)),
+    ]
+
+    print("{:>26} {:>12} {:>12} {:>12}".format("call", "memory (ms)", "sqlite (ms)", "mongo (ms)"))
+    for name, call in calls:
+        times = []
+        for driver in drivers:
+            if driver is MongoDriver and name == "recipes_search" and corpus.is_mock(args.host):
+                times.append("-")
+                continue
+            times.append("{:.2f}".format(corpus.timeit(lambda: call(driver), args.repeat) * 1000))
+        print("{:>26} {:>12} {:>12} {:>12}".format(name, *times))
+
+    SQLiteDriver.db_close()
+    tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Micro-benchmark the per-document conversion cost of MongoDriver's read paths.
+
+Compares turning raw BSON documents into RecipeModel's/UserModel's via
+mongoengine hydration (Document._from_son + _recipe_to_dict) against the
+RawMongoDriver path (_recipe_son_to_dict).  No database is involved: the
+documents are generated in memory, so only python conversion is measured.
+
+$ python benchmarks/bench_raw_reads.py --sizes 1000 10000 100000
+"""
+
+import argparse
+import datetime
+
+import bson
+
+import corpus
+
+from pyrecipe.storage.mongo import MongoDriver
+from pyrecipe.storage.mongo.recipe import Recipe
+from pyrecipe.storage.mongo.user import User
+from pyrecipe.storage.shared import RecipeModel
+from pyrecipe.storage.shared import UserModel
+
+
+def user_docs(num: int) -> list:
+    now = datetime.datetime(2020, 1, 1)
+    return [
+        {
+            "_id": bson.ObjectId(),
+            "name": "user {}".format(i),
+            "username": "user{}".format(i),
+            "email": "user{}@mail.com".format(i),
+            "password_hash": "x" * 100,
+            "created_date": now,
+            "last_modified_date": now,
+            "recipe_ids": [],
+            "shared_recipe_ids": [],
+            "email_distros": {},
+        }
+        for i in range(num)
+    ]
+
+
+PATHS = {
+    "recipe": (
+        lambda son: MongoDriver._recipe_to_model(Recipe._from_son(son)),
+        MongoDriver._recipe_son_to_model,
+    ),
+    "user": (
+        lambda son: UserModel.from_dict(MongoDriver._user_to_dict(User._from_son(son))),
+        lambda son: UserModel.from_dict(MongoDriver._user_son_to_dict(son)),
+    ),
+}
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("--repeat", type=int, default=3, help="timing repetitions")
+    p.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    args = p.parse_args()
+
+    print("{:>7} {:>8} {:>14} {:>14} {:>9}".format(
+        "model", "docs", "hydrate (us)", "raw (us)", "speedup"))
+
+    for size in args.sizes:
+        docs = {"recipe": corpus.recipe_docs(size), "user": user_docs(size)}
+        for doc in docs["recipe"]:
+            doc["_id"] = bson.ObjectId()
+
+        for model, (hydrate, raw) in PATHS.items():
+            sons = docs[model]
+            slow = corpus.timeit(lambda: [hydrate(s) for s in sons], args.repeat)
+            fast = corpus.timeit(lambda: [raw(s) for s in sons], args.repeat)
+            print("{:>7} {:>8} {:>14.2f} {:>14.2f} {:>8.1f}x".format(
+                model, size, slow / size * 1e6, fast / size * 1e6, slow / fast))
+
+
+if __name__ == "__main__":
+    main()
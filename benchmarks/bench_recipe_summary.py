@@ -0,0 +1,64 @@
+"""
+Benchmark full RecipeModel listings against RecipeSummary projections.
+
+Reports the BSON bytes the server sends back, the time to build the list
+and the peak python allocation while doing so, for recipes_active() and
+recipes_active_summary().
+
+$ python benchmarks/bench_recipe_summary.py --host mongodb://localhost
+"""
+
+import tracemalloc
+
+import bson
+
+import corpus
+
+from pyrecipe.storage.mongo import MongoDriver
+from pyrecipe.storage.mongo.recipe import Recipe
+from pyrecipe.storage.shared import RecipeSummary
+
+
+def peak_kib(func) -> float:
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def wire_kib(queryset) -> float:
+    return sum(len(bson.encode(doc)) for doc in queryset.as_pymongo()) / 1024
+
+
+def main():
+    p = corpus.parser(__doc__)
+    p.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    args = p.parse_args()
+
+    corpus.connect(args.host, args.db)
+    print("{:>8} {:>9} {:>12} {:>10} {:>12}".format(
+        "total", "variant", "wire (KiB)", "time (ms)", "peak (KiB)"))
+
+    for size in args.sizes:
+        corpus.load(corpus.recipe_docs(size))
+        variants = [
+            ("full", Recipe.objects(deleted=False), MongoDriver.recipes_active),
+            (
+                "summary",
+                Recipe.objects(deleted=False).only(*RecipeSummary.FIELDS),
+                MongoDriver.recipes_active_summary,
+            ),
+        ]
+        for name, queryset, func in variants:
+            wire = wire_kib(queryset)
+            took = corpus.timeit(lambda: list(func()), args.repeat)
+            peak = peak_kib(lambda: list(func()))
+            print("{:>8} {:>9} {:>12.1f} {:>10.1f} {:>12.1f}".format(
+                size, name, wire, took * 1000, peak))
+
+    Recipe._get_collection().delete_many({})
+
+
+if __name__ == "__main__":
+    main()
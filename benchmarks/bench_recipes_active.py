@@ -0,0 +1,51 @@
+"""
+Benchmark MongoDriver.recipes_active() as the collection grows.
+
+The number of active recipes is held constant while deleted recipes are
+added, so the server-side filter should stay flat while the legacy
+python-side filter grows with the size of the collection.
+
+$ python benchmarks/bench_recipes_active.py --host mongodb://localhost
+"""
+
+import corpus
+
+from pyrecipe.storage.mongo import MongoDriver
+from pyrecipe.storage.mongo.recipe import Recipe
+
+
+def legacy_recipes_active():
+    """The previous implementation: hydrate everything, filter in python."""
+    recipes = [r for r in Recipe.objects() if r.deleted == False]
+    return [MongoDriver._recipe_to_model(r) for r in recipes]
+
+
+def main():
+    p = corpus.parser(__doc__)
+    p.add_argument("--active", type=int, default=200, help="active recipes")
+    p.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 20000])
+    args = p.parse_args()
+
+    corpus.connect(args.host, args.db)
+    print("{:>10} {:>8} {:>12} {:>12} {:>10}".format(
+        "total", "active", "legacy (ms)", "query (ms)", "examined"))
+
+    for size in args.sizes:
+        corpus.load(corpus.recipe_docs(size, num_deleted=size - args.active))
+
+        legacy = corpus.timeit(legacy_recipes_active, args.repeat)
+        query = corpus.timeit(lambda: list(MongoDriver.recipes_active()), args.repeat)
+
+        examined = "n/a"
+        if not corpus.is_mock(args.host):
+            plan = Recipe.objects(deleted=False).explain()
+            examined = plan["executionStats"]["totalDocsExamined"]
+
+        print("{:>10} {:>8} {:>12.1f} {:>12.1f} {:>10}".format(
+            size, args.active, legacy * 1000, query * 1000, examined))
+
+    Recipe._get_collection().delete_many({})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark MongoDriver.recipes_page() at increasing collection sizes.
+
+For each size the first page and a page halfway through the collection are
+fetched with keyset pagination, and the same deep page with skip() for
+comparison.  Against a real server (indexes) the keyset timings and the
+per-page allocation stay flat; mongomock sorts in python so only the
+allocation column is meaningful there.
+
+$ python benchmarks/bench_recipes_page.py --host mongodb://localhost --sizes 10000 100000 1000000
+"""
+
+import tracemalloc
+
+import corpus
+
+from pyrecipe.storage.mongo import MongoDriver
+from pyrecipe.storage.mongo.recipe import Recipe
+from pyrecipe.storage.shared.page_model import encode_token
+
+
+def skip_page(offset, page_size):
+    """Offset pagination, the approach keyset pagination replaces."""
+    recipes = Recipe.objects(deleted=False).order_by("-created_date", "-id")
+    return [MongoDriver._recipe_to_model(r) for r in recipes.skip(offset).limit(page_size)]
+
+
+def peak_kib(func) -> float:
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def main():
+    p = corpus.parser(__doc__)
+    p.add_argument("--page-size", type=int, default=24)
+    p.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    args = p.parse_args()
+
+    corpus.connect(args.host, args.db)
+    print("{:>10} {:>12} {:>12} {:>12} {:>12}".format(
+        "total", "first (ms)", "keyset (ms)", "skip (ms)", "peak (KiB)"))
+
+    for size in args.sizes:
+        corpus.load(corpus.recipe_docs(size))
+        offset = size // 2
+        middle = Recipe.objects(deleted=False).order_by("-created_date", "-id")[offset - 1]
+        token = encode_token("created_date", middle.created_date, middle.id)
+
+        first = corpus.timeit(lambda: MongoDriver.recipes_page(args.page_size), args.repeat)
+        keyset = corpus.timeit(
+            lambda: MongoDriver.recipes_page(args.page_size, token=token), args.repeat
+        )
+        skip = corpus.timeit(lambda: skip_page(offset, args.page_size), args.repeat)
+        peak = peak_kib(lambda: MongoDriver.recipes_page(args.page_size, token=token))
+
+        print("{:>10} {:>12.1f} {:>12.1f} {:>12.1f} {:>12.1f}".format(
+            size, first * 1000, keyset * 1000, skip * 1000, peak))
+
+    Recipe._get_collection().delete_many({})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark the unified recipes_search_ranked() against the two searches it
+replaces: recipes_find_by_name() followed by recipes_search(), concatenated
+(two round-trips, duplicates, deleted recipes in the text results).
+
+For each size, every driver runs both on a query matching names and text,
+and the ranked search is also timed for a single page (limit).  The "rows"
+columns count what each returns, duplicates included.  Text search needs a
+real mongo server, so mongo is skipped on mongomock.  The "engine" row is the
+in-process SearchEngine (pyrecipe.services.search), built from and loaded
+(memory-mapped) out of a saved index; it has no two query search.
+
+$ python benchmarks/bench_search.py --host mongodb://localhost --sizes 10000 100000
+"""
+
+import os
+import tempfile
+
+import corpus
+from bench_drivers import memory_load
+from bench_drivers import sqlite_load
+
+from pyrecipe.services.search import SearchEngine
+from pyrecipe.storage.memory import MemoryDriver
+from pyrecipe.storage.mongo import MongoDriver
+from pyrecipe.storage.mongo.recipe import Recipe
+from pyrecipe.storage.sqlite import SQLiteDriver
+
+
+def two_queries(driver, text):
+    """The search RecipeUC.recipes_search used to run."""
+    return driver.recipes_find_by_name_summary(text) + driver.recipes_search_summary(text)
+
+
+def main():
+    p = corpus.parser(__doc__)
+    p.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    p.add_argument("--page-size", type=int, default=24)
+    p.add_argument("--text", default="garlic basil")
+    args = p.parse_args()
+
+    tmpdir = tempfile.TemporaryDirectory()
+    corpus.connect(args.host, args.db)
+    drivers = [MemoryDriver, SQLiteDriver]
+    if not corpus.is_mock(args.host):
+        drivers.append(MongoDriver)
+
+    print("{:>8} {:>8} {:>12} {:>12} {:>12} {:>10} {:>10}".format(
+        "driver", "total", "two (ms)", "ranked (ms)", "page (ms)", "two rows", "rows"))
+    for size in args.sizes:
+        docs = corpus.recipe_docs(size, num_deleted=size // 10)
+        corpus.load(docs)
+        memory_load(docs)
+        sqlite_load(docs, os.path.join(tmpdir.name, "bench_search_{}.sqlite3".format(size)))
+
+        for driver in drivers:
+            two = corpus.timeit(lambda: two_queries(driver, args.text), args.repeat)
+            ranked = corpus.timeit(
+                lambda: driver.recipes_search_ranked(args.text, summary=True), args.repeat
+            )
+            page = corpus.timeit(
+                lambda: driver.recipes_search_ranked(
+                    args.text, limit=args.page_size, summary=True
+                ),
+                args.repeat,
+            )
+            rows = len(driver.recipes_search_ranked(args.text, summary=True))
+            print("{:>8} {:>8} {:>12.1f} {:>12.1f} {:>12.1f} {:>10} {:>10}".format(
+                driver.__name__.replace("Driver", "").lower(), size, two * 1000,
+                ranked * 1000, page * 1000, len(two_queries(driver, args.text)), rows))
+
+        path = os.path.join(tmpdir.name, "bench_search_{}.idx".format(size))
+        SearchEngine.build(MemoryDriver.recipes_active()).save(path)
+        engine = SearchEngine.load(path)
+        ranked = corpus.timeit(lambda: engine.search(args.text, summary=True), args.repeat)
+        page = corpus.timeit(
+            lambda: engine.search(args.text, limit=args.page_size, summary=True), args.repeat
+        )
+        print("{:>8} {:>8} {:>12} {:>12.1f} {:>12.1f} {:>10} {:>10}".format(
+            "engine", size, "-", ranked * 1000, page * 1000, "-",
+            len(engine.search(args.text))))
+        SQLiteDriver.db_close()
+
+    Recipe._get_collection().delete_many({})
+    tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
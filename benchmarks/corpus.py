@@ -0,0 +1,108 @@
+"""
+Synthetic recipe corpus shared by the benchmark scripts.
+
+Documents are generated as raw mongo documents so large corpora can be
+loaded with insert_many instead of one save() per recipe.  By default the
+benchmarks run against mongomock; pass --host mongodb://localhost to run
+against a real MongoDB server (required for anything index related).
+"""
+
+import argparse
+import datetime
+import random
+import time
+from typing import Callable
+from typing import List
+
+import mongoengine
+
+from pyrecipe.storage.mongo.recipe import Recipe
+
+
+WORDS = [
+    "garlic", "onion", "tomato", "basil", "chicken", "beef", "pork", "rice",
+    "pasta", "bean", "pepper", "salt", "butter", "flour", "sugar", "egg",
+    "milk", "cheese", "lemon", "lime", "ginger", "soy", "honey", "carrot",
+    "potato", "spinach", "mushroom", "cumin", "paprika", "thyme", "oregano",
+    "cilantro", "parsley", "vinegar", "oil", "yogurt", "cream", "corn",
+]
+TAGS = [
+    "breakfast", "lunch", "dinner", "dessert", "vegetarian", "vegan", "quick",
+    "slow", "bbq", "spicy", "mexican", "italian", "asian", "soup", "salad",
+]
+UNITS = ["cup", "cups", "tbsp", "tsp", "oz", "lb", "clove", "pinch", ""]
+
+
+def recipe_doc(i: int, rng: random.Random, deleted: bool = False) -> dict:
+    """Return a raw mongo document for a synthetic recipe."""
+    name = " ".join(rng.sample(WORDS, 3)) + " {}".format(i)
+    ingredients = [
+        "{} {} {}".format(rng.randint(1, 4), rng.choice(UNITS), word).replace("  ", " ")
+        for word in rng.sample(WORDS, rng.randint(4, 12))
+    ]
+    directions = [
+        "{} the {} with {}".format(rng.choice(["mix", "fry", "boil", "bake"]), *rng.sample(WORDS, 2))
+        for _ in range(rng.randint(3, 10))
+    ]
+    created = datetime.datetime(2020, 1, 1) + datetime.timedelta(minutes=i)
+    return {
+        "name": name,
+        "num_ingredients": len(ingredients),
+        "ingredients": ingredients,
+        "directions": directions,
+        "prep_time": float(rng.randint(0, 60)),
+        "cook_time": float(rng.randint(0, 180)),
+        "servings": str(rng.randint(1, 8)),
+        "tags": rng.sample(TAGS, rng.randint(1, 4)),
+        "images": [],
+        "notes": ["note {}".format(n) for n in range(rng.randint(0, 3))],
+        "favorite": False,
+        "when_made": [created + datetime.timedelta(days=d) for d in range(rng.randint(0, 20))],
+        "deleted": deleted,
+        "created_date": created,
+        "last_modified_date": created,
+    }
+
+
+def recipe_docs(num: int, num_deleted: int = 0, seed: int = 7) -> List[dict]:
+    """Return num raw recipe documents, num_deleted of them marked deleted."""
+    rng = random.Random(seed)
+    deleted = set(rng.sample(range(num), num_deleted))
+    return [recipe_doc(i, rng, deleted=i in deleted) for i in range(num)]
+
+
+def parser(description: str) -> argparse.ArgumentParser:
+    """Return an ArgumentParser with the options common to all benchmarks."""
+    p = argparse.ArgumentParser(description=description)
+    p.add_argument("--host", default="mongomock://localhost", help="mongo host uri")
+    p.add_argument("--db", default="pyrecipe_bench", help="database name")
+    p.add_argument("--repeat", type=int, default=3, help="timing repetitions")
+    return p
+
+
+def connect(host: str, db_name: str) -> None:
+    """Register the "core" alias used by the ODM and ensure indexes exist."""
+    mongoengine.connect(db=db_name, alias="core", host=host)
+    Recipe.ensure_indexes()
+
+
+def load(docs: List[dict]) -> None:
+    """Replace the recipes collection with the given raw documents."""
+    collection = Recipe._get_collection()
+    collection.delete_many({})
+    for start in range(0, len(docs), 5000):
+        collection.insert_many([dict(d) for d in docs[start:start + 5000]])
+
+
+def timeit(func: Callable, repeat: int = 3) -> float:
+    """Return the best wall clock time in seconds of repeat calls to func."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def is_mock(host: str) -> bool:
+    return host.startswith("mongomock://")
@@ -1,2 +1,3 @@
 from . import view_modifiers
 from . import request_dict
+from . import search_engine
@@ -21,18 +21,18 @@ class RequestDictionary(dict):
         return self.get(key, self.default_val)
 
 
-def create(default_val=None, **route_args) -> RequestDictionary:
+def create(default_val=None, request: flask.Request = None, **route_args) -> RequestDictionary:
     """
     Creates and returns an instance of RequestDictionary.
 
     The dict "data" unpacks the kwargs gained in order from
     "least important" to "most important".  First it unpacks
     the URL query string, then headers, and then the form data
-    from the flask.request global.  Then, additional args from
-    the routing functions/methods themselves, if passed to the
-    function.
+    from the given request, or else the flask.request global.
+    Then, additional args from the routing functions/methods
+    themselves, if passed to the function.
     """
-    request = flask.request
+    request = request or flask.request
 
     data = {**request.args, **request.headers, **request.form, **route_args}
 
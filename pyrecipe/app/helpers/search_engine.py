@@ -0,0 +1,158 @@
+"""
+The app's in-process recipe search engine, used instead of the DB driver's
+search when the SEARCH_INDEX config (PYRECIPE_SEARCH_INDEX) names its file,
+its search-as-you-type Suggester and its "what can I cook?" PantryIndex.
+
+The index file is memory-mapped by every worker on its first request that
+needs it, so pre-forked workers share its pages.  The Suggester and the
+PantryIndex are kept in memory only, built from the DB on the worker's first
+request using them.
+
+Each worker re-indexes the recipes it writes itself, and finds out about the
+writes of the others through the DB driver's recipes_generation(), polled at
+most once per GENERATION_CHECK_MS like CachingDriver does.  If only the
+worker's own writes moved it (recipes_generation_is_own()), its indexes are
+current already.  Otherwise an index built at an older generation is dropped
+and rebuilt from the DB on its next use.  The index file records the
+generation it was built at: a stale one is rebuilt and saved over (through a
+temporary file and a rename), so the other workers map the new one instead
+of rebuilding it too.  Without a generation the indexes can't tell, so
+"pyrecipe serve" turns them off (IN_PROCESS_INDEXES) when it forks more than
+one worker.
+"""
+
+import os
+import threading
+import time
+from typing import Optional
+
+from flask import current_app
+
+
+GENERATION_CHECK_MS = 250
+
+_lock = threading.Lock()
+
+
+def has_generation(driver) -> bool:
+    """Whether the DB driver keeps a recipes generation for the indexes to poll."""
+    return hasattr(driver, "recipes_generation")
+
+
+def _generation(driver) -> Optional[int]:
+    return driver.recipes_generation() if has_generation(driver) else None
+
+
+def build(path: str, driver) -> None:
+    """Index the active recipes of the DB driver and save the index to path."""
+    from pyrecipe.services.search import SearchEngine
+
+    generation = _generation(driver)
+    engine = SearchEngine.build(driver.recipes_active())
+    engine.index.generation = generation
+    engine.save(path)
+
+
+def _is_own(driver, since: Optional[int], until: int) -> bool:
+    """Whether only this process's writes, indexed as they were made, moved the generation."""
+    is_own = getattr(driver, "recipes_generation_is_own", None)
+    return since is not None and is_own is not None and is_own(since, until)
+
+
+def _check_generation(config) -> Optional[int]:
+    """
+    Return the DB's recipes generation, read at most once per
+    GENERATION_CHECK_MS, dropping the indexes built at an older one unless
+    only this process's own writes moved it since.  None if the driver
+    keeps no generation.
+    """
+    now = time.monotonic()
+    if now - config.get("SEARCH_CHECKED", float("-inf")) >= GENERATION_CHECK_MS / 1000:
+        config["SEARCH_CHECKED"] = now
+        driver = config["DB_DRIVER"]
+        generation = config["SEARCH_GENERATION"] = _generation(driver)
+        if generation is not None:
+            with _lock:
+                built = config.setdefault("SEARCH_BUILT", {})
+                for key, at in list(built.items()):
+                    if at == generation:
+                        continue
+                    if _is_own(driver, at, generation):
+                        built[key] = generation
+                    else:
+                        config[key] = None
+                        del built[key]
+    return config.get("SEARCH_GENERATION")
+
+
+def _stale(built: Optional[int], generation: Optional[int]) -> bool:
+    """Whether an index built at generation built misses writes, as far as can be told."""
+    return generation is not None and (built is None or built < generation)
+
+
+def get() -> Optional["SearchEngine"]:
+    """
+    Return the current app's SearchEngine, loading it on first use, or None
+    if SEARCH_INDEX is not set.  If its file is missing or older than the
+    DB's recipes generation, it is built and saved first.
+    """
+    config = current_app.config
+    path = config.get("SEARCH_INDEX")
+    if not path or not config.get("IN_PROCESS_INDEXES", True):
+        return None
+    generation = _check_generation(config)
+    engine = config.get("SEARCH_ENGINE")
+    if engine is None:
+        with _lock:
+            engine = config.get("SEARCH_ENGINE")
+            if engine is None:
+                from pyrecipe.services.search import SearchEngine
+
+                engine = SearchEngine.load(path) if os.path.exists(path) else None
+                if engine is None or _stale(engine.index.generation, generation):
+                    build(path, config["DB_DRIVER"])
+                    engine = SearchEngine.load(path)
+                config["SEARCH_ENGINE"] = engine
+                if generation is not None:
+                    built = config.setdefault("SEARCH_BUILT", {})
+                    built["SEARCH_ENGINE"] = engine.index.generation
+    return engine
+
+
+def _in_memory(key: str, index: str, create: bool):
+    config = current_app.config
+    if not config.get("IN_PROCESS_INDEXES", True):
+        return None
+    if config.get(key) is None and not create:
+        return None
+    generation = _check_generation(config)
+    result = config.get(key)
+    if result is None and create:
+        with _lock:
+            result = config.get(key)
+            if result is None:
+                from pyrecipe.services import search
+
+                result = config[key] = getattr(search, index).build(
+                    config["DB_DRIVER"].recipes_active()
+                )
+                config.setdefault("SEARCH_BUILT", {})[key] = generation
+    return result
+
+
+def suggester(build: bool = True) -> Optional["Suggester"]:
+    """
+    Return the current app's Suggester, building it from the DB on first
+    use.  With build=False it is None until then, so writes don't build it.
+    This worker's writes update it in place (see RecipeUC); it is only
+    rebuilt after other workers' writes.
+    """
+    return _in_memory("SUGGESTER", "Suggester", build)
+
+
+def pantry(build: bool = True) -> Optional["PantryIndex"]:
+    """
+    Return the current app's PantryIndex, like suggester(): updated in place
+    by this worker's writes, rebuilt after other workers' writes.
+    """
+    return _in_memory("PANTRY", "PantryIndex", build)
@@ -6,6 +6,10 @@ class IndexViewModel(ViewModelBase):
 
     def __init__(self):
         super().__init__()
+        self.page_token = self.request_dict.page or None
+        self.recipes = None
+        self.next_url = None
+        self.tags = None
 
     def validate(self):
         if not self.user:
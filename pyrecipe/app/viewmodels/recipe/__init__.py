@@ -3,3 +3,4 @@ from .edit_viewmodel import EditViewModel
 from .recipe_viewmodel import RecipeViewModel
 from .delete_viewmodel import DeleteViewModel
 from .search_viewmodel import SearchViewModel
+from .cook_viewmodel import CookViewModel
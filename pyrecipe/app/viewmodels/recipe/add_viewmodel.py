@@ -1,3 +1,4 @@
+import datetime
 from typing import List
 from typing import Optional
 
@@ -76,6 +77,14 @@ class AddViewModel(ViewModelBase):
     def name(self) -> str:
         return self.request_dict.name
 
+    @property
+    def last_modified(self) -> Optional[datetime.datetime]:
+        """Returns the last_modified_date of the recipe being edited, if any."""
+        try:
+            return datetime.datetime.fromisoformat(self.request_dict.last_modified)
+        except (TypeError, ValueError):
+            return None
+
     @property
     def files(self) -> Optional[str]:
         files = self.request.files.getlist("files[]")
@@ -0,0 +1,23 @@
+import re
+
+from pyrecipe.app.viewmodels.shared import ViewModelBase
+
+
+class CookViewModel(ViewModelBase):
+    """Viewmodel used for the /recipe/cook ("what can I cook?") view."""
+
+    # Most ingredients a listed recipe may be missing.
+    MAX_MISSING = 5
+
+    def __init__(self):
+        super().__init__()
+        self.ingredients_text = self.request_dict.ingredients.strip()
+        self.ingredients = [
+            i.strip() for i in re.split(r"[,\n]", self.ingredients_text) if i.strip()
+        ]
+        try:
+            missing = int(self.request_dict.missing or 0)
+        except ValueError:
+            missing = 0
+        self.missing = max(0, min(missing, self.MAX_MISSING))
+        self.recipes = None
@@ -10,4 +10,5 @@ class DeleteViewModel(ViewModelBase):
         self.path = self.request.path
         self.recipe = None
         self.recipes = None
+        self.next_url = None
         self.tags = None
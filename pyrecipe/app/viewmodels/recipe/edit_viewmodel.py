@@ -73,6 +73,11 @@ class EditViewModel(ViewModelBase):
                 tgs += "\n"
             return tgs
 
+    @property
+    def last_modified(self) -> str:
+        if self.method=="GET" and self.recipe:
+            return self.recipe.last_modified_date.isoformat()
+
     def edit_form(self) -> dict:
         return {
             "_id": self._id,
@@ -84,4 +89,5 @@ class EditViewModel(ViewModelBase):
             "directions": self.directions,
             "notes": self.notes,
             "tags": self.tags,
+            "last_modified": self.last_modified,
         }
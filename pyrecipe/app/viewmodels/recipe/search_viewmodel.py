@@ -7,6 +7,10 @@ class SearchViewModel(ViewModelBase):
     def __init__(self):
         super().__init__()
         self.text = self.request_dict.search_text.strip()
+        self.page_token = self.request_dict.page or None
+        self.recipes = None
+        self.next_url = None
+        self.tags = None
 
     def validate(self):
         if not self.user:
@@ -9,35 +9,80 @@ from pyrecipe.security import cookie_auth
 from pyrecipe.usecases.account_uc import AccountUC
 
 
+_UNSET = object()
+
+
 class ViewModelBase:
     """
     Base class for viewmodel subclasses to inherit from.
 
-    Upon instantiation, subclasses will have access to the
-    flask.request global variable, the request_dict will form
-    the data structure containing all user-related content, and
-    the user will be gained from any cookies contained in the
-    request.
+    Subclasses have access to the flask.request global variable as
+    self.request, to request_dict, the data structure containing all
+    user-related content, and to the user gained from any cookies
+    contained in the request.  request_dict, user_id and user are only
+    built when first accessed, and an anonymous request never looks a
+    user up.  The user is looked up once per request, however many
+    viewmodels the request creates, so it must be first accessed
+    within the request.
     """
 
     def __init__(self):
-        self.request: Request = flask.request
-        self.request_dict: dict = request_dict.create(default_val="")
         self.error: Optional[str] = None
+        self._request: Request = flask.request._get_current_object()
+        self._config = current_app.config
+        self._request_dict: Optional[request_dict.RequestDictionary] = None
+        self._user_id: Optional[str] = _UNSET
+        self._user = _UNSET
+
+    @property
+    def request(self) -> Request:
+        return self._request
+
+    @property
+    def request_dict(self) -> request_dict.RequestDictionary:
+        """The request's query args, headers and form data, built on first access."""
+        if self._request_dict is None:
+            self._request_dict = request_dict.create(default_val="", request=self.request)
+        return self._request_dict
 
+    @property
+    def user_id(self) -> Optional[str]:
+        """The id in the request's auth cookie, if it has a valid one."""
+        if self._user_id is _UNSET:
+            cookie = self.request.cookies.get(self._config["COOKIE_NAME"])
+            if cookie is None:
+                self._user_id = None
+            else:
+                self._user_id = cookie_auth.get_user_id_from_cookie(
+                    cookie, self._config["SECRET_KEY"]
+                )
+        return self._user_id
 
-        if current_app.config["COOKIE_NAME"] not in self.request.cookies:
-            self.user_id: Optional[str] = None
-        else:
-            self.user_id: Optional[int] = cookie_auth.get_user_id_from_cookie(
-                self.request.cookies[current_app.config["COOKIE_NAME"]],
-                current_app.config["SECRET_KEY"]
-            )
+    @property
+    def user(self) -> Optional["UserModel"]:
+        """The logged in user, or None without querying the DB if there is none."""
+        if self._user is _UNSET:
+            self._user = None if self.user_id is None else self._find_user(self.user_id)
+        return self._user
 
-        #self.user_id: Optional[int] = cookie_auth.get_user_id_via_auth_cookie(
-        #    self.request, current_app.config["COOKIE_NAME"], current_app.config["SECRET_KEY"]
-        #)
-        self.user = AccountUC(current_app.config["DB_DRIVER"]).find_user_by_id(self.user_id)
+    @staticmethod
+    def _find_user(user_id: str) -> Optional["UserModel"]:
+        """
+        Return the user with the given id, looked up in the DB only the first
+        time in a request: the result is kept on flask.g for the rest of it.
+        """
+        users = flask.g.setdefault("users_by_id", {})
+        if user_id not in users:
+            users[user_id] = AccountUC(current_app.config["DB_DRIVER"]).find_user_by_id(user_id)
+        return users[user_id]
 
     def to_dict(self) -> dict:
-        return self.__dict__
+        """
+        Return the fields the templates render: the viewmodel's public
+        attributes, user_id and user.  The request and request_dict are not
+        passed on.
+        """
+        fields = {key: value for key, value in vars(self).items() if not key.startswith("_")}
+        fields["user_id"] = self.user_id
+        fields["user"] = self.user
+        return fields
@@ -14,6 +14,7 @@ from flask import current_app
 from pyrecipe.app.helpers.view_modifiers import response
 from pyrecipe.app.viewmodels.home import IndexViewModel
 from pyrecipe.app.viewmodels.home import AboutViewModel
+from pyrecipe.errors import PageTokenError
 from pyrecipe.frontend import TEMPLATESDIR
 from pyrecipe.static import STATICDIR
 from pyrecipe.usecases.recipe_uc import RecipeUC
@@ -36,7 +37,15 @@ def index():
     vm.validate()
 
     uc = RecipeUC(current_app.config["DB_DRIVER"])
-    vm.recipes = uc.get_all_recipes(deleted=False)
+    try:
+        page = uc.get_recipes_page(
+            page_size=current_app.config["PAGE_SIZE"], token=vm.page_token, summary=True
+        )
+    except PageTokenError:
+        flask.abort(400)
+    vm.recipes = page.items
+    if page.next_token:
+        vm.next_url = flask.url_for("home.index", page=page.next_token)
     vm.tags = uc.get_tags()
 
     return vm.to_dict()
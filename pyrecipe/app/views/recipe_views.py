@@ -3,6 +3,7 @@
 import datetime
 from collections.abc import MutableSequence
 from typing import List
+from typing import Optional
 
 import flask
 from flask import current_app
@@ -10,11 +11,15 @@ from werkzeug.utils import secure_filename
 
 from pyrecipe.app.helpers.view_modifiers import response
 from pyrecipe.app.helpers import request_dict
+from pyrecipe.app.helpers import search_engine
 from pyrecipe.app.viewmodels.recipe import AddViewModel
+from pyrecipe.app.viewmodels.recipe import CookViewModel
 from pyrecipe.app.viewmodels.recipe import EditViewModel
 from pyrecipe.app.viewmodels.recipe import RecipeViewModel
 from pyrecipe.app.viewmodels.recipe import DeleteViewModel
 from pyrecipe.app.viewmodels.recipe import SearchViewModel
+from pyrecipe.errors import PageTokenError
+from pyrecipe.errors import RecipeConflictError
 from pyrecipe.frontend import TEMPLATESDIR
 from pyrecipe.static import STATICDIR
 from pyrecipe.usecases.recipe_uc import RecipeUC
@@ -25,6 +30,16 @@ blueprint = flask.Blueprint(
 )
 
 
+def _indexed_uc() -> RecipeUC:
+    """RecipeUC searching the app's search engine, and updating its indexes on writes."""
+    return RecipeUC(
+        current_app.config["DB_DRIVER"],
+        search_engine=search_engine.get(),
+        suggester=search_engine.suggester(build=False),
+        pantry=search_engine.pantry(build=False),
+    )
+
+
 #################### Recipe Viewing ##########################################
 
 
@@ -78,7 +93,7 @@ def recipe_add_get():
 @response(template_file="recipe/add_recipe.html")
 def recipe_add_post():
     vm = AddViewModel()
-    uc = RecipeUC(current_app.config["DB_DRIVER"])
+    uc = _indexed_uc()
 
     if not vm.user:
         flask.flash("You must be logged in to add a recipe", category="danger")
@@ -146,18 +161,26 @@ def recipe_edit_post(recipe_id: str):
         flask.flash("You must be logged in to edit a recipe", category="danger")
         return flask.redirect(flask.url_for("account.login_get"))
 
-    uc = RecipeUC(current_app.config["DB_DRIVER"])
-    recipe = uc.edit_recipe(
-        _id=vm.path.split("/")[-1],
-        name=vm.name,
-        prep_time=vm.prep_time,
-        cook_time=vm.cook_time,
-        servings=vm.servings,
-        ingredients=vm.ingredients,
-        directions=vm.directions,
-        tags=vm.tags,
-        notes=vm.notes,
-    )
+    uc = _indexed_uc()
+    try:
+        recipe = uc.edit_recipe(
+            _id=vm.path.split("/")[-1],
+            name=vm.name,
+            prep_time=vm.prep_time,
+            cook_time=vm.cook_time,
+            servings=vm.servings,
+            ingredients=vm.ingredients,
+            directions=vm.directions,
+            tags=vm.tags,
+            notes=vm.notes,
+            last_modified=vm.last_modified,
+        )
+    except RecipeConflictError:
+        flask.flash(
+            "Recipe was edited by someone else, please review their changes",
+            category="danger",
+        )
+        return flask.redirect(flask.url_for("recipe.recipe_edit_get", recipe_id=recipe_id))
     if recipe:
         flask.flash("Recipe successfully edited", category="success")
         return flask.redirect(
@@ -196,17 +219,30 @@ def recipe_delete_post(recipe_id: str):
         flask.flash("You must be logged in to delete a recipe", category="danger")
         return flask.redirect(flask.url_for("account.login_get"))
 
-    uc = RecipeUC(current_app.config["DB_DRIVER"])
+    uc = _indexed_uc()
     result = uc.delete_recipe(recipe_id)
     flask.flash("Recipe deleted", category="success")
 
-    vm.recipes = uc.get_all_recipes(deleted=False)
+    page = uc.get_recipes_page(page_size=current_app.config["PAGE_SIZE"], summary=True)
+    vm.recipes = page.items
+    if page.next_token:
+        vm.next_url = flask.url_for("home.index", page=page.next_token)
     vm.tags = uc.get_tags()
     return vm.to_dict()
 
 
 #################### Recipes Searching #######################################
 
+
+def _page_number(page: Optional[str]) -> int:
+    """The 1-based number of a ranked listing's ?page=, aborting with 400 if it isn't one."""
+    if not page:
+        return 1
+    if not page.isdigit() or int(page) < 1:
+        flask.abort(400)
+    return int(page)
+
+
 @blueprint.route("/recipe/search/<text>", methods=["GET", "POST"])
 @blueprint.route("/recipe/search/", methods=["GET", "POST"])
 @response(template_file="home/index.html")
@@ -216,33 +252,81 @@ def recipes_search(text: str = None):
     if vm.text in (None, ""):
         vm.text = text
 
-    uc = RecipeUC(current_app.config["DB_DRIVER"])
+    uc = _indexed_uc()
 
     if vm.text is None:
-        vm.recipes = uc.get_all_recipes(deleted=False)
+        try:
+            page = uc.get_recipes_page(
+                page_size=current_app.config["PAGE_SIZE"],
+                token=vm.page_token,
+                summary=True,
+            )
+        except PageTokenError:
+            flask.abort(400)
+        vm.recipes = page.items
+        if page.next_token:
+            vm.next_url = flask.url_for("recipe.recipes_search", page=page.next_token)
     else:
-        vm.recipes = uc.recipes_search(vm.text)
+        # Ranked results have no keyset to continue from: page by number,
+        # asking for one more recipe to tell if there is a next page.
+        size = current_app.config["PAGE_SIZE"]
+        number = _page_number(vm.page_token)
+        recipes = uc.recipes_search(
+            vm.text, summary=True, limit=size + 1, skip=(number - 1) * size
+        )
+        vm.recipes = recipes[:size]
+        if len(recipes) > size:
+            vm.next_url = flask.url_for("recipe.recipes_search", text=vm.text, page=number + 1)
 
     vm.tags = uc.get_tags()
     return vm.to_dict()
 
 
+@blueprint.route("/recipe/cook", methods=["GET", "POST"])
+@response(template_file="recipe/cook.html")
+def recipes_cookable():
+    """
+    "What can I cook?": the recipes that can be made with the ingredients
+    submitted, or with at most "missing" more.
+    """
+    vm = CookViewModel()
+    if vm.ingredients:
+        uc = RecipeUC(current_app.config["DB_DRIVER"], pantry=search_engine.pantry())
+        vm.recipes = uc.recipes_cookable(
+            vm.ingredients, missing=vm.missing, limit=current_app.config["PAGE_SIZE"]
+        )
+    return vm.to_dict()
+
+
 @blueprint.route("/recipe/tag/<tags>", methods=["GET"])
 @response(template_file="recipe/tag.html")
 def recipes_with_tags(tags: List[str]):
     """
-    Routing required to view recipes with a given tag.
+    Routing required to view recipes with a given tag, a page at a time.
 
-    :param recipe_id: (str) the DB id of the recipe.
+    :param tags: (str) the tag.
 
-    :returns: recipe or 404 if recipe is not found.
+    :returns: a page of the recipes with the tag, and the next page's url.
     """
     if not isinstance(tags, MutableSequence):
         tags = [tags]
 
     uc = RecipeUC(current_app.config["DB_DRIVER"])
-    recipes = uc.find_recipes_by_tag(tags)
-    return {"recipes": recipes}
+    try:
+        page = uc.get_recipes_page(
+            page_size=current_app.config["PAGE_SIZE"],
+            token=flask.request.args.get("page") or None,
+            tags=tags,
+            summary=True,
+        )
+    except PageTokenError:
+        flask.abort(400)
+    next_url = None
+    if page.next_token:
+        next_url = flask.url_for(
+            "recipe.recipes_with_tags", tags=",".join(tags), page=page.next_token
+        )
+    return {"recipes": page.items, "next_url": next_url}
 
 
 @blueprint.route("/recipe/deleted", methods=["GET"])
@@ -1,10 +1,17 @@
 """REST interface for the app."""
 
 import flask
+from flask import current_app
+
+from pyrecipe.app.helpers import search_engine
+from pyrecipe.usecases.recipe_uc import RecipeUC
 
 
 blueprint = flask.Blueprint("rest", __name__)
 
+# Most suggestions of each kind an autocomplete request can ask for.
+AUTOCOMPLETE_MAX = 20
+
 
 @blueprint.route("/rest")
 @blueprint.route("/rest/")
@@ -13,3 +20,24 @@ def index():
     return {
         "alive": True,
     }
+
+
+@blueprint.route("/rest/autocomplete", methods=["GET"])
+def autocomplete():
+    """
+    Search-as-you-type suggestions for the ?q= prefix: up to ?limit= (5 by
+    default) recipe names, tags and ingredients.
+
+    GET /rest/autocomplete?q=gar
+    {"prefix": "gar", "names": [{"_id": ..., "name": "Garlic Bread"}],
+     "tags": [], "ingredients": ["garlic"]}
+    """
+    prefix = flask.request.args.get("q", "")
+    try:
+        limit = int(flask.request.args.get("limit", 5))
+    except ValueError:
+        flask.abort(400)
+    limit = max(0, min(limit, AUTOCOMPLETE_MAX))
+
+    uc = RecipeUC(current_app.config["DB_DRIVER"], suggester=search_engine.suggester())
+    return {"prefix": prefix, **uc.autocomplete(prefix, limit=limit)}
@@ -1,10 +1,86 @@
 """A config module for the app."""
 
+import multiprocessing
 import os
 import uuid
 
 from pyrecipe.static import IMAGEDIR
+from pyrecipe.storage.cache import CachingDriver
+from pyrecipe.storage.memory import MemoryDriver
 from pyrecipe.storage.mongo import MongoDriver
+from pyrecipe.storage.mongo import RawMongoDriver
+from pyrecipe.storage.sqlite import SQLiteDriver
+
+
+# DB drivers selectable with the PYRECIPE_DB_DRIVER environment variable.
+DB_DRIVERS = {
+    "mongo": MongoDriver,
+    "mongo_raw": RawMongoDriver,
+    "memory": MemoryDriver,
+    "sqlite": SQLiteDriver,
+}
+
+
+def _env_int(name: str, default: int = None) -> int:
+    """Return the environment variable as an int, or default if it is unset."""
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def _db_driver():
+    """
+    The PYRECIPE_DB_DRIVER driver, wrapped in a CachingDriver of
+    PYRECIPE_DB_CACHE_SIZE entries living PYRECIPE_DB_CACHE_TTL seconds
+    (default 60) when the cache size is set.  Users are cached too if
+    PYRECIPE_DB_USER_CACHE_SIZE is set, for PYRECIPE_DB_USER_CACHE_TTL
+    seconds (default 5).  Workers check for writes by the others every
+    PYRECIPE_DB_CACHE_CHECK_MS (default 250), and don't cache recipe reads
+    for PYRECIPE_DB_CACHE_LAG_MS after a write (default 1000 for mongo,
+    whose list reads may go to lagging secondaries).
+    """
+    driver = DB_DRIVERS[os.environ.get("PYRECIPE_DB_DRIVER") or "mongo"]
+    maxsize = _env_int("PYRECIPE_DB_CACHE_SIZE")
+    user_maxsize = _env_int("PYRECIPE_DB_USER_CACHE_SIZE")
+    if not maxsize and not user_maxsize:
+        return driver
+    ttl = float(os.environ.get("PYRECIPE_DB_CACHE_TTL") or 60)
+    user_ttl = float(os.environ.get("PYRECIPE_DB_USER_CACHE_TTL") or 5)
+    check_ms = _env_int("PYRECIPE_DB_CACHE_CHECK_MS", CachingDriver.GENERATION_CHECK_MS)
+    lag_ms = _env_int("PYRECIPE_DB_CACHE_LAG_MS")
+    return CachingDriver.wrap(
+        driver,
+        maxsize=maxsize or None,
+        ttl=ttl,
+        check_ms=check_ms,
+        user_maxsize=user_maxsize or 0,
+        user_ttl=user_ttl,
+        lag_ms=lag_ms,
+    )
+
+
+def _write_concern(value: str):
+    """Return the "w" write concern: a number of nodes or a mode like "majority"."""
+    return int(value) if value.isdigit() else value
+
+
+def _db_options() -> dict:
+    """
+    MongoClient connection pool, timeout, write concern and read preference
+    options from the environment.  Unset options are left to the driver default.
+    """
+    options = {
+        "maxPoolSize": _env_int("PYRECIPE_DB_MAX_POOL_SIZE"),
+        "minPoolSize": _env_int("PYRECIPE_DB_MIN_POOL_SIZE"),
+        "maxIdleTimeMS": _env_int("PYRECIPE_DB_MAX_IDLE_TIME_MS"),
+        "serverSelectionTimeoutMS": _env_int("PYRECIPE_DB_SERVER_SELECTION_TIMEOUT_MS", 5000),
+        "socketTimeoutMS": _env_int("PYRECIPE_DB_SOCKET_TIMEOUT_MS"),
+        "readPreference": os.environ.get("PYRECIPE_DB_READ_PREFERENCE"),
+    }
+    if os.environ.get("PYRECIPE_DB_WRITE_CONCERN"):
+        options["w"] = _write_concern(os.environ["PYRECIPE_DB_WRITE_CONCERN"])
+    if os.environ.get("PYRECIPE_DB_JOURNAL"):
+        options["journal"] = os.environ["PYRECIPE_DB_JOURNAL"].lower() in ("1", "true")
+    return {name: value for name, value in options.items() if value is not None}
 
 
 class BaseConfig:
@@ -13,13 +89,27 @@ class BaseConfig:
     APP_NAME = "PyRecipe"
     SECRET_KEY = os.environ.get("SECRET_KEY") or str(uuid.uuid4()).replace("-", "")
     DB_URI = os.environ.get("MONGODB_URI") or "pyrecipe_prod"
-    DB_DRIVER = MongoDriver
+    DB_DRIVER = _db_driver()
+    DB_HOST = os.environ.get("MONGODB_HOST")
+    DB_OPTIONS = _db_options()
     DEBUG = False
     TESTING = False
     COOKIE_NAME = "pyrecipe_prod"
     ALLOWED_IMAGES = ["jpg", "jpeg", "png", "gif"]
     IMAGEDIR = IMAGEDIR
     DOMAIN = "127.0.0.1"
+    PAGE_SIZE = int(os.environ.get("PYRECIPE_PAGE_SIZE") or 24)
+    # File of the in-process search index, searched instead of the DB if set.
+    SEARCH_INDEX = os.environ.get("PYRECIPE_SEARCH_INDEX")
+    # Keep the search engine, Suggester and PantryIndex in process.  Turned
+    # off by "pyrecipe serve" for pre-forked workers if the DB driver keeps no
+    # recipes generation to tell them about each other's writes.
+    IN_PROCESS_INDEXES = True
+    # "pyrecipe serve" settings.  Each worker process has its own DB
+    # connection pool, so maxPoolSize should be at least THREADS.
+    BIND = os.environ.get("PYRECIPE_BIND") or "127.0.0.1:8000"
+    WORKERS = _env_int("PYRECIPE_WORKERS", multiprocessing.cpu_count() * 2 + 1)
+    THREADS = _env_int("PYRECIPE_THREADS", 4)
 
 
 class ProdConfig(BaseConfig):
@@ -1,3 +1,5 @@
 from .custom_exceptions import UserNotFoundError
 from .custom_exceptions import UserLoginError
 from .custom_exceptions import UserCreationError
+from .custom_exceptions import PageTokenError
+from .custom_exceptions import RecipeConflictError
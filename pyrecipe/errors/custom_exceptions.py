@@ -30,3 +30,19 @@ class UserCreationError(ValueError):
             if key == "email":
                 self.error = "Email address <{}> used by another user.".format(val)
         super().__init__(UserCreationError, self.error)
+
+
+class PageTokenError(ValueError):
+    """Page continuation token is malformed or for a different query."""
+
+    def __init__(self, token):
+        self.error = "Invalid page token <{}>.".format(token)
+        super().__init__(PageTokenError, self.error)
+
+
+class RecipeConflictError(ValueError):
+    """Recipe was modified by someone else since the editor loaded it."""
+
+    def __init__(self, recipe_id):
+        self.error = "Recipe <{}> was modified by someone else.".format(recipe_id)
+        super().__init__(RecipeConflictError, self.error)
@@ -1,5 +1,7 @@
 """The main entry point for the application."""
 
+import argparse
+
 from pyrecipe import __version__ as VERSION
 from pyrecipe.app import app
 import pyrecipe.config as config
@@ -22,6 +24,17 @@ _^_^_^_^_^_^_^_^_^_^_^_^_^_^_^_^_^_^_^_^_^_^
 )
 
 
+def init_db(app: "flask.Flask", verbose: bool = False) -> None:
+    """Initialize the configured DB driver with the app's DB settings."""
+    app.config.get("DB_DRIVER").db_initialize(
+        db_name=app.config.get("DB_URI"),
+        verbose=verbose,
+        host=app.config.get("DB_HOST"),
+        warmup=True,
+        **app.config.get("DB_OPTIONS")
+    )
+
+
 def main(app: "flask.Flask", prod: bool=False) -> None:
     """Run the app.  prod=False, runs in development mode by default."""
     if prod:
@@ -30,9 +43,178 @@ def main(app: "flask.Flask", prod: bool=False) -> None:
         app.config.from_object(config.DevConfig)
 
     print(BANNER, flush=True)
-    app.config.get("DB_DRIVER").db_initialize(db_name=app.config.get("DB_URI"), verbose=True)
+    init_db(app, verbose=True)
     app.run(host=app.config.get("DOMAIN"))
 
 
+def serve(
+    app: "flask.Flask",
+    workers: int = None,
+    threads: int = None,
+    bind: str = None,
+    **settings
+) -> None:
+    """
+    Run the app in production mode with gunicorn: workers pre-forked
+    processes each serving up to threads requests at once.  Defaults come
+    from the WORKERS, THREADS and BIND config.  The DB is initialized in each
+    worker after it is forked.  Send the master SIGHUP to gracefully reload
+    the workers, and SIGTERM to gracefully shut down.  With more than one
+    worker, the in-process search indexes are only kept if the DB driver has
+    a recipes generation, see app/helpers/search_engine.py.
+
+    :param settings: other gunicorn settings, i.e. timeout, graceful_timeout,
+        max_requests.
+    """
+    from pyrecipe.app.helpers import search_engine
+    from pyrecipe.server import PyRecipeServer
+
+    app.config.from_object(config.ProdConfig)
+    options = {
+        "bind": bind or app.config.get("BIND"),
+        "workers": workers or app.config.get("WORKERS"),
+        "threads": threads or app.config.get("THREADS"),
+        **settings
+    }
+    if options["workers"] > 1 and not search_engine.has_generation(app.config["DB_DRIVER"]):
+        app.config["IN_PROCESS_INDEXES"] = False
+
+    print(BANNER, flush=True)
+    PyRecipeServer(app, options, init_db).run()
+
+
+def rebuild_tag_stats(app: "flask.Flask", prod: bool = True) -> None:
+    """
+    Recount the tag counts the DB driver keeps (see
+    MongoDriver.recipes_rebuild_tag_stats), to repair them or to fill them
+    in for recipes written before they were kept.
+    """
+    app.config.from_object(config.ProdConfig if prod else config.DevConfig)
+    init_db(app, verbose=True)
+    driver = app.config.get("DB_DRIVER")
+    rebuild = getattr(driver, "recipes_rebuild_tag_stats", lambda: None)
+    counts = rebuild()
+    if counts is None:
+        print("[+] {} counts tags on every read, nothing to rebuild".format(driver.__name__))
+    else:
+        print("[+] Tag counts rebuilt: {} tags".format(len(counts)))
+
+
+def backfill_ingredients(
+    app: "flask.Flask", prod: bool = True, batch_size: int = None, reparse: bool = False
+) -> None:
+    """
+    Parse the ingredients of the recipes written before ingredients were
+    parsed on write (see MongoDriver.recipes_backfill_ingredients), or of
+    every recipe with reparse=True, printing the progress of each batch.
+    """
+    app.config.from_object(config.ProdConfig if prod else config.DevConfig)
+    init_db(app, verbose=True)
+    driver = app.config.get("DB_DRIVER")
+
+    def progress(done: int, total: int) -> None:
+        print("[+] Parsed {}/{} recipes".format(done, total), flush=True)
+
+    updated = driver.recipes_backfill_ingredients(
+        batch_size=batch_size, reparse=reparse, progress=progress
+    )
+    print("[+] Ingredients parsed: {} recipes updated".format(updated))
+
+
+def build_search_index(app: "flask.Flask", prod: bool = True, path: str = None) -> None:
+    """
+    Index the active recipes for the in-process search engine and save the
+    index to path, SEARCH_INDEX by default.  Reload the workers (SIGHUP) to
+    have them map the new index.
+    """
+    from pyrecipe.app.helpers import search_engine
+
+    app.config.from_object(config.ProdConfig if prod else config.DevConfig)
+    path = path or app.config.get("SEARCH_INDEX")
+    if not path:
+        print("[-] No search index file, set PYRECIPE_SEARCH_INDEX or pass --path")
+        return
+    init_db(app, verbose=True)
+    search_engine.build(path, app.config.get("DB_DRIVER"))
+    print("[+] Search index saved to {}".format(path))
+
+
+def cli(argv: list = None) -> None:
+    """
+    The pyrecipe console script.
+
+    pyrecipe                 # development server
+    pyrecipe serve --workers 9 --threads 4
+    pyrecipe rebuild-tag-stats
+    pyrecipe backfill-ingredients --batch-size 1000
+    pyrecipe build-search-index --path /var/lib/pyrecipe/recipes.idx
+    """
+    parser = argparse.ArgumentParser(prog="pyrecipe", description="A Cookbook made with Python")
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("dev", help="run the development server (default)")
+    serve_parser = commands.add_parser(
+        "serve", help="run the production server, with pre-forked workers"
+    )
+    serve_parser.add_argument("--bind", help="address to listen on, i.e. 0.0.0.0:8000")
+    serve_parser.add_argument("--workers", type=int, help="number of worker processes")
+    serve_parser.add_argument(
+        "--threads", type=int, help="number of requests each worker serves at once"
+    )
+    serve_parser.add_argument(
+        "--timeout", type=int, help="seconds before a silent worker is restarted"
+    )
+    serve_parser.add_argument(
+        "--graceful-timeout", type=int, help="seconds workers get to finish on reload/shutdown"
+    )
+    serve_parser.add_argument(
+        "--max-requests", type=int, help="restart each worker after this many requests"
+    )
+    rebuild_parser = commands.add_parser(
+        "rebuild-tag-stats", help="recount the recipes of every tag, for repair"
+    )
+    rebuild_parser.add_argument(
+        "--dev", action="store_true", help="use the development DB, instead of production"
+    )
+    backfill_parser = commands.add_parser(
+        "backfill-ingredients", help="parse the ingredients of the recipes written before"
+    )
+    backfill_parser.add_argument("--batch-size", type=int, help="recipes updated per batch")
+    backfill_parser.add_argument(
+        "--reparse", action="store_true", help="parse every recipe, i.e. after a parser update"
+    )
+    backfill_parser.add_argument(
+        "--dev", action="store_true", help="use the development DB, instead of production"
+    )
+    index_parser = commands.add_parser(
+        "build-search-index", help="index the recipes for the in-process search engine"
+    )
+    index_parser.add_argument("--path", help="index file, instead of PYRECIPE_SEARCH_INDEX")
+    index_parser.add_argument(
+        "--dev", action="store_true", help="use the development DB, instead of production"
+    )
+    args = parser.parse_args(argv)
+
+    if args.command == "rebuild-tag-stats":
+        rebuild_tag_stats(app, prod=not args.dev)
+    elif args.command == "backfill-ingredients":
+        backfill_ingredients(
+            app, prod=not args.dev, batch_size=args.batch_size, reparse=args.reparse
+        )
+    elif args.command == "build-search-index":
+        build_search_index(app, prod=not args.dev, path=args.path)
+    elif args.command == "serve":
+        serve(
+            app,
+            workers=args.workers,
+            threads=args.threads,
+            bind=args.bind,
+            timeout=args.timeout,
+            graceful_timeout=args.graceful_timeout,
+            max_requests=args.max_requests,
+        )
+    else:
+        main(app, prod=False)
+
+
 if __name__ == "__main__":
-    main(app, prod=False)
+    cli()
@@ -0,0 +1,45 @@
+"""
+Production WSGI server for the app: gunicorn with pre-forked worker processes.
+
+The app is imported once in the master and forked into the workers, and each
+worker registers its own DB connection after the fork, since pymongo clients
+(and their pools) can't be shared across a fork.
+
+gunicorn is an optional dependency: pip install pyrecipe[server].
+"""
+
+import gunicorn.app.base
+
+
+class PyRecipeServer(gunicorn.app.base.BaseApplication):
+    """
+    gunicorn application serving the flask app.
+
+    PyRecipeServer(app, {"bind": "0.0.0.0:8000", "workers": 9, "threads": 4}, init_db).run()
+
+    :param app: the flask app to serve.
+    :param options: gunicorn settings, i.e. bind, workers, threads, timeout.
+    :param init_db: callable(app) that initializes the DB, run in every
+        worker right after it is forked.
+    """
+
+    def __init__(self, app: "flask.Flask", options: dict, init_db: "Callable"):
+        self.application = app
+        self.options = options
+        self.init_db = init_db
+        super().__init__()
+
+    def load_config(self) -> None:
+        """Apply the options.  Also called again on a graceful reload (SIGHUP)."""
+        for key, value in self.options.items():
+            if key in self.cfg.settings and value is not None:
+                self.cfg.set(key, value)
+        self.cfg.set("preload_app", True)
+        self.cfg.set("post_fork", self.post_fork)
+
+    def load(self) -> "flask.Flask":
+        return self.application
+
+    def post_fork(self, server, worker) -> None:
+        """gunicorn hook: connect the freshly forked worker to the DB."""
+        self.init_db(self.application)
@@ -1,3 +1,22 @@
-from . import export
-from . import images
-from . import importer
+"""
+Services used by the use cases: pdf export, image processing, recipe import
+and in-process recipe search.
+
+All but search pull in a heavy third party package (reportlab, PIL,
+recipe_scrapers) that most requests never need, so the subpackages are only
+imported on first access, i.e. pyrecipe.services.export.
+"""
+
+import importlib
+
+__all__ = ["export", "images", "importer", "search"]
+
+
+def __getattr__(name: str):
+    if name in __all__:
+        return importlib.import_module("." + name, __name__)
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
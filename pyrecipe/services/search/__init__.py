@@ -0,0 +1,3 @@
+from .engine import SearchEngine
+from .pantry import PantryIndex
+from .suggest import Suggester
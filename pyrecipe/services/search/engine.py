@@ -0,0 +1,191 @@
+"""
+In-process recipe search: BM25F ranking over an InvertedIndex.
+
+The score of a recipe for a query term combines the term's frequency in
+each field, weighted by WEIGHTS and normalized by the field's length
+against its average (B), saturated by K1, times the term's idf:
+
+    tf = sum(WEIGHTS[f] * tf[f] / (1 - B[f] + B[f] * len[f] / avg_len[f]))
+    score = sum(idf(term) * tf / (K1 + tf))
+"""
+
+import bisect
+import collections
+import heapq
+import math
+import re
+import threading
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+from pyrecipe.storage.shared.recipe_summary_model import RecipeSummary
+
+from .index import FIELDS
+from .index import InvertedIndex
+
+
+class SearchEngine:
+    """
+    Thread safe search engine over the active recipes.
+
+    engine = SearchEngine.build(driver.recipes_active())
+    engine.save("recipes.idx")
+    engine = SearchEngine.load("recipes.idx")   # i.e. in each worker
+    engine.add(recipe)                          # on create/edit
+    engine.remove(recipe_id)                    # on delete
+    engine.search("garlic bas", limit=24, prefix=True, summary=True)
+    """
+
+    # Same field weights as the text indexes of the DB drivers.
+    WEIGHTS = {"name": 10, "tags": 5, "ingredients": 4, "directions": 2}
+    # Length normalization of each field: short fields barely vary in length.
+    B = {"name": 0.5, "tags": 0.3, "ingredients": 0.75, "directions": 0.75}
+    K1 = 1.2
+
+    TERM_RE = re.compile(r"\w+")
+
+    def __init__(
+        self,
+        index: InvertedIndex = None,
+        weights: dict = None,
+        b: dict = None,
+        k1: float = None,
+    ):
+        self.index = index if index is not None else InvertedIndex()
+        weights = {**self.WEIGHTS, **(weights or {})}
+        b = {**self.B, **(b or {})}
+        self._weights = [weights[field] for field in FIELDS]
+        self._b = [b[field] for field in FIELDS]
+        self._k1 = self.K1 if k1 is None else k1
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @classmethod
+    def terms(cls, text: str) -> List[str]:
+        return cls.TERM_RE.findall(text.lower())
+
+    @classmethod
+    def build(cls, recipes, **kwargs) -> "SearchEngine":
+        """Index the given recipes, i.e. driver.recipes_active()."""
+        engine = cls(**kwargs)
+        for recipe in recipes:
+            engine.add(recipe)
+        return engine
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "SearchEngine":
+        """Memory-map the index saved at path."""
+        return cls(InvertedIndex.load(path), **kwargs)
+
+    def save(self, path: str) -> None:
+        with self._lock:
+            self.index.save(path)
+
+    def add(self, recipe: Union["RecipeModel", dict]) -> None:
+        """
+        Index the recipe, or re-index it if it was edited.  Takes a
+        RecipeModel, or a dict of its fields including _id.  A recipe marked
+        as deleted is removed instead.
+        """
+        record = recipe if isinstance(recipe, dict) else recipe.to_dict()
+        if record.get("deleted"):
+            self.remove(record["_id"])
+            return
+        fields = {}
+        for field in FIELDS:
+            values = record.get(field) or []
+            if isinstance(values, str):
+                values = [values]
+            fields[field] = [term for value in values for term in self.terms(value)]
+        stored = [record["name"], record.get("cook_time"), list(record.get("tags") or [])]
+        with self._lock:
+            self.index.add(str(record["_id"]), fields, stored)
+
+    def remove(self, recipe_id: str) -> bool:
+        """Remove the recipe from the index, returning whether it was in it."""
+        with self._lock:
+            return self.index.remove(str(recipe_id))
+
+    def _expand(self, term: str, prefix: bool) -> List[int]:
+        index = self.index
+        if not prefix:
+            term_number = index.terms.get(term)
+            return [] if term_number is None else [term_number]
+        terms = index.sorted_terms()
+        start = bisect.bisect_left(terms, term)
+        end = bisect.bisect_left(terms, term + "\uffff", start)
+        return [index.terms[t] for t in terms[start:end]]
+
+    def scores(self, text: str, prefix: bool = False) -> collections.Counter:
+        """
+        Return {doc number: BM25F score} of the recipes matching any term of
+        text.  With prefix=True every term also matches the longer terms it
+        starts, i.e. "bas" matches "basil".
+        """
+        index = self.index
+        width = len(FIELDS)
+        weights, b, k1 = self._weights, self._b, self._k1
+        scores = collections.Counter()
+        live = len(index)
+        if not live:
+            return scores
+        avg = [max(total / live, 1e-9) for total in index.field_totals]
+        lengths = index.lengths
+        doc_ids = index.doc_ids
+        term_numbers = {
+            n for term in set(self.terms(text)) for n in self._expand(term, prefix)
+        }
+        for term_number in term_numbers:
+            docs, tfs = index.postings(term_number)
+            matches = [(i, doc) for i, doc in enumerate(docs) if doc_ids[doc] is not None]
+            if not matches:
+                continue
+            df = len(matches)
+            idf = math.log(1 + (live - df + 0.5) / (df + 0.5))
+            for i, doc in matches:
+                tf = 0.0
+                for f in range(width):
+                    frequency = tfs[i * width + f]
+                    if frequency:
+                        norm = 1 - b[f] + b[f] * lengths[doc * width + f] / avg[f]
+                        tf += weights[f] * frequency / norm
+                if tf:
+                    scores[doc] += idf * tf / (k1 + tf)
+        return scores
+
+    def search(
+        self,
+        text: str,
+        limit: Optional[int] = None,
+        skip: int = 0,
+        prefix: bool = False,
+        summary: bool = False,
+    ) -> List[Union[Tuple[str, float], RecipeSummary]]:
+        """
+        Return the (_id, score) of the recipes matching text, best match
+        first, or their RecipeSummary's if summary=True.
+        """
+        with self._lock:
+            scores = self.scores(text, prefix=prefix)
+            doc_ids = self.index.doc_ids
+            key = lambda doc: (-scores[doc], doc_ids[doc])
+            if limit is None:
+                ranked = sorted(scores, key=key)[skip:]
+            else:
+                ranked = heapq.nsmallest(skip + limit, scores, key=key)[skip:]
+            if not summary:
+                return [(doc_ids[doc], scores[doc]) for doc in ranked]
+            stored = self.index.stored
+            return [
+                RecipeSummary(
+                    _id=doc_ids[doc],
+                    name=stored[doc][0],
+                    cook_time=stored[doc][1],
+                    tags=list(stored[doc][2]),
+                )
+                for doc in ranked
+            ]
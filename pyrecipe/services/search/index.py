@@ -0,0 +1,253 @@
+"""
+Array-backed inverted index of recipe terms, saved to and memory-mapped
+from a single file.
+
+Each term is interned and numbered.  Its postings are two flat arrays: the
+numbers of the documents holding it ("I"), and their term frequencies in
+each of FIELDS ("H", len(FIELDS) per posting).  The field lengths of every
+document are kept the same way, so BM25F can be computed from the arrays
+alone.
+
+A loaded index maps the file read-only and reads the postings straight out
+of the mapping, so every process loading the same file shares its pages.
+Writes never touch the mapping: a changed term's postings are copied into
+arrays the first time it is written to, and removed documents are only
+marked as such until the index is saved again.
+"""
+
+import json
+import mmap
+import os
+import sys
+import tempfile
+from array import array
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Tuple
+
+
+FIELDS = ("name", "tags", "ingredients", "directions")
+
+MAGIC = b"PYRSIDX1"
+DOC_TYPE = "I"
+TF_TYPE = "H"
+TF_MAX = 2 ** 16 - 1
+
+
+def _align(offset: int, size: int = 8) -> int:
+    return offset + -offset % size
+
+
+class InvertedIndex:
+    """
+    Postings and field lengths of the documents added, by document number.
+
+    index = InvertedIndex()
+    index.add("5e7d...", {"name": [...], "tags": [...], ...}, stored)
+    docs, tfs = index.postings(index.terms["garlic"])
+    index.save("recipes.idx")
+    index = InvertedIndex.load("recipes.idx")
+    """
+
+    def __init__(self):
+        self.terms = {}  # term -> term number
+        self.term_list = []  # term number -> term
+        self.doc_ids = []  # doc number -> _id, or None once removed
+        self.doc_numbers = {}  # _id -> doc number
+        self.stored = []  # doc number -> stored fields, i.e. for summaries
+        self.lengths = array(DOC_TYPE)  # len(FIELDS) field lengths per doc
+        self.field_totals = [0] * len(FIELDS)  # summed lengths of live docs
+        self._doc_terms = {}  # doc number -> term numbers, if added since load
+        self._changed = {}  # term number -> (docs, tfs) arrays, once written to
+        self._offsets = array(DOC_TYPE, [0])  # loaded postings of each term
+        self._docs = memoryview(array(DOC_TYPE))
+        self._tfs = memoryview(array(TF_TYPE))
+        self._mmap = None
+        self._sorted_terms = None
+        self.generation = None  # DB recipes generation indexed, if known
+
+    def __len__(self) -> int:
+        return len(self.doc_numbers)
+
+    def postings(self, term_number: int) -> Tuple[Iterable[int], Iterable[int]]:
+        """Return the doc numbers and field frequencies of the term's postings."""
+        changed = self._changed.get(term_number)
+        if changed is not None:
+            return changed
+        if term_number + 1 >= len(self._offsets):
+            return (), ()
+        start, end = self._offsets[term_number], self._offsets[term_number + 1]
+        width = len(FIELDS)
+        return self._docs[start:end], self._tfs[start * width:end * width]
+
+    def _writable(self, term_number: int) -> Tuple[array, array]:
+        changed = self._changed.get(term_number)
+        if changed is None:
+            docs, tfs = self.postings(term_number)
+            changed = self._changed[term_number] = (array(DOC_TYPE, docs), array(TF_TYPE, tfs))
+        return changed
+
+    def sorted_terms(self) -> List[str]:
+        """Every term, sorted, for prefix lookups."""
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self.terms)
+        return self._sorted_terms
+
+    def is_live(self, doc: int) -> bool:
+        return self.doc_ids[doc] is not None
+
+    def add(self, _id: str, fields: Dict[str, List[str]], stored: list) -> None:
+        """
+        Index a document, given the terms of each of FIELDS in order.  Any
+        document already indexed under _id is removed first.
+        """
+        self.remove(_id)
+        if not isinstance(self.lengths, array):
+            self.lengths = array(DOC_TYPE, self.lengths)
+        doc = len(self.doc_ids)
+        self.doc_ids.append(_id)
+        self.doc_numbers[_id] = doc
+        self.stored.append(stored)
+
+        frequencies = {}
+        for f, field in enumerate(FIELDS):
+            terms = fields.get(field, ())
+            self.lengths.append(len(terms))
+            self.field_totals[f] += len(terms)
+            for term in terms:
+                term_number = self.terms.get(term)
+                if term_number is None:
+                    term_number = self.terms[sys.intern(term)] = len(self.term_list)
+                    self.term_list.append(term)
+                    self._changed[term_number] = (array(DOC_TYPE), array(TF_TYPE))
+                    self._sorted_terms = None
+                frequencies.setdefault(term_number, [0] * len(FIELDS))[f] += 1
+
+        for term_number, tfs in frequencies.items():
+            docs, term_tfs = self._writable(term_number)
+            docs.append(doc)
+            term_tfs.extend(min(tf, TF_MAX) for tf in tfs)
+        self._doc_terms[doc] = list(frequencies)
+
+    def remove(self, _id: str) -> bool:
+        """
+        Remove the document from the index.  Its postings are dropped if it
+        was added since the index was loaded, else skipped until saved.
+        """
+        doc = self.doc_numbers.pop(_id, None)
+        if doc is None:
+            return False
+        self.doc_ids[doc] = None
+        self.stored[doc] = None
+        width = len(FIELDS)
+        for f in range(width):
+            self.field_totals[f] -= self.lengths[doc * width + f]
+        for term_number in self._doc_terms.pop(doc, ()):
+            docs, tfs = self._changed[term_number]
+            i = docs.index(doc)
+            del docs[i]
+            del tfs[i * width:(i + 1) * width]
+        return True
+
+    def save(self, path: str) -> None:
+        """
+        Write the live documents to path, renumbered, replacing it
+        atomically so processes mapping the old file are unaffected.
+        """
+        width = len(FIELDS)
+        renumber = {}
+        doc_ids, stored, lengths = [], [], array(DOC_TYPE)
+        for doc, _id in enumerate(self.doc_ids):
+            if _id is not None:
+                renumber[doc] = len(doc_ids)
+                doc_ids.append(_id)
+                stored.append(self.stored[doc])
+                lengths.extend(self.lengths[doc * width:(doc + 1) * width])
+
+        terms, offsets = [], array(DOC_TYPE, [0])
+        all_docs, all_tfs = array(DOC_TYPE), array(TF_TYPE)
+        for term_number, term in enumerate(self.term_list):
+            docs, tfs = self.postings(term_number)
+            count = len(all_docs)
+            for i, doc in enumerate(docs):
+                if doc in renumber:
+                    all_docs.append(renumber[doc])
+                    all_tfs.extend(tfs[i * width:(i + 1) * width])
+            if len(all_docs) > count:
+                terms.append(term)
+                offsets.append(len(all_docs))
+
+        sections = {}
+        position = 0
+        for name, data in (
+            ("offsets", offsets), ("docs", all_docs), ("tfs", all_tfs), ("lengths", lengths)
+        ):
+            sections[name] = [position, len(data)]
+            position = _align(position + len(data) * data.itemsize)
+        header = json.dumps({
+            "byteorder": sys.byteorder,
+            "fields": FIELDS,
+            "field_totals": [sum(lengths[f::width]) for f in range(width)],
+            "terms": terms,
+            "doc_ids": doc_ids,
+            "stored": stored,
+            "sections": sections,
+            "generation": self.generation,
+        }).encode()
+        start = _align(len(MAGIC) + 8 + len(header))
+
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".search-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fp:
+                fp.write(MAGIC)
+                fp.write(len(header).to_bytes(8, "little"))
+                fp.write(header)
+                for name, data in (
+                    ("offsets", offsets), ("docs", all_docs), ("tfs", all_tfs), ("lengths", lengths)
+                ):
+                    fp.seek(start + sections[name][0])
+                    fp.write(data.tobytes())
+                fp.truncate(start + position)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> "InvertedIndex":
+        """Map the index saved at path, sharing its pages with other processes."""
+        with open(path, "rb") as fp:
+            mapping = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        if mapping[:len(MAGIC)] != MAGIC:
+            mapping.close()
+            raise ValueError("{} is not a search index".format(path))
+        size = int.from_bytes(mapping[len(MAGIC):len(MAGIC) + 8], "little")
+        header = json.loads(mapping[len(MAGIC) + 8:len(MAGIC) + 8 + size].decode())
+        if header["byteorder"] != sys.byteorder or tuple(header["fields"]) != FIELDS:
+            mapping.close()
+            raise ValueError("{} was saved by an incompatible index".format(path))
+        start = _align(len(MAGIC) + 8 + size)
+
+        view = memoryview(mapping)
+
+        def section(name: str, typecode: str) -> memoryview:
+            offset, count = header["sections"][name]
+            offset += start
+            return view[offset:offset + count * array(typecode).itemsize].cast(typecode)
+
+        index = cls()
+        index._mmap = mapping
+        index._offsets = section("offsets", DOC_TYPE)
+        index._docs = section("docs", DOC_TYPE)
+        index._tfs = section("tfs", TF_TYPE)
+        index.lengths = section("lengths", DOC_TYPE)
+        index.field_totals = header["field_totals"]
+        index.term_list = [sys.intern(term) for term in header["terms"]]
+        index.terms = {term: n for n, term in enumerate(index.term_list)}
+        index.doc_ids = header["doc_ids"]
+        index.doc_numbers = {_id: doc for doc, _id in enumerate(index.doc_ids)}
+        index.stored = header["stored"]
+        index.generation = header.get("generation")
+        return index
@@ -0,0 +1,183 @@
+"""
+"What can I cook?": the recipes whose ingredients are all, or all but a
+few, in the pantry.
+
+Each ingredient has a bitset, a python int with bit n set for recipe number
+n if it needs that ingredient, and recipes are grouped into bitsets by how
+many ingredients they need.  A query ANDs and ORs these whole bitsets, one
+C-level operation per step, instead of testing recipes one by one:
+
+    at_least[k] = recipes having at least k of the pantry's ingredients
+    missing m   = OR over n of needs[n] & at_least[n - m] & ~at_least[n - m + 1]
+"""
+
+import collections
+import threading
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Tuple
+from typing import Union
+
+from pyrecipe.storage.shared.ingredient_parser import ingredient_key
+from pyrecipe.storage.shared.recipe_summary_model import RecipeSummary
+
+
+def _bits(bitset: int) -> Iterator[int]:
+    """The numbers of the bits set, lowest first."""
+    digits = bin(bitset)[:1:-1]
+    n = digits.find("1")
+    while n != -1:
+        yield n
+        n = digits.find("1", n + 1)
+
+
+class PantryIndex:
+    """
+    Thread safe ingredient bitsets of the active recipes.
+
+    pantry = PantryIndex.build(driver.recipes_active())
+    pantry.add(recipe)                  # on create/edit
+    pantry.remove(recipe_id)            # on delete
+    pantry.cookable(["eggs", "flour", "milk"], missing=1)
+    """
+
+    # Assumed to be in every pantry.
+    STAPLES = frozenset({"salt", "pepper", "black pepper", "water"})
+
+    def __init__(self):
+        self._postings = collections.defaultdict(int)  # ingredient -> bitset
+        self._needs = collections.defaultdict(int)  # number of ingredients -> bitset
+        self._recipes = []  # recipe number -> (summary, ingredients), or None
+        self._numbers = {}  # _id -> recipe number
+        self._free = []
+        self._live = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._numbers)
+
+    @staticmethod
+    def _entry(record: dict) -> Tuple[RecipeSummary, frozenset]:
+        summary = RecipeSummary(
+            _id=str(record["_id"]),
+            name=record["name"],
+            cook_time=record.get("cook_time"),
+            tags=list(record.get("tags") or []),
+        )
+        parsed = record.get("parsed_ingredients")
+        if parsed:
+            ingredients = frozenset(i["name"] for i in parsed)
+        else:
+            ingredients = frozenset(ingredient_key(i) for i in record.get("ingredients") or [])
+        return summary, ingredients - {""}
+
+    @classmethod
+    def build(cls, recipes: Iterable) -> "PantryIndex":
+        """
+        Index the given recipes, i.e. driver.recipes_active(), setting the
+        bits of each bitset at once rather than one recipe at a time.
+        """
+        pantry = cls()
+        postings = collections.defaultdict(list)
+        needs = collections.defaultdict(list)
+        for recipe in recipes:
+            record = recipe if isinstance(recipe, dict) else recipe.to_dict()
+            if record.get("deleted"):
+                continue
+            summary, ingredients = cls._entry(record)
+            n = len(pantry._recipes)
+            pantry._recipes.append((summary, ingredients))
+            pantry._numbers[summary.id] = n
+            for ingredient in ingredients:
+                postings[ingredient].append(n)
+            needs[len(ingredients)].append(n)
+
+        size = len(pantry._recipes)
+
+        def bitset(numbers: List[int]) -> int:
+            bitmap = bytearray(size // 8 + 1)
+            for n in numbers:
+                bitmap[n >> 3] |= 1 << (n & 7)
+            return int.from_bytes(bitmap, "little")
+
+        pantry._postings.update((i, bitset(numbers)) for i, numbers in postings.items())
+        pantry._needs.update((count, bitset(numbers)) for count, numbers in needs.items())
+        pantry._live = (1 << size) - 1
+        return pantry
+
+    def add(self, recipe: Union["RecipeModel", dict]) -> None:
+        """
+        Index the recipe, or re-index it if it was edited.  Takes a
+        RecipeModel, or a dict of its fields including _id.  A recipe marked
+        as deleted is removed instead.
+        """
+        record = recipe if isinstance(recipe, dict) else recipe.to_dict()
+        summary, ingredients = self._entry(record)
+        with self._lock:
+            self.remove(summary.id)
+            if record.get("deleted"):
+                return
+            if self._free:
+                n = self._free.pop()
+                self._recipes[n] = (summary, ingredients)
+            else:
+                n = len(self._recipes)
+                self._recipes.append((summary, ingredients))
+            self._numbers[summary.id] = n
+            bit = 1 << n
+            for ingredient in ingredients:
+                self._postings[ingredient] |= bit
+            self._needs[len(ingredients)] |= bit
+            self._live |= bit
+
+    def remove(self, recipe_id: str) -> bool:
+        """Remove the recipe from the index, returning whether it was in it."""
+        with self._lock:
+            n = self._numbers.pop(str(recipe_id), None)
+            if n is None:
+                return False
+            _, ingredients = self._recipes[n]
+            bit = 1 << n
+            for ingredient in ingredients:
+                self._postings[ingredient] &= ~bit
+                if not self._postings[ingredient]:
+                    del self._postings[ingredient]
+            self._needs[len(ingredients)] &= ~bit
+            self._live &= ~bit
+            self._recipes[n] = None
+            self._free.append(n)
+            return True
+
+    def cookable(
+        self, pantry: Iterable[str], missing: int = 0, limit: int = None
+    ) -> List[Tuple[RecipeSummary, List[str]]]:
+        """
+        Return the recipes that can be cooked with the pantry's ingredients
+        (and the STAPLES), or that miss at most missing of theirs.  Each comes
+        with the ingredients it misses, fewest missing first, then by name.
+        """
+        have = ({ingredient_key(i) for i in pantry} | self.STAPLES) - {""}
+        results = []
+        with self._lock:
+            postings = [self._postings[i] for i in have if i in self._postings]
+            at_least = [self._live] + [0] * len(postings)
+            for j, posting in enumerate(postings):
+                for k in range(j + 1, 0, -1):
+                    at_least[k] |= at_least[k - 1] & posting
+            at_least.append(0)
+
+            for m in range(missing + 1):
+                bitset = 0
+                for count, needs in self._needs.items():
+                    k = count - m
+                    if 0 <= k < len(at_least) - 1:
+                        bitset |= needs & at_least[k] & ~at_least[k + 1]
+                found = [self._recipes[n] for n in _bits(bitset)]
+                found.sort(key=lambda entry: (entry[0].name, entry[0].id))
+                results.extend(
+                    (summary, sorted(ingredients - have)) for summary, ingredients in found
+                )
+                if limit is not None and len(results) >= limit:
+                    return results[:limit]
+        return results
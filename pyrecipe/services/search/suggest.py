@@ -0,0 +1,221 @@
+"""
+Search-as-you-type suggestions of recipe names, tags and ingredients.
+
+Each kind of suggestion is a PrefixIndex: a sorted array of (key, value),
+searched with bisect for the range of keys starting with the typed prefix.
+Every word suffix of a value's text is a key, so "basil soup" is suggested
+for "ba" as well as for "so".
+"""
+
+import bisect
+import collections
+import functools
+import heapq
+import re
+import threading
+from typing import Dict
+from typing import Hashable
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+
+TERM_RE = re.compile(r"\w+")
+
+# Leading words of an ingredient that are not part of its name.
+UNITS = {
+    "cup", "cups", "tbsp", "tablespoon", "tablespoons", "tsp", "teaspoon",
+    "teaspoons", "oz", "ounce", "ounces", "lb", "lbs", "pound", "pounds", "g",
+    "kg", "ml", "l", "clove", "cloves", "pinch", "can", "cans", "loaf", "loaves",
+    "slice", "slices", "bunch", "handful", "a", "of",
+}
+
+
+def normalize(text: str) -> str:
+    return " ".join(TERM_RE.findall(text.lower()))
+
+
+@functools.lru_cache(maxsize=2 ** 16)
+def ingredient_name(ingredient: str) -> str:
+    """
+    The name of an ingredient, without its quantity, unit or preparation,
+    i.e. "2 cups flour, sifted" -> "flour".
+    """
+    words = TERM_RE.findall(ingredient.split(",")[0].lower())
+    for i, word in enumerate(words):
+        if not (word.isdigit() or word in UNITS):
+            return " ".join(words[i:])
+    return ""
+
+
+class PrefixIndex:
+    """
+    Values found by the prefixes of the words of their text.  Each value is
+    counted, i.e. the number of recipes having a tag, and dropped once its
+    count is back to 0.
+    """
+
+    # Below this many new keys, insert them in place instead of re-sorting.
+    INSORT_MAX = 64
+
+    def __init__(self):
+        self._keys = []  # sorted (key, value)
+        self._texts = {}
+        self.counts = collections.Counter()
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    @staticmethod
+    def keys(text: str) -> List[str]:
+        words = TERM_RE.findall(text.lower())
+        return [" ".join(words[i:]) for i in range(len(words))]
+
+    def update(self, items: Iterable[Tuple[Hashable, str]]) -> None:
+        """Add each (value, text), i.e. all of a recipe's tags at once."""
+        new = []
+        for value, text in items:
+            self.counts[value] += 1
+            if self.counts[value] == 1:
+                self._texts[value] = text
+                new.extend((key, value) for key in self.keys(text))
+        if len(new) <= self.INSORT_MAX:
+            for item in new:
+                bisect.insort(self._keys, item)
+        else:
+            self._keys.extend(new)
+            self._keys.sort()
+
+    def discard(self, value: Hashable) -> None:
+        """Uncount the value, removing it once its count is back to 0."""
+        if self.counts[value] > 1:
+            self.counts[value] -= 1
+            return
+        del self.counts[value]
+        for key in self.keys(self._texts.pop(value, "")):
+            i = bisect.bisect_left(self._keys, (key, value))
+            if i < len(self._keys) and self._keys[i] == (key, value):
+                del self._keys[i]
+
+    def _range(self, prefix: str) -> Tuple[int, int]:
+        lo = bisect.bisect_left(self._keys, (prefix,))
+        hi = bisect.bisect_left(self._keys, (prefix + "\uffff",), lo)
+        return lo, hi
+
+    def complete(self, prefix: str, limit: int = 5, by_count: bool = True) -> List[Hashable]:
+        """
+        Return up to limit values having a word starting with prefix.  The
+        most counted come first with by_count=True, else the first by key.
+        """
+        prefix = normalize(prefix)
+        if not prefix or limit <= 0:
+            return []
+        lo, hi = self._range(prefix)
+        if by_count:
+            values = {value for _, value in self._keys[lo:hi]}
+            return heapq.nsmallest(limit, values, key=lambda value: (-self.counts[value], value))
+        values = []
+        for i in range(lo, hi):
+            value = self._keys[i][1]
+            if value not in values:
+                values.append(value)
+                if len(values) == limit:
+                    break
+        return values
+
+
+class Suggester:
+    """
+    Thread safe suggestions over the active recipes.
+
+    suggester = Suggester.build(driver.recipes_active())
+    suggester.add(recipe)               # on create/edit
+    suggester.remove(recipe_id)         # on delete
+    suggester.suggest("gar", limit=5)
+    """
+
+    def __init__(self):
+        self.names = PrefixIndex()
+        self.tags = PrefixIndex()
+        self.ingredients = PrefixIndex()
+        self._recipes = {}  # _id -> (name, tags, ingredients)
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._recipes)
+
+    @classmethod
+    def build(cls, recipes) -> "Suggester":
+        """Index the given recipes, i.e. driver.recipes_active()."""
+        suggester = cls()
+        names, tags, ingredients = [], [], []
+        for recipe in recipes:
+            entry = suggester._entry(recipe)
+            if entry is not None:
+                _id, (name, recipe_tags, recipe_ingredients) = entry
+                suggester._recipes[_id] = (name, recipe_tags, recipe_ingredients)
+                names.append((_id, name))
+                tags.extend((tag, tag) for tag in recipe_tags)
+                ingredients.extend((i, i) for i in recipe_ingredients)
+        suggester.names.update(names)
+        suggester.tags.update(tags)
+        suggester.ingredients.update(ingredients)
+        return suggester
+
+    @staticmethod
+    def _entry(recipe: Union["RecipeModel", dict]) -> Optional[Tuple[str, tuple]]:
+        record = recipe if isinstance(recipe, dict) else recipe.to_dict()
+        if record.get("deleted"):
+            return None
+        tags = sorted({normalize(tag) for tag in record.get("tags") or []} - {""})
+        ingredients = sorted(
+            {ingredient_name(i) for i in record.get("ingredients") or []} - {""}
+        )
+        return str(record["_id"]), (record["name"], tags, ingredients)
+
+    def add(self, recipe: Union["RecipeModel", dict]) -> None:
+        """
+        Add the recipe's suggestions, replacing its old ones if it was
+        edited.  Takes a RecipeModel, or a dict of its fields including _id.
+        """
+        record = recipe if isinstance(recipe, dict) else recipe.to_dict()
+        self.remove(record["_id"])
+        entry = self._entry(record)
+        if entry is None:
+            return
+        _id, (name, tags, ingredients) = entry
+        with self._lock:
+            self._recipes[_id] = (name, tags, ingredients)
+            self.names.update([(_id, name)])
+            self.tags.update((tag, tag) for tag in tags)
+            self.ingredients.update((i, i) for i in ingredients)
+
+    def remove(self, recipe_id: str) -> bool:
+        """Remove the recipe's suggestions, returning whether it had any."""
+        with self._lock:
+            entry = self._recipes.pop(str(recipe_id), None)
+            if entry is None:
+                return False
+            _, tags, ingredients = entry
+            self.names.discard(str(recipe_id))
+            for tag in tags:
+                self.tags.discard(tag)
+            for ingredient in ingredients:
+                self.ingredients.discard(ingredient)
+            return True
+
+    def suggest(self, prefix: str, limit: int = 5) -> Dict[str, list]:
+        """
+        Return up to limit recipe names (with their _id), tags and
+        ingredients having a word starting with prefix.  Tags and
+        ingredients used by the most recipes come first.
+        """
+        with self._lock:
+            ids = self.names.complete(prefix, limit, by_count=False)
+            return {
+                "names": [{"_id": _id, "name": self._recipes[_id][0]} for _id in ids],
+                "tags": self.tags.complete(prefix, limit),
+                "ingredients": self.ingredients.complete(prefix, limit),
+            }
@@ -1,2 +1,5 @@
 from . import shared
 from . import mongo
+from . import memory
+from . import sqlite
+from . import cache
@@ -0,0 +1,2 @@
+from .cachingdriver import CachingDriver
+from .lru import LRUCache
@@ -0,0 +1,494 @@
+"""
+Read-through caching DB Driver that wraps any other DB Driver.
+
+CachingDriver.wrap(MongoDriver) returns a driver class that serves
+recipe_find_by_id, recipes_get_tags, recipes_find_by_tag and the recipe
+list/page reads from an in-process LRUCache, and drops exactly the cached
+entries a write can affect.  Everything else is passed through.
+
+Optionally, user_find_by_id (run on every page, for the logged in user) is
+cached too, in a separate cache with a short TTL.
+
+Writes made by other processes (i.e. the other workers of "pyrecipe serve")
+are picked up through the wrapped driver's recipes_generation() and
+users_generation(), if it has them: counters every write increments, polled
+at most once per GENERATION_CHECK_MS.  When one moved, its cache is emptied,
+unless recipes_generation_is_own() (users_generation_is_own()) tells that
+only this process's writes moved it, which already dropped what they affect.
+
+List, tag and search reads may be served by lagging secondaries (see
+MongoDriver.READ_ALIAS), so for REPLICATION_LAG_MS after recipe entries were
+dropped, recipe reads are passed through instead of cached.  Otherwise a
+reload from a secondary that hasn't seen the write yet would be cached for
+the whole TTL.
+"""
+
+import copy
+import time
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+
+from pyrecipe.errors import RecipeConflictError
+from pyrecipe.storage.shared.bulk_model import BulkResult
+from pyrecipe.storage.shared.db_interface import DBInitInt
+from pyrecipe.storage.shared.page_model import PageModel
+from pyrecipe.storage.shared.recipe_interface import RecipeDBInt
+from pyrecipe.storage.shared.recipe_model import RecipeModel
+from pyrecipe.storage.shared.recipe_summary_model import RecipeSummary
+from pyrecipe.storage.shared.user_interface import UserDBInt
+from pyrecipe.storage.shared.user_model import UserModel
+
+from .lru import LRUCache
+
+
+class CachingDriver(DBInitInt, RecipeDBInt, UserDBInt):
+    """
+    Singleton type class caching the reads of the wrapped driver.  Cached
+    values are deep copied on the way in and out, so callers can't modify
+    what the next caller gets.
+
+    DB_DRIVER = CachingDriver.wrap(MongoDriver, maxsize=1024, ttl=60)
+
+    Each cached entry depends on "recipe:<id>" for every recipe in it, and
+    on "tag:<tag>", "tags", "list", "deleted" and "page:<sort_by>" for the
+    queries whose results a write can add recipes to.  See the write methods
+    for what each one invalidates.
+    """
+
+    # How often, at most, the wrapped driver's generation is checked.  Reads
+    # may be this stale, on top of the replication lag of secondary reads.
+    GENERATION_CHECK_MS = 250
+
+    # How long recipe reads aren't cached after recipe entries were dropped,
+    # for drivers reading from secondaries (those with a READ_ALIAS).
+    REPLICATION_LAG_MS = 1000
+
+    _driver = None
+    _cache = None
+    _users = None
+    _generations = {}
+    _checked = float("-inf")
+    _resets = 0
+    _unsettled_until = float("-inf")
+
+    @classmethod
+    def wrap(
+        cls,
+        driver: type,
+        maxsize: Optional[int] = 1024,
+        ttl: float = 60.0,
+        check_ms: int = GENERATION_CHECK_MS,
+        user_maxsize: int = 0,
+        user_ttl: float = 5.0,
+        lag_ms: Optional[int] = None,
+    ) -> type:
+        """
+        Return a CachingDriver class for the driver, with its own cache.
+        Recipes are cached only if maxsize is given, users only if
+        user_maxsize is given.  lag_ms defaults to REPLICATION_LAG_MS if
+        the driver reads from secondaries, else 0.
+        """
+        if lag_ms is None:
+            lag_ms = cls.REPLICATION_LAG_MS if hasattr(driver, "READ_ALIAS") else 0
+        attributes = {
+            "_driver": driver,
+            "_cache": LRUCache(maxsize=maxsize, ttl=ttl) if maxsize else None,
+            "_users": LRUCache(maxsize=user_maxsize, ttl=user_ttl) if user_maxsize else None,
+            "_generations": {},
+            "GENERATION_CHECK_MS": check_ms,
+            "REPLICATION_LAG_MS": lag_ms,
+        }
+        # Pass the wrapped driver's generations through, for the app's other
+        # in-process caches (i.e. its search indexes) to poll as well.
+        for name in (
+            "recipes_generation",
+            "users_generation",
+            "recipes_generation_is_own",
+            "users_generation_is_own",
+        ):
+            if hasattr(driver, name):
+                attributes[name] = staticmethod(getattr(driver, name))
+        return type("Caching" + driver.__name__, (cls,), attributes)
+
+    @classmethod
+    def cache_stats(cls) -> dict:
+        """
+        Return the cache hit/miss/eviction counters (see LRUCache.stats),
+        the last recipes generation seen and the number of times a
+        generation moved, and the user cache counters under "users".
+        """
+        return dict(
+            cls._cache.stats() if cls._cache is not None else {},
+            generation=cls._generations.get("recipes"),
+            resets=cls._resets,
+            users=cls._users.stats() if cls._users is not None else None,
+        )
+
+    #### Cache helpers #######################################################
+
+    @staticmethod
+    def _tag_deps(tags: Iterable[str]) -> set:
+        return {"tag:" + tag.lower() for tag in tags or ()}
+
+    @staticmethod
+    def _recipe_deps(recipes: Iterable) -> set:
+        return {"recipe:" + recipe.id for recipe in recipes}
+
+    @classmethod
+    def _unsettle(cls) -> None:
+        """Pass recipe reads through for REPLICATION_LAG_MS, see the module docstring."""
+        cls._unsettled_until = time.monotonic() + cls.REPLICATION_LAG_MS / 1000
+
+    @classmethod
+    def _invalidate(cls, deps: set) -> None:
+        """Drop the cached recipe reads depending on any of deps."""
+        if cls._cache is not None:
+            cls._cache.invalidate(deps)
+            cls._unsettle()
+
+    @classmethod
+    def _clear(cls) -> None:
+        """Empty the recipe cache."""
+        if cls._cache is not None:
+            cls._cache.clear()
+            cls._unsettle()
+
+    @classmethod
+    def _check_generation(cls) -> None:
+        """
+        Empty the recipe (user) cache if the wrapped driver's recipes (users)
+        generation moved since the last check, which is skipped if made less
+        than GENERATION_CHECK_MS ago.  Moves made by this process's own
+        writes only don't empty it: the writes dropped what they affect.
+        """
+        now = time.monotonic()
+        if now - cls._checked < cls.GENERATION_CHECK_MS / 1000:
+            return
+        cls._checked = now
+        for name, cache in (("recipes", cls._cache), ("users", cls._users)):
+            generation = getattr(cls._driver, name + "_generation", None)
+            if generation is None or cache is None:
+                continue
+            current = generation()
+            seen = cls._generations.get(name)
+            if current == seen:
+                continue
+            is_own = getattr(cls._driver, name + "_generation_is_own", None)
+            if seen is None or is_own is None or not is_own(seen, current):
+                cache.clear()
+                if seen is not None:
+                    cls._resets += 1
+                    if cache is cls._cache:
+                        cls._unsettle()
+            cls._generations[name] = current
+
+    @classmethod
+    def _cached(cls, key: tuple, load: Callable, deps: Callable, cache: LRUCache = None):
+        """
+        Return a copy of the value cached for key in cache (default the
+        recipe cache), or load() it and cache it with deps(value).  None
+        results are not cached.  Without a recipe cache, or while unsettled
+        after recipe writes, recipe reads are passed through.
+        """
+        cache = cls._cache if cache is None else cache
+        if cache is None:
+            return load()
+        cls._check_generation()
+        if cache is cls._cache and time.monotonic() < cls._unsettled_until:
+            return load()
+        hit, value = cache.get(key)
+        if not hit:
+            version = cache.version
+            value = load()
+            if value is None:
+                return None
+            cache.set(key, value, deps(value), version=version)
+        return copy.deepcopy(value)
+
+    @classmethod
+    def _cached_list(cls, key: tuple, load: Callable, deps: set) -> list:
+        """_cached for reads returning recipes, materialized as a list."""
+        return cls._cached(
+            key, lambda: list(load()), lambda recipes: deps | cls._recipe_deps(recipes)
+        )
+
+    #### DBInitInt methods ###################################################
+
+    @classmethod
+    def db_initialize(cls, db_name="pyrecipe", verbose=False, **options) -> None:
+        """Initialize the wrapped driver, and empty the cache."""
+        cls._driver.db_initialize(db_name=db_name, verbose=verbose, **options)
+        cls._clear()
+        if cls._users is not None:
+            cls._users.clear()
+        cls._generations = {}
+        cls._checked = float("-inf")
+        cls._unsettled_until = float("-inf")
+
+    #### RecipeDBInt methods #################################################
+
+    @classmethod
+    def recipe_create(cls, **kwargs) -> RecipeModel:
+        """Create the recipe.  Invalidates the lists, tags and its tags' queries."""
+        recipe = cls._driver.recipe_create(**kwargs)
+        cls._invalidate({"list", "tags"} | cls._tag_deps(recipe.tags))
+        return recipe
+
+    @classmethod
+    def recipe_create_many(
+        cls, recipes: List[dict], chunk_size: Optional[int] = None
+    ) -> List[BulkResult]:
+        """Create the recipes.  Invalidates like recipe_create, by their stored tags."""
+        results = cls._driver.recipe_create_many(recipes, chunk_size=chunk_size)
+        tags = set()
+        for result in results:
+            if result.recipe:
+                tags |= cls._tag_deps(result.recipe.tags)
+        cls._invalidate({"list", "tags"} | tags)
+        return results
+
+    @classmethod
+    def recipe_edit(cls, _id: str, **kwargs) -> Optional[RecipeModel]:
+        """
+        Edit the recipe.  Invalidates everything holding it, the tags, the
+        queries of its new tags and the pages sorted by name.  A conflict
+        means the cached recipe is stale (written by another process), so it
+        is dropped as well.
+        """
+        try:
+            recipe = cls._driver.recipe_edit(_id=_id, **kwargs)
+        except RecipeConflictError:
+            cls._invalidate({"recipe:" + _id})
+            raise
+        tags = recipe.tags if recipe else kwargs.get("tags")
+        cls._invalidate(
+            {"recipe:" + _id, "tags", "page:name"} | cls._tag_deps(tags)
+        )
+        return recipe
+
+    @classmethod
+    def recipe_find_by_id(cls, recipe_id: str) -> Optional[RecipeModel]:
+        return cls._cached(
+            ("recipe", recipe_id),
+            lambda: cls._driver.recipe_find_by_id(recipe_id),
+            lambda recipe: {"recipe:" + recipe_id},
+        )
+
+    @classmethod
+    def recipes_find_by_name(cls, search_string: str) -> List[RecipeModel]:
+        return cls._driver.recipes_find_by_name(search_string)
+
+    @classmethod
+    def recipes_find_by_name_summary(cls, search_string: str) -> List[RecipeSummary]:
+        return cls._driver.recipes_find_by_name_summary(search_string)
+
+    @classmethod
+    def recipes_find_by_tag(cls, tags: List[str]) -> List[RecipeModel]:
+        tags = sorted(tag.lower() for tag in tags)
+        return cls._cached_list(
+            ("tag", tuple(tags)),
+            lambda: cls._driver.recipes_find_by_tag(tags),
+            cls._tag_deps(tags),
+        )
+
+    @classmethod
+    def recipes_find_by_tag_summary(cls, tags: List[str]) -> List[RecipeSummary]:
+        tags = sorted(tag.lower() for tag in tags)
+        return cls._cached_list(
+            ("tag_summary", tuple(tags)),
+            lambda: cls._driver.recipes_find_by_tag_summary(tags),
+            cls._tag_deps(tags),
+        )
+
+    @classmethod
+    def recipes_find_by_ingredient(cls, ingredients: List[str]) -> List[RecipeModel]:
+        return cls._driver.recipes_find_by_ingredient(ingredients)
+
+    @classmethod
+    def recipes_find_by_ingredient_summary(cls, ingredients: List[str]) -> List[RecipeSummary]:
+        return cls._driver.recipes_find_by_ingredient_summary(ingredients)
+
+    @classmethod
+    def recipes_backfill_ingredients(
+        cls,
+        batch_size: Optional[int] = None,
+        reparse: bool = False,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> int:
+        """
+        Parse the ingredients of the wrapped driver's recipes that have none
+        parsed (see MongoDriver.recipes_backfill_ingredients), emptying the
+        cache since any recipe may have changed.
+        """
+        updated = cls._driver.recipes_backfill_ingredients(
+            batch_size=batch_size, reparse=reparse, progress=progress
+        )
+        cls._clear()
+        return updated
+
+    @classmethod
+    def recipes_get_tags(cls) -> List[str]:
+        return cls._cached(("tags",), cls._driver.recipes_get_tags, lambda tags: {"tags"})
+
+    @classmethod
+    def recipes_tag_counts(cls) -> Dict[str, int]:
+        return cls._cached(
+            ("tag_counts",), cls._driver.recipes_tag_counts, lambda counts: {"tags"}
+        )
+
+    @classmethod
+    def recipes_rebuild_tag_stats(cls) -> Optional[Dict[str, int]]:
+        """
+        Recount the wrapped driver's tag stats, if it keeps any (see
+        MongoDriver.recipes_rebuild_tag_stats).  Returns None if it doesn't.
+        """
+        rebuild = getattr(cls._driver, "recipes_rebuild_tag_stats", None)
+        if rebuild is None:
+            return None
+        counts = rebuild()
+        cls._invalidate({"tags"})
+        return counts
+
+    @classmethod
+    def recipes_all(cls) -> List[RecipeModel]:
+        return cls._cached_list(("all",), cls._driver.recipes_all, {"list", "deleted"})
+
+    @classmethod
+    def recipes_active(cls) -> List[RecipeModel]:
+        return cls._cached_list(("active",), cls._driver.recipes_active, {"list"})
+
+    @classmethod
+    def recipes_active_summary(cls) -> List[RecipeSummary]:
+        return cls._cached_list(
+            ("active_summary",), cls._driver.recipes_active_summary, {"list"}
+        )
+
+    @classmethod
+    def recipes_deleted(cls) -> List[RecipeModel]:
+        return cls._cached_list(("deleted",), cls._driver.recipes_deleted, {"deleted"})
+
+    @classmethod
+    def recipes_page(
+        cls,
+        page_size: int = 20,
+        token: Optional[str] = None,
+        sort_by: str = "created_date",
+        tags: Optional[List[str]] = None,
+        deleted: bool = False,
+        summary: bool = False,
+    ) -> PageModel:
+        tags = sorted(tag.lower() for tag in tags) if tags else None
+        deps = {"deleted" if deleted else "list", "page:" + sort_by} | cls._tag_deps(tags)
+        return cls._cached(
+            ("page", page_size, token, sort_by, tuple(tags or ()), deleted, summary),
+            lambda: cls._driver.recipes_page(
+                page_size=page_size,
+                token=token,
+                sort_by=sort_by,
+                tags=tags,
+                deleted=deleted,
+                summary=summary,
+            ),
+            lambda page: deps | cls._recipe_deps(page.items),
+        )
+
+    @classmethod
+    def recipe_copy(cls, recipe: RecipeModel) -> RecipeModel:
+        """Copy the recipe.  Invalidates like recipe_create."""
+        new = cls._driver.recipe_copy(recipe)
+        cls._invalidate({"list", "tags"} | cls._tag_deps(new.tags))
+        return new
+
+    @classmethod
+    def recipe_add_tag(cls, recipe: RecipeModel, tag: str) -> int:
+        """Add the tag.  Invalidates the recipe, the tags and the tag's queries."""
+        result = cls._driver.recipe_add_tag(recipe, tag)
+        cls._invalidate({"recipe:" + recipe.id, "tags"} | cls._tag_deps([tag]))
+        return result
+
+    @classmethod
+    def recipe_delete_tag(cls, recipe: RecipeModel, tag: str) -> int:
+        """Delete the tag.  Invalidates the recipe and the tags."""
+        result = cls._driver.recipe_delete_tag(recipe, tag)
+        cls._invalidate({"recipe:" + recipe.id, "tags"})
+        return result
+
+    @classmethod
+    def recipe_mark_made(cls, recipe: RecipeModel, date: "datetime" = None) -> int:
+        """Mark the recipe made.  Invalidates the recipe only."""
+        result = cls._driver.recipe_mark_made(recipe, date)
+        cls._invalidate({"recipe:" + recipe.id})
+        return result
+
+    @classmethod
+    def recipe_delete(cls, recipe_id: str) -> int:
+        """Delete the recipe.  Invalidates the recipe, the tags and the deleted lists."""
+        result = cls._driver.recipe_delete(recipe_id)
+        cls._invalidate({"recipe:" + recipe_id, "tags", "deleted"})
+        return result
+
+    @classmethod
+    def recipes_search(cls, text: str) -> List[RecipeModel]:
+        return cls._driver.recipes_search(text)
+
+    @classmethod
+    def recipes_search_summary(cls, text: str) -> List[RecipeSummary]:
+        return cls._driver.recipes_search_summary(text)
+
+    @classmethod
+    def recipes_search_ranked(
+        cls, text: str, limit: Optional[int] = None, skip: int = 0, summary: bool = False
+    ) -> List[RecipeModel]:
+        return cls._driver.recipes_search_ranked(text, limit=limit, skip=skip, summary=summary)
+
+    #### UserDBInt methods ###################################################
+
+    @classmethod
+    def user_create(cls, name: str, email: str, password: str) -> Optional[UserModel]:
+        return cls._driver.user_create(name, email, password)
+
+    @classmethod
+    def user_find_by_id(cls, user_id: str) -> Optional[UserModel]:
+        """Find the user, from the user cache if it is enabled."""
+        if cls._users is None:
+            return cls._driver.user_find_by_id(user_id)
+        return cls._cached(
+            ("user", user_id),
+            lambda: cls._driver.user_find_by_id(user_id),
+            lambda user: {"user:" + str(user_id)},
+            cache=cls._users,
+        )
+
+    @classmethod
+    def user_login(cls, email: str, password: str) -> Optional[UserModel]:
+        return cls._driver.user_login(email, password)
+
+    @classmethod
+    def user_find_by_email(cls, email: str) -> Optional[UserModel]:
+        return cls._driver.user_find_by_email(email)
+
+    @classmethod
+    def users_list(cls) -> List[UserModel]:
+        return cls._driver.users_list()
+
+    @classmethod
+    def _user_changed(cls, user: UserModel) -> None:
+        if cls._users is not None:
+            cls._users.invalidate({"user:" + str(user.id)})
+
+    @classmethod
+    def user_add_recipe(cls, user: UserModel, recipe_id: str) -> int:
+        """Add the recipe to the user.  Invalidates the cached user."""
+        result = cls._driver.user_add_recipe(user, recipe_id)
+        cls._user_changed(user)
+        return result
+
+    @classmethod
+    def user_set_password(cls, user: UserModel, password: str) -> Optional[str]:
+        """Set the user's password.  Invalidates the cached user."""
+        result = cls._driver.user_set_password(user, password)
+        cls._user_changed(user)
+        return result
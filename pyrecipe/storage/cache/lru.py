@@ -0,0 +1,119 @@
+"""
+Bounded LRU cache with a TTL, and dependency tags for precise invalidation.
+
+Every entry is stored with the set of dependency tags it was built from,
+i.e. "recipe:<id>" for each recipe in it or "tag:<tag>" for a tag query, and
+invalidate() drops exactly the entries holding any of the given tags.
+"""
+
+import collections
+import threading
+import time
+from typing import Callable
+from typing import Hashable
+from typing import Iterable
+from typing import Tuple
+
+
+class LRUCache:
+    """
+    Thread safe LRU cache of at most maxsize entries, each expiring ttl
+    seconds after it was stored.
+
+    cache = LRUCache(maxsize=1024, ttl=60)
+    version = cache.version
+    hit, value = cache.get(("recipe", _id))
+    if not hit:
+        value = load()
+        cache.set(("recipe", _id), value, deps={"recipe:" + _id}, version=version)
+
+    Passing the version read before loading makes set() a no-op if anything
+    was invalidated meanwhile, so a read racing a write can't cache stale data.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0, clock: Callable = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._entries = collections.OrderedDict()  # key -> (expires, value, deps)
+        self._deps = collections.defaultdict(set)  # dep -> keys
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: Hashable) -> None:
+        _, _, deps = self._entries.pop(key)
+        for dep in deps:
+            keys = self._deps[dep]
+            keys.discard(key)
+            if not keys:
+                del self._deps[dep]
+
+    def get(self, key: Hashable) -> Tuple[bool, object]:
+        """Return (True, value) if the key is cached and fresh, else (False, None)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= self._clock():
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[1]
+
+    def set(self, key: Hashable, value, deps: Iterable[str] = (), version: int = None) -> None:
+        """
+        Cache the value under key, evicting the least recently used entries
+        beyond maxsize.  Skipped if version is given and is not current.
+        """
+        with self._lock:
+            if version is not None and version != self.version:
+                return
+            if key in self._entries:
+                self._remove(key)
+            deps = frozenset(deps)
+            self._entries[key] = (self._clock() + self.ttl, value, deps)
+            for dep in deps:
+                self._deps[dep].add(key)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, deps: Iterable[str]) -> None:
+        """Drop every entry that depends on any of deps."""
+        with self._lock:
+            self.version += 1
+            for dep in deps:
+                for key in list(self._deps.get(dep, ())):
+                    self._remove(key)
+                    self.invalidations += 1
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+            self._deps.clear()
+
+    def stats(self) -> dict:
+        """Return the hit/miss/eviction counters and the current size."""
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
@@ -0,0 +1 @@
+from .memorydriver import MemoryDriver
@@ -0,0 +1,753 @@
+"""In-process DB driver that keeps all data in memory."""
+
+import datetime
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+
+import bson
+
+from pyrecipe.errors import PageTokenError
+from pyrecipe.errors import RecipeConflictError
+from pyrecipe.security import auth
+from pyrecipe.storage.shared.bulk_model import BulkResult
+from pyrecipe.storage.shared.db_interface import DBInitInt
+from pyrecipe.storage.shared.ingredient_parser import ingredient_key
+from pyrecipe.storage.shared.ingredient_parser import parse_ingredients
+from pyrecipe.storage.shared.page_model import PageModel
+from pyrecipe.storage.shared.page_model import decode_token
+from pyrecipe.storage.shared.page_model import encode_token
+from pyrecipe.storage.shared.recipe_interface import RecipeDBInt
+from pyrecipe.storage.shared.recipe_model import RecipeModel
+from pyrecipe.storage.shared.recipe_model import normalize_tags
+from pyrecipe.storage.shared.recipe_summary_model import RecipeSummary
+from pyrecipe.storage.shared.user_interface import UserDBInt
+from pyrecipe.storage.shared.user_model import UserModel
+
+from .store import MemoryStore
+
+
+class MemoryDriver(DBInitInt, RecipeDBInt, UserDBInt):
+    """
+    Singleton type class that keeps all recipes and users in process memory,
+    with secondary indexes on tags, parsed ingredient names, deleted, name
+    and created_date and a weighted text index.  Nothing is persisted; it is a zero-I/O baseline
+    for benchmarks and local experiments.
+
+    Text search tokenizes on words only (no stemming or stop words), so it
+    ranks like, but does not exactly match, MongoDB's $text search.
+    """
+
+    # sort_by option -> (field, direction) keyset pagination is ordered by.
+    PAGE_SORTS = {"created_date": ("created_date", -1), "name": ("name", 1)}
+
+    # Fields recipe_edit diffs against the stored recipe.
+    EDIT_FIELDS = (
+        "name", "prep_time", "cook_time", "servings",
+        "ingredients", "directions", "tags", "notes",
+    )
+
+    # Default number of recipes inserted (updated) per lock acquisition by
+    # recipe_create_many (recipes_backfill_ingredients).
+    BULK_CHUNK_SIZE = 500
+
+    # Added by recipes_search_ranked to the text score of recipes whose name
+    # contains the search string.  Same as MongoDriver.SEARCH_NAME_BOOST.
+    SEARCH_NAME_BOOST = 100.0
+
+    # db_name -> MemoryStore, so db_initialize can switch between databases.
+    _stores = {}
+    _store = None
+
+    #### DBInitInt methods ###################################################
+
+    @classmethod
+    def db_initialize(cls, db_name="pyrecipe", verbose=False, **options) -> None:
+        """
+        Create/select the in-memory database with the given name.  Server
+        connection options (host, pool sizes, ...) are ignored.
+        """
+        cls._store = cls._stores.setdefault(db_name, MemoryStore())
+        if verbose:
+            print("[+] In-memory database selected: {}".format(db_name))
+
+    @classmethod
+    def _db(cls) -> MemoryStore:
+        """Return the selected database, initializing the default one if needed."""
+        if cls._store is None:
+            cls.db_initialize()
+        return cls._store
+
+    #### RecipeDBInt methods #################################################
+
+    @staticmethod
+    def _recipe_to_model(record: dict) -> RecipeModel:
+        """Return a RecipeModel holding copies of the record's lists."""
+        recipe = {k: list(v) if isinstance(v, list) else v for k, v in record.items()}
+        recipe["parsed_ingredients"] = [dict(i) for i in record.get("parsed_ingredients", ())]
+        return RecipeModel.from_dict(recipe)
+
+    @staticmethod
+    def _recipe_to_summary(record: dict) -> RecipeSummary:
+        return RecipeSummary(
+            _id=record["_id"],
+            name=record["name"],
+            cook_time=record["cook_time"],
+            tags=list(record["tags"]),
+        )
+
+    @classmethod
+    def _recipes_by_id(cls, ids, summary: bool = False) -> list:
+        """Return the recipes for the _id's, in the given order."""
+        records = cls._db().recipes.records
+        to_model = cls._recipe_to_summary if summary else cls._recipe_to_model
+        return [to_model(records[_id]) for _id in ids]
+
+    @staticmethod
+    def _validate_recipe(record: dict) -> None:
+        """Apply the same rules as the mongo Recipe document, raising ValueError."""
+        if not record["name"]:
+            raise ValueError("Field is required: ['name']")
+        if not record["ingredients"]:
+            raise ValueError("Field is required: ['ingredients']")
+        if not record["directions"]:
+            raise ValueError("Field is required: ['directions']")
+        if record["prep_time"] < 0 or record["cook_time"] < 0:
+            raise ValueError("prep_time and cook_time must be at least 0")
+
+    @staticmethod
+    def _build_recipe(
+        name: str,
+        prep_time: int,
+        cook_time: int,
+        servings: str,
+        ingredients: List["ingredients"],
+        directions: List["directions"],
+        tags: List["tags"] = [],
+        notes: List["notes"] = [],
+        images: List["filepath"] = [],
+    ) -> dict:
+        """Given the recipe_create parameters, return a validated recipe record."""
+        now = datetime.datetime.utcnow()
+        record = {
+            "_id": str(bson.ObjectId()),
+            "name": name,
+            "num_ingredients": len(ingredients),
+            "ingredients": list(ingredients),
+            "directions": list(directions),
+            "prep_time": float(prep_time),
+            "cook_time": float(cook_time),
+            "servings": servings,
+            "images": list(images),
+            "tags": normalize_tags(tags),
+            "notes": list(notes),
+            "rating": None,
+            "favorite": False,
+            "when_made": [],
+            "deleted": False,
+            "created_date": now,
+            "last_modified_date": now,
+            "parsed_ingredients": parse_ingredients(ingredients),
+        }
+        MemoryDriver._validate_recipe(record)
+        return record
+
+    @classmethod
+    def recipe_create(cls, **kwargs) -> RecipeModel:
+        """
+        Given the recipe_create parameters, create a recipe.
+
+        r = MemoryDriver.recipe_create(**kwargs)
+
+        :returns: RecipeModel of the new recipe.
+        :raises ValueError: if the recipe is invalid.
+        """
+        record = cls._build_recipe(**kwargs)
+        db = cls._db()
+        with db.lock:
+            db.recipes.insert(record)
+        return cls._recipe_to_model(record)
+
+    @classmethod
+    def recipe_create_many(
+        cls, recipes: List[dict], chunk_size: Optional[int] = None
+    ) -> List[BulkResult]:
+        """
+        Create many recipes at once.  Invalid recipes are reported and
+        skipped; the rest are inserted chunk_size at a time, releasing the
+        lock between chunks so readers are not blocked for the whole batch.
+
+        results = MemoryDriver.recipe_create_many([kwargs1, kwargs2])
+
+        :returns: List["BulkResult"] one per recipe in input order.
+        """
+        chunk_size = chunk_size or cls.BULK_CHUNK_SIZE
+        results = [BulkResult(index=i) for i in range(len(recipes))]
+
+        valid = []
+        for i, kwargs in enumerate(recipes):
+            try:
+                record = cls._build_recipe(**kwargs)
+            except (TypeError, ValueError) as e:
+                results[i].error = str(e)
+                continue
+            results[i]._id = record["_id"]
+            results[i].recipe = cls._recipe_to_model(record)
+            valid.append(record)
+
+        db = cls._db()
+        for start in range(0, len(valid), chunk_size):
+            with db.lock:
+                for record in valid[start : start + chunk_size]:
+                    db.recipes.insert(record)
+        return results
+
+    @classmethod
+    def recipe_edit(
+        cls,
+        _id: str,
+        name: str,
+        prep_time: int,
+        cook_time: int,
+        servings: str,
+        ingredients: List["ingredients"],
+        directions: List["directions"],
+        tags: List["tags"] = [],
+        notes: List["notes"] = [],
+        last_modified: datetime.datetime = None,
+    ) -> Optional[RecipeModel]:
+        """
+        Edit a recipe's information, writing only the changed fields.
+
+        r = MemoryDriver.recipe_edit(**kwargs, last_modified=recipe.last_modified_date)
+
+        :returns: RecipeModel of the edited recipe, or None if not found.
+        :raises: RecipeConflictError if the recipe was modified after last_modified.
+        :raises ValueError: if the edited recipe is invalid.
+        """
+        # Built and validated like a new recipe, so "15" matches a stored 15.0.
+        form = cls._build_recipe(
+            name=name,
+            prep_time=prep_time,
+            cook_time=cook_time,
+            servings=servings,
+            ingredients=ingredients,
+            directions=directions,
+            tags=tags,
+            notes=notes,
+        )
+        db = cls._db()
+        with db.lock:
+            current = db.recipes.records.get(_id)
+            if not current:
+                return None
+            if last_modified is not None and current["last_modified_date"] != last_modified:
+                raise RecipeConflictError(_id)
+            changes = {k: form[k] for k in cls.EDIT_FIELDS if current[k] != form[k]}
+            if not changes:
+                return cls._recipe_to_model(current)
+            if "ingredients" in changes:
+                changes["num_ingredients"] = form["num_ingredients"]
+                changes["parsed_ingredients"] = form["parsed_ingredients"]
+            changes["last_modified_date"] = datetime.datetime.utcnow()
+            return cls._recipe_to_model(db.recipes.update(_id, changes))
+
+    @classmethod
+    def recipe_find_by_id(cls, recipe_id: str) -> Optional[RecipeModel]:
+        """
+        Return the recipe with the given id.
+
+        recipe = MemoryDriver.recipe_find_by_id(recipe_id)
+
+        :returns: RecipeModel for the recipe found or None
+        """
+        record = cls._db().recipes.records.get(recipe_id)
+        if record:
+            return cls._recipe_to_model(record)
+
+    @classmethod
+    def _active_by_name(cls, search_string: str) -> List[str]:
+        search_string = search_string.lower()
+        db = cls._db()
+        with db.lock:
+            return [
+                _id
+                for _id, record in db.recipes.records.items()
+                if not record["deleted"] and search_string in record["name"].lower()
+            ]
+
+    @classmethod
+    def recipes_find_by_name(cls, search_string: str) -> List[RecipeModel]:
+        """
+        Case insensitive substring match on the names of all active recipes.
+
+        recipes = MemoryDriver.recipes_find_by_name("spam")
+        """
+        return cls._recipes_by_id(cls._active_by_name(search_string))
+
+    @classmethod
+    def recipes_find_by_name_summary(cls, search_string: str) -> List[RecipeSummary]:
+        """Same as recipes_find_by_name, but returns RecipeSummary's."""
+        return cls._recipes_by_id(cls._active_by_name(search_string), summary=True)
+
+    @classmethod
+    def _active_by_tag(cls, tags: List[str]) -> List[str]:
+        db = cls._db()
+        with db.lock:
+            ids = db.recipes.with_tags([tag.lower() for tag in tags])
+            return sorted(ids & db.recipes.by_deleted[False])
+
+    @classmethod
+    def recipes_find_by_tag(cls, tags: List[str]) -> List[RecipeModel]:
+        """
+        Return all active recipes that have all of the given tags.
+
+        recipes = MemoryDriver.recipes_find_by_tag(["tag1", "tag2"])
+        """
+        return cls._recipes_by_id(cls._active_by_tag(tags))
+
+    @classmethod
+    def recipes_find_by_tag_summary(cls, tags: List[str]) -> List[RecipeSummary]:
+        """Same as recipes_find_by_tag, but returns RecipeSummary's."""
+        return cls._recipes_by_id(cls._active_by_tag(tags), summary=True)
+
+    @classmethod
+    def _active_by_ingredient(cls, ingredients: List[str]) -> List[str]:
+        names = sorted({ingredient_key(ingredient) for ingredient in ingredients} - {""})
+        db = cls._db()
+        with db.lock:
+            ids = db.recipes.with_ingredients(names)
+            return sorted(ids & db.recipes.by_deleted[False])
+
+    @classmethod
+    def recipes_find_by_ingredient(cls, ingredients: List[str]) -> List[RecipeModel]:
+        """
+        Return all active recipes having all of the given ingredients, looked
+        up by their parsed names.
+
+        recipes = MemoryDriver.recipes_find_by_ingredient(["garlic", "tomatoes"])
+        """
+        return cls._recipes_by_id(cls._active_by_ingredient(ingredients))
+
+    @classmethod
+    def recipes_find_by_ingredient_summary(cls, ingredients: List[str]) -> List[RecipeSummary]:
+        """Same as recipes_find_by_ingredient, but returns RecipeSummary's."""
+        return cls._recipes_by_id(cls._active_by_ingredient(ingredients), summary=True)
+
+    @classmethod
+    def recipes_backfill_ingredients(
+        cls,
+        batch_size: Optional[int] = None,
+        reparse: bool = False,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> int:
+        """
+        Parse the ingredients of the recipes that have none parsed, or of
+        every recipe with reparse=True (i.e. after the parser changed),
+        batch_size recipes per lock acquisition.  progress(done, total) is
+        called after each batch.
+
+        MemoryDriver.recipes_backfill_ingredients(progress=print)
+
+        :returns: (int) the number of recipes updated.
+        """
+        batch_size = batch_size or cls.BULK_CHUNK_SIZE
+        db = cls._db()
+        with db.lock:
+            ids = [
+                _id
+                for _id, record in db.recipes.records.items()
+                if reparse or not record.get("parsed_ingredients")
+            ]
+        updated = 0
+        for start in range(0, len(ids), batch_size):
+            with db.lock:
+                for _id in ids[start : start + batch_size]:
+                    record = db.recipes.records.get(_id)
+                    if record:
+                        parsed = parse_ingredients(record["ingredients"])
+                        db.recipes.update(_id, {"parsed_ingredients": parsed})
+                        updated += 1
+            if progress:
+                progress(min(start + batch_size, len(ids)), len(ids))
+        return updated
+
+    @classmethod
+    def recipes_get_tags(cls) -> List["tags"]:
+        """Return all distinct tags of the active recipes."""
+        db = cls._db()
+        with db.lock:
+            active = db.recipes.by_deleted[False]
+            return sorted(
+                tag for tag, ids in db.recipes.by_tag.items() if not ids.isdisjoint(active)
+            )
+
+    @classmethod
+    def recipes_tag_counts(cls) -> Dict[str, int]:
+        """Return the number of active recipes having each tag, most used first."""
+        db = cls._db()
+        with db.lock:
+            active = db.recipes.by_deleted[False]
+            counts = ((tag, len(ids & active)) for tag, ids in db.recipes.by_tag.items())
+            return dict(sorted((c for c in counts if c[1]), key=lambda c: (-c[1], c[0])))
+
+    @classmethod
+    def recipes_all(cls) -> List[RecipeModel]:
+        """Return all the recipes, deleted or not."""
+        db = cls._db()
+        with db.lock:
+            return [cls._recipe_to_model(r) for r in db.recipes.records.values()]
+
+    @classmethod
+    def _by_deleted(cls, deleted: bool, summary: bool = False) -> list:
+        db = cls._db()
+        with db.lock:
+            return cls._recipes_by_id(sorted(db.recipes.by_deleted[deleted]), summary)
+
+    @classmethod
+    def recipes_active(cls) -> List[RecipeModel]:
+        """Return all the recipes that have not been marked as deleted."""
+        return cls._by_deleted(False)
+
+    @classmethod
+    def recipes_active_summary(cls) -> List[RecipeSummary]:
+        """Same as recipes_active, but returns RecipeSummary's."""
+        return cls._by_deleted(False, summary=True)
+
+    @classmethod
+    def recipes_deleted(cls) -> List[RecipeModel]:
+        """Return all the recipes that have been marked as deleted."""
+        return cls._by_deleted(True)
+
+    @classmethod
+    def recipes_page(
+        cls,
+        page_size: int = 20,
+        token: Optional[str] = None,
+        sort_by: str = "created_date",
+        tags: Optional[List[str]] = None,
+        deleted: bool = False,
+        summary: bool = False,
+    ) -> PageModel:
+        """
+        Get a single page of recipes, ordered and keyset-paginated the same
+        way as MongoDriver.recipes_page, by scanning the sorted index of the
+        sort_by field from the token's position.
+
+        page = MemoryDriver.recipes_page(page_size=20, token=page.next_token)
+
+        :returns: PageModel of RecipeModel's (or RecipeSummary's) and the
+            token for the next page.
+        :raises PageTokenError: if the token is malformed.
+        """
+        field, direction = cls.PAGE_SORTS[sort_by]
+        after = None
+        if token:
+            after = decode_token(token, sort_by)
+            if not isinstance(after[1], str):
+                raise PageTokenError(token)
+
+        db = cls._db()
+        with db.lock:
+            candidates = db.recipes.by_deleted[deleted]
+            if tags:
+                candidates = candidates & db.recipes.with_tags(
+                    [tag.lower() for tag in tags]
+                )
+            ids = []
+            try:
+                for _id in db.recipes.sorted[field].scan(direction < 0, after):
+                    if _id in candidates:
+                        ids.append(_id)
+                        if len(ids) > page_size:
+                            break
+            except TypeError:
+                raise PageTokenError(token)
+
+            next_token = None
+            if len(ids) > page_size:
+                ids = ids[:page_size]
+                last = db.recipes.records[ids[-1]]
+                next_token = encode_token(sort_by, last[field], last["_id"])
+            return PageModel(items=cls._recipes_by_id(ids, summary), next_token=next_token)
+
+    @classmethod
+    def recipe_copy(cls, recipe) -> RecipeModel:
+        """
+        Given a recipe, create a copy of it with a modified name,
+        i.e. recipe.name = 'lasagna_COPY'
+
+        new_recipe = MemoryDriver.recipe_copy(recipe)
+        """
+        if isinstance(recipe, RecipeModel):
+            recipe = recipe.to_dict()
+        record = cls._build_recipe(
+            name=recipe["name"] + "_COPY",
+            prep_time=recipe["prep_time"],
+            cook_time=recipe["cook_time"],
+            servings=recipe["servings"],
+            ingredients=recipe["ingredients"],
+            directions=recipe["directions"],
+            tags=recipe["tags"],
+            notes=recipe["notes"],
+        )
+        record["rating"] = recipe["rating"]
+        db = cls._db()
+        with db.lock:
+            db.recipes.insert(record)
+        return cls._recipe_to_model(record)
+
+    @classmethod
+    def _recipe_update(cls, recipe_id: str, update) -> int:
+        """
+        Atomically apply update(record) -> changes to the recipe, also
+        setting its last_modified_date.  update returns None to skip.
+
+        :returns: (int) 1 if the recipe was updated, 0 otherwise.
+        """
+        db = cls._db()
+        with db.lock:
+            record = db.recipes.records.get(recipe_id)
+            if not record:
+                return 0
+            changes = update(record)
+            if changes is None:
+                return 0
+            changes["last_modified_date"] = datetime.datetime.utcnow()
+            db.recipes.update(recipe_id, changes)
+            return 1
+
+    @classmethod
+    def recipe_add_tag(cls, recipe: RecipeModel, tag: str) -> int:
+        """
+        Given a recipe instance, add a new tag.
+
+        :returns: (int) 1 for success, 0 for failure
+        """
+        tag = tag.lower()
+        return cls._recipe_update(
+            recipe.id,
+            lambda r: {"tags": r["tags"] if tag in r["tags"] else r["tags"] + [tag]},
+        )
+
+    @classmethod
+    def recipe_delete_tag(cls, recipe: RecipeModel, tag: str) -> int:
+        """
+        Given a recipe instance, delete a tag.
+
+        :returns: (int) 1 for success, 0 for failure
+        """
+        tag = tag.lower()
+        return cls._recipe_update(
+            recipe.id, lambda r: {"tags": [t for t in r["tags"] if t != tag]}
+        )
+
+    @classmethod
+    def recipe_mark_made(cls, recipe: RecipeModel, date: datetime = None) -> int:
+        """
+        Add a date the recipe was made, at most once per (UTC) day.
+
+        :returns: (int) 1 for success, 0 for failure or if trying to
+            mark_made on the same date more than once.
+        """
+        if date is None:
+            date = datetime.datetime.utcnow()
+
+        def mark(record):
+            if any(d.date() == date.date() for d in record["when_made"]):
+                return None
+            return {"when_made": record["when_made"] + [date]}
+
+        return cls._recipe_update(recipe.id, mark)
+
+    @classmethod
+    def recipe_delete(cls, recipe_id: str) -> int:
+        """
+        Given a recipe id, mark it as deleted.
+
+        :returns: (int) 1 for success, 0 for failure
+        """
+        return cls._recipe_update(recipe_id, lambda r: {"deleted": True})
+
+    @classmethod
+    def _search(cls, text: str) -> List[str]:
+        db = cls._db()
+        with db.lock:
+            return db.recipes.text.search(text)
+
+    @classmethod
+    def recipes_search(cls, text: str) -> List[RecipeModel]:
+        """
+        Return the recipes matching any word of text, ranked by the summed
+        field weights (name 10, tags 5, ingredients 4, directions 2).
+
+        MemoryDriver.recipes_search(text)
+        """
+        return cls._recipes_by_id(cls._search(text))
+
+    @classmethod
+    def recipes_search_summary(cls, text: str) -> List[RecipeSummary]:
+        """Same as recipes_search, but returns RecipeSummary's."""
+        return cls._recipes_by_id(cls._search(text), summary=True)
+
+    @classmethod
+    def recipes_search_ranked(
+        cls, text: str, limit: Optional[int] = None, skip: int = 0, summary: bool = False
+    ) -> List[RecipeModel]:
+        """
+        Search the active recipes by name (case insensitive substring) and
+        by the text index at once, ranked the same way as
+        MongoDriver.recipes_search_ranked: text score plus SEARCH_NAME_BOOST
+        if the name matched.
+
+        MemoryDriver.recipes_search_ranked("spam", limit=20, skip=40, summary=True)
+        """
+        if not text.strip():
+            return []
+        needle = text.lower()
+        db = cls._db()
+        with db.lock:
+            active = db.recipes.by_deleted[False]
+            scores = {
+                _id: score
+                for _id, score in db.recipes.text.scores(text).items()
+                if _id in active
+            }
+            for _id in active:
+                if needle in db.recipes.records[_id]["name"].lower():
+                    scores[_id] = scores.get(_id, 0) + cls.SEARCH_NAME_BOOST
+            ids = sorted(scores, key=lambda _id: (-scores[_id], _id))
+            ids = ids[skip:skip + limit] if limit else ids[skip:]
+            return cls._recipes_by_id(ids, summary=summary)
+
+    #### UserDBInt methods ###################################################
+
+    @staticmethod
+    def _user_to_model(record: dict) -> UserModel:
+        """Return a UserModel holding copies of the record's lists/dicts."""
+        return UserModel.from_dict(
+            {
+                **record,
+                "recipe_ids": list(record["recipe_ids"]),
+                "shared_recipe_ids": list(record["shared_recipe_ids"]),
+                "email_distros": dict(record["email_distros"]),
+            }
+        )
+
+    @classmethod
+    def user_create(cls, name: str, email: str, password: str) -> Optional[UserModel]:
+        """
+        Create and return the user.
+
+        :returns: (UserModel) the user or None if user email already in use.
+        """
+        now = datetime.datetime.utcnow()
+        record = {
+            "_id": str(bson.ObjectId()),
+            "name": name,
+            "username": name,
+            "email": email,
+            "password_hash": auth.hash_password(password),
+            "created_date": now,
+            "last_modified_date": now,
+            "recipe_ids": [],
+            "shared_recipe_ids": [],
+            "email_distros": {},
+        }
+        db = cls._db()
+        with db.lock:
+            if email in db.users.by_email:
+                return None
+            db.users.insert(record)
+        return cls._user_to_model(record)
+
+    @classmethod
+    def user_find_by_id(cls, user_id: str) -> Optional[UserModel]:
+        """
+        Find the user by id.
+
+        :returns: (UserModel) the user or None.
+        """
+        record = cls._db().users.records.get(str(user_id))
+        if record:
+            return cls._user_to_model(record)
+
+    @classmethod
+    def user_find_by_email(cls, email: str) -> Optional[UserModel]:
+        """
+        Find the user by email address.
+
+        :returns: (UserModel) the user or None.
+        """
+        db = cls._db()
+        with db.lock:
+            _id = db.users.by_email.get(email)
+            if _id:
+                return cls._user_to_model(db.users.records[_id])
+
+    @classmethod
+    def user_login(cls, email: str, password: str) -> Optional[UserModel]:
+        """
+        Logs in and returns the user.
+
+        :returns: (UserModel) the user.  None if user doesn't exist or the
+            password is incorrect.
+        """
+        user = cls.user_find_by_email(email)
+        if not user:
+            return None
+        if not auth.verify_password(password, user.password_hash):
+            return None
+        return user
+
+    @classmethod
+    def users_list(cls) -> Optional[List[UserModel]]:
+        """
+        Returns a list of all Users, or None if there are none.
+        """
+        db = cls._db()
+        with db.lock:
+            users = [cls._user_to_model(u) for u in db.users.records.values()]
+        if users:
+            return users
+
+    @classmethod
+    def _user_update(cls, user_id: str, changes: dict) -> int:
+        db = cls._db()
+        with db.lock:
+            record = db.users.records.get(str(user_id))
+            if not record:
+                return 0
+            record.update(changes, last_modified_date=datetime.datetime.utcnow())
+            return 1
+
+    @classmethod
+    def user_add_recipe(cls, user: UserModel, recipe_id: str) -> int:
+        """
+        Adds a recipe reference to the user's recipes.
+
+        :returns: (int) 1 for success, 0 if unsuccessful.
+        """
+        db = cls._db()
+        with db.lock:
+            record = db.users.records.get(str(user.id))
+            if not record:
+                return 0
+            recipe_ids = record["recipe_ids"]
+            recipe_id = str(recipe_id)
+            if recipe_id not in recipe_ids:
+                recipe_ids = recipe_ids + [recipe_id]
+            return cls._user_update(user.id, {"recipe_ids": recipe_ids})
+
+    @classmethod
+    def user_set_password(cls, user: UserModel, password: str) -> Optional[str]:
+        """
+        Sets password_hash as the hash of the user's password.
+
+        :returns: password hash of the supplied password or None if unsuccesssful.
+        """
+        password_hash = auth.hash_password(password)
+        if cls._user_update(user.id, {"password_hash": password_hash}):
+            return password_hash
+        return None
@@ -0,0 +1,201 @@
+"""
+In-memory collections for the MemoryDriver.
+
+Records are kept as plain dicts shaped like RecipeModel/UserModel dicts,
+along with the secondary indexes the driver queries through, so lookups
+never have to scan every record.
+"""
+
+import bisect
+import collections
+import re
+import threading
+from typing import Iterator
+from typing import List
+from typing import Optional
+
+
+class SortedIndex:
+    """
+    Ascending list of (value, _id) keys, supporting keyset scans in either
+    direction.
+
+    index.add("spam", "5f...")
+    for _id in index.scan(descending=True, after=("spam", "5f...")):
+        ...
+    """
+
+    def __init__(self):
+        self._keys = []
+
+    def add(self, value, _id: str) -> None:
+        bisect.insort(self._keys, (value, _id))
+
+    def remove(self, value, _id: str) -> None:
+        i = bisect.bisect_left(self._keys, (value, _id))
+        if i < len(self._keys) and self._keys[i] == (value, _id):
+            del self._keys[i]
+
+    def scan(self, descending: bool = False, after: Optional[tuple] = None) -> Iterator[str]:
+        """
+        Yield the _id's in key order, starting right after the given
+        (value, _id) key if there is one.  Raises TypeError if the key
+        can't be compared with the indexed values.
+        """
+        keys = self._keys
+        if descending:
+            start = len(keys) if after is None else bisect.bisect_left(keys, after)
+            for i in range(start - 1, -1, -1):
+                yield keys[i][1]
+        else:
+            start = 0 if after is None else bisect.bisect_right(keys, after)
+            for i in range(start, len(keys)):
+                yield keys[i][1]
+
+
+class TextIndex:
+    """
+    Weighted inverted index of term -> {_id: score}.  A record's score for a
+    term is the sum of the weights of every field occurrence of that term,
+    and a search ranks records by their summed score over the search terms.
+    """
+
+    TERM_RE = re.compile(r"\w+")
+
+    def __init__(self, weights: dict):
+        self.weights = weights
+        self._postings = collections.defaultdict(dict)
+        self._terms = {}
+
+    @classmethod
+    def terms(cls, text: str) -> List[str]:
+        return cls.TERM_RE.findall(text.lower())
+
+    def add(self, _id: str, record: dict) -> None:
+        scores = collections.Counter()
+        for field, weight in self.weights.items():
+            values = record.get(field) or []
+            if isinstance(values, str):
+                values = [values]
+            for value in values:
+                for term in self.terms(value):
+                    scores[term] += weight
+        for term, score in scores.items():
+            self._postings[term][_id] = score
+        self._terms[_id] = list(scores)
+
+    def remove(self, _id: str) -> None:
+        for term in self._terms.pop(_id, ()):
+            postings = self._postings[term]
+            postings.pop(_id, None)
+            if not postings:
+                del self._postings[term]
+
+    def scores(self, text: str) -> collections.Counter:
+        """Return {_id: score} of the records matching any term of text."""
+        scores = collections.Counter()
+        for term in set(self.terms(text)):
+            for _id, score in self._postings.get(term, {}).items():
+                scores[_id] += score
+        return scores
+
+    def search(self, text: str) -> List[str]:
+        """Return the _id's matching any term of text, best match first."""
+        scores = self.scores(text)
+        return sorted(scores, key=lambda _id: (-scores[_id], _id))
+
+
+class RecipeStore:
+    """
+    Recipe records indexed by tags, parsed ingredient names, deleted, name,
+    created_date and text.
+    """
+
+    # Same field weights as the text index on the mongo Recipe collection.
+    TEXT_WEIGHTS = {"name": 10, "tags": 5, "ingredients": 4, "directions": 2}
+
+    def __init__(self):
+        self.records = {}
+        self.by_tag = collections.defaultdict(set)
+        self.by_ingredient = collections.defaultdict(set)
+        self.by_deleted = {False: set(), True: set()}
+        self.sorted = {"name": SortedIndex(), "created_date": SortedIndex()}
+        self.text = TextIndex(self.TEXT_WEIGHTS)
+
+    @staticmethod
+    def _ingredient_names(record: dict) -> set:
+        return {i["name"] for i in record.get("parsed_ingredients") or ()} - {""}
+
+    def _index(self, record: dict) -> None:
+        _id = record["_id"]
+        for tag in record["tags"]:
+            self.by_tag[tag].add(_id)
+        for name in self._ingredient_names(record):
+            self.by_ingredient[name].add(_id)
+        self.by_deleted[record["deleted"]].add(_id)
+        for field, index in self.sorted.items():
+            index.add(record[field], _id)
+        self.text.add(_id, record)
+
+    def _unindex(self, record: dict) -> None:
+        _id = record["_id"]
+        for tag in record["tags"]:
+            self.by_tag[tag].discard(_id)
+            if not self.by_tag[tag]:
+                del self.by_tag[tag]
+        for name in self._ingredient_names(record):
+            self.by_ingredient[name].discard(_id)
+            if not self.by_ingredient[name]:
+                del self.by_ingredient[name]
+        self.by_deleted[record["deleted"]].discard(_id)
+        for field, index in self.sorted.items():
+            index.remove(record[field], _id)
+        self.text.remove(_id)
+
+    def insert(self, record: dict) -> None:
+        self.records[record["_id"]] = record
+        self._index(record)
+
+    def update(self, _id: str, changes: dict) -> dict:
+        """Apply the changes to the record, re-indexing it.  Returns the new record."""
+        old = self.records[_id]
+        new = {**old, **changes}
+        self._unindex(old)
+        self._index(new)
+        self.records[_id] = new
+        return new
+
+    def with_tags(self, tags: List[str]) -> set:
+        """Return the _id's of the records that have all of the tags."""
+        if not tags:
+            return set()
+        sets = sorted((self.by_tag.get(tag, set()) for tag in tags), key=len)
+        return sets[0].intersection(*sets[1:])
+
+    def with_ingredients(self, names: List[str]) -> set:
+        """Return the _id's of the records that have all of the ingredient names."""
+        if not names:
+            return set()
+        sets = sorted((self.by_ingredient.get(name, set()) for name in names), key=len)
+        return sets[0].intersection(*sets[1:])
+
+
+class UserStore:
+    """User records indexed by email."""
+
+    def __init__(self):
+        self.records = {}
+        self.by_email = {}
+
+    def insert(self, record: dict) -> None:
+        self.records[record["_id"]] = record
+        self.by_email[record["email"]] = record["_id"]
+
+
+class MemoryStore:
+    """One in-memory database: its recipes, users and the lock guarding them."""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.recipes = RecipeStore()
+        self.users = UserStore()
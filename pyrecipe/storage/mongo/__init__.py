@@ -1 +1,3 @@
 from .mongodriver import MongoDriver
+from .mongodriver import RawMongoDriver
+from .motordriver import MotorDriver
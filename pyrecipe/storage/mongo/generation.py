@@ -0,0 +1,70 @@
+"""ODM for MongoDB Generation Collection."""
+
+import threading
+
+import mongoengine
+
+
+class Generation(mongoengine.Document):
+    """
+    ODM Class that maps to the Generations collection in MongoDB.  One
+    document per collection, whose value is incremented by every write to
+    that collection, so processes caching its data can tell cheaply whether
+    anything changed since they last looked.
+
+    REQUIRED params:
+    :param name: (str) name of the collection, i.e. "recipes".
+
+    NOT-REQUIRED params:
+    :param value: (int) number of writes to the collection so far.
+    """
+
+    name = mongoengine.StringField(primary_key=True)
+    value = mongoengine.IntField(default=0)
+
+    meta = {
+        "db_alias": "core",
+        "collection": "generations",
+    }
+
+    def __repr__(self):
+        """Repr of instance for quick debugging purposes."""
+        return "<Generation: {}:{}>".format(self.name, self.value)
+
+
+class OwnGenerations:
+    """
+    The generations this process's own writes bumped each collection to, so
+    its caches, which apply their own writes themselves, can tell them from
+    the writes of other processes.  The last MAXLEN of each are kept.
+
+    own = OwnGenerations()
+    own.add("recipes", 8)
+    own.covers("recipes", 7, 8)
+    True
+    """
+
+    MAXLEN = 1024
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def add(self, name: str, value: int) -> None:
+        """Record that a write of this process bumped the collection to value."""
+        with self._lock:
+            values = self._values.setdefault(name, {})
+            values[value] = None
+            if len(values) > self.MAXLEN:
+                del values[next(iter(values))]
+
+    def covers(self, name: str, since: int, until: int) -> bool:
+        """
+        Whether the collection's generation moved from since to until by
+        this process's writes only.
+        """
+        if not 0 <= until - since <= self.MAXLEN:
+            return False
+        with self._lock:
+            values = self._values.get(name, {})
+            return all(value in values for value in range(since + 1, until + 1))
@@ -1,33 +1,333 @@
 """Mongo DB Driver to use for all Mongo DB interactions."""
 
+import atexit
+import collections
 import datetime
+import itertools
+import logging
+import re
+import threading
+from typing import Callable
+from typing import Dict
+from typing import Iterable
 from typing import List
 from typing import Optional
 
+import bson
 import mongoengine
+import pymongo
+from mongoengine.queryset import QuerySet
+from mongoengine.queryset.visitor import Q
+from pymongo import read_preferences
 
+from pyrecipe.errors import PageTokenError
+from pyrecipe.errors import RecipeConflictError
 from pyrecipe.security import auth
+from pyrecipe.storage.shared.bulk_model import BulkResult
+from pyrecipe.storage.shared.cursor import ModelCursor
 from pyrecipe.storage.shared.db_interface import DBInitInt
+from pyrecipe.storage.shared.ingredient_parser import ingredient_key
+from pyrecipe.storage.shared.ingredient_parser import parse_ingredients
+from pyrecipe.storage.shared.page_model import PageModel
+from pyrecipe.storage.shared.page_model import decode_token
+from pyrecipe.storage.shared.page_model import encode_token
 from pyrecipe.storage.shared.recipe_interface import RecipeDBInt
 from pyrecipe.storage.shared.user_interface import UserDBInt
 from pyrecipe.storage.shared.user_model import UserModel
 from pyrecipe.storage.shared.recipe_model import RecipeModel
+from pyrecipe.storage.shared.recipe_model import normalize_tags
+from pyrecipe.storage.shared.recipe_summary_model import RecipeSummary
 
+from .generation import Generation
+from .generation import OwnGenerations
 from .recipe import Recipe
+from .tag_stat import TagStat
 from .user import User
+from .pool import PoolStats
+from .shared import utcnow
+
+
+logger = logging.getLogger(__name__)
 
 
 class MongoDriver(DBInitInt, RecipeDBInt, UserDBInt):
     """Singleton type class to drive all Mongo DB interactions."""
 
+    # sort_by option -> (field, direction) keyset pagination is ordered by.
+    # Each has a matching compound index with "deleted" in recipe.py.
+    PAGE_SORTS = {"created_date": ("created_date", -1), "name": ("name", 1)}
+
+    # When True, reads pull raw BSON with as_pymongo() and convert it straight
+    # into Models, skipping mongoengine document hydration.  See RawMongoDriver.
+    RAW_READS = False
+
+    # Default number of recipes sent to the server per insert_many by
+    # recipe_create_many, and per bulk_write by recipes_backfill_ingredients.
+    BULK_CHUNK_SIZE = 500
+
+    # Read-only list, tag and search queries go through the READ_ALIAS
+    # connection, so they can be served by secondaries.  Writes and reads of
+    # a single recipe (read-your-own-write after create/edit) stay on "core".
+    READ_ALIAS = "core_read"
+    READ_PREFERENCE = "secondaryPreferred"
+
+    # Added by recipes_search_ranked to the text score of recipes whose name
+    # contains the search string, ranking them above text-only matches.
+    SEARCH_NAME_BOOST = 100.0
+
+    # Pool utilisation of each connection, see db_pool_stats.
+    POOL_STATS = {"core": PoolStats(), READ_ALIAS: PoolStats()}
+
+    # Generations bumped by this process's writes, see recipes_generation_is_own.
+    OWN_GENERATIONS = OwnGenerations()
+
+    # Tag count changes are queued in process and written to tag_stats by
+    # flush_tag_stats, in one bulk_write, TAG_STATS_FLUSH_MS after the first
+    # one queued (None: only before tag counts are read, and at exit), so
+    # recipe writes don't pay a round-trip for them.  Changes queued by a
+    # process that dies are lost: recipes_rebuild_tag_stats repairs them.
+    TAG_STATS_FLUSH_MS = 1000
+    _pending_tags = collections.Counter()
+    _tags_lock = threading.Lock()
+    _flush_timer = None
+
     #### DBInitInt methods ###################################################
 
     @staticmethod
-    def db_initialize(db_name="pyrecipe", verbose=False) -> None:
-        """Create/Register connection with mongodb.  DB name will be 'pyrecipe'."""
-        mongoengine.register_connection(alias="core", name=db_name)
+    def db_initialize(
+        db_name="pyrecipe", verbose=False, host=None, warmup=False, **options
+    ) -> None:
+        """
+        Create/Register connection with mongodb.  DB name will be 'pyrecipe'.
+
+        MongoDriver.db_initialize(
+            db_name="pyrecipe", host="mongodb://db1,db2/?replicaSet=rs0",
+            warmup=True, maxPoolSize=50, w="majority", readPreference="primary",
+        )
+
+        :param host: (str) mongodb:// URI or hostname, None for localhost.
+        :param warmup: (bool) connect at once with db_warmup, instead of on
+            the first request.
+        :param options: MongoClient options, i.e. maxPoolSize, minPoolSize,
+            maxIdleTimeMS, serverSelectionTimeoutMS, socketTimeoutMS, w,
+            journal and readPreference (by name).  The READ_ALIAS connection
+            gets the same options with READ_PREFERENCE.
+        """
+        read_preferences = {
+            "core": options.pop("readPreference", None) or "primary",
+            MongoDriver.READ_ALIAS: MongoDriver.READ_PREFERENCE,
+        }
+        for alias, read_preference in read_preferences.items():
+            mongoengine.register_connection(
+                alias=alias,
+                name=db_name,
+                host=host,
+                read_preference=MongoDriver._read_preference(read_preference),
+                event_listeners=[MongoDriver.POOL_STATS[alias]],
+                **options
+            )
         if verbose:
             print("[+] MongoDB connection registered to database: {}".format(db_name))
+        if warmup:
+            MongoDriver.db_warmup(verbose=verbose)
+
+    @staticmethod
+    def _read_preference(name: str) -> "ServerMode":
+        """Return the pymongo read preference for a mode name, i.e. "secondaryPreferred"."""
+        try:
+            mode = read_preferences.read_pref_mode_from_name(name)
+        except ValueError:
+            raise ValueError("Unknown MongoDB read preference: {}".format(name))
+        return read_preferences.make_read_preference(mode, None)
+
+    @staticmethod
+    def db_warmup(verbose=False) -> None:
+        """
+        Connect to the server and check it responds, so a bad host or
+        timeout fails at startup rather than on the first page load.  The
+        driver then keeps minPoolSize connections open in the background.
+        """
+        mongoengine.get_connection("core").admin.command("ping")
+        if verbose:
+            print("[+] MongoDB connection pool warmed up: {}".format(MongoDriver.db_pool_stats()))
+
+    @staticmethod
+    def db_pool_stats() -> dict:
+        """
+        Return the connection pool utilisation of every server connected to,
+        for each connection alias.  See PoolStats.snapshot.
+        """
+        return {alias: stats.snapshot() for alias, stats in MongoDriver.POOL_STATS.items()}
+
+    @classmethod
+    def _read_only(cls, document: "Document") -> "QuerySet":
+        """
+        Return a queryset of the document evaluated against the READ_ALIAS
+        connection, or against "core" if that alias was never registered
+        (i.e. when connected with mongoengine.connect directly).
+        """
+        try:
+            db = mongoengine.get_db(cls.READ_ALIAS)
+        except mongoengine.connection.ConnectionFailure:
+            return document.objects()
+        return QuerySet(document, db[document._get_collection_name()])
+
+    @staticmethod
+    def _bumped(collection: str, result):
+        """
+        Bump the collection's generation if the write succeeded (result is
+        truthy), and return the write's result.  The generation it was bumped
+        to is recorded as this process's own.  See recipes_generation.
+        """
+        if result:
+            generation = Generation._get_collection().find_one_and_update(
+                {"_id": collection},
+                {"$inc": {"value": 1}},
+                upsert=True,
+                return_document=pymongo.ReturnDocument.AFTER,
+            )
+            MongoDriver.OWN_GENERATIONS.add(collection, generation["value"])
+        return result
+
+    @staticmethod
+    def recipes_generation() -> int:
+        """
+        Return the recipes collection's generation: a counter every recipe
+        write increments.  Processes caching recipes (see CachingDriver)
+        poll it to find out about writes made by other processes.  Always
+        read from the primary.
+
+        generation = MongoDriver.recipes_generation()
+
+        :returns: (int) the generation, 0 before the first write.
+        """
+        generation = Generation.objects(name="recipes").as_pymongo().first()
+        return generation["value"] if generation else 0
+
+    @staticmethod
+    def users_generation() -> int:
+        """
+        Return the users collection's generation, bumped by every user
+        write.  See recipes_generation.
+
+        :returns: (int) the generation, 0 before the first write.
+        """
+        generation = Generation.objects(name="users").as_pymongo().first()
+        return generation["value"] if generation else 0
+
+    @staticmethod
+    def recipes_generation_is_own(since: int, until: int) -> bool:
+        """
+        Return whether the recipes generation moved from since to until by
+        this process's own writes only, i.e. a cache that applied them
+        itself is still current and needs no reset.
+
+        :param since: (int) the generation the cache was current at.
+        :param until: (int) the generation read now.
+        :returns: (bool) True if no other process wrote recipes in between.
+        """
+        return MongoDriver.OWN_GENERATIONS.covers("recipes", since, until)
+
+    @staticmethod
+    def users_generation_is_own(since: int, until: int) -> bool:
+        """Same as recipes_generation_is_own, for the users generation."""
+        return MongoDriver.OWN_GENERATIONS.covers("users", since, until)
+
+    @staticmethod
+    def _tag_delta(added: Iterable[str] = (), removed: Iterable[str] = ()) -> collections.Counter:
+        """Return the tag count changes of an active recipe's tags going from removed to added."""
+        delta = collections.Counter(set(added))
+        delta.subtract(set(removed))
+        return delta
+
+    @staticmethod
+    def _count_tags(delta: collections.Counter) -> None:
+        """Queue the tag count changes for flush_tag_stats, starting its timer if needed."""
+        delta = {tag: n for tag, n in delta.items() if n}
+        if not delta:
+            return
+        with MongoDriver._tags_lock:
+            MongoDriver._pending_tags.update(delta)
+            if MongoDriver._flush_timer is None and MongoDriver.TAG_STATS_FLUSH_MS is not None:
+                timer = threading.Timer(
+                    MongoDriver.TAG_STATS_FLUSH_MS / 1000, MongoDriver.flush_tag_stats
+                )
+                timer.daemon = True
+                MongoDriver._flush_timer = timer
+                timer.start()
+
+    @staticmethod
+    def flush_tag_stats() -> int:
+        """
+        Write the queued tag count changes to tag_stats in a single bulk
+        write, and bump the recipes generation so caching workers pick them
+        up.  They are queued again if the write fails.
+
+        MongoDriver.flush_tag_stats()
+
+        :returns: (int) the number of tag counts changed.
+        """
+        with MongoDriver._tags_lock:
+            pending = MongoDriver._pending_tags
+            MongoDriver._pending_tags = collections.Counter()
+            MongoDriver._flush_timer = None
+        updates = [
+            pymongo.UpdateOne({"_id": tag}, {"$inc": {"count": n}}, upsert=True)
+            for tag, n in pending.items()
+            if n
+        ]
+        if not updates:
+            return 0
+        try:
+            TagStat._get_collection().bulk_write(updates, ordered=False)
+        except pymongo.errors.PyMongoError:
+            with MongoDriver._tags_lock:
+                MongoDriver._pending_tags.update(pending)
+            raise
+        MongoDriver._bumped("recipes", True)
+        return len(updates)
+
+    @staticmethod
+    def _tag_stats_pipeline() -> list:
+        """Aggregation pipeline counting the active recipes of every tag, from scratch."""
+        return [
+            {"$match": {"deleted": False}},
+            {"$project": {"tags": {"$setUnion": ["$tags", []]}}},
+            {"$unwind": "$tags"},
+            {"$group": {"_id": "$tags", "count": {"$sum": 1}}},
+        ]
+
+    @staticmethod
+    def recipes_rebuild_tag_stats() -> Dict[str, int]:
+        """
+        Recount tag_stats from the recipes, i.e. to repair it or to fill it
+        for recipes written before it existed.  Writes made while it runs
+        may be miscounted: run it when the app is idle.  This process's
+        queued changes are dropped, since the recount has them.  Bumps the
+        recipes generation, so caching workers pick up the new counts.
+
+        MongoDriver.recipes_rebuild_tag_stats()
+
+        :returns: Dict[str, int] the recounted tag counts.
+        """
+        with MongoDriver._tags_lock:
+            MongoDriver._pending_tags = collections.Counter()
+        counts = {
+            son["_id"]: son["count"]
+            for son in Recipe._get_collection().aggregate(MongoDriver._tag_stats_pipeline())
+        }
+        collection = TagStat._get_collection()
+        collection.delete_many({"_id": {"$nin": list(counts)}})
+        if counts:
+            collection.bulk_write(
+                [
+                    pymongo.ReplaceOne({"_id": tag}, {"count": count}, upsert=True)
+                    for tag, count in counts.items()
+                ],
+                ordered=False,
+            )
+        MongoDriver._bumped("recipes", True)
+        return counts
 
     #### RecipeDBInt methods #################################################
 
@@ -52,10 +352,89 @@ class MongoDriver(DBInitInt, RecipeDBInt, UserDBInt):
             "deleted": recipe.deleted,
             "created_date": recipe.created_date,
             "last_modified_date": recipe.last_modified_date,
+            "parsed_ingredients": [dict(i) for i in recipe.parsed_ingredients],
         }
 
     @staticmethod
-    def recipe_create(
+    def _recipe_to_model(recipe: Recipe) -> RecipeModel:
+        """Given a mongo Recipe object, return it as a RecipeModel."""
+        return RecipeModel.from_dict(MongoDriver._recipe_to_dict(recipe))
+
+    @staticmethod
+    def _recipe_son_to_dict(son: dict) -> dict:
+        """Given a raw mongo recipe document, return the same dict as
+        _recipe_to_dict, filling in the Recipe field defaults."""
+        get = son.get
+        return {
+            "_id": str(son["_id"]),
+            "name": get("name"),
+            "num_ingredients": get("num_ingredients"),
+            "ingredients": get("ingredients", []),
+            "directions": get("directions", []),
+            "prep_time": get("prep_time", 0),
+            "cook_time": get("cook_time", 0),
+            "servings": get("servings"),
+            "images": get("images", []),
+            "tags": get("tags", []),
+            "notes": get("notes", []),
+            "rating": get("rating"),
+            "favorite": get("favorite", False),
+            "when_made": get("when_made", []),
+            "deleted": get("deleted", False),
+            "created_date": get("created_date"),
+            "last_modified_date": get("last_modified_date"),
+            "parsed_ingredients": get("parsed_ingredients", []),
+        }
+
+    @staticmethod
+    def _recipe_son_to_model(son: dict) -> RecipeModel:
+        """Given a raw mongo recipe document, return it as a RecipeModel."""
+        return RecipeModel.from_dict(MongoDriver._recipe_son_to_dict(son))
+
+    @classmethod
+    def _recipe_converter(cls, queryset: "QuerySet") -> tuple:
+        """
+        Return the (queryset, converter) pair for the driver's read path:
+        either the raw as_pymongo() queryset and _recipe_son_to_model, or the
+        queryset of Recipe documents and _recipe_to_model.
+        """
+        if cls.RAW_READS:
+            return queryset.as_pymongo(), cls._recipe_son_to_model
+        return queryset, cls._recipe_to_model
+
+    @classmethod
+    def _recipes(cls, queryset: "QuerySet") -> List[RecipeModel]:
+        """Convert every recipe in the queryset into a RecipeModel."""
+        queryset, to_model = cls._recipe_converter(queryset)
+        return [to_model(r) for r in queryset]
+
+    @classmethod
+    def _recipe_first(cls, queryset: "QuerySet") -> Optional[RecipeModel]:
+        """Return the first recipe in the queryset as a RecipeModel or None."""
+        queryset, to_model = cls._recipe_converter(queryset)
+        r = queryset.first()
+        if r:
+            return to_model(r)
+
+    @staticmethod
+    def _recipe_to_summary(son: dict) -> RecipeSummary:
+        """Given a raw mongo document projected to RecipeSummary.FIELDS, return
+        it as a RecipeSummary."""
+        return RecipeSummary(
+            _id=str(son["_id"]),
+            name=son.get("name"),
+            cook_time=son.get("cook_time", 0),
+            tags=son.get("tags", []),
+        )
+
+    @staticmethod
+    def _summaries(queryset: "QuerySet") -> "QuerySet":
+        """Restrict a Recipe queryset to the RecipeSummary fields server-side
+        and return raw documents instead of hydrated Recipe objects."""
+        return queryset.only(*RecipeSummary.FIELDS).as_pymongo()
+
+    @staticmethod
+    def _build_recipe(
         name: str,
         prep_time: int,
         cook_time: int,
@@ -65,14 +444,8 @@ class MongoDriver(DBInitInt, RecipeDBInt, UserDBInt):
         tags: List["tags"] = [],
         notes: List["notes"] = [],
         images: List["filepath"] = [],
-    ) -> RecipeModel:
-        """
-        Given the correct parameters, create a recipe.
-
-        r = MongoDriver.recipe_create(**kwargs)
-
-        :returns: Recipe instance and saves it into the DB.
-        """
+    ) -> Recipe:
+        """Given the recipe_create parameters, return an unsaved Recipe."""
         r = Recipe()
         r.name = name
         r.prep_time = float(prep_time)
@@ -80,15 +453,118 @@ class MongoDriver(DBInitInt, RecipeDBInt, UserDBInt):
         r.servings = servings
         r.ingredients = ingredients
         r.num_ingredients = len(ingredients)
+        r.parsed_ingredients = parse_ingredients(ingredients)
         r.directions = directions
-        r.tags = tags
+        r.tags = normalize_tags(tags)
         r.notes = notes
         r.images = images
-        r.save()
+        return r
+
+    @staticmethod
+    def _edit_changes(current: dict, form: dict) -> dict:
+        """
+        Given a recipe's raw document and the recipe_edit form, return the
+        fields to $set.  The form is built and validated the same way as by
+        recipe_create first, so "15" matches a stored 15.0 and bad values
+        raise instead of being written.
+        """
+        r = MongoDriver._build_recipe(**form)
+        r.validate()
+        son = r.to_mongo()
+        changes = {k: son.get(k) for k in form if current.get(k) != son.get(k)}
+        if "ingredients" in changes:
+            changes["num_ingredients"] = son["num_ingredients"]
+            changes["parsed_ingredients"] = son["parsed_ingredients"]
+        return changes
+
+    @staticmethod
+    def recipe_create(
+        name: str,
+        prep_time: int,
+        cook_time: int,
+        servings: str,
+        ingredients: List["ingredients"],
+        directions: List["directions"],
+        tags: List["tags"] = [],
+        notes: List["notes"] = [],
+        images: List["filepath"] = [],
+    ) -> RecipeModel:
+        """
+        Given the correct parameters, create a recipe.
+
+        r = MongoDriver.recipe_create(**kwargs)
+
+        :returns: Recipe instance and saves it into the DB.
+        """
+        r = MongoDriver._build_recipe(
+            name=name,
+            prep_time=prep_time,
+            cook_time=cook_time,
+            servings=servings,
+            ingredients=ingredients,
+            directions=directions,
+            tags=tags,
+            notes=notes,
+            images=images,
+        )
+        MongoDriver._bumped("recipes", r.save())
+        MongoDriver._count_tags(MongoDriver._tag_delta(added=r.tags))
         return RecipeModel.from_dict(MongoDriver._recipe_to_dict(r))
 
     @staticmethod
+    def recipe_create_many(
+        recipes: List[dict], chunk_size: Optional[int] = None
+    ) -> List[BulkResult]:
+        """
+        Create many recipes at once.  Every recipe is built and validated up
+        front, then the valid ones are sent with unordered insert_many in
+        chunks of chunk_size, so one bad recipe does not stop the others.
+
+        results = MongoDriver.recipe_create_many([kwargs1, kwargs2])
+
+        :param recipes: List[dict] each dict holds the recipe_create parameters.
+        :param chunk_size: (int) recipes per insert_many, default BULK_CHUNK_SIZE.
+        :returns: List["BulkResult"] one per recipe in input order, holding the
+            new recipe id or the reason it was not created.
+        """
+        chunk_size = chunk_size or MongoDriver.BULK_CHUNK_SIZE
+        results = [BulkResult(index=i) for i in range(len(recipes))]
+
+        valid = []
+        for i, kwargs in enumerate(recipes):
+            try:
+                r = MongoDriver._build_recipe(**kwargs)
+                r.validate()
+            except (mongoengine.errors.ValidationError, TypeError, ValueError) as e:
+                results[i].error = str(e)
+                continue
+            son = r.to_mongo()
+            son["_id"] = bson.ObjectId()
+            results[i]._id = str(son["_id"])
+            valid.append((i, son))
+
+        collection = Recipe._get_collection()
+        for start in range(0, len(valid), chunk_size):
+            chunk = valid[start : start + chunk_size]
+            try:
+                collection.insert_many([son for _, son in chunk], ordered=False)
+            except pymongo.errors.BulkWriteError as e:
+                for error in e.details["writeErrors"]:
+                    result = results[chunk[error["index"]][0]]
+                    result._id = None
+                    result.error = error["errmsg"]
+        delta = collections.Counter()
+        for i, son in valid:
+            if results[i].ok:
+                results[i].recipe = MongoDriver._recipe_son_to_model(son)
+                delta.update(MongoDriver._tag_delta(added=son.get("tags", ())))
+        MongoDriver._count_tags(delta)
+        MongoDriver._bumped("recipes", any(result._id for result in results))
+        return results
+
+    @classmethod
     def recipe_edit(
+        cls,
         _id: str,
         name: str,
         prep_time: int,
@@ -98,32 +574,60 @@ class MongoDriver(DBInitInt, RecipeDBInt, UserDBInt):
         directions: List["directions"],
         tags: List["tags"] = [],
         notes: List["notes"] = [],
-    ) -> RecipeModel:
+        last_modified: datetime.datetime = None,
+    ) -> Optional[RecipeModel]:
         """
-        Wholescale edit a recipe's information.
+        Edit a recipe's information.  The submitted form is diffed against
+        the stored recipe and only the changed fields are $set, in a single
+        update guarded by the recipe's last_modified_date.
 
-        r = MongoDriver.recipe_edit(**kwargs)
+        Pass the last_modified_date the editor loaded as last_modified so
+        edits made by someone else in the meantime are not overwritten.
 
-        :returns: Recipe instance and saves it into the DB.
+        r = MongoDriver.recipe_edit(**kwargs, last_modified=recipe.last_modified_date)
+
+        :returns: RecipeModel of the edited recipe, or None if not found.
+        :raises: RecipeConflictError if the recipe was modified by someone else.
         """
-        r = Recipe.objects().filter(id=_id).first()
-        if r:
-            r.update(
-                name=name,
-                prep_time=prep_time,
-                cook_time=cook_time,
-                servings=servings,
-                ingredients=ingredients,
-                directions=directions,
-                tags=tags,
-                notes=notes,
+        current = Recipe.objects(id=_id).as_pymongo().first()
+        if not current:
+            return None
+        if last_modified is None:
+            last_modified = current.get("last_modified_date")
+        elif current.get("last_modified_date") != last_modified:
+            raise RecipeConflictError(_id)
+
+        form = {
+            "name": name,
+            "prep_time": prep_time,
+            "cook_time": cook_time,
+            "servings": servings,
+            "ingredients": ingredients,
+            "directions": directions,
+            "tags": tags,
+            "notes": notes,
+        }
+        changes = cls._edit_changes(current, form)
+        if not changes:
+            return cls._recipe_son_to_model(current)
+
+        changes["last_modified_date"] = utcnow()
+        son = Recipe._get_collection().find_one_and_update(
+            {"_id": current["_id"], "last_modified_date": last_modified},
+            {"$set": changes},
+            return_document=pymongo.ReturnDocument.AFTER,
+        )
+        if son is None:
+            raise RecipeConflictError(_id)
+        cls._bumped("recipes", son)
+        if "tags" in changes and not current.get("deleted"):
+            cls._count_tags(
+                cls._tag_delta(added=changes["tags"], removed=current.get("tags", ()))
             )
-            r.save()
-            return RecipeModel.from_dict(MongoDriver._recipe_to_dict(r))
+        return cls._recipe_son_to_model(son)
 
-
-    @staticmethod
-    def recipe_find_by_id(recipe_id: str) -> Optional[RecipeModel]:
+    @classmethod
+    def recipe_find_by_id(cls, recipe_id: str) -> Optional[RecipeModel]:
         """
         Return the recipe with the given id.
 
@@ -132,12 +636,10 @@ class MongoDriver(DBInitInt, RecipeDBInt, UserDBInt):
         :param recipe_id: (str) the recipe id as a string
         :returns: RecipeModel for the recipe found or None
         """
-        r = Recipe.objects().filter(id=recipe_id).first()
-        if r:
-            return RecipeModel.from_dict(MongoDriver._recipe_to_dict(r))
+        return cls._recipe_first(Recipe.objects().filter(id=recipe_id))
 
-    @staticmethod
-    def recipes_find_by_name(search_string: str) -> Optional[RecipeModel]:
+    @classmethod
+    def recipes_find_by_name(cls, search_string: str) -> Optional[RecipeModel]:
         """
         Returns a match of all recipes for the search_string using a case insensitive
         regex match in the Recipe.name field
@@ -147,13 +649,11 @@ class MongoDriver(DBInitInt, RecipeDBInt, UserDBInt):
         :param search_string: (str) string to search.
         :returns: List["RecipeModel"] a list of all recipes that match or None.
         """
-        recipes = list(
-            Recipe.objects().filter(name__icontains=search_string, deleted=False)
-        )
-        return [RecipeModel.from_dict(MongoDriver._recipe_to_dict(r)) for r in recipes]
+        recipes = cls._read_only(Recipe).filter(name__icontains=search_string, deleted=False)
+        return cls._recipes(recipes)
 
-    @staticmethod
-    def recipes_find_by_tag(tags: List[str]) -> Optional[RecipeModel]:
+    @classmethod
+    def recipes_find_by_tag(cls, tags: List[str]) -> Optional[RecipeModel]:
         """
         Returns a match of all recipes for with the given tag.
 
@@ -163,22 +663,170 @@ class MongoDriver(DBInitInt, RecipeDBInt, UserDBInt):
         :returns: List["RecipeModel"] a list of all recipes that match or None.
         """
         tags = [tag.lower() for tag in tags]
-        recipes = list(Recipe.objects().filter(tags__all=tags, deleted=False))
-        return [RecipeModel.from_dict(MongoDriver._recipe_to_dict(r)) for r in recipes]
+        recipes = cls._read_only(Recipe).filter(tags__all=tags, deleted=False)
+        return cls._recipes(recipes)
+
+    @classmethod
+    def recipes_find_by_name_summary(cls, search_string: str) -> List[RecipeSummary]:
+        """
+        Same as recipes_find_by_name, but only the RecipeSummary fields are
+        returned from the DB.
+
+        recipes = MongoDriver.recipes_find_by_name_summary("spam")
+
+        :param search_string: (str) string to search.
+        :returns: List["RecipeSummary"] a list of all recipes that match.
+        """
+        recipes = cls._read_only(Recipe).filter(name__icontains=search_string, deleted=False)
+        return [cls._recipe_to_summary(r) for r in cls._summaries(recipes)]
+
+    @classmethod
+    def recipes_find_by_tag_summary(cls, tags: List[str]) -> List[RecipeSummary]:
+        """
+        Same as recipes_find_by_tag, but only the RecipeSummary fields are
+        returned from the DB.
+
+        recipes = MongoDriver.recipes_find_by_tag_summary(["tag1", "tag2"])
+
+        :param tags: List[str] list of strings (tags) to search.
+        :returns: List["RecipeSummary"] a list of all recipes that match.
+        """
+        tags = [tag.lower() for tag in tags]
+        recipes = cls._read_only(Recipe).filter(tags__all=tags, deleted=False)
+        return [cls._recipe_to_summary(r) for r in cls._summaries(recipes)]
+
+    @staticmethod
+    def _ingredient_query(ingredients: List[str]) -> Optional[dict]:
+        """
+        Return the query matching the active recipes having all of the
+        ingredients, by their parsed names, or None if none has a name.
+        """
+        names = sorted({ingredient_key(ingredient) for ingredient in ingredients} - {""})
+        if not names:
+            return None
+        return {"parsed_ingredients.name": {"$all": names}, "deleted": False}
+
+    @classmethod
+    def recipes_find_by_ingredient(cls, ingredients: List[str]) -> List[RecipeModel]:
+        """
+        Returns all active recipes having all of the given ingredients,
+        matched on the parsed names through the parsed_ingredients.name index
+        instead of a regex scan of the ingredients strings.
+
+        recipes = MongoDriver.recipes_find_by_ingredient(["garlic", "tomatoes"])
+
+        :param ingredients: List[str] ingredients, i.e. "tomatoes" or "2 eggs".
+        :returns: List["RecipeModel"] a list of all recipes that match.
+        """
+        query = cls._ingredient_query(ingredients)
+        if query is None:
+            return []
+        return cls._recipes(cls._read_only(Recipe).filter(__raw__=query))
+
+    @classmethod
+    def recipes_find_by_ingredient_summary(cls, ingredients: List[str]) -> List[RecipeSummary]:
+        """
+        Same as recipes_find_by_ingredient, but only the RecipeSummary fields
+        are returned from the DB.
+
+        recipes = MongoDriver.recipes_find_by_ingredient_summary(["garlic"])
+        """
+        query = cls._ingredient_query(ingredients)
+        if query is None:
+            return []
+        recipes = cls._read_only(Recipe).filter(__raw__=query)
+        return [cls._recipe_to_summary(r) for r in cls._summaries(recipes)]
+
+    @staticmethod
+    def _backfill_query(reparse: bool) -> dict:
+        """Query of the recipes recipes_backfill_ingredients parses."""
+        if reparse:
+            return {}
+        return {
+            "$or": [
+                {"parsed_ingredients": {"$exists": False}},
+                {"parsed_ingredients": {"$size": 0}},
+            ]
+        }
+
+    @staticmethod
+    def _backfill_update(son: dict) -> pymongo.UpdateOne:
+        """
+        Return the update setting the recipe's parsed ingredients, which only
+        applies if its ingredients are still the ones parsed.
+        """
+        ingredients = son.get("ingredients", [])
+        return pymongo.UpdateOne(
+            {"_id": son["_id"], "ingredients": ingredients},
+            {"$set": {"parsed_ingredients": parse_ingredients(ingredients)}},
+        )
+
+    @staticmethod
+    def recipes_backfill_ingredients(
+        batch_size: Optional[int] = None,
+        reparse: bool = False,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> int:
+        """
+        Parse the ingredients of the recipes written before they were parsed
+        on write, or of every recipe with reparse=True (i.e. after the parser
+        changed), sending batch_size updates per bulk_write.  Each update
+        only applies if the recipe's ingredients are still the ones parsed,
+        so edits made while it runs win.  last_modified_date is left alone.
+        progress(done, total) is called after each batch.  Bumps the recipes
+        generation, so caching workers pick up the parsed ingredients.
+
+        MongoDriver.recipes_backfill_ingredients(progress=print)
+
+        :returns: (int) the number of recipes updated.
+        """
+        batch_size = batch_size or MongoDriver.BULK_CHUNK_SIZE
+        query = MongoDriver._backfill_query(reparse)
+        collection = Recipe._get_collection()
+        total = collection.count_documents(query)
+        done = updated = 0
+        sons = collection.find(query, {"ingredients": 1}, batch_size=batch_size)
+        while True:
+            batch = [MongoDriver._backfill_update(son) for son in itertools.islice(sons, batch_size)]
+            if not batch:
+                break
+            updated += collection.bulk_write(batch, ordered=False).modified_count
+            done += len(batch)
+            if progress:
+                progress(done, total)
+        MongoDriver._bumped("recipes", updated)
+        return updated
 
     @staticmethod
     def recipes_get_tags() -> List["tags"]:
         """
-        Returns a of all distinct tags in the recipe collection.
+        Returns a list of all distinct tags of the active recipes, read from
+        tag_stats.
 
         recipes = MongoDriver.recipe_get_tags()
 
         :returns: List["tags"] a list of all distinct tags in the collection.
         """
-        return list(Recipe.objects().filter(deleted=False).distinct("tags"))
+        return sorted(MongoDriver.recipes_tag_counts())
 
     @staticmethod
-    def recipes_all() -> List[RecipeModel]:
+    def recipes_tag_counts() -> Dict[str, int]:
+        """
+        Returns the number of active recipes having each tag, most used
+        tags first, read from tag_stats after flushing this process's
+        queued changes to it.
+
+        counts = MongoDriver.recipes_tag_counts()
+
+        :returns: Dict[str, int] tag -> number of recipes.
+        """
+        if MongoDriver._pending_tags:
+            MongoDriver.flush_tag_stats()
+        stats = MongoDriver._read_only(TagStat).filter(count__gt=0).order_by("-count", "tag")
+        return {son["_id"]: son["count"] for son in stats.as_pymongo()}
+
+    @classmethod
+    def recipes_all(cls) -> List[RecipeModel]:
         """
         Get all the recipes currently stored in DB.
 
@@ -186,32 +834,113 @@ class MongoDriver(DBInitInt, RecipeDBInt, UserDBInt):
 
         :returns: List["RecipeModel"] of all recipes.
         """
-        recipes = list(Recipe.objects())
-        return [RecipeModel.from_dict(MongoDriver._recipe_to_dict(r)) for r in recipes]
+        return cls._recipes(Recipe.objects())
 
-    @staticmethod
-    def recipes_active() -> List[RecipeModel]:
+    @classmethod
+    def recipes_active(cls) -> ModelCursor:
         """
-        Get all the recipes that have not been marked as deleted.
+        Get all the recipes that have not been marked as deleted.  The filter
+        runs server-side on the "deleted" index and the results are converted
+        lazily as they are iterated over.
 
         recipes = MongoDriver.recipe_active()
 
-        :returns: List["RecipeModel"] of all recipes where deleted==False.
+        :returns: ModelCursor of RecipeModel's for all recipes where deleted==False.
         """
-        recipes = [r for r in Recipe.objects() if r.deleted == False]
-        return [RecipeModel.from_dict(MongoDriver._recipe_to_dict(r)) for r in recipes]
+        recipes = cls._read_only(Recipe).filter(deleted=False).no_cache()
+        return ModelCursor(*cls._recipe_converter(recipes))
 
-    @staticmethod
-    def recipes_deleted() -> Optional[RecipeModel]:
+    @classmethod
+    def recipes_active_summary(cls) -> ModelCursor:
+        """
+        Same as recipes_active, but only the RecipeSummary fields are
+        returned from the DB.
+
+        recipes = MongoDriver.recipes_active_summary()
+
+        :returns: ModelCursor of RecipeSummary's for all recipes where deleted==False.
         """
-        Get all the recipes that have been marked as deleted.
+        recipes = cls._summaries(cls._read_only(Recipe).filter(deleted=False).no_cache())
+        return ModelCursor(recipes, cls._recipe_to_summary)
+
+    @classmethod
+    def recipes_deleted(cls) -> ModelCursor:
+        """
+        Get all the recipes that have been marked as deleted.  The filter
+        runs server-side on the "deleted" index and the results are converted
+        lazily as they are iterated over.
 
         recipes = MongoDriver.recipe_deleted()
 
-        :returns: List["RecipeModel"] of all recipes where deleted==True.
+        :returns: ModelCursor of RecipeModel's for all recipes where deleted==True.
+        """
+        recipes = Recipe.objects(deleted=True).no_cache()
+        return ModelCursor(*cls._recipe_converter(recipes))
+
+    @classmethod
+    def recipes_page(
+        cls,
+        page_size: int = 20,
+        token: Optional[str] = None,
+        sort_by: str = "created_date",
+        tags: Optional[List[str]] = None,
+        deleted: bool = False,
+        summary: bool = False,
+    ) -> PageModel:
+        """
+        Get a single page of recipes using keyset pagination on (sort_by, _id),
+        so the cost of a page does not depend on how deep into the collection
+        it is.  "created_date" pages newest first and "name" pages A-Z.
+
+        page = MongoDriver.recipes_page(page_size=20)
+        page = MongoDriver.recipes_page(page_size=20, token=page.next_token)
+
+        :param page_size: (int) maximum number of recipes on the page.
+        :param token: (str) the next_token of the previous page, None for the first.
+        :param sort_by: (str) "created_date" or "name".
+        :param tags: List[str] only include recipes with all of these tags.
+        :param deleted: (bool) page through deleted instead of active recipes.
+        :param summary: (bool) return RecipeSummary's instead of RecipeModel's.
+        :returns: PageModel of RecipeModel's and the token for the next page.
+        :raises PageTokenError: if the token is malformed.
         """
-        recipes = [r for r in Recipe.objects() if r.deleted == True]
-        return [RecipeModel.from_dict(MongoDriver._recipe_to_dict(r)) for r in recipes]
+        field, direction = cls.PAGE_SORTS[sort_by]
+        query = Q(deleted=deleted)
+        if tags:
+            query &= Q(tags__all=[tag.lower() for tag in tags])
+        if token:
+            value, _id = decode_token(token, sort_by)
+            try:
+                _id = bson.ObjectId(_id)
+            except bson.errors.InvalidId:
+                raise PageTokenError(token)
+            op = "lt" if direction < 0 else "gt"
+            query &= Q(**{field + "__" + op: value}) | Q(
+                **{field: value, "id__" + op: _id}
+            )
+
+        order = "-" if direction < 0 else "+"
+        recipes = (
+            Recipe.objects(query)
+            .order_by(order + field, order + "id")
+            .limit(page_size + 1)
+        )
+        if summary:
+            recipes = recipes.only(*RecipeSummary.FIELDS, field).as_pymongo()
+            to_model = cls._recipe_to_summary
+        else:
+            recipes, to_model = cls._recipe_converter(recipes)
+        recipes = list(recipes)
+
+        next_token = None
+        if len(recipes) > page_size:
+            recipes = recipes[:page_size]
+            last = recipes[-1]
+            if isinstance(last, dict):
+                next_token = encode_token(sort_by, last[field], last["_id"])
+            else:
+                next_token = encode_token(sort_by, getattr(last, field), last.id)
+        return PageModel(items=[to_model(r) for r in recipes], next_token=next_token)
 
     @staticmethod
     def recipe_copy(recipe: RecipeModel) -> RecipeModel:
@@ -228,6 +957,7 @@ class MongoDriver(DBInitInt, RecipeDBInt, UserDBInt):
         copy.name = recipe["name"] + "_COPY"
         copy.num_ingredients = recipe["num_ingredients"]
         copy.ingredients = recipe["ingredients"]
+        copy.parsed_ingredients = parse_ingredients(recipe["ingredients"])
         copy.directions = recipe["directions"]
         copy.prep_time = recipe["prep_time"]
         copy.cook_time = recipe["cook_time"]
@@ -235,36 +965,62 @@ class MongoDriver(DBInitInt, RecipeDBInt, UserDBInt):
         copy.tags = recipe["tags"]
         copy.notes = recipe["notes"]
         copy.rating = recipe["rating"]
-        copy.save()
+        MongoDriver._bumped("recipes", copy.save())
+        MongoDriver._count_tags(MongoDriver._tag_delta(added=copy.tags))
         return RecipeModel.from_dict(MongoDriver._recipe_to_dict(copy))
 
+    @staticmethod
+    def _recipe_modify(recipe_id: str, after: Callable, **update) -> int:
+        """
+        Apply update, and a new last_modified_date, to the recipe in a single
+        atomic find_one_and_update that returns its tags and deleted flag as
+        they were before.  The change from those tags to after(tags) is then
+        queued for tag_stats, if the recipe was active.
+
+        :returns: (int) 1 for success, 0 if no recipe matched.
+        """
+        before = (
+            Recipe.objects(id=recipe_id)
+            .only("tags", "deleted")
+            .modify(set__last_modified_date=utcnow(), **update)
+        )
+        if before is None:
+            return 0
+        if not before.deleted:
+            MongoDriver._count_tags(
+                MongoDriver._tag_delta(added=after(before.tags), removed=before.tags)
+            )
+        return MongoDriver._bumped("recipes", 1)
+
     @staticmethod
     def recipe_add_tag(recipe: RecipeModel, tag: str) -> int:
         """
-        Given a recipe instance, add a new tag
+        Given a recipe instance, add a new tag.  The tag and the last
+        modified date are set in a single atomic update.
 
         MongoDriver.recipe_add_tag(recipe, "tag")
 
         :returns: (int) 1 for success, 0 for failure
         """
-        r = Recipe.objects().filter(id=recipe.id).first()
-        result = r.update(add_to_set__tags=tag.lower())
-        r._update_last_mod_date()
-        return result
+        tag = tag.lower()
+        return MongoDriver._recipe_modify(
+            recipe.id, lambda tags: tags + [tag], add_to_set__tags=tag
+        )
 
     @staticmethod
     def recipe_delete_tag(recipe: RecipeModel, tag: str) -> int:
         """
-        Given a recipe instance, delete a new tag
+        Given a recipe instance, delete a tag.  The tag and the last
+        modified date are updated in a single atomic update.
 
         MongoDriver.recipe_delete_tag(recipe, "tag")
 
         :returns: (int) 1 for success, 0 for failure
         """
-        r = Recipe.objects().filter(id=recipe.id).first()
-        result = r.update(pull__tags=tag.lower())
-        r._update_last_mod_date()
-        return result
+        tag = tag.lower()
+        return MongoDriver._recipe_modify(
+            recipe.id, lambda tags: [t for t in tags if t != tag], pull__tags=tag
+        )
 
     @staticmethod
     def recipe_mark_made(recipe: RecipeModel, date: datetime = None) -> int:
@@ -272,6 +1028,10 @@ class MongoDriver(DBInitInt, RecipeDBInt, UserDBInt):
         Add a date the recipe was last made.  This will be a list of
         all dates the recipe is made.
 
+        The "once per day" rule is enforced by the DB: the update only
+        matches if "when_made" holds no date on the same (UTC) day, so
+        the array is never pulled into Python.
+
         MongoDriver.recipe_mark_made(recipe, date)
 
         :returns: (int) for success, 0 for failure or if trying to
@@ -279,32 +1039,34 @@ class MongoDriver(DBInitInt, RecipeDBInt, UserDBInt):
         """
         if date is None:
             date = datetime.datetime.utcnow()
-        r = Recipe.objects().filter(id=recipe.id).first()
-        for d in r.when_made:
-            day_delta = (d.date() - date.date()).days
-            if day_delta == 0:
-                return 0
-
-        result = r.update(push__when_made=date)
-        r._update_last_mod_date()
-        return result
+        day_start = datetime.datetime.combine(date.date(), datetime.time())
+        day_end = day_start + datetime.timedelta(days=1)
+        not_made_today = {
+            "when_made": {
+                "$not": {"$elemMatch": {"$gte": day_start, "$lt": day_end}}
+            }
+        }
+        return MongoDriver._bumped(
+            "recipes",
+            Recipe.objects(id=recipe.id, __raw__=not_made_today).update_one(
+                push__when_made=date,
+                set__last_modified_date=utcnow(),
+            ),
+        )
 
     @staticmethod
-    def recipe_delete(recipe_id:str) -> int:
+    def recipe_delete(recipe_id: str) -> int:
         """
-        Given a recipe instance, mark it as deleted
+        Given a recipe id, mark it as deleted in a single atomic update.
 
-        MongoDriver.recipe_delete(recipe)
+        MongoDriver.recipe_delete(recipe_id)
 
         :returns: (int) 1 for success, 0 for failure
         """
-        r = Recipe.objects().filter(id=recipe_id).first()
-        result = r.update(deleted=True)
-        r._update_last_mod_date()
-        return result
+        return MongoDriver._recipe_modify(recipe_id, lambda tags: [], set__deleted=True)
 
-    @staticmethod
-    def recipes_search(text: str) -> Optional["RecipeModel"]:
+    @classmethod
+    def recipes_search(cls, text: str) -> Optional["RecipeModel"]:
         """
         Given a search string, return all matches
 
@@ -312,9 +1074,101 @@ class MongoDriver(DBInitInt, RecipeDBInt, UserDBInt):
 
         :returns: A list of recipes that match (if any)
         """
-        recipes = Recipe.objects.search_text(text).order_by("$text_score")
-        return [RecipeModel.from_dict(MongoDriver._recipe_to_dict(r)) for r in recipes]
+        recipes = cls._read_only(Recipe).search_text(text).order_by("$text_score")
+        return cls._recipes(recipes)
 
+    @classmethod
+    def recipes_search_summary(cls, text: str) -> List[RecipeSummary]:
+        """
+        Same as recipes_search, but only the RecipeSummary fields are
+        returned from the DB.
+
+        MongoDriver.recipes_search_summary(text)
+
+        :returns: A list of RecipeSummary's that match (if any)
+        """
+        recipes = cls._read_only(Recipe).search_text(text).order_by("$text_score")
+        return [cls._recipe_to_summary(r) for r in cls._summaries(recipes)]
+
+    @staticmethod
+    def _search_pipeline(
+        text: str, limit: Optional[int] = None, skip: int = 0, summary: bool = False
+    ) -> List[dict]:
+        """
+        Return the recipes_search_ranked aggregation.  The $text and name
+        clauses of the $or are both indexed, so the $match (which must come
+        first for $text) runs off the text and name indexes.
+        """
+        name = re.escape(text)
+        pipeline = [
+            {
+                "$match": {
+                    "$or": [
+                        {"$text": {"$search": text}},
+                        {"name": {"$regex": name, "$options": "i"}},
+                    ],
+                    "deleted": False,
+                }
+            },
+            {
+                "$addFields": {
+                    "_score": {
+                        "$add": [
+                            {"$ifNull": [{"$meta": "textScore"}, 0]},
+                            {
+                                "$cond": [
+                                    {
+                                        "$regexMatch": {
+                                            "input": "$name",
+                                            "regex": name,
+                                            "options": "i",
+                                        }
+                                    },
+                                    MongoDriver.SEARCH_NAME_BOOST,
+                                    0,
+                                ]
+                            },
+                        ]
+                    }
+                }
+            },
+            {"$sort": {"_score": -1, "_id": 1}},
+        ]
+        if skip:
+            pipeline.append({"$skip": skip})
+        if limit:
+            pipeline.append({"$limit": limit})
+        if summary:
+            pipeline.append({"$project": {field: 1 for field in RecipeSummary.FIELDS}})
+        else:
+            pipeline.append({"$project": {"_score": 0}})
+        return pipeline
+
+    @classmethod
+    def recipes_search_ranked(
+        cls, text: str, limit: Optional[int] = None, skip: int = 0, summary: bool = False
+    ) -> List[RecipeModel]:
+        """
+        Search the active recipes by name (case insensitive substring) and
+        by the text index at once, in a single aggregation.  Each recipe is
+        returned once, ranked by its text score plus SEARCH_NAME_BOOST if
+        its name matched.  Needs MongoDB 4.2+ ($regexMatch).
+
+        MongoDriver.recipes_search_ranked("spam", limit=20, skip=40, summary=True)
+
+        :param text: (str) the search string.  A blank one matches nothing.
+        :param limit: (int) the maximum number of recipes to return, or None for all.
+        :param skip: (int) the number of best matches to skip.
+        :param summary: (bool) return RecipeSummary's instead of RecipeModel's.
+        :returns: List[RecipeModel] or List[RecipeSummary], best match first.
+        """
+        if not text.strip():
+            return []
+        cursor = cls._read_only(Recipe).aggregate(
+            cls._search_pipeline(text, limit=limit, skip=skip, summary=summary)
+        )
+        to_model = cls._recipe_to_summary if summary else cls._recipe_son_to_model
+        return [to_model(son) for son in cursor]
 
     #### UserDBInt methods ###################################################
 
@@ -334,6 +1188,37 @@ class MongoDriver(DBInitInt, RecipeDBInt, UserDBInt):
             "email_distros": user.email_distros,
         }
 
+    @staticmethod
+    def _user_son_to_dict(son: dict) -> dict:
+        """Given a raw mongo user document, return the same dict as
+        _user_to_dict.  Recipe references are returned as stored (ids)
+        rather than being dereferenced."""
+        get = son.get
+        return {
+            "_id": son["_id"],
+            "name": get("name"),
+            "username": get("username"),
+            "email": get("email"),
+            "password_hash": get("password_hash"),
+            "created_date": get("created_date"),
+            "last_modified_date": get("last_modified_date"),
+            "recipe_ids": get("recipe_ids", []),
+            "shared_recipe_ids": get("shared_recipe_ids", []),
+            "email_distros": get("email_distros", {}),
+        }
+
+    @classmethod
+    def _user_first(cls, queryset: "QuerySet") -> Optional[UserModel]:
+        """Return the first user in the queryset as a UserModel or None."""
+        if cls.RAW_READS:
+            user = queryset.as_pymongo().first()
+            if user:
+                return UserModel.from_dict(cls._user_son_to_dict(user))
+        else:
+            user = queryset.first()
+            if user:
+                return UserModel.from_dict(cls._user_to_dict(user))
+
     @staticmethod
     def user_create(name: str, email: str, password: str) -> Optional["UserModel"]:
         """
@@ -353,11 +1238,11 @@ class MongoDriver(DBInitInt, RecipeDBInt, UserDBInt):
         user.username = name
         user.email = email
         user.password_hash = auth.hash_password(password)
-        user.save()
+        MongoDriver._bumped("users", user.save())
         return UserModel.from_dict(MongoDriver._user_to_dict(user))
 
-    @staticmethod
-    def user_find_by_id(user_id: str) -> Optional["UserModel"]:
+    @classmethod
+    def user_find_by_id(cls, user_id: str) -> Optional["UserModel"]:
         """
         Check to see if a user with that user_id exists.
 
@@ -367,14 +1252,12 @@ class MongoDriver(DBInitInt, RecipeDBInt, UserDBInt):
         :returns: (UserModel) the user or None.
         """
         try:
-            user = User.objects().filter(id=user_id).first()
+            return cls._user_first(User.objects().filter(id=user_id))
         except mongoengine.errors.ValidationError:
-            user = None
-        if user:
-            return UserModel.from_dict(MongoDriver._user_to_dict(user))
+            return None
 
-    @staticmethod
-    def user_login(email: str, password: str) -> Optional["UserModel"]:
+    @classmethod
+    def user_login(cls, email: str, password: str) -> Optional["UserModel"]:
         """
         Logs in and returns the user.
 
@@ -384,15 +1267,15 @@ class MongoDriver(DBInitInt, RecipeDBInt, UserDBInt):
         :param password: (str) the supplied password.
         :returns: (UserModel) the user.  None if user doesn't exist.
         """
-        user = User.objects().filter(email=email).first()
+        user = cls._user_first(User.objects().filter(email=email))
         if not user:
             return None
         if not auth.verify_password(password, user.password_hash):
             return None
-        return UserModel.from_dict(MongoDriver._user_to_dict(user))
+        return user
 
-    @staticmethod
-    def user_find_by_email(email: str) -> Optional["UserModel"]:
+    @classmethod
+    def user_find_by_email(cls, email: str) -> Optional["UserModel"]:
         """
         Finds the user by email address.
 
@@ -401,12 +1284,10 @@ class MongoDriver(DBInitInt, RecipeDBInt, UserDBInt):
         :param email: (str) the user's email address.
         :returns: (UserModel) the user or None.
         """
-        user = User.objects().filter(email=email).first()
-        if user:
-            return UserModel.from_dict(MongoDriver._user_to_dict(user))
+        return cls._user_first(User.objects().filter(email=email))
 
-    @staticmethod
-    def users_list() -> List["UserModel"]:
+    @classmethod
+    def users_list(cls) -> List["UserModel"]:
         """
         Returns a list of all Users.
 
@@ -414,11 +1295,12 @@ class MongoDriver(DBInitInt, RecipeDBInt, UserDBInt):
 
         :returns: list(User)
         """
-        users = list(User.objects())
+        if cls.RAW_READS:
+            users = [cls._user_son_to_dict(u) for u in User.objects().as_pymongo()]
+        else:
+            users = [cls._user_to_dict(u) for u in User.objects()]
         if users:
-            return [
-                UserModel.from_dict(MongoDriver._user_to_dict(user)) for user in users
-            ]
+            return [UserModel.from_dict(user) for user in users]
 
     @staticmethod
     def user_add_recipe(user: "UserModel", recipe_id: str) -> int:
@@ -431,26 +1313,56 @@ class MongoDriver(DBInitInt, RecipeDBInt, UserDBInt):
         :param recipe_id: (str) a reference to a recipe.
         :returns: (int) 1 for success, 0 if unsuccessful.
         """
-        user = User.objects().filter(id=user.id).first()
-        result = user.update(add_to_set__recipe_ids=recipe_id)
-        if result:
-            user._update_last_mod_date()
-        user.reload()
-        return result
+        return MongoDriver._bumped(
+            "users",
+            User.objects(id=user.id).update_one(
+                add_to_set__recipe_ids=recipe_id,
+                set__last_modified_date=utcnow(),
+            ),
+        )
 
     @staticmethod
     def user_set_password(user: "UserModel", password: str) -> str:
         """
-        Sets password_hash as the hash of the user's password and reloads
-        the DB instance.  Can use this method to change user's password.
+        Sets password_hash as the hash of the user's password, in a single
+        update.  Can use this method to change user's password.
 
         MongoDriver.user_set_password(user, 'p@ssw0rd')
 
         :returns: password hash of the supplied password or None if unsuccesssful.
         """
-        u = User.objects().filter(id=user.id).first()
-        if u:
-            password_hash = auth.hash_password(password)
-            u.update(password_hash=password_hash)
+        password_hash = auth.hash_password(password)
+        result = MongoDriver._bumped(
+            "users",
+            User.objects(id=user.id).update_one(
+                set__password_hash=password_hash,
+                set__last_modified_date=utcnow(),
+            ),
+        )
+        if result:
             return password_hash
         return None
+
+
+@atexit.register
+def _flush_tag_stats_at_exit() -> None:
+    """Write the tag count changes still queued when the process exits."""
+    if MongoDriver._pending_tags:
+        try:
+            MongoDriver.flush_tag_stats()
+        except Exception:
+            logger.exception("Lost the queued tag_stats changes, run rebuild-tag-stats")
+
+
+class RawMongoDriver(MongoDriver):
+    """
+    MongoDriver whose reads bypass mongoengine document hydration (field
+    validation, dereferencing and change tracking) and convert raw BSON
+    directly into RecipeModel's/UserModel's.  Writes are unchanged.
+
+    Differences from MongoDriver: UserModel.recipe_ids/shared_recipe_ids
+    hold the stored recipe ids instead of dereferenced Recipe documents.
+    """
+
+    RAW_READS = True
+
@@ -0,0 +1,850 @@
+"""
+Asyncio Mongo DB Driver, built on motor, for use from an async server.
+
+Every RecipeDBInt/UserDBInt operation is a coroutine here, so a single event
+loop can have many DB round-trips in flight at once instead of parking a
+worker thread on each.  Documents are built and validated with the same
+mongoengine Recipe/User classes as MongoDriver, and read back as raw BSON, so
+both drivers share one schema and return the same Models as RawMongoDriver.
+
+motor is an optional dependency: pip install pyrecipe[async].
+"""
+
+import collections
+import datetime
+import re
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+
+import bson
+import mongoengine
+import pymongo
+
+from pyrecipe.errors import PageTokenError
+from pyrecipe.errors import RecipeConflictError
+from pyrecipe.security import auth
+from pyrecipe.storage.shared.bulk_model import BulkResult
+from pyrecipe.storage.shared.db_interface import DBInitInt
+from pyrecipe.storage.shared.ingredient_parser import parse_ingredients
+from pyrecipe.storage.shared.page_model import PageModel
+from pyrecipe.storage.shared.page_model import decode_token
+from pyrecipe.storage.shared.page_model import encode_token
+from pyrecipe.storage.shared.recipe_interface import RecipeDBInt
+from pyrecipe.storage.shared.user_interface import UserDBInt
+from pyrecipe.storage.shared.user_model import UserModel
+from pyrecipe.storage.shared.recipe_model import RecipeModel
+from pyrecipe.storage.shared.recipe_summary_model import RecipeSummary
+
+from .mongodriver import MongoDriver
+from .generation import Generation
+from .recipe import Recipe
+from .tag_stat import TagStat
+from .user import User
+from .pool import PoolStats
+from .shared import utcnow
+
+
+class MotorDriver(DBInitInt, RecipeDBInt, UserDBInt):
+    """
+    Singleton type class to drive all Mongo DB interactions from asyncio.
+    Same operations as MongoDriver, but each one is awaited.
+
+    MotorDriver.db_initialize(db_name="pyrecipe")
+    recipe = await MotorDriver.recipe_find_by_id(recipe_id)
+    """
+
+    PAGE_SORTS = MongoDriver.PAGE_SORTS
+    BULK_CHUNK_SIZE = MongoDriver.BULK_CHUNK_SIZE
+
+    SUMMARY_PROJECTION = {field: 1 for field in RecipeSummary.FIELDS}
+
+    POOL_STATS = PoolStats()
+
+    _client = None
+    _db = None
+
+    #### DBInitInt methods ###################################################
+
+    @classmethod
+    def db_initialize(
+        cls, db_name="pyrecipe", verbose=False, host=None, client=None, **options
+    ) -> None:
+        """
+        Create the motor client for the database.  No I/O is done until the
+        first operation is awaited, so this is safe to call outside the loop.
+        Pass client to use an existing (or stand-in) motor client.
+
+        :param host: (str) mongodb:// URI or hostname, None for localhost.
+        :param options: MongoClient options, same as MongoDriver.db_initialize.
+            "warmup" is ignored here, await db_warmup() on the loop instead.
+        """
+        options.pop("warmup", None)
+        if client is None:
+            import motor.motor_asyncio
+
+            client = motor.motor_asyncio.AsyncIOMotorClient(
+                host, event_listeners=[cls.POOL_STATS], **options
+            )
+        cls._client = client
+        cls._db = client[db_name]
+        if verbose:
+            print("[+] MongoDB (motor) client created for database: {}".format(db_name))
+
+    @classmethod
+    async def db_warmup(cls) -> None:
+        """Connect to the server and check it responds.  See MongoDriver.db_warmup."""
+        await cls._client.admin.command("ping")
+
+    @classmethod
+    def db_pool_stats(cls) -> dict:
+        """Return the connection pool utilisation, see PoolStats.snapshot."""
+        return cls.POOL_STATS.snapshot()
+
+    @classmethod
+    def db_close(cls) -> None:
+        """Close the motor client."""
+        if cls._client is not None:
+            cls._client.close()
+        cls._client = None
+        cls._db = None
+
+    @classmethod
+    async def db_ensure_indexes(cls) -> None:
+        """
+        Create the indexes declared in the Recipe and User meta.  mongoengine
+        does this on first use for MongoDriver; call it once at startup here.
+        """
+        for document in (Recipe, User, TagStat):
+            indexes = []
+            for spec in document._meta["index_specs"]:
+                spec = dict(spec)
+                indexes.append(pymongo.IndexModel(spec.pop("fields"), **spec))
+            await cls._collection(document).create_indexes(indexes)
+
+    @classmethod
+    def _collection(cls, document: "Document") -> "AsyncIOMotorCollection":
+        """Return the motor collection holding the given mongoengine Document."""
+        return cls._db[document._meta["collection"]]
+
+    @classmethod
+    async def _bumped(cls, collection: str, result):
+        """
+        Bump the collection's generation if the write succeeded (result is
+        truthy), and return the write's result.  See MongoDriver._bumped.
+        """
+        if result:
+            generation = await cls._collection(Generation).find_one_and_update(
+                {"_id": collection},
+                {"$inc": {"value": 1}},
+                upsert=True,
+                return_document=pymongo.ReturnDocument.AFTER,
+            )
+            MongoDriver.OWN_GENERATIONS.add(collection, generation["value"])
+        return result
+
+    @classmethod
+    async def recipes_generation(cls) -> int:
+        """Return the recipes collection's generation.  See MongoDriver.recipes_generation."""
+        generation = await cls._collection(Generation).find_one({"_id": "recipes"})
+        return generation["value"] if generation else 0
+
+    @classmethod
+    async def users_generation(cls) -> int:
+        """Return the users collection's generation.  See MongoDriver.users_generation."""
+        generation = await cls._collection(Generation).find_one({"_id": "users"})
+        return generation["value"] if generation else 0
+
+    @staticmethod
+    def recipes_generation_is_own(since: int, until: int) -> bool:
+        """See MongoDriver.recipes_generation_is_own."""
+        return MongoDriver.recipes_generation_is_own(since, until)
+
+    @staticmethod
+    def users_generation_is_own(since: int, until: int) -> bool:
+        """See MongoDriver.users_generation_is_own."""
+        return MongoDriver.users_generation_is_own(since, until)
+
+    @classmethod
+    async def _count_tags(cls, delta: collections.Counter) -> None:
+        """Apply the tag count changes to tag_stats.  See MongoDriver._count_tags."""
+        updates = [
+            pymongo.UpdateOne({"_id": tag}, {"$inc": {"count": n}}, upsert=True)
+            for tag, n in delta.items()
+            if n
+        ]
+        if updates:
+            await cls._collection(TagStat).bulk_write(updates, ordered=False)
+
+    @classmethod
+    async def recipes_rebuild_tag_stats(cls) -> Dict[str, int]:
+        """Recount tag_stats from the recipes.  See MongoDriver.recipes_rebuild_tag_stats."""
+        cursor = cls._collection(Recipe).aggregate(MongoDriver._tag_stats_pipeline())
+        counts = {son["_id"]: son["count"] async for son in cursor}
+        collection = cls._collection(TagStat)
+        await collection.delete_many({"_id": {"$nin": list(counts)}})
+        if counts:
+            await collection.bulk_write(
+                [
+                    pymongo.ReplaceOne({"_id": tag}, {"count": count}, upsert=True)
+                    for tag, count in counts.items()
+                ],
+                ordered=False,
+            )
+        await cls._bumped("recipes", True)
+        return counts
+
+    #### RecipeDBInt methods #################################################
+
+    @staticmethod
+    def _object_id(_id) -> Optional[bson.ObjectId]:
+        """Return _id as an ObjectId, or None if it is not a valid one."""
+        try:
+            return bson.ObjectId(_id)
+        except (bson.errors.InvalidId, TypeError):
+            return None
+
+    @classmethod
+    async def _recipes(cls, query: dict, **kwargs) -> List[RecipeModel]:
+        """Find the recipes matching query and return them as RecipeModel's."""
+        cursor = cls._collection(Recipe).find(query, **kwargs)
+        return [MongoDriver._recipe_son_to_model(son) async for son in cursor]
+
+    @classmethod
+    async def _summaries(cls, query: dict, **kwargs) -> List[RecipeSummary]:
+        """Find the recipes matching query, fetching only the RecipeSummary
+        fields from the DB, and return them as RecipeSummary's."""
+        cursor = cls._collection(Recipe).find(query, cls.SUMMARY_PROJECTION, **kwargs)
+        return [MongoDriver._recipe_to_summary(son) async for son in cursor]
+
+    @staticmethod
+    def _name_query(search_string: str) -> dict:
+        return {
+            "name": {"$regex": re.escape(search_string), "$options": "i"},
+            "deleted": False,
+        }
+
+    @staticmethod
+    def _tag_query(tags: List[str]) -> dict:
+        return {"tags": {"$all": [tag.lower() for tag in tags]}, "deleted": False}
+
+    @classmethod
+    async def _insert_recipe(cls, recipe: Recipe) -> RecipeModel:
+        """Validate and insert an unsaved Recipe, returning it as a RecipeModel."""
+        recipe.validate()
+        son = recipe.to_mongo().to_dict()
+        son["_id"] = bson.ObjectId()
+        await cls._collection(Recipe).insert_one(son)
+        await cls._bumped("recipes", True)
+        await cls._count_tags(MongoDriver._tag_delta(added=son.get("tags", ())))
+        return MongoDriver._recipe_son_to_model(son)
+
+    @classmethod
+    async def recipe_create(
+        cls,
+        name: str,
+        prep_time: int,
+        cook_time: int,
+        servings: str,
+        ingredients: List["ingredients"],
+        directions: List["directions"],
+        tags: List["tags"] = [],
+        notes: List["notes"] = [],
+        images: List["filepath"] = [],
+    ) -> RecipeModel:
+        """
+        Given the correct parameters, create a recipe.
+
+        r = await MotorDriver.recipe_create(**kwargs)
+
+        :returns: RecipeModel of the recipe saved into the DB.
+        """
+        r = MongoDriver._build_recipe(
+            name=name,
+            prep_time=prep_time,
+            cook_time=cook_time,
+            servings=servings,
+            ingredients=ingredients,
+            directions=directions,
+            tags=tags,
+            notes=notes,
+            images=images,
+        )
+        return await cls._insert_recipe(r)
+
+    @classmethod
+    async def recipe_create_many(
+        cls, recipes: List[dict], chunk_size: Optional[int] = None
+    ) -> List[BulkResult]:
+        """
+        Create many recipes at once, with unordered insert_many's of
+        chunk_size recipes.  See MongoDriver.recipe_create_many.
+
+        results = await MotorDriver.recipe_create_many([kwargs1, kwargs2])
+
+        :returns: List["BulkResult"] one per recipe in input order.
+        """
+        chunk_size = chunk_size or cls.BULK_CHUNK_SIZE
+        results = [BulkResult(index=i) for i in range(len(recipes))]
+
+        valid = []
+        for i, kwargs in enumerate(recipes):
+            try:
+                r = MongoDriver._build_recipe(**kwargs)
+                r.validate()
+            except (mongoengine.errors.ValidationError, TypeError, ValueError) as e:
+                results[i].error = str(e)
+                continue
+            son = r.to_mongo().to_dict()
+            son["_id"] = bson.ObjectId()
+            results[i]._id = str(son["_id"])
+            valid.append((i, son))
+
+        collection = cls._collection(Recipe)
+        for start in range(0, len(valid), chunk_size):
+            chunk = valid[start : start + chunk_size]
+            try:
+                await collection.insert_many([son for _, son in chunk], ordered=False)
+            except pymongo.errors.BulkWriteError as e:
+                for error in e.details["writeErrors"]:
+                    result = results[chunk[error["index"]][0]]
+                    result._id = None
+                    result.error = error["errmsg"]
+        delta = collections.Counter()
+        for i, son in valid:
+            if results[i].ok:
+                results[i].recipe = MongoDriver._recipe_son_to_model(son)
+                delta.update(MongoDriver._tag_delta(added=son.get("tags", ())))
+        await cls._count_tags(delta)
+        await cls._bumped("recipes", any(result._id for result in results))
+        return results
+
+    @classmethod
+    async def recipe_edit(
+        cls,
+        _id: str,
+        name: str,
+        prep_time: int,
+        cook_time: int,
+        servings: str,
+        ingredients: List["ingredients"],
+        directions: List["directions"],
+        tags: List["tags"] = [],
+        notes: List["notes"] = [],
+        last_modified: datetime.datetime = None,
+    ) -> Optional[RecipeModel]:
+        """
+        Edit a recipe's information, $set'ing only the changed fields in a
+        single update guarded by last_modified.  See MongoDriver.recipe_edit.
+
+        r = await MotorDriver.recipe_edit(**kwargs, last_modified=recipe.last_modified_date)
+
+        :returns: RecipeModel of the edited recipe, or None if not found.
+        :raises: RecipeConflictError if the recipe was modified by someone else.
+        """
+        collection = cls._collection(Recipe)
+        current = await collection.find_one({"_id": cls._object_id(_id)})
+        if not current:
+            return None
+        if last_modified is None:
+            last_modified = current.get("last_modified_date")
+        elif current.get("last_modified_date") != last_modified:
+            raise RecipeConflictError(_id)
+
+        form = {
+            "name": name,
+            "prep_time": prep_time,
+            "cook_time": cook_time,
+            "servings": servings,
+            "ingredients": ingredients,
+            "directions": directions,
+            "tags": tags,
+            "notes": notes,
+        }
+        changes = MongoDriver._edit_changes(current, form)
+        if not changes:
+            return MongoDriver._recipe_son_to_model(current)
+
+        changes["last_modified_date"] = utcnow()
+        son = await collection.find_one_and_update(
+            {"_id": current["_id"], "last_modified_date": last_modified},
+            {"$set": changes},
+            return_document=pymongo.ReturnDocument.AFTER,
+        )
+        if son is None:
+            raise RecipeConflictError(_id)
+        await cls._bumped("recipes", son)
+        if "tags" in changes and not current.get("deleted"):
+            delta = MongoDriver._tag_delta(added=changes["tags"], removed=current.get("tags", ()))
+            await cls._count_tags(delta)
+        return MongoDriver._recipe_son_to_model(son)
+
+    @classmethod
+    async def recipe_find_by_id(cls, recipe_id: str) -> Optional[RecipeModel]:
+        """
+        Return the recipe with the given id.
+
+        recipe = await MotorDriver.recipe_find_by_id(recipe_id)
+
+        :returns: RecipeModel for the recipe found or None
+        """
+        son = await cls._collection(Recipe).find_one({"_id": cls._object_id(recipe_id)})
+        if son:
+            return MongoDriver._recipe_son_to_model(son)
+
+    @classmethod
+    async def recipes_find_by_name(cls, search_string: str) -> List[RecipeModel]:
+        """
+        Returns all active recipes whose name contains search_string, ignoring case.
+
+        recipes = await MotorDriver.recipes_find_by_name("spam")
+        """
+        return await cls._recipes(cls._name_query(search_string))
+
+    @classmethod
+    async def recipes_find_by_tag(cls, tags: List[str]) -> List[RecipeModel]:
+        """
+        Returns all active recipes with all of the given tags.
+
+        recipes = await MotorDriver.recipes_find_by_tag(["tag1", "tag2"])
+        """
+        return await cls._recipes(cls._tag_query(tags))
+
+    @classmethod
+    async def recipes_find_by_name_summary(cls, search_string: str) -> List[RecipeSummary]:
+        """Same as recipes_find_by_name, but returns RecipeSummary's."""
+        return await cls._summaries(cls._name_query(search_string))
+
+    @classmethod
+    async def recipes_find_by_tag_summary(cls, tags: List[str]) -> List[RecipeSummary]:
+        """Same as recipes_find_by_tag, but returns RecipeSummary's."""
+        return await cls._summaries(cls._tag_query(tags))
+
+    @classmethod
+    async def recipes_find_by_ingredient(cls, ingredients: List[str]) -> List[RecipeModel]:
+        """
+        Returns all active recipes having all of the given ingredients, by
+        their parsed names.  See MongoDriver.recipes_find_by_ingredient.
+
+        recipes = await MotorDriver.recipes_find_by_ingredient(["garlic", "tomatoes"])
+        """
+        query = MongoDriver._ingredient_query(ingredients)
+        return [] if query is None else await cls._recipes(query)
+
+    @classmethod
+    async def recipes_find_by_ingredient_summary(
+        cls, ingredients: List[str]
+    ) -> List[RecipeSummary]:
+        """Same as recipes_find_by_ingredient, but returns RecipeSummary's."""
+        query = MongoDriver._ingredient_query(ingredients)
+        return [] if query is None else await cls._summaries(query)
+
+    @classmethod
+    async def recipes_backfill_ingredients(
+        cls,
+        batch_size: Optional[int] = None,
+        reparse: bool = False,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> int:
+        """
+        Parse the ingredients of the recipes written before they were parsed
+        on write, batch_size per bulk_write.  See
+        MongoDriver.recipes_backfill_ingredients.
+
+        :returns: (int) the number of recipes updated.
+        """
+        batch_size = batch_size or cls.BULK_CHUNK_SIZE
+        query = MongoDriver._backfill_query(reparse)
+        collection = cls._collection(Recipe)
+        total = await collection.count_documents(query)
+        done = updated = 0
+        cursor = collection.find(query, {"ingredients": 1}, batch_size=batch_size)
+        while True:
+            batch = [
+                MongoDriver._backfill_update(son) for son in await cursor.to_list(batch_size)
+            ]
+            if not batch:
+                break
+            result = await collection.bulk_write(batch, ordered=False)
+            updated += result.modified_count
+            done += len(batch)
+            if progress:
+                progress(done, total)
+        await cls._bumped("recipes", updated)
+        return updated
+
+    @classmethod
+    async def recipes_get_tags(cls) -> List["tags"]:
+        """
+        Returns all distinct tags of the active recipes, read from tag_stats.
+
+        tags = await MotorDriver.recipes_get_tags()
+        """
+        return sorted(await cls.recipes_tag_counts())
+
+    @classmethod
+    async def recipes_tag_counts(cls) -> Dict[str, int]:
+        """
+        Returns the number of active recipes having each tag, most used
+        tags first, read from tag_stats.
+
+        counts = await MotorDriver.recipes_tag_counts()
+        """
+        cursor = cls._collection(TagStat).find({"count": {"$gt": 0}}).sort(
+            [("count", pymongo.DESCENDING), ("_id", pymongo.ASCENDING)]
+        )
+        return {son["_id"]: son["count"] async for son in cursor}
+
+    @classmethod
+    async def recipes_all(cls) -> List[RecipeModel]:
+        """Get all the recipes currently stored in DB."""
+        return await cls._recipes({})
+
+    @classmethod
+    async def recipes_active(cls) -> List[RecipeModel]:
+        """Get all the recipes that have not been marked as deleted."""
+        return await cls._recipes({"deleted": False})
+
+    @classmethod
+    async def recipes_active_summary(cls) -> List[RecipeSummary]:
+        """Same as recipes_active, but returns RecipeSummary's."""
+        return await cls._summaries({"deleted": False})
+
+    @classmethod
+    async def recipes_deleted(cls) -> List[RecipeModel]:
+        """Get all the recipes that have been marked as deleted."""
+        return await cls._recipes({"deleted": True})
+
+    @classmethod
+    async def recipes_page(
+        cls,
+        page_size: int = 20,
+        token: Optional[str] = None,
+        sort_by: str = "created_date",
+        tags: Optional[List[str]] = None,
+        deleted: bool = False,
+        summary: bool = False,
+    ) -> PageModel:
+        """
+        Get a single page of recipes using keyset pagination on (sort_by, _id).
+        See MongoDriver.recipes_page; tokens are interchangeable between them.
+
+        page = await MotorDriver.recipes_page(page_size=20)
+        page = await MotorDriver.recipes_page(page_size=20, token=page.next_token)
+
+        :returns: PageModel of RecipeModel's and the token for the next page.
+        :raises PageTokenError: if the token is malformed.
+        """
+        field, direction = cls.PAGE_SORTS[sort_by]
+        query = {"deleted": deleted}
+        if tags:
+            query["tags"] = {"$all": [tag.lower() for tag in tags]}
+        if token:
+            value, _id = decode_token(token, sort_by)
+            _id = cls._object_id(_id)
+            if _id is None:
+                raise PageTokenError(token)
+            op = "$lt" if direction < 0 else "$gt"
+            query["$or"] = [{field: {op: value}}, {field: value, "_id": {op: _id}}]
+
+        projection = None
+        to_model = MongoDriver._recipe_son_to_model
+        if summary:
+            projection = dict(cls.SUMMARY_PROJECTION, **{field: 1})
+            to_model = MongoDriver._recipe_to_summary
+        cursor = (
+            cls._collection(Recipe)
+            .find(query, projection)
+            .sort([(field, direction), ("_id", direction)])
+            .limit(page_size + 1)
+        )
+        recipes = await cursor.to_list(length=None)
+
+        next_token = None
+        if len(recipes) > page_size:
+            recipes = recipes[:page_size]
+            last = recipes[-1]
+            next_token = encode_token(sort_by, last[field], last["_id"])
+        return PageModel(items=[to_model(r) for r in recipes], next_token=next_token)
+
+    @classmethod
+    async def recipe_copy(cls, recipe: RecipeModel) -> RecipeModel:
+        """
+        Given a recipe, save a copy of it named e.g. 'lasagna_COPY'.
+
+        new_recipe = await MotorDriver.recipe_copy(recipe)
+        """
+        if isinstance(recipe, RecipeModel):
+            recipe = recipe.to_dict()
+        copy = Recipe()
+        copy.name = recipe["name"] + "_COPY"
+        copy.num_ingredients = recipe["num_ingredients"]
+        copy.ingredients = recipe["ingredients"]
+        copy.parsed_ingredients = parse_ingredients(recipe["ingredients"])
+        copy.directions = recipe["directions"]
+        copy.prep_time = recipe["prep_time"]
+        copy.cook_time = recipe["cook_time"]
+        copy.servings = recipe["servings"]
+        copy.tags = recipe["tags"]
+        copy.notes = recipe["notes"]
+        copy.rating = recipe["rating"]
+        return await cls._insert_recipe(copy)
+
+    @classmethod
+    async def _recipe_update(
+        cls, recipe_id: str, update: dict, query: dict = None, after: Callable = None
+    ) -> int:
+        """Apply update, and a new last_modified_date, to the recipe in a
+        single update.  Returns the number of recipes matched.  If the update
+        changes the tags, after(tags) returns the new ones, so tag_stats can
+        be updated too (see MongoDriver._recipe_modify)."""
+        update.setdefault("$set", {})["last_modified_date"] = utcnow()
+        query = dict(query or {}, _id=cls._object_id(recipe_id))
+        collection = cls._collection(Recipe)
+        if after is None:
+            result = await collection.update_one(query, update)
+            return await cls._bumped("recipes", result.matched_count)
+
+        before = await collection.find_one_and_update(
+            query, update, projection={"tags": 1, "deleted": 1}
+        )
+        if before is None:
+            return 0
+        if not before.get("deleted"):
+            tags = before.get("tags", [])
+            await cls._count_tags(MongoDriver._tag_delta(added=after(tags), removed=tags))
+        return await cls._bumped("recipes", 1)
+
+    @classmethod
+    async def recipe_add_tag(cls, recipe: RecipeModel, tag: str) -> int:
+        """
+        Given a recipe, add a new tag in a single atomic update.
+
+        await MotorDriver.recipe_add_tag(recipe, "tag")
+
+        :returns: (int) 1 for success, 0 for failure
+        """
+        tag = tag.lower()
+        return await cls._recipe_update(
+            recipe.id, {"$addToSet": {"tags": tag}}, after=lambda tags: tags + [tag]
+        )
+
+    @classmethod
+    async def recipe_delete_tag(cls, recipe: RecipeModel, tag: str) -> int:
+        """
+        Given a recipe, delete a tag in a single atomic update.
+
+        await MotorDriver.recipe_delete_tag(recipe, "tag")
+
+        :returns: (int) 1 for success, 0 for failure
+        """
+        tag = tag.lower()
+        return await cls._recipe_update(
+            recipe.id,
+            {"$pull": {"tags": tag}},
+            after=lambda tags: [t for t in tags if t != tag],
+        )
+
+    @classmethod
+    async def recipe_mark_made(cls, recipe: RecipeModel, date: datetime = None) -> int:
+        """
+        Add a date the recipe was made, at most once per (UTC) day.
+
+        await MotorDriver.recipe_mark_made(recipe, date)
+
+        :returns: (int) 1 for success, 0 for failure or if trying to
+            mark_made on the same date more than once.
+        """
+        if date is None:
+            date = datetime.datetime.utcnow()
+        day_start = datetime.datetime.combine(date.date(), datetime.time())
+        day_end = day_start + datetime.timedelta(days=1)
+        not_made_today = {
+            "when_made": {
+                "$not": {"$elemMatch": {"$gte": day_start, "$lt": day_end}}
+            }
+        }
+        return await cls._recipe_update(
+            recipe.id, {"$push": {"when_made": date}}, query=not_made_today
+        )
+
+    @classmethod
+    async def recipe_delete(cls, recipe_id: str) -> int:
+        """
+        Given a recipe id, mark it as deleted in a single atomic update.
+
+        await MotorDriver.recipe_delete(recipe_id)
+
+        :returns: (int) 1 for success, 0 for failure
+        """
+        return await cls._recipe_update(
+            recipe_id, {"$set": {"deleted": True}}, after=lambda tags: []
+        )
+
+    @classmethod
+    async def recipes_search(cls, text: str) -> List[RecipeModel]:
+        """
+        Given a search string, return all matches of the text index, best first.
+
+        await MotorDriver.recipes_search(text)
+        """
+        score = {"score": {"$meta": "textScore"}}
+        return await cls._recipes(
+            {"$text": {"$search": text}}, projection=score, sort=[("score", score["score"])]
+        )
+
+    @classmethod
+    async def recipes_search_summary(cls, text: str) -> List[RecipeSummary]:
+        """Same as recipes_search, but returns RecipeSummary's."""
+        score = {"score": {"$meta": "textScore"}}
+        cursor = cls._collection(Recipe).find(
+            {"$text": {"$search": text}},
+            dict(cls.SUMMARY_PROJECTION, **score),
+            sort=[("score", score["score"])],
+        )
+        return [MongoDriver._recipe_to_summary(son) async for son in cursor]
+
+    @classmethod
+    async def recipes_search_ranked(
+        cls, text: str, limit: Optional[int] = None, skip: int = 0, summary: bool = False
+    ) -> List[RecipeModel]:
+        """
+        Search the active recipes by name and text in a single aggregation,
+        best match first.  See MongoDriver.recipes_search_ranked.
+
+        await MotorDriver.recipes_search_ranked("spam", limit=20, summary=True)
+        """
+        if not text.strip():
+            return []
+        cursor = cls._collection(Recipe).aggregate(
+            MongoDriver._search_pipeline(text, limit=limit, skip=skip, summary=summary)
+        )
+        to_model = MongoDriver._recipe_to_summary if summary else MongoDriver._recipe_son_to_model
+        return [to_model(son) async for son in cursor]
+
+    #### UserDBInt methods ###################################################
+
+    @classmethod
+    async def _user_first(cls, query: dict) -> Optional[UserModel]:
+        """Return the first user matching query as a UserModel or None."""
+        son = await cls._collection(User).find_one(query)
+        if son:
+            return UserModel.from_dict(MongoDriver._user_son_to_dict(son))
+
+    @classmethod
+    async def user_create(cls, name: str, email: str, password: str) -> Optional[UserModel]:
+        """
+        Create and return the user.
+
+        await MotorDriver.user_create(name, email, password)
+
+        :returns: (UserModel) the user or None if user email already in use.
+        """
+        collection = cls._collection(User)
+        if await collection.find_one({"email": email}, {"_id": 1}):
+            return None
+        user = User()
+        user.name = name
+        user.username = name
+        user.email = email
+        user.password_hash = auth.hash_password(password)
+        user.validate()
+        son = user.to_mongo().to_dict()
+        son["_id"] = bson.ObjectId()
+        try:
+            await collection.insert_one(son)
+        except pymongo.errors.DuplicateKeyError:
+            return None
+        await cls._bumped("users", True)
+        return UserModel.from_dict(MongoDriver._user_son_to_dict(son))
+
+    @classmethod
+    async def user_find_by_id(cls, user_id: str) -> Optional[UserModel]:
+        """
+        Check to see if a user with that user_id exists.
+
+        await MotorDriver.user_find_by_id(user_id)
+
+        :returns: (UserModel) the user or None.
+        """
+        _id = cls._object_id(user_id)
+        if _id is None:
+            return None
+        return await cls._user_first({"_id": _id})
+
+    @classmethod
+    async def user_login(cls, email: str, password: str) -> Optional[UserModel]:
+        """
+        Logs in and returns the user.
+
+        await MotorDriver.user_login(email, password)
+
+        :returns: (UserModel) the user.  None if user doesn't exist or the
+            password is wrong.
+        """
+        user = await cls._user_first({"email": email})
+        if not user:
+            return None
+        if not auth.verify_password(password, user.password_hash):
+            return None
+        return user
+
+    @classmethod
+    async def user_find_by_email(cls, email: str) -> Optional[UserModel]:
+        """
+        Finds the user by email address.
+
+        user = await MotorDriver.user_find_by_email(email)
+        """
+        return await cls._user_first({"email": email})
+
+    @classmethod
+    async def users_list(cls) -> List[UserModel]:
+        """
+        Returns a list of all Users, or None if there are none.
+
+        await MotorDriver.users_list()
+        """
+        users = [
+            UserModel.from_dict(MongoDriver._user_son_to_dict(son))
+            async for son in cls._collection(User).find({})
+        ]
+        if users:
+            return users
+
+    @classmethod
+    async def user_add_recipe(cls, user: UserModel, recipe_id: str) -> int:
+        """
+        Adds a recipe reference to the user's recipes.
+
+        await MotorDriver.user_add_recipe(user, recipe_id)
+
+        :returns: (int) 1 for success, 0 if unsuccessful.
+        """
+        result = await cls._collection(User).update_one(
+            {"_id": cls._object_id(user.id)},
+            {
+                "$addToSet": {"recipe_ids": cls._object_id(recipe_id)},
+                "$set": {"last_modified_date": utcnow()},
+            },
+        )
+        return await cls._bumped("users", result.matched_count)
+
+    @classmethod
+    async def user_set_password(cls, user: UserModel, password: str) -> Optional[str]:
+        """
+        Sets password_hash as the hash of the user's password.
+
+        await MotorDriver.user_set_password(user, 'p@ssw0rd')
+
+        :returns: password hash of the supplied password or None if unsuccesssful.
+        """
+        password_hash = auth.hash_password(password)
+        result = await cls._collection(User).update_one(
+            {"_id": cls._object_id(user.id)},
+            {"$set": {"password_hash": password_hash, "last_modified_date": utcnow()}},
+        )
+        if await cls._bumped("users", result.matched_count):
+            return password_hash
+        return None
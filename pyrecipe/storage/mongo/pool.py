@@ -0,0 +1,117 @@
+"""
+Connection pool monitoring for the mongo drivers.
+
+PoolStats is registered as a pymongo event listener on the client, and keeps
+per-server counts of open and checked out connections, so pools can be
+sized to the number of app workers/threads instead of finding out they are
+exhausted under load.
+"""
+
+import logging
+import threading
+
+from pymongo import monitoring
+from pymongo.common import MAX_POOL_SIZE
+
+
+logger = logging.getLogger(__name__)
+
+
+class PoolStats(monitoring.ConnectionPoolListener):
+    """
+    Per-server connection pool utilisation.
+
+    stats = PoolStats()
+    client = pymongo.MongoClient(host, event_listeners=[stats])
+    stats.snapshot()
+    {"localhost:27017": {"max_pool_size": 100, "open": 4, "in_use": 1, ...}}
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._servers = {}
+
+    def _server(self, address: tuple) -> dict:
+        key = "{}:{}".format(*address)
+        if key not in self._servers:
+            self._servers[key] = {
+                "max_pool_size": None,
+                "open": 0,
+                "in_use": 0,
+                "peak_in_use": 0,
+                "checkouts": 0,
+                "checkout_failures": 0,
+                "checkout_timeouts": 0,
+            }
+        return self._servers[key]
+
+    def snapshot(self) -> dict:
+        """
+        Return a copy of the counts for every server, with "utilisation" set
+        to peak_in_use / max_pool_size (None if the pool size is unknown).
+        """
+        with self._lock:
+            stats = {key: dict(server) for key, server in self._servers.items()}
+        for server in stats.values():
+            size = server["max_pool_size"]
+            server["utilisation"] = server["peak_in_use"] / size if size else None
+        return stats
+
+    def reset(self) -> None:
+        """Forget all the counts, i.e. between benchmark runs."""
+        with self._lock:
+            self._servers.clear()
+
+    #### ConnectionPoolListener methods ######################################
+
+    def pool_created(self, event):
+        with self._lock:
+            # Only the non-default pool options are in the event.
+            size = event.options.get("maxPoolSize", MAX_POOL_SIZE)
+            self._server(event.address)["max_pool_size"] = size
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        with self._lock:
+            self._servers.pop("{}:{}".format(*event.address), None)
+
+    def connection_created(self, event):
+        with self._lock:
+            self._server(event.address)["open"] += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            server = self._server(event.address)
+            server["open"] = max(server["open"] - 1, 0)
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            server = self._server(event.address)
+            server["checkout_failures"] += 1
+            if event.reason == monitoring.ConnectionCheckOutFailedReason.TIMEOUT:
+                server["checkout_timeouts"] += 1
+        if event.reason == monitoring.ConnectionCheckOutFailedReason.TIMEOUT:
+            logger.warning(
+                "MongoDB connection pool for %s:%s exhausted, checkout timed out",
+                *event.address
+            )
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            server = self._server(event.address)
+            server["checkouts"] += 1
+            server["in_use"] += 1
+            server["peak_in_use"] = max(server["peak_in_use"], server["in_use"])
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            server = self._server(event.address)
+            server["in_use"] = max(server["in_use"] - 1, 0)
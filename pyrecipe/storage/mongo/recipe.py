@@ -1,10 +1,9 @@
 """ODM for MongoDB Recipe Collection."""
 
-import datetime
-
 import mongoengine
 
 from .shared import BaseDocument
+from .shared import utcnow
 
 
 class Recipe(BaseDocument):
@@ -25,6 +24,10 @@ class Recipe(BaseDocument):
     :param servings: (str) number of servings in the recipe.
     :param tags: (list) descriptive tags for a recipe.
         i.e. ['bbq', 'vegetarian']
+    :param parsed_ingredients: (list) the ingredients split into quantity,
+        unit, name and preparation, see storage/shared/ingredient_parser.py.
+        Missing on recipes written before it existed, see
+        MongoDriver.recipes_backfill_ingredients.
     :param images: (list filepath for an uploaded image.
     :param notes: (list) list of notes about the recipe.
         i.e. "Substitute butter for ghee if you don't have ghee."
@@ -45,14 +48,15 @@ class Recipe(BaseDocument):
     cook_time = mongoengine.FloatField(default=0, min_val=0.0)
     servings = mongoengine.StringField(required=False)
     tags = mongoengine.ListField(required=False)
+    parsed_ingredients = mongoengine.ListField(field=mongoengine.DictField(), required=False)
     images = mongoengine.ListField(field=mongoengine.StringField(), required=False)
     notes = mongoengine.ListField(field=mongoengine.StringField(), required=False)
     rating = mongoengine.FloatField(required=False, min_val=0.0, max_val=5.0)
     favorite = mongoengine.BooleanField(default=False)
     when_made = mongoengine.ListField(required=False)
     deleted = mongoengine.BooleanField(default=False)
-    created_date = mongoengine.DateTimeField(default=datetime.datetime.utcnow)
-    last_modified_date = mongoengine.DateTimeField(default=datetime.datetime.utcnow)
+    created_date = mongoengine.DateTimeField(default=utcnow)
+    last_modified_date = mongoengine.DateTimeField(default=utcnow)
 
     meta = {
         "db_alias": "core",
@@ -68,7 +72,10 @@ class Recipe(BaseDocument):
             "favorite",
             "deleted",
             "ingredients",
+            ("parsed_ingredients.name", "deleted"),
             "when_made",
+            ("deleted", "-created_date", "-id"),
+            ("deleted", "name", "id"),
             {
                 "fields": ["$name", "$ingredients", "$directions", "$tags"],
                 "default_language": "english",
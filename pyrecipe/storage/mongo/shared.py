@@ -5,33 +5,30 @@ import datetime
 import mongoengine
 
 
+def utcnow() -> datetime.datetime:
+    """
+    Current UTC time truncated to milliseconds, the precision MongoDB
+    stores, so in-memory dates compare equal to the stored ones.
+    """
+    now = datetime.datetime.utcnow()
+    return now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+
 class BaseDocument(mongoengine.Document):
     meta = {
         "abstract": True,
     }
 
-    def _update_last_mod_date(self) -> int:
-        """
-        Updates the document's "last_updated_date" attribute in the DB.
-
-        document._update_last_mod_date()
-
-        :returns: (int) 1 for success, 0 if unsuccessful
-        """
-        result = self.update(last_modified_date=datetime.datetime.utcnow())
-        self.reload()
-        return result
-
     def save(self) -> int:
         """
-        Save the document's current state in the DB.  First refreshes the last
-        modified date if it's already a DB instance, before delegating to the
-        built-in/inherited save() method.
+        Save the document's current state in the DB.  If it's already a DB
+        instance, the last modified date is refreshed in memory first so it
+        goes out in the same write as the other changed fields.
 
         document.save()
 
         :returns: (int) 1 for success, 0 if unsuccessful
         """
         if self.id:
-            self._update_last_mod_date()
+            self.last_modified_date = utcnow()
         return super().save()
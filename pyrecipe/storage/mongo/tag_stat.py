@@ -0,0 +1,32 @@
+"""ODM for MongoDB TagStat Collection."""
+
+import mongoengine
+
+
+class TagStat(mongoengine.Document):
+    """
+    ODM Class that maps to the TagStats collection in MongoDB.  One document
+    per tag, counting the active (not deleted) recipes having it.  Kept up to
+    date by every MongoDriver write changing a recipe's tags or deleting it,
+    so the tags don't have to be collected from the recipes on every page.
+
+    REQUIRED params:
+    :param tag: (str) the tag.
+
+    NOT-REQUIRED params:
+    :param count: (int) number of active recipes with the tag, 0 once the
+        last one is deleted or untagged.
+    """
+
+    tag = mongoengine.StringField(primary_key=True)
+    count = mongoengine.IntField(default=0)
+
+    meta = {
+        "db_alias": "core",
+        "collection": "tag_stats",
+        "indexes": ["-count"],
+    }
+
+    def __repr__(self):
+        """Repr of instance for quick debugging purposes."""
+        return "<TagStat: {}:{}>".format(self.tag, self.count)
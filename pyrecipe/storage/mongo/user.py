@@ -1,11 +1,10 @@
 """ODM for MongoDB User Collection."""
 
-import datetime
-
 import mongoengine
 
 from .recipe import Recipe
 from .shared import BaseDocument
+from .shared import utcnow
 
 
 class User(BaseDocument):
@@ -38,8 +37,8 @@ class User(BaseDocument):
     username = mongoengine.StringField(required=True, unique=True)
     email = mongoengine.StringField(required=True, unique=True)
     password_hash = mongoengine.StringField(required=True)
-    created_date = mongoengine.DateTimeField(default=datetime.datetime.utcnow)
-    last_modified_date = mongoengine.DateTimeField(default=datetime.datetime.utcnow)
+    created_date = mongoengine.DateTimeField(default=utcnow)
+    last_modified_date = mongoengine.DateTimeField(default=utcnow)
     recipe_ids = mongoengine.ListField(
         field=mongoengine.ReferenceField(Recipe), required=False
     )
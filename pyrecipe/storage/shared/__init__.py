@@ -3,4 +3,13 @@ from .user_interface import UserDBInt
 from .recipe_interface import RecipeDBInt
 
 from .recipe_model import RecipeModel
+from .recipe_model import normalize_tags
+from .recipe_summary_model import RecipeSummary
 from .user_model import UserModel
+from .page_model import PageModel
+from .bulk_model import BulkResult
+from .ingredient_model import IngredientModel
+from .cursor import ModelCursor
+
+from .ingredient_parser import parse_ingredient
+from .ingredient_parser import parse_ingredients
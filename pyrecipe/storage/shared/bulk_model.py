@@ -0,0 +1,37 @@
+"""
+Bulk Result Object Model.
+
+Datastructure that reports the outcome of a single item of a bulk DB
+operation for delivery to usecases.
+"""
+
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Optional
+
+from pyrecipe.storage.shared.recipe_model import RecipeModel
+
+
+@dataclass
+class BulkResult:
+    """
+    Outcome of one item of a bulk operation, in input order.  A created
+    item also carries the record as the driver stored it, for the caller
+    to index; it is left out of to_dict.
+    """
+
+    index: int
+    _id: Optional[str] = None
+    error: Optional[str] = None
+    recipe: Optional[RecipeModel] = field(default=None, repr=False)
+
+    @property
+    def id(self) -> Optional[str]:
+        return self._id
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def to_dict(self) -> dict:
+        return {"index": self.index, "_id": self._id, "error": self.error}
@@ -0,0 +1,53 @@
+"""
+Lazy Model Cursor.
+
+Sequence-like wrapper around a DB cursor/queryset that converts each
+DB record into its Model only when it is iterated over, so that large
+result sets are never fully materialized in memory.
+"""
+
+from typing import Callable
+from typing import Iterator
+
+
+class ModelCursor:
+    """
+    Lazily iterated sequence of Models backed by a DB queryset.
+
+    The queryset is expected to support clone(), count() and indexing
+    (i.e. a mongoengine QuerySetNoCache).  Every iteration issues a
+    fresh query, and records are converted one at a time via to_model.
+
+    recipes = ModelCursor(Recipe.objects(deleted=False).no_cache(), to_model)
+    for recipe in recipes:
+        ...
+    """
+
+    def __init__(self, queryset, to_model: Callable):
+        self._queryset = queryset
+        self._to_model = to_model
+        self._count = None
+
+    def __iter__(self) -> Iterator:
+        for record in self._queryset.clone():
+            yield self._to_model(record)
+
+    def __len__(self) -> int:
+        if self._count is None:
+            self._count = self._queryset.count(with_limit_and_skip=True)
+        return self._count
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self._to_model(r) for r in self._queryset.clone()[key]]
+        if key < 0:
+            key += len(self)
+        if key < 0:
+            raise IndexError("ModelCursor index out of range")
+        try:
+            return self._to_model(self._queryset[key])
+        except IndexError:
+            raise IndexError("ModelCursor index out of range")
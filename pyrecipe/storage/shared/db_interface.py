@@ -17,5 +17,9 @@ class DBInitInt(metaclass=ABCMeta):
 
     @abstractmethod
     def db_initialize() -> None:
-        """Do what's needed to initialize the DB."""
+        """
+        Do what's needed to initialize the DB.  Called with db_name, verbose
+        and the DB_HOST/DB_OPTIONS connection settings from the config, which
+        drivers that don't connect to a server ignore.
+        """
         pass
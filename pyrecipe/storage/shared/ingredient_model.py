@@ -0,0 +1,27 @@
+"""
+Ingredient Object Model.
+
+Datastructure holding one of a recipe's ingredient strings split into its
+quantity, unit, name and preparation, as stored by the DB drivers.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class IngredientModel:
+    """A parsed ingredient, i.e. "2 cups flour, sifted"."""
+
+    text: str
+    quantity: Optional[float]
+    unit: Optional[str]
+    name: str
+    preparation: Optional[str]
+
+    @classmethod
+    def from_dict(cls, adict) -> "IngredientModel":
+        return cls(**adict)
+
+    def to_dict(self) -> dict:
+        return self.__dict__
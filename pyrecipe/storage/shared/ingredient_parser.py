@@ -0,0 +1,188 @@
+"""
+Ingredient parser: splits the raw ingredient strings of a recipe into their
+quantity, unit, name and preparation.
+
+    "1 1/2 cups flour, sifted" -> 1.5, "cup", "flour", "sifted"
+    "garlic, 2 cloves, minced" -> 2.0, "clove", "garlic", "minced"
+    "salt, to taste"           -> None, None, "salt", "to taste"
+
+Units are canonicalized ("tablespoons" -> "tbsp") and names lowercased and
+made singular ("Tomatoes" -> "tomato"), so the same ingredient gets the same
+name in every recipe.  The DB drivers parse a recipe's ingredients once, as
+it is written, and store the results alongside the raw strings.
+"""
+
+import functools
+import re
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from .ingredient_model import IngredientModel
+
+
+# Unicode vulgar fractions: 1/4, 1/2, 3/4, 1/3, 2/3, 1/8, 3/8, 5/8, 7/8.
+FRACTIONS = {
+    "¼": 1 / 4, "½": 1 / 2, "¾": 3 / 4, "⅓": 1 / 3, "⅔": 2 / 3,
+    "⅛": 1 / 8, "⅜": 3 / 8, "⅝": 5 / 8, "⅞": 7 / 8,
+}
+
+TOKEN_RE = re.compile(
+    r"\d+(?:\.\d+)?/\d+|\d*\.\d+|\d+|[{}]|-|[^\W\d_]+".format("".join(FRACTIONS))
+)
+PARENTHESES_RE = re.compile(r"\([^)]*\)")
+
+# Words standing for a quantity.
+QUANTITIES = {
+    "a": 1.0, "an": 1.0, "one": 1.0, "two": 2.0, "three": 3.0, "four": 4.0,
+    "five": 5.0, "six": 6.0, "half": 0.5, "dozen": 12.0,
+}
+
+# Unit -> canonical unit.
+UNITS = {
+    "cup": "cup", "cups": "cup", "c": "cup",
+    "tablespoon": "tbsp", "tablespoons": "tbsp", "tbsp": "tbsp", "tbs": "tbsp",
+    "teaspoon": "tsp", "teaspoons": "tsp", "tsp": "tsp",
+    "ounce": "oz", "ounces": "oz", "oz": "oz",
+    "pound": "lb", "pounds": "lb", "lb": "lb", "lbs": "lb",
+    "gram": "g", "grams": "g", "g": "g",
+    "kilogram": "kg", "kilograms": "kg", "kg": "kg",
+    "milliliter": "ml", "milliliters": "ml", "ml": "ml",
+    "liter": "l", "liters": "l", "l": "l",
+    "pint": "pint", "pints": "pint", "quart": "quart", "quarts": "quart",
+    "gallon": "gallon", "gallons": "gallon",
+    "clove": "clove", "cloves": "clove", "pinch": "pinch", "pinches": "pinch",
+    "dash": "dash", "dashes": "dash", "can": "can", "cans": "can",
+    "package": "package", "packages": "package", "stick": "stick", "sticks": "stick",
+    "slice": "slice", "slices": "slice", "loaf": "loaf", "loaves": "loaf",
+    "bunch": "bunch", "bunches": "bunch", "handful": "handful", "handfuls": "handful",
+    "sprig": "sprig", "sprigs": "sprig", "piece": "piece", "pieces": "piece",
+    "head": "head", "heads": "head",
+}
+
+# Units too short to tell from a word unless they follow a quantity.
+SHORT_UNITS = {"c", "g", "l"}
+
+# Words before or after the name describing how the ingredient is prepared.
+PREPARATIONS = {
+    "chopped", "minced", "diced", "sliced", "grated", "shredded", "crushed",
+    "melted", "softened", "beaten", "peeled", "cubed", "halved", "quartered",
+    "mashed", "toasted", "cooked", "drained", "rinsed", "sifted", "packed",
+    "finely", "roughly", "coarsely", "thinly", "freshly", "lightly",
+}
+
+# Words that are not part of an ingredient's name.
+DESCRIPTIONS = {"large", "medium", "small", "fresh"}
+
+
+def _number(token: str) -> Optional[float]:
+    """The value of a number, fraction or quantity word, or None."""
+    if token in FRACTIONS:
+        return FRACTIONS[token]
+    if token in QUANTITIES:
+        return QUANTITIES[token]
+    if token[0].isdigit() or token[0] == ".":
+        numerator, _, denominator = token.partition("/")
+        if denominator:
+            return float(numerator) / float(denominator) if float(denominator) else None
+        return float(numerator)
+    return None
+
+
+def _amount(tokens: List[str]) -> Tuple[Optional[float], Optional[str], int]:
+    """
+    Return the (quantity, unit) the tokens start with and the number of
+    tokens they span.  Mixed numbers ("1 1/2") are added up and ranges
+    ("2-3", "2 to 3") are reduced to their lower bound.
+    """
+    i = 0
+    quantity = _number(tokens[0]) if tokens else None
+    if quantity is not None:
+        i = 1
+        if i < len(tokens) and quantity.is_integer():
+            fraction = _number(tokens[i])
+            if fraction is not None and 0 < fraction < 1 and tokens[i] not in QUANTITIES:
+                quantity += fraction
+                i += 1
+        if i < len(tokens) and tokens[i] == "dozen":
+            quantity *= 12
+            i += 1
+        if i + 1 < len(tokens) and tokens[i] in ("-", "to", "or"):
+            if _number(tokens[i + 1]) is not None and tokens[i + 1] not in QUANTITIES:
+                i += 2
+        if i < len(tokens) and tokens[i] == "of":
+            i += 1  # "half of a lemon"
+            if i < len(tokens) and tokens[i] in ("a", "an"):
+                i += 1
+    unit = None
+    if i < len(tokens) and tokens[i] in UNITS:
+        if quantity is not None or (tokens[i] not in SHORT_UNITS and i + 1 < len(tokens)):
+            unit = UNITS[tokens[i]]
+            i += 1
+            if i < len(tokens) and tokens[i] == "of":
+                i += 1
+    return quantity, unit, i
+
+
+def singular(word: str) -> str:
+    """The singular of an ingredient's word, i.e. "tomatoes" -> "tomato"."""
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith(("oes", "ches", "shes", "xes")):
+        return word[:-2]
+    if word.endswith("s") and not word.endswith(("ss", "us", "sses")) and len(word) > 2:
+        return word[:-1]
+    return word
+
+
+@functools.lru_cache(maxsize=2 ** 16)
+def _parse(text: str) -> tuple:
+    parts = [TOKEN_RE.findall(part.lower()) for part in PARENTHESES_RE.sub(" ", text).split(",")]
+    tokens = parts[0]
+    quantity, unit, i = _amount(tokens)
+    words = [t for t in tokens[i:] if t != "-"]
+    rest = parts[1:]
+    if quantity is None and unit is None and rest:
+        # "garlic, 2 cloves": the amount follows the name.
+        after_quantity, after_unit, j = _amount(rest[0])
+        if (after_quantity is not None or after_unit is not None) and j == len(rest[0]):
+            quantity, unit = after_quantity, after_unit
+            rest = rest[1:]
+
+    start, end = 0, len(words)
+    while start < end and words[start] in PREPARATIONS:
+        start += 1
+    while end > start and words[end - 1] in PREPARATIONS:
+        end -= 1
+    name = [w for w in words[start:end] if w not in DESCRIPTIONS]
+    if name:
+        name[-1] = singular(name[-1])
+    preparation = [" ".join(words[:start] + words[end:])]
+    preparation.extend(" ".join(t for t in part if t != "-") for part in rest)
+    preparation = ", ".join(p for p in preparation if p)
+    return text, quantity, unit, " ".join(name), preparation or None
+
+
+def parse_ingredient(text: str) -> IngredientModel:
+    """
+    Parse one ingredient string.
+
+    parse_ingredient("2 cups flour, sifted")
+    -> IngredientModel(text="2 cups flour, sifted", quantity=2.0, unit="cup",
+                       name="flour", preparation="sifted")
+    """
+    return IngredientModel(*_parse(text))
+
+
+def parse_ingredients(ingredients: Iterable[str]) -> List[dict]:
+    """Parse a recipe's ingredients, as the dicts the DB drivers store."""
+    return [parse_ingredient(ingredient).to_dict() for ingredient in ingredients]
+
+
+def ingredient_key(text: str) -> str:
+    """
+    The canonical name of an ingredient, to match ingredients across
+    recipes, i.e. "6 tomatoes, diced" -> "tomato".
+    """
+    return _parse(text)[3]
@@ -0,0 +1,66 @@
+"""
+Page Object Model.
+
+Datastructure that encapsulates a single page of a paginated DB query
+and the opaque continuation token used to request the next page.
+"""
+
+import base64
+import binascii
+import datetime
+import json
+from dataclasses import dataclass
+from typing import Optional
+from typing import Tuple
+
+from pyrecipe.errors import PageTokenError
+
+
+@dataclass
+class PageModel:
+    """A single page of Models plus the token for the following page."""
+
+    items: list
+    next_token: Optional[str] = None
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_token is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+
+def encode_token(sort_by: str, value, _id: str) -> str:
+    """
+    Encode the keyset position of the last item on a page into an opaque,
+    url-safe token.
+
+    token = encode_token("created_date", recipe.created_date, recipe.id)
+    """
+    if isinstance(value, datetime.datetime):
+        value = {"$date": value.isoformat()}
+    raw = json.dumps([sort_by, value, str(_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_token(token: str, sort_by: str) -> Tuple[object, str]:
+    """
+    Decode a token produced by encode_token back into (value, _id).
+
+    :raises PageTokenError: if the token is malformed or was issued for a
+        different sort order.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        token_sort, value, _id = json.loads(raw.decode("utf-8"))
+        if isinstance(value, dict):
+            value = datetime.datetime.fromisoformat(value["$date"])
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise PageTokenError(token)
+    if token_sort != sort_by:
+        raise PageTokenError(token)
+    return value, _id
@@ -7,6 +7,7 @@ ensure consistent use and enable Interface Segragation.
 
 from abc import ABCMeta
 from abc import abstractmethod
+from typing import Dict
 from typing import Optional
 from typing import List
 
@@ -24,8 +25,20 @@ class RecipeDBInt(metaclass=ABCMeta):
         pass
 
     @abstractmethod
-    def recipe_edit(**kwargs) -> "RecipeModel":
-        """Wholescale edit a recipe's information and save it in DB."""
+    def recipe_create_many(recipes: List[dict], chunk_size: int) -> List["BulkResult"]:
+        """
+        Create many recipes at once, reporting success/failure per recipe.
+        A created recipe's BulkResult holds it as stored, as a RecipeModel.
+        """
+        pass
+
+    @abstractmethod
+    def recipe_edit(**kwargs) -> Optional["RecipeModel"]:
+        """
+        Edit a recipe's information, writing only the changed fields.
+        Raises RecipeConflictError if the recipe was modified after the
+        given last_modified date.
+        """
         pass
 
     @abstractmethod
@@ -42,11 +55,43 @@ class RecipeDBInt(metaclass=ABCMeta):
         """Find all recipes with given tag."""
         pass
 
+    @abstractmethod
+    def recipes_find_by_tag_summary(tags: List[str]) -> List["RecipeSummary"]:
+        """Find all recipes with given tag, as RecipeSummary's."""
+        pass
+
+    @abstractmethod
+    def recipes_find_by_name_summary(search_string: str) -> List["RecipeSummary"]:
+        """Find list of recipes in DB by given name, as RecipeSummary's."""
+        pass
+
+    @abstractmethod
+    def recipes_find_by_ingredient(ingredients: List[str]) -> List["RecipeModel"]:
+        """Find all active recipes with the given ingredients, by parsed name."""
+        pass
+
+    @abstractmethod
+    def recipes_find_by_ingredient_summary(ingredients: List[str]) -> List["RecipeSummary"]:
+        """Find all active recipes with the given ingredients, as RecipeSummary's."""
+        pass
+
+    @abstractmethod
+    def recipes_backfill_ingredients(
+        batch_size: Optional[int], reparse: bool, progress: "Callable"
+    ) -> int:
+        """Parse the ingredients of the recipes that have none parsed."""
+        pass
+
     @abstractmethod
     def recipes_get_tags() -> List["tags"]:
         """Return a list of all distinct tags in recipe DB."""
         pass
 
+    @abstractmethod
+    def recipes_tag_counts() -> Dict[str, int]:
+        """Return the number of active recipes having each tag, most used first."""
+        pass
+
     @abstractmethod
     def recipes_all() -> List["RecipeModel"]:
         """Return all Recipes in the DB."""
@@ -57,11 +102,28 @@ class RecipeDBInt(metaclass=ABCMeta):
         """Return all Recipes in the DB not marked as deleted."""
         pass
 
+    @abstractmethod
+    def recipes_active_summary() -> List["RecipeSummary"]:
+        """Return all Recipes not marked as deleted, as RecipeSummary's."""
+        pass
+
     @abstractmethod
     def recipes_deleted() -> Optional["RecipeModel"]:
         """Return all Recipes in the DB marked as deleted."""
         pass
 
+    @abstractmethod
+    def recipes_page(
+        page_size: int,
+        token: Optional[str],
+        sort_by: str,
+        tags: Optional[List[str]],
+        deleted: bool,
+        summary: bool,
+    ) -> "PageModel":
+        """Return a single keyset-paginated page of Recipes or RecipeSummary's."""
+        pass
+
     @abstractmethod
     def recipe_copy(recipe: "Recipe") -> "RecipeModel":
         """Return a copy of the given recipe."""
@@ -91,3 +153,18 @@ class RecipeDBInt(metaclass=ABCMeta):
     def recipes_search(text: str) -> Optional["RecipeModel"]:
         """Return a list of recipes that match the search string."""
         pass
+
+    @abstractmethod
+    def recipes_search_summary(text: str) -> List["RecipeSummary"]:
+        """Return recipes that match the search string, as RecipeSummary's."""
+        pass
+
+    @abstractmethod
+    def recipes_search_ranked(
+        text: str, limit: Optional[int], skip: int, summary: bool
+    ) -> List["RecipeModel"]:
+        """
+        Return the active recipes matching the search string by name or by
+        text, once each and best match first, as RecipeSummary's if summary.
+        """
+        pass
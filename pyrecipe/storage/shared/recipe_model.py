@@ -6,6 +6,14 @@ attributes for delivery to usecases.
 """
 
 from dataclasses import dataclass
+from dataclasses import field
+from typing import Iterable
+from typing import List
+
+
+def normalize_tags(tags: Iterable[str]) -> List[str]:
+    """Strip and lowercase tags, dropping blank and repeated ones in order."""
+    return list(dict.fromkeys(t.strip().lower() for t in tags if t.strip()))
 
 
 @dataclass
@@ -29,6 +37,8 @@ class RecipeModel:
     last_modified_date: "datetime.datetime"
     ingredients: list
     images: list
+    # IngredientModel dicts of the ingredients, see ingredient_parser.py.
+    parsed_ingredients: list = field(default_factory=list)
 
     @property
     def id(self) -> str:
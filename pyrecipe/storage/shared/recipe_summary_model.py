@@ -0,0 +1,32 @@
+"""
+Recipe Summary Object Model.
+
+Lightweight datastructure with only the Recipe attributes needed to
+render recipe lists, for delivery to usecases.
+"""
+
+from dataclasses import dataclass
+
+
+@dataclass
+class RecipeSummary:
+    """Projection of a recipe DB record used by list views."""
+
+    _id: str
+    name: str
+    cook_time: float
+    tags: list
+
+    # DB fields a RecipeSummary is projected from.
+    FIELDS = ("name", "cook_time", "tags")
+
+    @property
+    def id(self) -> str:
+        return self._id
+
+    @classmethod
+    def from_dict(cls, adict) -> "RecipeSummary":
+        return cls(**adict)
+
+    def to_dict(self) -> dict:
+        return self.__dict__
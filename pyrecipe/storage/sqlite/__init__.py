@@ -0,0 +1 @@
+from .sqlitedriver import SQLiteDriver
@@ -0,0 +1,133 @@
+"""
+Schema for the SQLite Recipe and User tables.
+
+List fields are JSON arrays in TEXT columns and dates are fixed-width ISO
+strings, so they sort correctly as text.  The recipe_tags and
+recipe_ingredients tables and the recipes_fts full text index are maintained
+from the recipes table by triggers, so the driver only ever writes to
+recipes.
+"""
+
+# Same weights as the text index on the mongo Recipe collection, in the
+# column order of recipes_fts, for bm25().
+FTS_WEIGHTS = (10.0, 5.0, 4.0, 2.0)
+
+# Columns added since their table was first released, as (table, column,
+# definition).  CREATE TABLE IF NOT EXISTS leaves existing tables as they
+# are, so SQLiteDriver.db_initialize adds these to them first.
+ADDED_COLUMNS = (("recipes", "parsed_ingredients", "TEXT"),)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS recipes (
+    rid INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL CONSTRAINT name_required CHECK (name <> ''),
+    num_ingredients INTEGER NOT NULL,
+    ingredients TEXT NOT NULL
+        CONSTRAINT ingredients_required CHECK (json_array_length(ingredients) > 0),
+    directions TEXT NOT NULL
+        CONSTRAINT directions_required CHECK (json_array_length(directions) > 0),
+    prep_time REAL NOT NULL DEFAULT 0 CONSTRAINT prep_time_min CHECK (prep_time >= 0),
+    cook_time REAL NOT NULL DEFAULT 0 CONSTRAINT cook_time_min CHECK (cook_time >= 0),
+    servings TEXT,
+    images TEXT NOT NULL DEFAULT '[]',
+    tags TEXT NOT NULL DEFAULT '[]',
+    notes TEXT NOT NULL DEFAULT '[]',
+    rating REAL CONSTRAINT rating_range CHECK (rating BETWEEN 0 AND 5),
+    favorite INTEGER NOT NULL DEFAULT 0,
+    when_made TEXT NOT NULL DEFAULT '[]',
+    deleted INTEGER NOT NULL DEFAULT 0,
+    created_date TEXT NOT NULL,
+    last_modified_date TEXT NOT NULL,
+    parsed_ingredients TEXT
+);
+
+CREATE INDEX IF NOT EXISTS recipes_deleted_created
+    ON recipes (deleted, created_date DESC, id DESC);
+CREATE INDEX IF NOT EXISTS recipes_deleted_name ON recipes (deleted, name, id);
+
+CREATE TABLE IF NOT EXISTS recipe_tags (
+    tag TEXT NOT NULL,
+    recipe_id TEXT NOT NULL,
+    PRIMARY KEY (tag, recipe_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS recipe_tags_recipe ON recipe_tags (recipe_id);
+
+CREATE TRIGGER IF NOT EXISTS recipes_tags_ai AFTER INSERT ON recipes BEGIN
+    INSERT OR IGNORE INTO recipe_tags (tag, recipe_id)
+        SELECT value, new.id FROM json_each(new.tags);
+END;
+
+CREATE TRIGGER IF NOT EXISTS recipes_tags_au AFTER UPDATE OF tags ON recipes BEGIN
+    DELETE FROM recipe_tags WHERE recipe_id = old.id;
+    INSERT OR IGNORE INTO recipe_tags (tag, recipe_id)
+        SELECT value, new.id FROM json_each(new.tags);
+END;
+
+CREATE TRIGGER IF NOT EXISTS recipes_tags_ad AFTER DELETE ON recipes BEGIN
+    DELETE FROM recipe_tags WHERE recipe_id = old.id;
+END;
+
+CREATE TABLE IF NOT EXISTS recipe_ingredients (
+    name TEXT NOT NULL,
+    recipe_id TEXT NOT NULL,
+    PRIMARY KEY (name, recipe_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS recipe_ingredients_recipe ON recipe_ingredients (recipe_id);
+
+CREATE TRIGGER IF NOT EXISTS recipes_ingredients_ai AFTER INSERT ON recipes BEGIN
+    INSERT OR IGNORE INTO recipe_ingredients (name, recipe_id)
+        SELECT json_extract(value, '$.name'), new.id FROM json_each(new.parsed_ingredients)
+        WHERE json_extract(value, '$.name') <> '';
+END;
+
+CREATE TRIGGER IF NOT EXISTS recipes_ingredients_au
+AFTER UPDATE OF parsed_ingredients ON recipes BEGIN
+    DELETE FROM recipe_ingredients WHERE recipe_id = old.id;
+    INSERT OR IGNORE INTO recipe_ingredients (name, recipe_id)
+        SELECT json_extract(value, '$.name'), new.id FROM json_each(new.parsed_ingredients)
+        WHERE json_extract(value, '$.name') <> '';
+END;
+
+CREATE TRIGGER IF NOT EXISTS recipes_ingredients_ad AFTER DELETE ON recipes BEGIN
+    DELETE FROM recipe_ingredients WHERE recipe_id = old.id;
+END;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS recipes_fts USING fts5 (
+    name, tags, ingredients, directions,
+    content='recipes', content_rowid='rid', tokenize='porter unicode61'
+);
+
+CREATE TRIGGER IF NOT EXISTS recipes_fts_ai AFTER INSERT ON recipes BEGIN
+    INSERT INTO recipes_fts (rowid, name, tags, ingredients, directions)
+        VALUES (new.rid, new.name, new.tags, new.ingredients, new.directions);
+END;
+
+CREATE TRIGGER IF NOT EXISTS recipes_fts_au
+AFTER UPDATE OF name, tags, ingredients, directions ON recipes BEGIN
+    INSERT INTO recipes_fts (recipes_fts, rowid, name, tags, ingredients, directions)
+        VALUES ('delete', old.rid, old.name, old.tags, old.ingredients, old.directions);
+    INSERT INTO recipes_fts (rowid, name, tags, ingredients, directions)
+        VALUES (new.rid, new.name, new.tags, new.ingredients, new.directions);
+END;
+
+CREATE TRIGGER IF NOT EXISTS recipes_fts_ad AFTER DELETE ON recipes BEGIN
+    INSERT INTO recipes_fts (recipes_fts, rowid, name, tags, ingredients, directions)
+        VALUES ('delete', old.rid, old.name, old.tags, old.ingredients, old.directions);
+END;
+
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    username TEXT NOT NULL UNIQUE,
+    email TEXT NOT NULL UNIQUE,
+    password_hash TEXT NOT NULL,
+    created_date TEXT NOT NULL,
+    last_modified_date TEXT NOT NULL,
+    recipe_ids TEXT NOT NULL DEFAULT '[]',
+    shared_recipe_ids TEXT NOT NULL DEFAULT '[]',
+    email_distros TEXT NOT NULL DEFAULT '{}'
+) WITHOUT ROWID;
+"""
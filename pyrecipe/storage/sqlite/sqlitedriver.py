@@ -0,0 +1,919 @@
+"""Embedded SQLite DB driver for single-node deployments."""
+
+import datetime
+import json
+import os
+import re
+import sqlite3
+import threading
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+
+import bson
+
+from pyrecipe.errors import PageTokenError
+from pyrecipe.errors import RecipeConflictError
+from pyrecipe.security import auth
+from pyrecipe.storage.shared.bulk_model import BulkResult
+from pyrecipe.storage.shared.db_interface import DBInitInt
+from pyrecipe.storage.shared.ingredient_parser import ingredient_key
+from pyrecipe.storage.shared.ingredient_parser import parse_ingredients
+from pyrecipe.storage.shared.page_model import PageModel
+from pyrecipe.storage.shared.page_model import decode_token
+from pyrecipe.storage.shared.page_model import encode_token
+from pyrecipe.storage.shared.recipe_interface import RecipeDBInt
+from pyrecipe.storage.shared.recipe_model import RecipeModel
+from pyrecipe.storage.shared.recipe_model import normalize_tags
+from pyrecipe.storage.shared.recipe_summary_model import RecipeSummary
+from pyrecipe.storage.shared.user_interface import UserDBInt
+from pyrecipe.storage.shared.user_model import UserModel
+
+from .schema import ADDED_COLUMNS
+from .schema import FTS_WEIGHTS
+from .schema import SCHEMA
+
+
+RECIPE_LISTS = ("ingredients", "directions", "images", "tags", "notes")
+RECIPE_COLUMNS = (
+    "id", "name", "num_ingredients", "ingredients", "directions", "prep_time",
+    "cook_time", "servings", "images", "tags", "notes", "rating", "favorite",
+    "when_made", "deleted", "created_date", "last_modified_date", "parsed_ingredients",
+)
+SUMMARY_COLUMNS = "recipes.id, recipes.name, recipes.cook_time, recipes.tags"
+INSERT_RECIPE = "INSERT INTO recipes ({}) VALUES ({})".format(
+    ", ".join(RECIPE_COLUMNS), ", ".join("?" * len(RECIPE_COLUMNS))
+)
+
+
+def _date_to_db(date: datetime.datetime) -> str:
+    """Fixed-width ISO format, so stored dates sort correctly as text."""
+    return date.isoformat(timespec="microseconds")
+
+
+def _date_from_db(value: str) -> datetime.datetime:
+    return datetime.datetime.fromisoformat(value)
+
+
+class SQLiteDriver(DBInitInt, RecipeDBInt, UserDBInt):
+    """
+    Singleton type class to drive all SQLite DB interactions.
+
+    The database runs in WAL mode so readers never block the writer, and
+    every thread gets its own connection (sqlite3 connections can't be
+    shared between threads).  recipes_search uses an FTS5 index ranked by
+    bm25 with the same field weights as the mongo text index.
+    """
+
+    # sort_by option -> (column, direction, type of the token value) keyset
+    # pagination is ordered by.  Each has a matching index in schema.py.
+    PAGE_SORTS = {
+        "created_date": ("created_date", -1, datetime.datetime),
+        "name": ("name", 1, str),
+    }
+
+    # Columns recipe_edit diffs against the stored recipe.
+    EDIT_FIELDS = (
+        "name", "prep_time", "cook_time", "servings",
+        "ingredients", "directions", "tags", "notes",
+    )
+
+    # Default number of recipes inserted per transaction by recipe_create_many,
+    # and updated per transaction by recipes_backfill_ingredients.
+    BULK_CHUNK_SIZE = 500
+
+    # Added by recipes_search_ranked to the score of recipes whose name
+    # contains the search string.  Same as MongoDriver.SEARCH_NAME_BOOST.
+    SEARCH_NAME_BOOST = 100.0
+
+    # Milliseconds a connection waits for a lock before raising "database is locked".
+    BUSY_TIMEOUT = 5000
+
+    _path = None
+    _local = threading.local()
+
+    #### DBInitInt methods ###################################################
+
+    @classmethod
+    def db_initialize(cls, db_name="pyrecipe", verbose=False, **options) -> None:
+        """
+        Open (creating if needed) the database file db_name, ".sqlite3" is
+        appended if it has no extension, switch it to WAL mode and create
+        the schema.  Server connection options (host, pool sizes, ...) are
+        ignored.
+        """
+        if not os.path.splitext(db_name)[1]:
+            db_name += ".sqlite3"
+        cls._path = os.path.abspath(db_name)
+        conn = cls._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        for table, column, definition in ADDED_COLUMNS:
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info({})".format(table))}
+            if columns and column not in columns:
+                conn.execute("ALTER TABLE {} ADD COLUMN {} {}".format(table, column, definition))
+        conn.executescript(SCHEMA)
+        if verbose:
+            print("[+] SQLite database initialized: {}".format(cls._path))
+
+    @classmethod
+    def _conn(cls) -> sqlite3.Connection:
+        """Return this thread's connection to the database, opening it if needed."""
+        conns = cls._local.__dict__.setdefault("conns", {})
+        conn = conns.get(cls._path)
+        if conn is None:
+            if cls._path is None:
+                raise RuntimeError("SQLiteDriver.db_initialize() has not been called")
+            conn = sqlite3.connect(cls._path, timeout=cls.BUSY_TIMEOUT / 1000)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conns[cls._path] = conn
+        return conn
+
+    @classmethod
+    def db_close(cls) -> None:
+        """Close this thread's connections."""
+        for conn in cls._local.__dict__.pop("conns", {}).values():
+            conn.close()
+
+    #### RecipeDBInt methods #################################################
+
+    @staticmethod
+    def _recipe_to_model(row: sqlite3.Row) -> RecipeModel:
+        """Given a recipes row, return it as a RecipeModel."""
+        recipe = {column: row[column] for column in RECIPE_COLUMNS}
+        recipe["_id"] = recipe.pop("id")
+        for column in RECIPE_LISTS:
+            recipe[column] = json.loads(recipe[column])
+        recipe["when_made"] = [_date_from_db(d) for d in json.loads(recipe["when_made"])]
+        recipe["favorite"] = bool(recipe["favorite"])
+        recipe["deleted"] = bool(recipe["deleted"])
+        recipe["created_date"] = _date_from_db(recipe["created_date"])
+        recipe["last_modified_date"] = _date_from_db(recipe["last_modified_date"])
+        recipe["parsed_ingredients"] = json.loads(recipe["parsed_ingredients"] or "[]")
+        return RecipeModel.from_dict(recipe)
+
+    @staticmethod
+    def _recipe_to_summary(row: sqlite3.Row) -> RecipeSummary:
+        return RecipeSummary(
+            _id=row["id"],
+            name=row["name"],
+            cook_time=row["cook_time"],
+            tags=json.loads(row["tags"]),
+        )
+
+    @classmethod
+    def _recipes(cls, sql: str, params=(), summary: bool = False) -> list:
+        """
+        Run the query and convert every row.  sql selects {columns} from
+        recipes, which is filled in with the model's or summary's columns.
+        """
+        if summary:
+            sql, to_model = sql.format(columns=SUMMARY_COLUMNS), cls._recipe_to_summary
+        else:
+            sql, to_model = sql.format(columns="recipes.*"), cls._recipe_to_model
+        return [to_model(row) for row in cls._conn().execute(sql, params)]
+
+    @staticmethod
+    def _recipe_row(recipe: dict) -> tuple:
+        """Given a recipe dict (RecipeModel fields), return its recipes row values."""
+        return (
+            recipe["_id"],
+            recipe["name"],
+            recipe["num_ingredients"],
+            json.dumps(recipe["ingredients"]),
+            json.dumps(recipe["directions"]),
+            recipe["prep_time"],
+            recipe["cook_time"],
+            recipe["servings"],
+            json.dumps(recipe["images"]),
+            json.dumps(recipe["tags"]),
+            json.dumps(recipe["notes"]),
+            recipe["rating"],
+            int(recipe["favorite"]),
+            json.dumps([_date_to_db(d) for d in recipe["when_made"]]),
+            int(recipe["deleted"]),
+            _date_to_db(recipe["created_date"]),
+            _date_to_db(recipe["last_modified_date"]),
+            json.dumps(recipe["parsed_ingredients"]),
+        )
+
+    @staticmethod
+    def _build_recipe(
+        name: str,
+        prep_time: int,
+        cook_time: int,
+        servings: str,
+        ingredients: List["ingredients"],
+        directions: List["directions"],
+        tags: List["tags"] = [],
+        notes: List["notes"] = [],
+        images: List["filepath"] = [],
+    ) -> dict:
+        """Given the recipe_create parameters, return a new recipe dict."""
+        now = datetime.datetime.utcnow()
+        return {
+            "_id": str(bson.ObjectId()),
+            "name": name,
+            "num_ingredients": len(ingredients),
+            "ingredients": list(ingredients),
+            "directions": list(directions),
+            "prep_time": float(prep_time),
+            "cook_time": float(cook_time),
+            "servings": servings,
+            "images": list(images),
+            "tags": normalize_tags(tags),
+            "notes": list(notes),
+            "rating": None,
+            "favorite": False,
+            "when_made": [],
+            "deleted": False,
+            "created_date": now,
+            "last_modified_date": now,
+            "parsed_ingredients": parse_ingredients(ingredients),
+        }
+
+    @classmethod
+    def _insert_recipe(cls, conn: sqlite3.Connection, recipe: dict) -> None:
+        """Insert the recipe, raising ValueError if it breaks a constraint."""
+        try:
+            conn.execute(INSERT_RECIPE, cls._recipe_row(recipe))
+        except sqlite3.IntegrityError as e:
+            raise ValueError(str(e))
+
+    @classmethod
+    def recipe_create(cls, **kwargs) -> RecipeModel:
+        """
+        Given the recipe_create parameters, create a recipe.
+
+        r = SQLiteDriver.recipe_create(**kwargs)
+
+        :returns: RecipeModel of the new recipe.
+        :raises ValueError: if the recipe is invalid.
+        """
+        recipe = cls._build_recipe(**kwargs)
+        conn = cls._conn()
+        with conn:
+            cls._insert_recipe(conn, recipe)
+        return RecipeModel.from_dict(recipe)
+
+    @classmethod
+    def recipe_create_many(
+        cls, recipes: List[dict], chunk_size: Optional[int] = None
+    ) -> List[BulkResult]:
+        """
+        Create many recipes at once, one transaction per chunk_size recipes.
+        A recipe that breaks a constraint only fails its own insert, the
+        rest of its chunk is still committed.
+
+        results = SQLiteDriver.recipe_create_many([kwargs1, kwargs2])
+
+        :returns: List["BulkResult"] one per recipe in input order.
+        """
+        chunk_size = chunk_size or cls.BULK_CHUNK_SIZE
+        results = [BulkResult(index=i) for i in range(len(recipes))]
+        conn = cls._conn()
+        for start in range(0, len(recipes), chunk_size):
+            with conn:
+                for i in range(start, min(start + chunk_size, len(recipes))):
+                    try:
+                        recipe = cls._build_recipe(**recipes[i])
+                        cls._insert_recipe(conn, recipe)
+                    except (TypeError, ValueError) as e:
+                        results[i].error = str(e)
+                        continue
+                    results[i]._id = recipe["_id"]
+                    results[i].recipe = RecipeModel.from_dict(recipe)
+        return results
+
+    @classmethod
+    def recipe_edit(
+        cls,
+        _id: str,
+        name: str,
+        prep_time: int,
+        cook_time: int,
+        servings: str,
+        ingredients: List["ingredients"],
+        directions: List["directions"],
+        tags: List["tags"] = [],
+        notes: List["notes"] = [],
+        last_modified: datetime.datetime = None,
+    ) -> Optional[RecipeModel]:
+        """
+        Edit a recipe's information.  The form is diffed against the stored
+        recipe and only the changed columns are updated, guarded by the
+        recipe's last_modified_date.
+
+        r = SQLiteDriver.recipe_edit(**kwargs, last_modified=recipe.last_modified_date)
+
+        :returns: RecipeModel of the edited recipe, or None if not found.
+        :raises: RecipeConflictError if the recipe was modified by someone else.
+        :raises ValueError: if the edited recipe is invalid.
+        """
+        current = cls.recipe_find_by_id(_id)
+        if not current:
+            return None
+        if last_modified is None:
+            last_modified = current.last_modified_date
+        elif current.last_modified_date != last_modified:
+            raise RecipeConflictError(_id)
+
+        # Built like a new recipe, so "15" matches a stored 15.0.
+        form = cls._build_recipe(
+            name=name,
+            prep_time=prep_time,
+            cook_time=cook_time,
+            servings=servings,
+            ingredients=ingredients,
+            directions=directions,
+            tags=tags,
+            notes=notes,
+        )
+        changes = {k: form[k] for k in cls.EDIT_FIELDS if getattr(current, k) != form[k]}
+        if not changes:
+            return current
+        if "ingredients" in changes:
+            changes["num_ingredients"] = form["num_ingredients"]
+            changes["parsed_ingredients"] = form["parsed_ingredients"]
+        columns = {
+            k: json.dumps(v) if k in RECIPE_LISTS or k == "parsed_ingredients" else v
+            for k, v in changes.items()
+        }
+        now = datetime.datetime.utcnow()
+        columns["last_modified_date"] = _date_to_db(now)
+
+        conn = cls._conn()
+        try:
+            with conn:
+                cursor = conn.execute(
+                    "UPDATE recipes SET {} WHERE id = ? AND last_modified_date = ?".format(
+                        ", ".join("{} = ?".format(column) for column in columns)
+                    ),
+                    (*columns.values(), _id, _date_to_db(last_modified)),
+                )
+        except sqlite3.IntegrityError as e:
+            raise ValueError(str(e))
+        if not cursor.rowcount:
+            raise RecipeConflictError(_id)
+        return RecipeModel.from_dict(
+            {**current.to_dict(), **changes, "last_modified_date": now}
+        )
+
+    @classmethod
+    def recipe_find_by_id(cls, recipe_id: str) -> Optional[RecipeModel]:
+        """
+        Return the recipe with the given id.
+
+        recipe = SQLiteDriver.recipe_find_by_id(recipe_id)
+
+        :returns: RecipeModel for the recipe found or None
+        """
+        recipes = cls._recipes("SELECT {columns} FROM recipes WHERE id = ?", (recipe_id,))
+        if recipes:
+            return recipes[0]
+
+    @staticmethod
+    def _name_pattern(search_string: str) -> str:
+        """Return the LIKE pattern (ESCAPE '\\') matching names containing search_string."""
+        return "%{}%".format(re.sub(r"([\\%_])", r"\\\1", search_string))
+
+    @classmethod
+    def _by_name(cls, search_string: str, summary: bool = False) -> list:
+        pattern = cls._name_pattern(search_string)
+        return cls._recipes(
+            "SELECT {columns} FROM recipes WHERE deleted = 0"
+            " AND name LIKE ? ESCAPE '\\' ORDER BY rid",
+            (pattern,),
+            summary,
+        )
+
+    @classmethod
+    def recipes_find_by_name(cls, search_string: str) -> List[RecipeModel]:
+        """
+        Case insensitive substring match on the names of all active recipes.
+
+        recipes = SQLiteDriver.recipes_find_by_name("spam")
+        """
+        return cls._by_name(search_string)
+
+    @classmethod
+    def recipes_find_by_name_summary(cls, search_string: str) -> List[RecipeSummary]:
+        """Same as recipes_find_by_name, but only the RecipeSummary columns are read."""
+        return cls._by_name(search_string, summary=True)
+
+    @staticmethod
+    def _tags_filter(tags: List[str]) -> tuple:
+        """Return the (sql, params) restricting recipes to those with all tags."""
+        tags = sorted({tag.lower() for tag in tags})
+        sql = (
+            "id IN (SELECT recipe_id FROM recipe_tags WHERE tag IN ({})"
+            " GROUP BY recipe_id HAVING count(*) = ?)"
+        ).format(", ".join("?" * len(tags)))
+        return sql, (*tags, len(tags))
+
+    @classmethod
+    def _by_tag(cls, tags: List[str], summary: bool = False) -> list:
+        sql, params = cls._tags_filter(tags)
+        return cls._recipes(
+            "SELECT {columns} FROM recipes WHERE deleted = 0 AND " + sql + " ORDER BY rid",
+            params,
+            summary,
+        )
+
+    @classmethod
+    def recipes_find_by_tag(cls, tags: List[str]) -> List[RecipeModel]:
+        """
+        Return all active recipes that have all of the given tags.
+
+        recipes = SQLiteDriver.recipes_find_by_tag(["tag1", "tag2"])
+        """
+        return cls._by_tag(tags)
+
+    @classmethod
+    def recipes_find_by_tag_summary(cls, tags: List[str]) -> List[RecipeSummary]:
+        """Same as recipes_find_by_tag, but only the RecipeSummary columns are read."""
+        return cls._by_tag(tags, summary=True)
+
+    @staticmethod
+    def _ingredients_filter(names: List[str]) -> tuple:
+        """Return the (sql, params) restricting recipes to those with all ingredients."""
+        sql = (
+            "id IN (SELECT recipe_id FROM recipe_ingredients WHERE name IN ({})"
+            " GROUP BY recipe_id HAVING count(*) = ?)"
+        ).format(", ".join("?" * len(names)))
+        return sql, (*names, len(names))
+
+    @classmethod
+    def _by_ingredient(cls, ingredients: List[str], summary: bool = False) -> list:
+        names = sorted({ingredient_key(ingredient) for ingredient in ingredients} - {""})
+        if not names:
+            return []
+        sql, params = cls._ingredients_filter(names)
+        return cls._recipes(
+            "SELECT {columns} FROM recipes WHERE deleted = 0 AND " + sql + " ORDER BY rid",
+            params,
+            summary,
+        )
+
+    @classmethod
+    def recipes_find_by_ingredient(cls, ingredients: List[str]) -> List[RecipeModel]:
+        """
+        Return all active recipes having all of the given ingredients, looked
+        up by their parsed names in the recipe_ingredients table.
+
+        recipes = SQLiteDriver.recipes_find_by_ingredient(["garlic", "tomatoes"])
+        """
+        return cls._by_ingredient(ingredients)
+
+    @classmethod
+    def recipes_find_by_ingredient_summary(cls, ingredients: List[str]) -> List[RecipeSummary]:
+        """Same as recipes_find_by_ingredient, but only the RecipeSummary columns are read."""
+        return cls._by_ingredient(ingredients, summary=True)
+
+    @classmethod
+    def recipes_backfill_ingredients(
+        cls,
+        batch_size: Optional[int] = None,
+        reparse: bool = False,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> int:
+        """
+        Parse the ingredients of the recipes written before they were parsed
+        on write, or of every recipe with reparse=True (i.e. after the parser
+        changed), one transaction per batch_size recipes.  A recipe is only
+        updated if its ingredients are still the ones parsed, so edits made
+        meanwhile win.  progress(done, total) is called after each batch.
+
+        SQLiteDriver.recipes_backfill_ingredients(progress=print)
+
+        :returns: (int) the number of recipes updated.
+        """
+        batch_size = batch_size or cls.BULK_CHUNK_SIZE
+        where = "" if reparse else " AND coalesce(parsed_ingredients, '[]') = '[]'"
+        conn = cls._conn()
+        total = conn.execute("SELECT count(*) FROM recipes WHERE 1" + where).fetchone()[0]
+        done = updated = last = 0
+        while True:
+            rows = conn.execute(
+                "SELECT rid, id, ingredients FROM recipes WHERE rid > ?" + where
+                + " ORDER BY rid LIMIT ?",
+                (last, batch_size),
+            ).fetchall()
+            if not rows:
+                break
+            with conn:
+                for row in rows:
+                    parsed = parse_ingredients(json.loads(row["ingredients"]))
+                    updated += conn.execute(
+                        "UPDATE recipes SET parsed_ingredients = ?"
+                        " WHERE id = ? AND ingredients = ?",
+                        (json.dumps(parsed), row["id"], row["ingredients"]),
+                    ).rowcount
+            last = rows[-1]["rid"]
+            done += len(rows)
+            if progress:
+                progress(done, total)
+        return updated
+
+    @classmethod
+    def recipes_get_tags(cls) -> List["tags"]:
+        """Return all distinct tags of the active recipes."""
+        rows = cls._conn().execute(
+            "SELECT DISTINCT t.tag FROM recipe_tags t JOIN recipes r ON r.id = t.recipe_id"
+            " WHERE r.deleted = 0 ORDER BY t.tag"
+        )
+        return [row["tag"] for row in rows]
+
+    @classmethod
+    def recipes_tag_counts(cls) -> Dict[str, int]:
+        """Return the number of active recipes having each tag, most used first."""
+        rows = cls._conn().execute(
+            "SELECT t.tag, COUNT(DISTINCT t.recipe_id) AS n FROM recipe_tags t"
+            " JOIN recipes r ON r.id = t.recipe_id WHERE r.deleted = 0"
+            " GROUP BY t.tag ORDER BY n DESC, t.tag"
+        )
+        return {row["tag"]: row["n"] for row in rows}
+
+    @classmethod
+    def recipes_all(cls) -> List[RecipeModel]:
+        """Return all the recipes, deleted or not."""
+        return cls._recipes("SELECT {columns} FROM recipes ORDER BY rid")
+
+    @classmethod
+    def recipes_active(cls) -> List[RecipeModel]:
+        """Return all the recipes that have not been marked as deleted."""
+        return cls._recipes("SELECT {columns} FROM recipes WHERE deleted = 0 ORDER BY rid")
+
+    @classmethod
+    def recipes_active_summary(cls) -> List[RecipeSummary]:
+        """Same as recipes_active, but only the RecipeSummary columns are read."""
+        return cls._recipes(
+            "SELECT {columns} FROM recipes WHERE deleted = 0 ORDER BY rid", summary=True
+        )
+
+    @classmethod
+    def recipes_deleted(cls) -> List[RecipeModel]:
+        """Return all the recipes that have been marked as deleted."""
+        return cls._recipes("SELECT {columns} FROM recipes WHERE deleted = 1 ORDER BY rid")
+
+    @classmethod
+    def recipes_page(
+        cls,
+        page_size: int = 20,
+        token: Optional[str] = None,
+        sort_by: str = "created_date",
+        tags: Optional[List[str]] = None,
+        deleted: bool = False,
+        summary: bool = False,
+    ) -> PageModel:
+        """
+        Get a single page of recipes using keyset pagination on (sort_by, id),
+        with the same ordering and tokens as MongoDriver.recipes_page.
+
+        page = SQLiteDriver.recipes_page(page_size=20, token=page.next_token)
+
+        :returns: PageModel of RecipeModel's (or RecipeSummary's) and the
+            token for the next page.
+        :raises PageTokenError: if the token is malformed.
+        """
+        column, direction, value_type = cls.PAGE_SORTS[sort_by]
+        where, params = ["deleted = ?"], [int(deleted)]
+        if tags:
+            sql, tag_params = cls._tags_filter(tags)
+            where.append(sql)
+            params.extend(tag_params)
+        if token:
+            value, _id = decode_token(token, sort_by)
+            if not isinstance(value, value_type) or not isinstance(_id, str):
+                raise PageTokenError(token)
+            if value_type is datetime.datetime:
+                value = _date_to_db(value)
+            where.append("({}, id) {} (?, ?)".format(column, "<" if direction < 0 else ">"))
+            params.extend([value, _id])
+
+        order = "DESC" if direction < 0 else "ASC"
+        columns = SUMMARY_COLUMNS + ", " + column if summary else "*"
+        rows = cls._conn().execute(
+            "SELECT {} FROM recipes WHERE {} ORDER BY {} {order}, id {order} LIMIT ?".format(
+                columns, " AND ".join(where), column, order=order
+            ),
+            (*params, page_size + 1),
+        ).fetchall()
+
+        next_token = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            value = rows[-1][column]
+            if value_type is datetime.datetime:
+                value = _date_from_db(value)
+            next_token = encode_token(sort_by, value, rows[-1]["id"])
+        to_model = cls._recipe_to_summary if summary else cls._recipe_to_model
+        return PageModel(items=[to_model(row) for row in rows], next_token=next_token)
+
+    @classmethod
+    def recipe_copy(cls, recipe) -> RecipeModel:
+        """
+        Given a recipe, create a copy of it with a modified name,
+        i.e. recipe.name = 'lasagna_COPY'
+
+        new_recipe = SQLiteDriver.recipe_copy(recipe)
+        """
+        if isinstance(recipe, RecipeModel):
+            recipe = recipe.to_dict()
+        copy = cls._build_recipe(
+            name=recipe["name"] + "_COPY",
+            prep_time=recipe["prep_time"],
+            cook_time=recipe["cook_time"],
+            servings=recipe["servings"],
+            ingredients=recipe["ingredients"],
+            directions=recipe["directions"],
+            tags=recipe["tags"],
+            notes=recipe["notes"],
+        )
+        copy["rating"] = recipe["rating"]
+        conn = cls._conn()
+        with conn:
+            cls._insert_recipe(conn, copy)
+        return RecipeModel.from_dict(copy)
+
+    @classmethod
+    def _recipe_update(
+        cls, recipe_id: str, assignments: str, params=(), condition="", condition_params=()
+    ) -> int:
+        """
+        Run a single UPDATE of the recipe that also sets its last_modified_date,
+        optionally only if the extra condition holds.
+
+        :returns: (int) 1 if the recipe was updated, 0 otherwise.
+        """
+        conn = cls._conn()
+        with conn:
+            cursor = conn.execute(
+                "UPDATE recipes SET {}, last_modified_date = ? WHERE id = ?{}".format(
+                    assignments, " AND " + condition if condition else ""
+                ),
+                (
+                    *params,
+                    _date_to_db(datetime.datetime.utcnow()),
+                    recipe_id,
+                    *condition_params,
+                ),
+            )
+        return cursor.rowcount
+
+    @classmethod
+    def recipe_add_tag(cls, recipe: RecipeModel, tag: str) -> int:
+        """
+        Given a recipe instance, add a new tag.
+
+        :returns: (int) 1 for success, 0 for failure
+        """
+        tag = tag.lower()
+        return cls._recipe_update(
+            recipe.id,
+            "tags = CASE WHEN EXISTS (SELECT 1 FROM json_each(tags) WHERE value = ?)"
+            " THEN tags ELSE json_insert(tags, '$[#]', ?) END",
+            (tag, tag),
+        )
+
+    @classmethod
+    def recipe_delete_tag(cls, recipe: RecipeModel, tag: str) -> int:
+        """
+        Given a recipe instance, delete a tag.
+
+        :returns: (int) 1 for success, 0 for failure
+        """
+        return cls._recipe_update(
+            recipe.id,
+            "tags = (SELECT json_group_array(value) FROM json_each(tags) WHERE value != ?)",
+            (tag.lower(),),
+        )
+
+    @classmethod
+    def recipe_mark_made(cls, recipe: RecipeModel, date: datetime = None) -> int:
+        """
+        Add a date the recipe was made.  The "once per day" rule is part of
+        the UPDATE's condition, so no row matches on a same-day duplicate.
+
+        :returns: (int) 1 for success, 0 for failure or if trying to
+            mark_made on the same date more than once.
+        """
+        if date is None:
+            date = datetime.datetime.utcnow()
+        return cls._recipe_update(
+            recipe.id,
+            "when_made = json_insert(when_made, '$[#]', ?)",
+            (_date_to_db(date),),
+            condition="NOT EXISTS (SELECT 1 FROM json_each(when_made)"
+            " WHERE substr(value, 1, 10) = ?)",
+            condition_params=(date.strftime("%Y-%m-%d"),),
+        )
+
+    @classmethod
+    def recipe_delete(cls, recipe_id: str) -> int:
+        """
+        Given a recipe id, mark it as deleted.
+
+        :returns: (int) 1 for success, 0 for failure
+        """
+        return cls._recipe_update(recipe_id, "deleted = 1")
+
+    @staticmethod
+    def _match_query(text: str) -> str:
+        """Return an FTS5 query matching any word of text."""
+        return " OR ".join('"{}"'.format(term) for term in re.findall(r"\w+", text))
+
+    @classmethod
+    def _search(cls, text: str, summary: bool = False) -> list:
+        query = cls._match_query(text)
+        if not query:
+            return []
+        return cls._recipes(
+            "SELECT {columns} FROM recipes_fts JOIN recipes ON recipes.rid = recipes_fts.rowid"
+            " WHERE recipes_fts MATCH ? ORDER BY bm25(recipes_fts, ?, ?, ?, ?)",
+            (query, *FTS_WEIGHTS),
+            summary,
+        )
+
+    @classmethod
+    def recipes_search(cls, text: str) -> List[RecipeModel]:
+        """
+        Return the recipes matching any word of text, best match first by
+        bm25 with the name 10, tags 5, ingredients 4, directions 2 weights.
+
+        SQLiteDriver.recipes_search(text)
+        """
+        return cls._search(text)
+
+    @classmethod
+    def recipes_search_summary(cls, text: str) -> List[RecipeSummary]:
+        """Same as recipes_search, but only the RecipeSummary columns are read."""
+        return cls._search(text, summary=True)
+
+    @classmethod
+    def recipes_search_ranked(
+        cls, text: str, limit: Optional[int] = None, skip: int = 0, summary: bool = False
+    ) -> List[RecipeModel]:
+        """
+        Search the active recipes by name (case insensitive substring) and
+        by the FTS5 index in one query, ranked like
+        MongoDriver.recipes_search_ranked: the bm25 score (negated, so higher
+        is better) plus SEARCH_NAME_BOOST if the name matched.
+
+        SQLiteDriver.recipes_search_ranked("spam", limit=20, skip=40, summary=True)
+        """
+        if not text.strip():
+            return []
+        name = cls._name_pattern(text)
+        query = cls._match_query(text)
+        if query:
+            fts = (
+                "SELECT rowid, bm25(recipes_fts, ?, ?, ?, ?) AS rank"
+                " FROM recipes_fts WHERE recipes_fts MATCH ?"
+            )
+            fts_params = (*FTS_WEIGHTS, query)
+        else:
+            fts, fts_params = "SELECT NULL AS rowid, 0 AS rank WHERE 0", ()
+        return cls._recipes(
+            "SELECT {columns} FROM recipes LEFT JOIN (" + fts + ") AS fts"
+            " ON fts.rowid = recipes.rid"
+            " WHERE recipes.deleted = 0"
+            " AND (fts.rowid IS NOT NULL OR recipes.name LIKE ? ESCAPE '\\')"
+            " ORDER BY (CASE WHEN recipes.name LIKE ? ESCAPE '\\' THEN ? ELSE 0 END)"
+            " - coalesce(fts.rank, 0) DESC, recipes.id"
+            " LIMIT ? OFFSET ?",
+            (*fts_params, name, name, cls.SEARCH_NAME_BOOST, limit or -1, skip),
+            summary,
+        )
+
+    #### UserDBInt methods ###################################################
+
+    @staticmethod
+    def _user_to_model(row: sqlite3.Row) -> UserModel:
+        """Given a users row, return it as a UserModel."""
+        return UserModel(
+            _id=row["id"],
+            name=row["name"],
+            username=row["username"],
+            email=row["email"],
+            password_hash=row["password_hash"],
+            created_date=_date_from_db(row["created_date"]),
+            last_modified_date=_date_from_db(row["last_modified_date"]),
+            recipe_ids=json.loads(row["recipe_ids"]),
+            shared_recipe_ids=json.loads(row["shared_recipe_ids"]),
+            email_distros=json.loads(row["email_distros"]),
+        )
+
+    @classmethod
+    def _user_first(cls, where: str, params) -> Optional[UserModel]:
+        row = cls._conn().execute("SELECT * FROM users WHERE " + where, params).fetchone()
+        if row:
+            return cls._user_to_model(row)
+
+    @classmethod
+    def user_create(cls, name: str, email: str, password: str) -> Optional[UserModel]:
+        """
+        Create and return the user.
+
+        :returns: (UserModel) the user or None if the email (or username)
+            is already in use.
+        """
+        now = _date_to_db(datetime.datetime.utcnow())
+        _id = str(bson.ObjectId())
+        conn = cls._conn()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT INTO users (id, name, username, email, password_hash,"
+                    " created_date, last_modified_date) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (_id, name, name, email, auth.hash_password(password), now, now),
+                )
+        except sqlite3.IntegrityError:
+            return None
+        return cls.user_find_by_id(_id)
+
+    @classmethod
+    def user_find_by_id(cls, user_id: str) -> Optional[UserModel]:
+        """
+        Find the user by id.
+
+        :returns: (UserModel) the user or None.
+        """
+        return cls._user_first("id = ?", (str(user_id),))
+
+    @classmethod
+    def user_find_by_email(cls, email: str) -> Optional[UserModel]:
+        """
+        Find the user by email address.
+
+        :returns: (UserModel) the user or None.
+        """
+        return cls._user_first("email = ?", (email,))
+
+    @classmethod
+    def user_login(cls, email: str, password: str) -> Optional[UserModel]:
+        """
+        Logs in and returns the user.
+
+        :returns: (UserModel) the user.  None if user doesn't exist or the
+            password is incorrect.
+        """
+        user = cls.user_find_by_email(email)
+        if not user:
+            return None
+        if not auth.verify_password(password, user.password_hash):
+            return None
+        return user
+
+    @classmethod
+    def users_list(cls) -> Optional[List[UserModel]]:
+        """
+        Returns a list of all Users, or None if there are none.
+        """
+        rows = cls._conn().execute("SELECT * FROM users ORDER BY created_date, id")
+        users = [cls._user_to_model(row) for row in rows]
+        if users:
+            return users
+
+    @classmethod
+    def user_add_recipe(cls, user: UserModel, recipe_id: str) -> int:
+        """
+        Adds a recipe reference to the user's recipes in a single UPDATE.
+
+        :returns: (int) 1 for success, 0 if unsuccessful.
+        """
+        recipe_id = str(recipe_id)
+        conn = cls._conn()
+        with conn:
+            cursor = conn.execute(
+                "UPDATE users SET recipe_ids = CASE WHEN EXISTS"
+                " (SELECT 1 FROM json_each(recipe_ids) WHERE value = ?)"
+                " THEN recipe_ids ELSE json_insert(recipe_ids, '$[#]', ?) END,"
+                " last_modified_date = ? WHERE id = ?",
+                (
+                    recipe_id,
+                    recipe_id,
+                    _date_to_db(datetime.datetime.utcnow()),
+                    str(user.id),
+                ),
+            )
+        return cursor.rowcount
+
+    @classmethod
+    def user_set_password(cls, user: UserModel, password: str) -> Optional[str]:
+        """
+        Sets password_hash as the hash of the user's password.
+
+        :returns: password hash of the supplied password or None if unsuccesssful.
+        """
+        password_hash = auth.hash_password(password)
+        conn = cls._conn()
+        with conn:
+            cursor = conn.execute(
+                "UPDATE users SET password_hash = ?, last_modified_date = ? WHERE id = ?",
+                (password_hash, _date_to_db(datetime.datetime.utcnow()), str(user.id)),
+            )
+        if cursor.rowcount:
+            return password_hash
+        return None
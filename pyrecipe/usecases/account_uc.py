@@ -39,3 +39,26 @@ class AccountUC:
         """
         user = self._driver.user_find_by_id(user_id)
         return user
+
+
+class AsyncAccountUC:
+    """
+    Same use cases as AccountUC for an async DB driver (MotorDriver).
+
+    user = await AsyncAccountUC(MotorDriver).login_user(email, password)
+    """
+
+    def __init__(self, db_driver):
+        self._driver = db_driver
+
+    async def login_user(self, email: str, password: str) -> Optional["UserModel"]:
+        """Login the user, returning None if they don't exist or the password is incorrect."""
+        return await self._driver.user_login(email, password)
+
+    async def register_user(self, name: str, email: str, password: str) -> Optional["UserModel"]:
+        """Create a new user, returning None if the email address is already in use."""
+        return await self._driver.user_create(name, email, password)
+
+    async def find_user_by_id(self, user_id: str) -> Optional["UserModel"]:
+        """Get the user by the supplied user_id, or None if the user doesn't exist."""
+        return await self._driver.user_find_by_id(user_id)
@@ -1,25 +1,57 @@
-"""Use Cases for recipe-related logic."""
+"""
+Use Cases for recipe-related logic.
 
+The services (and the reportlab, PIL, recipe_scrapers and requests packages
+behind them) are imported inside the use cases that need them, so importing
+the app doesn't pay for them.
+"""
+
+import asyncio
 import datetime
+import functools
 import pathlib
 import uuid
+from typing import Dict
 from typing import Optional
 from typing import List
-
-import requests
+from typing import Tuple
 
 from pyrecipe.files import EXPORTDIR
-from pyrecipe.services import export
 from pyrecipe.static import IMAGEDIR
-from pyrecipe.services.images import process_image
-from pyrecipe.services.importer import import_from_url
 
 
 class RecipeUC:
-    """Use Cases for recipe-related logic."""
+    """
+    Use Cases for recipe-related logic.
 
-    def __init__(self, db_driver):
+    Given a search_engine (pyrecipe.services.search.SearchEngine), searches
+    are answered by it instead of the DB driver.  Recipes created, edited or
+    deleted here are re-indexed in it, in the suggester (Suggester) and in
+    the pantry (PantryIndex).
+    """
+
+    def __init__(
+        self,
+        db_driver,
+        search_engine: "SearchEngine" = None,
+        suggester: "Suggester" = None,
+        pantry: "PantryIndex" = None,
+    ):
         self._driver = db_driver
+        self._search = search_engine
+        self._suggester = suggester
+        self._pantry = pantry
+
+    def _indexes(self) -> list:
+        return [i for i in (self._search, self._suggester, self._pantry) if i is not None]
+
+    def _index(self, recipe: "RecipeModel") -> None:
+        for index in self._indexes():
+            index.add(recipe)
+
+    def _unindex(self, recipe_id: str) -> None:
+        for index in self._indexes():
+            index.remove(recipe_id)
 
     def get_all_recipes(self, deleted=None) -> List["RecipeModel"]:
         """Get all recipes in database."""
@@ -31,6 +63,29 @@ class RecipeUC:
             recipes = self._driver.recipes_all()
         return recipes
 
+    def get_recipes_page(
+        self,
+        page_size: int = 20,
+        token: Optional[str] = None,
+        sort_by: str = "created_date",
+        tags: Optional[List[str]] = None,
+        deleted: bool = False,
+        summary: bool = False,
+    ) -> "PageModel":
+        """
+        Get a single page of recipes, continuing from the given page token.
+        With summary=True the page holds RecipeSummary's for list views.
+        """
+        page = self._driver.recipes_page(
+            page_size=page_size,
+            token=token,
+            sort_by=sort_by,
+            tags=tags,
+            deleted=deleted,
+            summary=summary,
+        )
+        return page
+
     def find_recipe_by_id(self, recipe_id: str) -> Optional["RecipeModel"]:
         """Get specific recipe by id in database."""
         recipe = self._driver.recipe_find_by_id(recipe_id)
@@ -52,6 +107,8 @@ class RecipeUC:
     ) -> "RecipeModel":
         """Create a recipe in the database and return it."""
         if images:
+            from pyrecipe.services.images import process_image
+
             images = [process_image(IMAGEDIR.joinpath(image)) for image in images]
 
         recipe = self._driver.recipe_create(
@@ -65,18 +122,61 @@ class RecipeUC:
             notes=notes,
             images=images,
         )
+        if recipe:
+            self._index(recipe)
         return recipe
 
-    def find_recipes_by_tag(self, tags: List[str]) -> List["RecipeModel"]:
-        """Find recipes with the given tags."""
+    def create_recipes(
+        self, recipes: List[dict], chunk_size: Optional[int] = None
+    ) -> List["BulkResult"]:
+        """
+        Create many recipes in the database at once, i.e. when seeding or
+        importing a cookbook.  Each dict holds the create_recipe parameters.
+        Returns one BulkResult per recipe, in order, with its id or error.
+        The created recipes are indexed as the driver stored them.
+        """
+        recipes = [dict(recipe) for recipe in recipes]
+        for recipe in recipes:
+            if recipe.get("images"):
+                from pyrecipe.services.images import process_image
+
+                recipe["images"] = [
+                    process_image(IMAGEDIR.joinpath(image)) for image in recipe["images"]
+                ]
+        results = self._driver.recipe_create_many(recipes, chunk_size=chunk_size)
+        if self._indexes():
+            for result in results:
+                if result.recipe:
+                    self._index(result.recipe)
+        return results
+
+    def find_recipes_by_tag(self, tags: List[str], summary: bool = False) -> List["RecipeModel"]:
+        """Find recipes with the given tags, as RecipeSummary's if summary=True."""
+        if summary:
+            return self._driver.recipes_find_by_tag_summary(tags)
         recipes = self._driver.recipes_find_by_tag(tags)
         return recipes
 
+    def find_recipes_by_ingredient(
+        self, ingredients: List[str], summary: bool = False
+    ) -> List["RecipeModel"]:
+        """
+        Find the recipes having all of the given ingredients, matched by
+        their parsed names, as RecipeSummary's if summary=True.
+        """
+        if summary:
+            return self._driver.recipes_find_by_ingredient_summary(ingredients)
+        return self._driver.recipes_find_by_ingredient(ingredients)
+
     def get_tags(self) -> List[str]:
         """Get all the unique tags in the DB."""
         tags = self._driver.recipes_get_tags()
         return tags
 
+    def get_tag_counts(self) -> Dict[str, int]:
+        """Get the number of recipes having each tag, most used tags first."""
+        return self._driver.recipes_tag_counts()
+
     def edit_recipe(
         self,
         _id: str,
@@ -89,8 +189,12 @@ class RecipeUC:
         tags: List["tags"] = [],
         notes: List["notes"] = [],
         #images: List["filenames"] = [],
+        last_modified: "datetime.datetime" = None,
     ) -> "RecipeModel":
-        """Create a recipe in the database and return it."""
+        """
+        Edit a recipe in the database and return it.  Raises
+        RecipeConflictError if it was modified after last_modified.
+        """
         recipe = self._driver.recipe_edit(
             _id=_id,
             name=name,
@@ -100,20 +204,64 @@ class RecipeUC:
             ingredients=ingredients,
             directions=directions,
             tags=tags,
-            notes=notes
+            notes=notes,
             #images=images, #not implemented on edit yet
+            last_modified=last_modified,
         )
+        if recipe:
+            self._index(recipe)
         return recipe
 
     def delete_recipe(self, recipe_id: str) -> int:
         """Marks the recipe as deleted."""
-        return self._driver.recipe_delete(recipe_id)
+        result = self._driver.recipe_delete(recipe_id)
+        if result:
+            self._unindex(recipe_id)
+        return result
+
+    def recipes_search(
+        self, text: str, summary: bool = False, limit: Optional[int] = None, skip: int = 0
+    ) -> List["RecipeModel"]:
+        """
+        Return the recipes that match the supplied search string by name or
+        text, best match first, as RecipeSummary's if summary=True.
+        """
+        if self._search is None:
+            return self._driver.recipes_search_ranked(
+                text, limit=limit, skip=skip, summary=summary
+            )
+        hits = self._search.search(text, limit=limit, skip=skip, summary=summary)
+        if summary:
+            return hits
+        recipes = (self._driver.recipe_find_by_id(_id) for _id, _ in hits)
+        return [recipe for recipe in recipes if recipe and not recipe.deleted]
+
+    def autocomplete(self, prefix: str, limit: int = 5) -> Dict[str, list]:
+        """
+        Return up to limit recipe names, tags and ingredients having a word
+        starting with prefix, for search-as-you-type.  Without a suggester,
+        one is built from the active recipes first.
+        """
+        if self._suggester is None:
+            from pyrecipe.services.search import Suggester
+
+            self._suggester = Suggester.build(self._driver.recipes_active())
+        return self._suggester.suggest(prefix, limit=limit)
+
+    def recipes_cookable(
+        self, ingredients: List[str], missing: int = 0, limit: Optional[int] = None
+    ) -> List[Tuple["RecipeSummary", List[str]]]:
+        """
+        Return the recipes that can be made with the given ingredients, or
+        with at most missing more, as (RecipeSummary, missing ingredients),
+        fewest missing first.  Without a pantry index, one is built from the
+        active recipes first.
+        """
+        if self._pantry is None:
+            from pyrecipe.services.search import PantryIndex
 
-    def recipes_search(self, text: str) -> Optional["RecipeModel"]:
-        """Return a list of recipes that match the supplied search string."""
-        name_search = self._driver.recipes_find_by_name(text)
-        text_search = self._driver.recipes_search(text)
-        return name_search + text_search
+            self._pantry = PantryIndex.build(self._driver.recipes_active())
+        return self._pantry.cookable(ingredients, missing=missing, limit=limit)
 
     def export_recipe(self, recipe_id: str) -> pathlib.Path:
         """
@@ -134,11 +282,15 @@ class RecipeUC:
         if filepath.is_file():
             result = filepath
         else:
+            from pyrecipe.services import export
+
             result = export.export_to_pdf(recipe, filename)
 
         return result
 
     def import_recipe_from_url(self, url: str) -> "RecipeModel":
+        from pyrecipe.services.importer import import_from_url
+
         imported = import_from_url(url)
 
         if imported.get("images"):
@@ -147,13 +299,215 @@ class RecipeUC:
         print(imported)
         return self.create_recipe(**imported)
 
-    def _save_image(self, url: str) -> str:
+    @staticmethod
+    def _save_image(url: str) -> str:
         """
         Internal function used to temporarily download and save an image url
         from a recipe that is imported via url
         """
+        import requests
+
         img = requests.get(url)
         filename = str(uuid.uuid4()) + ".jpg"
         with open(str(IMAGEDIR.joinpath(filename)), "wb") as fin:
             fin.write(img.content)
         return filename
+
+
+async def _run_blocking(func, *args, **kwargs):
+    """Run a blocking (file or network) call in the loop's default executor."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+
+class AsyncRecipeUC:
+    """
+    Same use cases as RecipeUC for an async DB driver (MotorDriver), so an
+    async server can have many page loads waiting on the DB at once.  Image,
+    pdf and url work is blocking and runs in the default executor.
+
+    recipe = await AsyncRecipeUC(MotorDriver).find_recipe_by_id(recipe_id)
+    """
+
+    def __init__(self, db_driver):
+        self._driver = db_driver
+
+    async def get_all_recipes(self, deleted=None) -> List["RecipeModel"]:
+        """Get all recipes in database."""
+        if deleted == False:
+            return await self._driver.recipes_active()
+        elif deleted == True:
+            return await self._driver.recipes_deleted()
+        return await self._driver.recipes_all()
+
+    async def get_recipes_page(
+        self,
+        page_size: int = 20,
+        token: Optional[str] = None,
+        sort_by: str = "created_date",
+        tags: Optional[List[str]] = None,
+        deleted: bool = False,
+        summary: bool = False,
+    ) -> "PageModel":
+        """Get a single page of recipes, continuing from the given page token."""
+        return await self._driver.recipes_page(
+            page_size=page_size,
+            token=token,
+            sort_by=sort_by,
+            tags=tags,
+            deleted=deleted,
+            summary=summary,
+        )
+
+    async def find_recipe_by_id(self, recipe_id: str) -> Optional["RecipeModel"]:
+        """Get specific recipe by id in database."""
+        recipe = await self._driver.recipe_find_by_id(recipe_id)
+        if hasattr(recipe, "images") and recipe.images:
+            recipe.images = ["../../static/img/recipe_images/" + image for image in recipe.images]
+        return recipe
+
+    async def _process_images(self, images: List["filenames"]) -> List["filenames"]:
+        from pyrecipe.services.images import process_image
+
+        return [
+            await _run_blocking(process_image, IMAGEDIR.joinpath(image)) for image in images
+        ]
+
+    async def create_recipe(
+        self,
+        name: str,
+        prep_time: int,
+        cook_time: int,
+        servings: str,
+        ingredients: List["ingredients"],
+        directions: List["directions"],
+        tags: List["tags"] = [],
+        notes: List["notes"] = [],
+        images: List["filenames"] = [],
+    ) -> "RecipeModel":
+        """Create a recipe in the database and return it."""
+        if images:
+            images = await self._process_images(images)
+
+        return await self._driver.recipe_create(
+            name=name,
+            prep_time=prep_time,
+            cook_time=cook_time,
+            servings=servings,
+            ingredients=ingredients,
+            directions=directions,
+            tags=tags,
+            notes=notes,
+            images=images,
+        )
+
+    async def create_recipes(
+        self, recipes: List[dict], chunk_size: Optional[int] = None
+    ) -> List["BulkResult"]:
+        """Create many recipes in the database at once.  See RecipeUC.create_recipes."""
+        recipes = [dict(recipe) for recipe in recipes]
+        for recipe in recipes:
+            if recipe.get("images"):
+                recipe["images"] = await self._process_images(recipe["images"])
+        return await self._driver.recipe_create_many(recipes, chunk_size=chunk_size)
+
+    async def find_recipes_by_tag(
+        self, tags: List[str], summary: bool = False
+    ) -> List["RecipeModel"]:
+        """Find recipes with the given tags, as RecipeSummary's if summary=True."""
+        if summary:
+            return await self._driver.recipes_find_by_tag_summary(tags)
+        return await self._driver.recipes_find_by_tag(tags)
+
+    async def find_recipes_by_ingredient(
+        self, ingredients: List[str], summary: bool = False
+    ) -> List["RecipeModel"]:
+        """Find the recipes having all of the given ingredients.  See RecipeUC."""
+        if summary:
+            return await self._driver.recipes_find_by_ingredient_summary(ingredients)
+        return await self._driver.recipes_find_by_ingredient(ingredients)
+
+    async def get_tags(self) -> List[str]:
+        """Get all the unique tags in the DB."""
+        return await self._driver.recipes_get_tags()
+
+    async def get_tag_counts(self) -> Dict[str, int]:
+        """Get the number of recipes having each tag, most used tags first."""
+        return await self._driver.recipes_tag_counts()
+
+    async def edit_recipe(
+        self,
+        _id: str,
+        name: str,
+        prep_time: int,
+        cook_time: int,
+        servings: str,
+        ingredients: List["ingredients"],
+        directions: List["directions"],
+        tags: List["tags"] = [],
+        notes: List["notes"] = [],
+        last_modified: "datetime.datetime" = None,
+    ) -> "RecipeModel":
+        """
+        Edit a recipe in the database and return it.  Raises
+        RecipeConflictError if it was modified after last_modified.
+        """
+        return await self._driver.recipe_edit(
+            _id=_id,
+            name=name,
+            prep_time=prep_time,
+            cook_time=cook_time,
+            servings=servings,
+            ingredients=ingredients,
+            directions=directions,
+            tags=tags,
+            notes=notes,
+            last_modified=last_modified,
+        )
+
+    async def delete_recipe(self, recipe_id: str) -> int:
+        """Marks the recipe as deleted."""
+        return await self._driver.recipe_delete(recipe_id)
+
+    async def recipes_search(
+        self, text: str, summary: bool = False, limit: Optional[int] = None, skip: int = 0
+    ) -> List["RecipeModel"]:
+        """
+        Return the recipes that match the supplied search string by name or
+        text, best match first, as RecipeSummary's if summary=True.
+        """
+        return await self._driver.recipes_search_ranked(
+            text, limit=limit, skip=skip, summary=summary
+        )
+
+    async def export_recipe(self, recipe_id: str) -> pathlib.Path:
+        """
+        Export the given recipe to a pdf and return the filepath of the pdf,
+        reusing the previous export if the recipe wasn't modified since.
+        """
+        recipe = await self.find_recipe_by_id(recipe_id)
+
+        filename = recipe_id
+        filename += "_"
+        filename += datetime.datetime.strftime(recipe.last_modified_date, "%Y-%m-%d_%H-%M-%Sutc")
+        filename += ".pdf"
+
+        filepath = EXPORTDIR.joinpath(filename)
+
+        if filepath.is_file():
+            return filepath
+        from pyrecipe.services import export
+
+        return await _run_blocking(export.export_to_pdf, recipe, filename)
+
+    async def import_recipe_from_url(self, url: str) -> "RecipeModel":
+        from pyrecipe.services.importer import import_from_url
+
+        imported = await _run_blocking(import_from_url, url)
+
+        if imported.get("images"):
+            imported["images"] = [
+                await _run_blocking(RecipeUC._save_image, imported["images"])
+            ]
+
+        return await self.create_recipe(**imported)
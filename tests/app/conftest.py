@@ -1,11 +1,13 @@
 """Fixtures for the pyrecipe/app/views module."""
 
+import datetime
 import sys
 import os
 
 import pytest
 
 from pyrecipe.app import app as flask_app
+from pyrecipe.security import cookie_auth
 
 
 class TestUser:
@@ -25,6 +27,7 @@ class TestRecipe:
         self.notes = notes
         self.tags = tags
         self.images = []
+        self.last_modified_date = datetime.datetime(2020, 1, 1, 12, 30, 0, 123000)
         self.id = "12345"
         self._id = self.id
 
@@ -37,6 +40,13 @@ def testuser():
     yield _user
 
 
+@pytest.fixture(scope="function")
+def auth_cookie():
+    """Returns request headers carrying the auth cookie of a logged in user."""
+    cookie = cookie_auth.get_auth_cookie("12345", flask_app.config["SECRET_KEY"])
+    yield {"Cookie": "{}={}".format(flask_app.config["COOKIE_NAME"], cookie)}
+
+
 @pytest.fixture(scope="function")
 def testrecipe():
     """Returns a dummy recipe for testing."""
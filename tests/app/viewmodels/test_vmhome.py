@@ -6,6 +6,7 @@ import pytest
 
 from flask import Response
 
+from pyrecipe.app.helpers import request_dict
 from pyrecipe.usecases.account_uc import AccountUC
 from pyrecipe.app.viewmodels.home import AboutViewModel
 from pyrecipe.app.viewmodels.home import IndexViewModel
@@ -32,7 +33,7 @@ def test_idxvm_nouser(mocker):
     assert result["name"] == "Guest"
 
 
-def test_idxvm_withuser(mocker):
+def test_idxvm_withuser(mocker, auth_cookie):
     """
     GIVEN a logged in user
     WHEN a view request for /index is initiated
@@ -40,11 +41,12 @@ def test_idxvm_withuser(mocker):
     """
     target = mocker.patch.object(AccountUC, "find_user_by_id")
     target.return_value = USER("Dude")
-    with flask_app.test_request_context(path='/index', data=None):
+    with flask_app.test_request_context(path='/index', data=None, headers=auth_cookie):
         vm = IndexViewModel()
+        vm.validate()
+        result = vm.to_dict()
 
-    vm.validate()
-    result = vm.to_dict()
+    target.assert_called_once_with("12345")
     assert vm.error is None
     assert result["name"] == "Dude"
 
@@ -60,3 +62,40 @@ def test_aboutvm(mocker):
     with flask_app.test_request_context(path='/about', data=None):
         vm = AboutViewModel()
     assert isinstance(vm, AboutViewModel)
+
+
+def test_vm_user_found_once_per_request(mocker, auth_cookie):
+    """
+    GIVEN a logged in user
+    WHEN a request creates several viewmodels, and another request follows
+    THEN assert the user is looked up once per request
+    """
+    target = mocker.patch.object(AccountUC, "find_user_by_id")
+    target.return_value = USER("Dude")
+    with flask_app.test_request_context(path='/index', data=None, headers=auth_cookie):
+        vms = [IndexViewModel(), AboutViewModel()]
+        assert [vm.user.name for vm in vms] == ["Dude", "Dude"]
+    assert target.call_count == 1
+
+    with flask_app.test_request_context(path='/about', data=None, headers=auth_cookie):
+        AboutViewModel().to_dict()
+    assert target.call_count == 2
+
+
+def test_vm_lazy(mocker):
+    """
+    GIVEN an anonymous request
+    WHEN a viewmodel is created and rendered
+    THEN assert the request is only parsed when used, the DB is not queried,
+        and only template fields are rendered
+    """
+    target = mocker.patch.object(AccountUC, "find_user_by_id")
+    create = mocker.spy(request_dict, "create")
+    with flask_app.test_request_context(path='/about', data=None):
+        result = AboutViewModel().to_dict()
+        assert create.call_count == 0
+        assert IndexViewModel().page_token is None
+        assert create.call_count == 1
+
+    assert target.call_count == 0
+    assert result == {"error": None, "user_id": None, "user": None}
@@ -1,5 +1,9 @@
 """Tests for pyrecipe/app/viewmodels."""
 
+import datetime
+
+import pytest
+
 from flask import Response
 
 from pyrecipe.usecases.account_uc import AccountUC
@@ -9,6 +13,7 @@ from pyrecipe.app.viewmodels.recipe import EditViewModel
 from pyrecipe.app.viewmodels.recipe import RecipeViewModel
 from pyrecipe.app.viewmodels.recipe import DeleteViewModel
 from pyrecipe.app.viewmodels.recipe import SearchViewModel
+from pyrecipe.app.viewmodels.recipe import CookViewModel
 from pyrecipe.app import app as flask_app
 
 
@@ -66,6 +71,27 @@ def test_addvm(mocker):
     assert vm.cook_time == 30
     assert vm.prep_time == 2
     assert vm.recipe_url == ""
+    assert vm.last_modified is None
+
+
+def test_addvm_last_modified(mocker):
+    """
+    GIVEN an edit form posted to /recipe/edit/<recipe_id>
+    WHEN it carries the last_modified date the editor loaded
+    THEN assert it is parsed back into a datetime
+    """
+    userid_mock = mocker.patch.object(AccountUC, "find_user_by_id")
+    userid_mock.return_value = None
+    form_data = {"last_modified": "2020-01-01T12:30:00.123000"}
+    with flask_app.test_request_context(path="/recipe/edit/12345", data=form_data):
+        vm = AddViewModel()
+        assert vm.last_modified == datetime.datetime(2020, 1, 1, 12, 30, 0, 123000)
+
+    with flask_app.test_request_context(
+        path="/recipe/edit/12345", data={"last_modified": "garbage"}
+    ):
+        vm = AddViewModel()
+        assert vm.last_modified is None
 
 
 def test_editvm(mocker, testrecipe):
@@ -93,6 +119,7 @@ def test_editvm(mocker, testrecipe):
     assert edit_form["directions"] == "do this\ndo that\n"
     assert edit_form["notes"] == "sub igr3 for igr2\n"
     assert edit_form["tags"] == "t1\nt2\n"
+    assert edit_form["last_modified"] == "2020-01-01T12:30:00.123000"
     assert vm.error is None
 
 
@@ -127,3 +154,28 @@ def test_searchvm(mocker):
     vm.to_dict()
     assert vm.error is None
     assert vm.text == "oatmeal"
+
+
+@pytest.mark.parametrize(
+    "form_data, ingredients, missing",
+    [
+        ({}, [], 0),
+        ({"ingredients": "eggs, flour\n milk\n\n", "missing": "2"}, ["eggs", "flour", "milk"], 2),
+        ({"ingredients": "rice", "missing": "99"}, ["rice"], CookViewModel.MAX_MISSING),
+        ({"ingredients": "rice", "missing": "lots"}, ["rice"], 0),
+    ],
+)
+def test_cookvm(mocker, form_data, ingredients, missing):
+    """
+    GIVEN a request to /recipe/cook
+    WHEN a request is passed through the CookViewModel
+    THEN assert the ingredients are split and missing is bounded
+    """
+    userid_mock = mocker.patch.object(AccountUC, "find_user_by_id")
+    userid_mock.return_value = None
+    with flask_app.test_request_context(path="/recipe/cook", method="POST", data=form_data):
+        vm = CookViewModel()
+
+    assert vm.ingredients == ingredients
+    assert vm.missing == missing
+    assert vm.recipes is None
@@ -12,7 +12,7 @@ from pyrecipe.app.views import account_views
 
 #################### Index ##########################
 
-def test_index_loggedin(mocker):
+def test_index_loggedin(mocker, auth_cookie):
     """
     GIVEN user is already logged in
     WHEN user navigates to /account
@@ -21,7 +21,7 @@ def test_index_loggedin(mocker):
     acct = mocker.patch.object(AccountUC, "find_user_by_id")
     acct.return_value = "FOUND"
     idxvm = mocker.patch.object(IndexViewModel, "__call__")
-    with flask_app.test_request_context(path="/account", data=None):
+    with flask_app.test_request_context(path="/account", data=None, headers=auth_cookie):
         resp: Response = account_views.index()
     assert resp.location is None
 
@@ -3,6 +3,7 @@
 import pytest
 
 from flask import Response
+import werkzeug
 
 from pyrecipe.usecases.account_uc import AccountUC
 from pyrecipe.usecases.recipe_uc import RecipeUC
@@ -10,6 +11,8 @@ from pyrecipe.app import app as flask_app
 from pyrecipe.app.views import home_views
 from pyrecipe.app.viewmodels.home import IndexViewModel
 from pyrecipe.app.viewmodels.home import AboutViewModel
+from pyrecipe.errors import PageTokenError
+from pyrecipe.storage.shared import PageModel
 
 
 def test_indexview(mocker):
@@ -19,13 +22,46 @@ def test_indexview(mocker):
     THEN assert no errors
     """
     acct = mocker.patch.object(AccountUC, "find_user_by_id")
-    recipes = mocker.patch.object(RecipeUC, "get_all_recipes")
+    recipes = mocker.patch.object(RecipeUC, "get_recipes_page")
     tags = mocker.patch.object(RecipeUC, "get_tags")
     idxvm = mocker.patch.object(IndexViewModel, "__call__")
 
     with flask_app.test_request_context(path="/index", data=None):
         resp: Response = home_views.index()
     assert resp.location is None
+    assert recipes.call_args[1]["token"] is None
+
+
+def test_indexview_nextpage(mocker):
+    """
+    GIVEN a running app
+    WHEN a view is requested for /index with a page token
+    THEN assert the token is passed on and the next page is linked
+    """
+    acct = mocker.patch.object(AccountUC, "find_user_by_id")
+    recipes = mocker.patch.object(RecipeUC, "get_recipes_page")
+    recipes.return_value = PageModel(items=[], next_token="nexttoken")
+    tags = mocker.patch.object(RecipeUC, "get_tags")
+
+    with flask_app.test_request_context(path="/index?page=sometoken", data=None):
+        resp: Response = home_views.index()
+    assert recipes.call_args[1]["token"] == "sometoken"
+    assert resp.model["next_url"] == "/index?page=nexttoken"
+
+
+def test_indexview_badpage(mocker):
+    """
+    GIVEN a running app
+    WHEN a view is requested for /index with a tampered page token
+    THEN assert a 400 BadRequest error is thrown
+    """
+    acct = mocker.patch.object(AccountUC, "find_user_by_id")
+    recipes = mocker.patch.object(RecipeUC, "get_recipes_page")
+    recipes.side_effect = PageTokenError("bad")
+
+    with pytest.raises(werkzeug.exceptions.BadRequest):
+        with flask_app.test_request_context(path="/index?page=bad", data=None):
+            resp: Response = home_views.index()
 
 
 def test_aboutview(mocker):
@@ -1,5 +1,7 @@
 """Tests for pyrecipe/app/views."""
 
+import datetime
+
 import pytest
 
 import flask
@@ -14,6 +16,10 @@ from pyrecipe.app.viewmodels.recipe import EditViewModel
 from pyrecipe.app.viewmodels.recipe import DeleteViewModel
 from pyrecipe.app.viewmodels.recipe import SearchViewModel
 from pyrecipe.app import app as flask_app
+from pyrecipe.app.helpers import search_engine
+from pyrecipe.errors import PageTokenError
+from pyrecipe.errors import RecipeConflictError
+from pyrecipe.storage.shared.page_model import PageModel
 from pyrecipe.app.views import recipe_views
 
 
@@ -74,7 +80,7 @@ def test_recipe_view_Notfound(mocker):
 
 #################### Recipe Adding ###########################################
 
-def test_recipe_add_get_loggedin(mocker):
+def test_recipe_add_get_loggedin(mocker, auth_cookie):
     """
     GIVEN a logged-in user
     WHEN navigating to /recipe/add
@@ -83,7 +89,7 @@ def test_recipe_add_get_loggedin(mocker):
     find = mocker.patch.object(AccountUC, "find_user_by_id")
     find.return_value = "FOUND"
     vm = mocker.patch.object(AddViewModel, "__call__")
-    with flask_app.test_request_context(path="/recipe/add", data=None):
+    with flask_app.test_request_context(path="/recipe/add", data=None, headers=auth_cookie):
         resp: Response = recipe_views.recipe_add_get()
     assert resp.location is None
 
@@ -128,7 +134,7 @@ def test_recipe_add_post_loggedout(mocker):
     assert resp.location in ("/login", "/account/login")
 
 
-def test_recipe_add_post_loggedin_created(mocker, testrecipe):
+def test_recipe_add_post_loggedin_created(mocker, testrecipe, auth_cookie):
     """
     GIVEN a logged-in user
     WHEN posting to /recipe/add
@@ -149,12 +155,12 @@ def test_recipe_add_post_loggedin_created(mocker, testrecipe):
     vm = mocker.patch.object(AddViewModel, "__call__")
     rec = mocker.patch.object(RecipeUC, "create_recipe")
     rec.return_value = testrecipe(**rec_data)
-    with flask_app.test_request_context(path="/recipe/add", data=rec_data):
+    with flask_app.test_request_context(path="/recipe/add", data=rec_data, headers=auth_cookie):
         resp: Response = recipe_views.recipe_add_post()
     assert resp.location in "/recipe/view/12345"
 
 
-def test_recipe_add_post_loggedin_Notcreated(mocker, testrecipe):
+def test_recipe_add_post_loggedin_Notcreated(mocker, testrecipe, auth_cookie):
     """
     GIVEN a logged-in user
     WHEN posting to /recipe/add but recipe is not created in DB
@@ -175,12 +181,12 @@ def test_recipe_add_post_loggedin_Notcreated(mocker, testrecipe):
     vm = mocker.patch.object(AddViewModel, "__call__")
     rec = mocker.patch.object(RecipeUC, "create_recipe")
     rec.return_value = None
-    with flask_app.test_request_context(path="/recipe/add", data=rec_data):
+    with flask_app.test_request_context(path="/recipe/add", data=rec_data, headers=auth_cookie):
         resp: Response = recipe_views.recipe_add_post()
     assert resp.location is None
 
 
-def test_recipe_add_post_urlimport(mocker, testrecipe):
+def test_recipe_add_post_urlimport(mocker, testrecipe, auth_cookie):
     """
     GIVEN a logged-in user
     WHEN importing a recipe via the url form
@@ -205,14 +211,14 @@ def test_recipe_add_post_urlimport(mocker, testrecipe):
     vm = mocker.patch.object(AddViewModel, "__call__")
     import_mock = mocker.patch.object(RecipeUC, "import_recipe_from_url")
     import_mock.return_value = testrecipe(**other_data)
-    with flask_app.test_request_context(path="/recipe/add", data=rec_data):
+    with flask_app.test_request_context(path="/recipe/add", data=rec_data, headers=auth_cookie):
         resp: Response = recipe_views.recipe_add_post()
     assert resp.location in "/recipe/view/12345"
 
 
 #################### Recipe Editing ##########################################
 
-def test_recipe_edit_get_loggedin(mocker):
+def test_recipe_edit_get_loggedin(mocker, auth_cookie):
     """
     GIVEN a logged-in user
     THEN navigating to /recipe/edit/<recipe_id>
@@ -222,7 +228,7 @@ def test_recipe_edit_get_loggedin(mocker):
     find.return_value = "FOUND"
     vm = mocker.patch.object(EditViewModel, "__call__")
     rec = mocker.patch.object(RecipeUC, "find_recipe_by_id")
-    with flask_app.test_request_context(path="/recipe/edit/<recipe_id>", data=None):
+    with flask_app.test_request_context(path="/recipe/edit/<recipe_id>", data=None, headers=auth_cookie):
         resp: Response = recipe_views.recipe_edit_get("12345")
     assert resp.location is None
 
@@ -241,7 +247,7 @@ def test_recipe_edit_get_loggedout(mocker):
     assert resp.location in ("/account/login", "/login")
 
 
-def test_recipe_edit_post_loggedin(mocker, testrecipe):
+def test_recipe_edit_post_loggedin(mocker, testrecipe, auth_cookie):
     """
     GIVEN a logged-in user
     WHEN posting to /recipe/edit/<recipe_id>
@@ -262,11 +268,38 @@ def test_recipe_edit_post_loggedin(mocker, testrecipe):
     vm = mocker.patch.object(AddViewModel, "__call__")
     rec = mocker.patch.object(RecipeUC, "edit_recipe")
     rec.return_value = testrecipe(**rec_data)
-    with flask_app.test_request_context(path="/recipe/add", data=rec_data):
+    with flask_app.test_request_context(path="/recipe/add", data=rec_data, headers=auth_cookie):
         resp: Response = recipe_views.recipe_edit_post("12345")
     assert resp.location in "/recipe/view/12345"
 
 
+def test_recipe_edit_post_conflict(mocker, auth_cookie):
+    """
+    GIVEN a logged-in user editing a recipe someone else just edited
+    WHEN posting to /recipe/edit/<recipe_id>
+    THEN assert redirected back to the edit page to review their changes
+    """
+    rec_data = {
+        "name": "test recipe",
+        "prep_time": "5",
+        "cook_time": "5",
+        "servings": "1",
+        "ingredients": ["garlic", "onion"],
+        "directions": ["cook"],
+        "notes": ["this is a test"],
+        "tags": ["test"],
+        "last_modified": "2020-01-01T00:00:00",
+    }
+    find = mocker.patch.object(AccountUC, "find_user_by_id")
+    find.return_value = "FOUND"
+    rec = mocker.patch.object(RecipeUC, "edit_recipe")
+    rec.side_effect = RecipeConflictError("12345")
+    with flask_app.test_request_context(path="/recipe/edit/12345", data=rec_data, headers=auth_cookie):
+        resp: Response = recipe_views.recipe_edit_post("12345")
+    assert resp.location == "/recipe/edit/12345"
+    assert rec.call_args[1]["last_modified"] == datetime.datetime(2020, 1, 1)
+
+
 def test_recipe_edit_post_loggedout(mocker):
     """
     GIVEN a logged-out or unregistered user
@@ -295,7 +328,7 @@ def test_recipe_edit_post_loggedout(mocker):
 
 #################### Recipe Deleting #########################################
 
-def test_recipe_delete_get_loggedin_goodrecipeID(mocker):
+def test_recipe_delete_get_loggedin_goodrecipeID(mocker, auth_cookie):
     """
     GIVEN a logged-in user
     THEN navigating to /recipe/delete/<recipe_id>
@@ -306,13 +339,13 @@ def test_recipe_delete_get_loggedin_goodrecipeID(mocker):
     vm = mocker.patch.object(DeleteViewModel, "__call__")
     rec = mocker.patch.object(RecipeUC, "find_recipe_by_id")
     rec.return_value = "FOUND"
-    with flask_app.test_request_context(path="/recipe/delete/<recipe_id>", data=None):
+    with flask_app.test_request_context(path="/recipe/delete/<recipe_id>", data=None, headers=auth_cookie):
         resp: Response = recipe_views.recipe_delete_get("12345")
     assert resp.location is None
     #assert vm.error is None
 
 
-def test_recipe_delete_get_loggedin_badrecipeID(mocker):
+def test_recipe_delete_get_loggedin_badrecipeID(mocker, auth_cookie):
     """
     GIVEN a logged-in user
     THEN navigating to /recipe/delete/<recipe_id>
@@ -323,7 +356,7 @@ def test_recipe_delete_get_loggedin_badrecipeID(mocker):
     vm = mocker.patch.object(DeleteViewModel, "__call__")
     rec = mocker.patch.object(RecipeUC, "find_recipe_by_id")
     rec.return_value = None
-    with flask_app.test_request_context(path="/recipe/delete/<recipe_id>", data=None):
+    with flask_app.test_request_context(path="/recipe/delete/<recipe_id>", data=None, headers=auth_cookie):
         resp: Response = recipe_views.recipe_delete_get("12345")
     assert resp.location is None
     #assert vm.error == "Recipe Not Found"
@@ -345,7 +378,7 @@ def test_recipe_delete_get_loggedout(mocker):
     assert resp.location in ("/account/login", "/login")
 
 
-def test_recipe_delete_post_loggedin(mocker):
+def test_recipe_delete_post_loggedin(mocker, auth_cookie):
     """
     GIVEN a logged-in user
     WHEN navigating to to /recipe/delete/<recipe_id>
@@ -355,11 +388,12 @@ def test_recipe_delete_post_loggedin(mocker):
     find.return_value = "FOUND"
     vm = mocker.patch.object(DeleteViewModel, "__call__")
     res = mocker.patch.object(RecipeUC, "delete_recipe")
-    rec = mocker.patch.object(RecipeUC, "get_all_recipes")
+    rec = mocker.patch.object(RecipeUC, "get_recipes_page")
     tags = mocker.patch.object(RecipeUC, "get_tags")
-    with flask_app.test_request_context(path="/recipe/delete/<recipe_id>", data=None):
+    with flask_app.test_request_context(path="/recipe/delete/<recipe_id>", data=None, headers=auth_cookie):
         resp: Response = recipe_views.recipe_delete_post("12345")
     assert resp.location is None
+    assert rec.call_count == 1
 
 
 def test_recipe_delete_post_loggedout(mocker):
@@ -390,7 +424,7 @@ def test_recipe_search_empty(mocker):
     find.return_value = None
     vm = mocker.patch.object(SearchViewModel, "__call__")
     vm.text = None
-    rec_all = mocker.patch.object(RecipeUC, "get_all_recipes")
+    rec_all = mocker.patch.object(RecipeUC, "get_recipes_page")
     rec_search = mocker.patch.object(RecipeUC, "recipes_search")
     rec_tags = mocker.patch.object(RecipeUC, "get_tags")
 
@@ -411,7 +445,7 @@ def test_recipe_search_notempty(mocker):
     find.return_value = None
     vm = mocker.patch.object(SearchViewModel, "__call__")
     vm.text = "oatmeal"
-    rec_all = mocker.patch.object(RecipeUC, "get_all_recipes")
+    rec_all = mocker.patch.object(RecipeUC, "get_recipes_page")
     rec_search = mocker.patch.object(RecipeUC, "recipes_search")
     rec_tags = mocker.patch.object(RecipeUC, "get_tags")
 
@@ -423,6 +457,292 @@ def test_recipe_search_notempty(mocker):
     assert rec_tags.call_count == 1
 
 
+@pytest.mark.parametrize(
+    "page, found, skip, next_page",
+    [(None, 25, 0, 2), ("2", 25, 24, 3), ("3", 24, 48, None)],
+)
+def test_recipe_search_paginated(mocker, page, found, skip, next_page):
+    """
+    GIVEN a text search with more matches than fit on a page
+    WHEN requesting a page of it by number
+    THEN assert a page is searched for (and one more recipe, to tell if
+        there is a next page), and the next page's url is returned
+    """
+    find = mocker.patch.object(AccountUC, "find_user_by_id")
+    find.return_value = None
+    rec_search = mocker.patch.object(RecipeUC, "recipes_search")
+    rec_search.return_value = list(range(found))
+    mocker.patch.object(RecipeUC, "get_tags")
+    mocker.patch.object(recipe_views, "_indexed_uc", lambda: RecipeUC(None))
+    mocker.patch.dict(flask_app.config, {"PAGE_SIZE": 24})
+
+    query = "?page=" + page if page else ""
+    with flask_app.test_request_context(path="/recipe/search/oatmeal" + query):
+        vm = recipe_views.recipes_search.__wrapped__("oatmeal")
+    assert rec_search.call_args[1] == {"summary": True, "limit": 25, "skip": skip}
+    assert vm["recipes"] == list(range(24))
+    if next_page:
+        assert vm["next_url"] == "/recipe/search/oatmeal?page={}".format(next_page)
+    else:
+        assert vm["next_url"] is None
+
+
+@pytest.mark.parametrize("page", ["0", "two", "-1"])
+def test_recipe_search_badpage(mocker, page):
+    """
+    GIVEN a user navigates to /recipe/search/<text> with a page that is not a number
+    WHEN the search text is not empty
+    THEN assert a 400 BadRequest error is thrown
+    """
+    find = mocker.patch.object(AccountUC, "find_user_by_id")
+    find.return_value = None
+    rec_search = mocker.patch.object(RecipeUC, "recipes_search")
+    mocker.patch.object(recipe_views, "_indexed_uc", lambda: RecipeUC(None))
+    with pytest.raises(werkzeug.exceptions.BadRequest):
+        with flask_app.test_request_context(path="/recipe/search/oatmeal?page=" + page):
+            recipe_views.recipes_search("oatmeal")
+    assert rec_search.call_count == 0
+
+
+def test_recipe_search_engine(mocker, tmp_path):
+    """
+    GIVEN the SEARCH_INDEX config names a missing index file
+    WHEN searching twice
+    THEN assert the index is built from the DB once, saved, and searched by the use case
+    """
+    find = mocker.patch.object(AccountUC, "find_user_by_id")
+    find.return_value = None
+    driver = mocker.Mock()
+    driver.recipes_active.return_value = [{"_id": "1", "name": "oatmeal", "cook_time": 5}]
+    driver.recipes_generation.return_value = 7
+    path = tmp_path / "recipes.idx"
+    mocker.patch.dict(
+        flask_app.config, {"DB_DRIVER": driver, "SEARCH_INDEX": str(path), "SEARCH_ENGINE": None}
+    )
+    mocker.patch.object(search_engine, "GENERATION_CHECK_MS", 0)
+    rec_tags = mocker.patch.object(RecipeUC, "get_tags")
+
+    for _ in range(2):
+        with flask_app.test_request_context(path="/recipe/search/oatmeal"):
+            resp: Response = recipe_views.recipes_search("oatmeal")
+    assert path.is_file()
+    assert driver.recipes_active.call_count == 1
+    assert flask_app.config["SEARCH_ENGINE"].index._mmap is not None
+    assert flask_app.config["SEARCH_ENGINE"].index.generation == 7
+    assert driver.recipes_search_ranked.call_count == 0
+    assert b"oatmeal" in resp.data
+
+
+def test_recipe_search_engine_generation(mocker, tmp_path):
+    """
+    GIVEN a search index file built before recipes were written
+    WHEN another worker writes a recipe, moving the recipes generation
+    THEN assert the stale index is rebuilt from the DB, finds the new
+        recipe, and is saved back to the file to be mapped again
+    """
+    from pyrecipe.services.search import SearchEngine
+
+    find = mocker.patch.object(AccountUC, "find_user_by_id")
+    find.return_value = None
+    driver = mocker.Mock()
+    driver.recipes_active.return_value = [{"_id": "1", "name": "oatmeal", "cook_time": 5}]
+    driver.recipes_generation.return_value = 1
+    driver.recipes_generation_is_own.return_value = False
+    path = tmp_path / "recipes.idx"
+    search_engine.build(str(path), driver)
+    driver.recipes_active.return_value.append({"_id": "2", "name": "porridge", "cook_time": 5})
+    driver.recipes_generation.return_value = 2
+    mocker.patch.dict(
+        flask_app.config, {"DB_DRIVER": driver, "SEARCH_INDEX": str(path), "SEARCH_ENGINE": None}
+    )
+    mocker.patch.object(search_engine, "GENERATION_CHECK_MS", 0)
+    rec_tags = mocker.patch.object(RecipeUC, "get_tags")
+
+    with flask_app.test_request_context(path="/recipe/search/porridge"):
+        resp: Response = recipe_views.recipes_search("porridge")
+    assert b"porridge" in resp.data
+    assert flask_app.config["SEARCH_ENGINE"].index.generation == 2
+    assert flask_app.config["SEARCH_ENGINE"].index._mmap is not None
+    assert SearchEngine.load(str(path)).index.generation == 2
+
+    driver.recipes_active.return_value.append({"_id": "3", "name": "granola", "cook_time": 5})
+    with flask_app.test_request_context(path="/recipe/search/granola"):
+        resp: Response = recipe_views.recipes_search("granola")
+    assert b"granola" not in resp.data
+    driver.recipes_generation.return_value = 3
+    with flask_app.test_request_context(path="/recipe/search/granola"):
+        resp: Response = recipe_views.recipes_search("granola")
+    assert b"granola" in resp.data
+    assert driver.recipes_active.call_count == 3
+    assert SearchEngine.load(str(path)).index.generation == 3
+
+
+def test_recipe_search_engine_own_write(mocker, tmp_path):
+    """
+    GIVEN a loaded search engine
+    WHEN this worker creates a recipe, moving the recipes generation
+    THEN assert the engine indexed it in place and is kept, not rebuilt
+    """
+    driver = mocker.Mock()
+    driver.recipes_active.return_value = [{"_id": "1", "name": "oatmeal", "cook_time": 5}]
+    driver.recipes_generation.return_value = 1
+    driver.recipes_generation_is_own.return_value = True
+    driver.recipe_create.return_value = {"_id": "2", "name": "porridge", "cook_time": 5}
+    path = tmp_path / "recipes.idx"
+    mocker.patch.dict(
+        flask_app.config, {"DB_DRIVER": driver, "SEARCH_INDEX": str(path), "SEARCH_ENGINE": None}
+    )
+    mocker.patch.object(search_engine, "GENERATION_CHECK_MS", 0)
+
+    with flask_app.test_request_context():
+        engine = search_engine.get()
+        RecipeUC(driver, search_engine=engine).create_recipe(
+            "porridge", 1, 5, "1", ["oats"], ["cook"]
+        )
+        driver.recipes_generation.return_value = 2
+        assert search_engine.get() is engine
+        assert flask_app.config["SEARCH_BUILT"]["SEARCH_ENGINE"] == 2
+        assert engine.search("porridge")[0][0] == "2"
+    driver.recipes_generation_is_own.assert_called_with(1, 2)
+    assert driver.recipes_active.call_count == 1
+
+
+def test_recipe_search_engine_saved_by_other_worker(mocker, tmp_path):
+    """
+    GIVEN a loaded search engine
+    WHEN another worker wrote a recipe and already saved a rebuilt index
+    THEN assert its file is mapped instead of rebuilding the index again
+    """
+    driver = mocker.Mock()
+    driver.recipes_active.return_value = [{"_id": "1", "name": "oatmeal", "cook_time": 5}]
+    driver.recipes_generation.return_value = 1
+    driver.recipes_generation_is_own.return_value = False
+    path = tmp_path / "recipes.idx"
+    mocker.patch.dict(
+        flask_app.config, {"DB_DRIVER": driver, "SEARCH_INDEX": str(path), "SEARCH_ENGINE": None}
+    )
+    mocker.patch.object(search_engine, "GENERATION_CHECK_MS", 0)
+
+    with flask_app.test_request_context():
+        search_engine.get()
+        driver.recipes_active.return_value.append({"_id": "2", "name": "porridge"})
+        driver.recipes_generation.return_value = 2
+        search_engine.build(str(path), driver)
+        engine = search_engine.get()
+    assert engine.index._mmap is not None
+    assert engine.search("porridge")[0][0] == "2"
+    assert driver.recipes_active.call_count == 2
+
+
+def test_recipe_search_empty_badpage(mocker):
+    """
+    GIVEN a user navigates to /recipe/search/ with a tampered page token
+    WHEN the search text is empty
+    THEN assert a 400 BadRequest error is thrown
+    """
+    find = mocker.patch.object(AccountUC, "find_user_by_id")
+    find.return_value = None
+    rec_all = mocker.patch.object(RecipeUC, "get_recipes_page")
+    rec_all.side_effect = PageTokenError("bad")
+    with pytest.raises(werkzeug.exceptions.BadRequest):
+        with flask_app.test_request_context(path="/recipe/search/?page=bad", data=None):
+            resp: Response = recipe_views.recipes_search()
+
+
+def test_recipes_cookable(mocker):
+    """
+    GIVEN a user navigates to /recipe/cook
+    WHEN no ingredients, then some ingredients, are submitted
+    THEN assert the pantry index is only built and asked once there are ingredients
+    """
+    find = mocker.patch.object(AccountUC, "find_user_by_id")
+    find.return_value = None
+    driver = mocker.Mock()
+    driver.recipes_active.return_value = [
+        {"_id": "1", "name": "Pancakes", "ingredients": ["2 eggs", "flour", "1 cup milk"]},
+        {"_id": "2", "name": "Omelette", "ingredients": ["3 eggs", "cheese"]},
+    ]
+    driver.recipes_generation.return_value = 1
+    mocker.patch.dict(flask_app.config, {"DB_DRIVER": driver, "PANTRY": None})
+    mocker.patch.object(search_engine, "GENERATION_CHECK_MS", 0)
+
+    with flask_app.test_request_context(path="/recipe/cook", method="GET"):
+        resp: Response = recipe_views.recipes_cookable()
+    assert driver.recipes_active.call_count == 0
+    assert b"No recipes found" not in resp.data
+
+    form_data = {"ingredients": "eggs, flour", "missing": "1"}
+    with flask_app.test_request_context(path="/recipe/cook", method="POST", data=form_data):
+        resp: Response = recipe_views.recipes_cookable()
+    assert driver.recipes_active.call_count == 1
+    assert b"Pancakes" in resp.data
+    assert b"Missing: milk" in resp.data
+    assert b"Omelette" in resp.data
+
+
+def test_recipes_cookable_generation(mocker):
+    """
+    GIVEN a built pantry index
+    WHEN another worker writes a recipe, moving the recipes generation
+    THEN assert the pantry index is rebuilt from the DB and finds the new recipe
+    """
+    find = mocker.patch.object(AccountUC, "find_user_by_id")
+    find.return_value = None
+    driver = mocker.Mock()
+    driver.recipes_active.return_value = [
+        {"_id": "1", "name": "Pancakes", "ingredients": ["2 eggs", "flour"]},
+    ]
+    driver.recipes_generation.return_value = 1
+    driver.recipes_generation_is_own.return_value = False
+    mocker.patch.dict(flask_app.config, {"DB_DRIVER": driver, "PANTRY": None})
+    mocker.patch.object(search_engine, "GENERATION_CHECK_MS", 0)
+
+    form_data = {"ingredients": "eggs, flour"}
+    with flask_app.test_request_context(path="/recipe/cook", method="POST", data=form_data):
+        recipe_views.recipes_cookable()
+    driver.recipes_active.return_value.append(
+        {"_id": "2", "name": "Crepes", "ingredients": ["1 egg", "flour"]}
+    )
+    driver.recipes_generation.return_value = 2
+    with flask_app.test_request_context(path="/recipe/cook", method="POST", data=form_data):
+        resp: Response = recipe_views.recipes_cookable()
+    assert b"Crepes" in resp.data
+    assert driver.recipes_active.call_count == 2
+
+
+def test_recipes_cookable_own_write(mocker):
+    """
+    GIVEN a built pantry index
+    WHEN this worker deletes a recipe, moving the recipes generation
+    THEN assert the pantry index removed it in place and is kept, not rebuilt
+    """
+    find = mocker.patch.object(AccountUC, "find_user_by_id")
+    find.return_value = None
+    driver = mocker.Mock()
+    driver.recipes_active.return_value = [
+        {"_id": "1", "name": "Pancakes", "ingredients": ["2 eggs", "flour"]},
+        {"_id": "2", "name": "Crepes", "ingredients": ["1 egg", "flour"]},
+    ]
+    driver.recipes_generation.return_value = 1
+    driver.recipes_generation_is_own.return_value = True
+    driver.recipe_delete.return_value = 1
+    mocker.patch.dict(flask_app.config, {"DB_DRIVER": driver, "PANTRY": None})
+    mocker.patch.object(search_engine, "GENERATION_CHECK_MS", 0)
+
+    form_data = {"ingredients": "eggs, flour"}
+    with flask_app.test_request_context(path="/recipe/cook", method="POST", data=form_data):
+        recipe_views.recipes_cookable()
+        pantry = search_engine.pantry(build=False)
+        RecipeUC(driver, pantry=pantry).delete_recipe("2")
+    driver.recipes_generation.return_value = 2
+    with flask_app.test_request_context(path="/recipe/cook", method="POST", data=form_data):
+        resp: Response = recipe_views.recipes_cookable()
+        assert search_engine.pantry(build=False) is pantry
+    assert b"Pancakes" in resp.data
+    assert b"Crepes" not in resp.data
+    assert driver.recipes_active.call_count == 1
+
+
 #################### Recipes with... #########################################
 
 def test_recipes_with_tags(mocker, testrecipe):
@@ -431,13 +751,47 @@ def test_recipes_with_tags(mocker, testrecipe):
     WHEN navigating to /recipe/tag/<tags>
     THEN assert no errors
     """
-    rec = mocker.patch.object(RecipeUC, "find_recipes_by_tag")
-    rec.return_value = None
+    rec = mocker.patch.object(RecipeUC, "get_recipes_page")
+    rec.return_value = PageModel(items=[])
     with flask_app.test_request_context(path="/recipe/tag/<tags>", data=None):
         resp: Response = recipe_views.recipes_with_tags("test")
     assert resp.status_code == 200
 
 
+def test_recipes_with_tags_paginated(mocker):
+    """
+    GIVEN more recipes with a tag than fit on a page
+    WHEN navigating to /recipe/tag/<tags>, then to the next page
+    THEN assert a page of the tag's recipes is returned with the next page's url
+    """
+    rec = mocker.patch.object(RecipeUC, "get_recipes_page")
+    rec.return_value = PageModel(items=[], next_token="abc")
+    mocker.patch.dict(flask_app.config, {"PAGE_SIZE": 24})
+    with flask_app.test_request_context(path="/recipe/tag/test"):
+        vm = recipe_views.recipes_with_tags.__wrapped__("test")
+    assert rec.call_args[1] == {"page_size": 24, "token": None, "tags": ["test"], "summary": True}
+    assert vm["next_url"] == "/recipe/tag/test?page=abc"
+
+    rec.return_value = PageModel(items=[])
+    with flask_app.test_request_context(path="/recipe/tag/test?page=abc"):
+        vm = recipe_views.recipes_with_tags.__wrapped__("test")
+    assert rec.call_args[1]["token"] == "abc"
+    assert vm["next_url"] is None
+
+
+def test_recipes_with_tags_badpage(mocker):
+    """
+    GIVEN a user navigates to /recipe/tag/<tags> with a tampered page token
+    WHEN the page is requested
+    THEN assert a 400 BadRequest error is thrown
+    """
+    rec = mocker.patch.object(RecipeUC, "get_recipes_page")
+    rec.side_effect = PageTokenError("bad")
+    with pytest.raises(werkzeug.exceptions.BadRequest):
+        with flask_app.test_request_context(path="/recipe/tag/test?page=bad"):
+            recipe_views.recipes_with_tags("test")
+
+
 def test_recipes_deleted(mocker):
     """
     GIVEN recipes in the DB and a logged-in user
@@ -486,7 +840,7 @@ def test_recipes_random(mocker):
 
 #################### Recipes Exporting #######################################
 
-def test_recipe_export_loggedin(mocker):
+def test_recipe_export_loggedin(mocker, auth_cookie):
     """
     GIVEN a recipe in the DB
     WHEN a logged-in user requests to export the recipe
@@ -498,7 +852,7 @@ def test_recipe_export_loggedin(mocker):
     uc_mock = mocker.patch.object(RecipeUC, "export_recipe")
     sendfile_mock = mocker.patch.object(flask, "send_file")
     redirect_mock = mocker.patch.object(flask, "redirect")
-    with flask_app.test_request_context(path="/recipe/export/<recipe_id>", data=None):
+    with flask_app.test_request_context(path="/recipe/export/<recipe_id>", data=None, headers=auth_cookie):
         resp: Response = recipe_views.recipe_export("12345")
     assert redirect_mock.call_count == 0
     assert sendfile_mock.call_count == 1
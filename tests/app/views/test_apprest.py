@@ -3,9 +3,12 @@
 import pytest
 
 from flask import Response
+import werkzeug
 
 from pyrecipe.app import app as flask_app
+from pyrecipe.app.helpers import search_engine
 from pyrecipe.app.views import rest_views
+from pyrecipe.usecases.recipe_uc import RecipeUC
 
 
 def test_index():
@@ -17,3 +20,96 @@ def test_index():
     with flask_app.test_request_context(path="/rest", data=None):
         resp: Response = rest_views.index()
     assert resp == {"alive": True}
+
+
+def test_autocomplete(mocker):
+    """
+    GIVEN a running app
+    WHEN /rest/autocomplete is requested for a prefix
+    THEN assert the suggestions are returned, built from the DB once, and limit is capped
+    """
+    driver = mocker.Mock()
+    driver.recipes_active.return_value = [
+        {"_id": "1", "name": "Garlic Bread", "tags": ["bread"], "ingredients": ["garlic"]}
+    ]
+    driver.recipes_generation.return_value = 1
+    mocker.patch.dict(flask_app.config, {"DB_DRIVER": driver, "SUGGESTER": None})
+    mocker.patch.object(search_engine, "GENERATION_CHECK_MS", 0)
+
+    with flask_app.test_request_context(path="/rest/autocomplete?q=gar"):
+        resp = rest_views.autocomplete()
+    assert resp == {
+        "prefix": "gar",
+        "names": [{"_id": "1", "name": "Garlic Bread"}],
+        "tags": [],
+        "ingredients": ["garlic"],
+    }
+
+    suggest = mocker.spy(flask_app.config["SUGGESTER"], "suggest")
+    with flask_app.test_request_context(path="/rest/autocomplete?q=b&limit=1000"):
+        resp = rest_views.autocomplete()
+    assert resp["tags"] == ["bread"]
+    assert suggest.call_args[1]["limit"] == rest_views.AUTOCOMPLETE_MAX
+    assert driver.recipes_active.call_count == 1
+
+
+def test_autocomplete_generation(mocker):
+    """
+    GIVEN a built suggester
+    WHEN another worker writes a recipe, moving the recipes generation
+    THEN assert the suggester is rebuilt from the DB and suggests the new recipe
+    """
+    driver = mocker.Mock()
+    driver.recipes_active.return_value = [{"_id": "1", "name": "Garlic Bread"}]
+    driver.recipes_generation.return_value = 1
+    driver.recipes_generation_is_own.return_value = False
+    mocker.patch.dict(flask_app.config, {"DB_DRIVER": driver, "SUGGESTER": None})
+    mocker.patch.object(search_engine, "GENERATION_CHECK_MS", 0)
+
+    with flask_app.test_request_context(path="/rest/autocomplete?q=gar"):
+        rest_views.autocomplete()
+    driver.recipes_active.return_value.append({"_id": "2", "name": "Garden Salad"})
+    driver.recipes_generation.return_value = 2
+    with flask_app.test_request_context(path="/rest/autocomplete?q=gar"):
+        resp = rest_views.autocomplete()
+    assert [n["name"] for n in resp["names"]] == ["Garden Salad", "Garlic Bread"]
+    assert driver.recipes_active.call_count == 2
+
+
+def test_autocomplete_own_write(mocker):
+    """
+    GIVEN a built suggester
+    WHEN this worker creates a recipe, moving the recipes generation
+    THEN assert the suggester added it in place and is kept, not rebuilt
+    """
+    driver = mocker.Mock()
+    driver.recipes_active.return_value = [{"_id": "1", "name": "Garlic Bread"}]
+    driver.recipes_generation.return_value = 1
+    driver.recipes_generation_is_own.return_value = True
+    driver.recipe_create.return_value = {"_id": "2", "name": "Garden Salad"}
+    mocker.patch.dict(flask_app.config, {"DB_DRIVER": driver, "SUGGESTER": None})
+    mocker.patch.object(search_engine, "GENERATION_CHECK_MS", 0)
+
+    with flask_app.test_request_context(path="/rest/autocomplete?q=gar"):
+        rest_views.autocomplete()
+        suggester = search_engine.suggester(build=False)
+        RecipeUC(driver, suggester=suggester).create_recipe(
+            "Garden Salad", 5, 0, "2", ["lettuce"], ["toss"]
+        )
+        driver.recipes_generation.return_value = 2
+        resp = rest_views.autocomplete()
+        assert search_engine.suggester(build=False) is suggester
+    assert [n["name"] for n in resp["names"]] == ["Garden Salad", "Garlic Bread"]
+    assert driver.recipes_active.call_count == 1
+
+
+def test_autocomplete_bad_limit(mocker):
+    """
+    GIVEN a running app
+    WHEN /rest/autocomplete is requested with a limit that is not a number
+    THEN assert a 400 BadRequest error is thrown
+    """
+    mocker.patch.dict(flask_app.config, {"SUGGESTER": mocker.Mock()})
+    with pytest.raises(werkzeug.exceptions.BadRequest):
+        with flask_app.test_request_context(path="/rest/autocomplete?q=b&limit=many"):
+            rest_views.autocomplete()
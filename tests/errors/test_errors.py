@@ -7,6 +7,7 @@ import pytest
 from pyrecipe.errors.custom_exceptions import UserNotFoundError
 from pyrecipe.errors.custom_exceptions import UserLoginError
 from pyrecipe.errors.custom_exceptions import UserCreationError
+from pyrecipe.errors.custom_exceptions import RecipeConflictError
 
 
 def test_UserNotFoundError(capsys):
@@ -38,3 +39,14 @@ def test_UserCreationErrror_email(capsys):
         raise UserCreationError(email='reused@mail.com')
         out, err = capsys.readouterr()
         assert "Email address <reused@mail.com> used by another user."
+
+
+def test_RecipeConflictError():
+    """
+    GIVEN a recipe edited by someone else
+    WHEN a RecipeConflictError is triggered
+    THEN assert it is a ValueError with the correct message
+    """
+    with pytest.raises(ValueError) as excinfo:
+        raise RecipeConflictError("12345")
+    assert excinfo.value.error == "Recipe <12345> was modified by someone else."
@@ -0,0 +1,70 @@
+"""Fixtures and config items for testing this module."""
+
+import datetime
+
+import pytest
+
+from pyrecipe.storage.shared.recipe_model import RecipeModel
+
+
+def _make_recipe(_id, name, tags=(), ingredients=(), directions=(), deleted=False):
+    now = datetime.datetime(2020, 1, 1)
+    return RecipeModel(
+        _id=_id,
+        name=name,
+        num_ingredients=len(ingredients),
+        directions=list(directions),
+        prep_time=5,
+        cook_time=10,
+        servings="4",
+        tags=list(tags),
+        notes=[],
+        rating=None,
+        favorite=False,
+        when_made=[],
+        deleted=deleted,
+        created_date=now,
+        last_modified_date=now,
+        ingredients=list(ingredients),
+        images=[],
+    )
+
+
+@pytest.fixture(scope="function")
+def make_recipe():
+    return _make_recipe
+
+
+@pytest.fixture(scope="function")
+def recipes(make_recipe):
+    return [
+        make_recipe(
+            "1",
+            "Garlic Bread",
+            tags=["bread"],
+            ingredients=["garlic, 2 cloves", "bread, 1 loaf", "butter"],
+            directions=["spread the butter and garlic on the bread", "bake"],
+        ),
+        make_recipe(
+            "2",
+            "Pesto",
+            tags=["sauce", "italian"],
+            ingredients=["basil, 2 cups", "garlic, 1 clove", "pine nuts", "olive oil"],
+            directions=["blend everything"],
+        ),
+        make_recipe(
+            "3",
+            "Tomato Basil Soup",
+            tags=["soup"],
+            ingredients=["tomatoes, 6", "basil, a handful", "onion"],
+            directions=["simmer the tomatoes and onion", "add the basil", "blend"],
+        ),
+        make_recipe(
+            "4",
+            "Old Garlic Soup",
+            tags=["soup"],
+            ingredients=["garlic"],
+            directions=["boil"],
+            deleted=True,
+        ),
+    ]
@@ -0,0 +1,130 @@
+"""Tests for the services/search/engine.py module."""
+
+import pytest
+
+from pyrecipe.services.search import SearchEngine
+from pyrecipe.storage.shared.recipe_summary_model import RecipeSummary
+
+
+@pytest.fixture(scope="function")
+def engine(recipes):
+    return SearchEngine.build(recipes)
+
+
+def ids(hits):
+    return [_id for _id, _ in hits]
+
+
+def test_build(engine):
+    """
+    GIVEN recipes, one of them deleted
+    WHEN building a search engine over them
+    THEN assert only the active recipes are indexed
+    """
+    assert len(engine) == 3
+    assert engine.search("boil") == []
+
+
+def test_search_ranking(engine):
+    """
+    GIVEN an engine over recipes
+    WHEN searching
+    THEN assert the best matches come first, a name match ranking above a text match
+    """
+    assert ids(engine.search("garlic")) == ["1", "2"]
+    assert ids(engine.search("basil")) == ["3", "2"]
+    assert ids(engine.search("Basil pesto")) == ["2", "3"]
+    scores = [score for _, score in engine.search("garlic")]
+    assert scores == sorted(scores, reverse=True)
+    assert engine.search("") == []
+    assert engine.search("nothing") == []
+
+
+def test_search_field_weights(engine, recipes):
+    """
+    GIVEN an engine whose name field weighs nothing
+    WHEN searching a term found only in a name
+    THEN assert nothing matches
+    """
+    assert ids(engine.search("tomato")) == ["3"]
+    engine = SearchEngine.build(recipes, weights={"name": 0})
+    assert ids(engine.search("tomato")) == []
+    assert ids(engine.search("tomatoes")) == ["3"]
+
+
+def test_search_prefix(engine):
+    """
+    GIVEN an engine over recipes
+    WHEN searching with prefix=True
+    THEN assert a term matches the longer terms it starts
+    """
+    assert engine.search("bas") == []
+    assert ids(engine.search("bas", prefix=True)) == ["3", "2"]
+    assert sorted(ids(engine.search("tom bre", prefix=True))) == ["1", "3"]
+
+
+def test_search_window_and_summary(engine):
+    """
+    GIVEN an engine over recipes
+    WHEN searching a window of summaries
+    THEN assert the summaries come from the index
+    """
+    ranked = ids(engine.search("garlic basil"))
+    assert ranked[0] == "2"
+    assert ids(engine.search("garlic basil", limit=1, skip=1)) == ranked[1:2]
+    result = engine.search("basil", limit=1, summary=True)
+    assert result == [
+        RecipeSummary(_id="3", name="Tomato Basil Soup", cook_time=10, tags=["soup"])
+    ]
+    assert ids(engine.search("basil", skip=1)) == ["2"]
+
+
+def test_add_edit_remove(engine, make_recipe):
+    """
+    GIVEN an engine over recipes
+    WHEN recipes are created, edited and deleted
+    THEN assert the searches follow
+    """
+    engine.add(make_recipe("5", "Garlic Knots", ingredients=["garlic", "dough"]))
+    assert ids(engine.search("knots")) == ["5"]
+
+    engine.add(make_recipe("1", "Cheese Bread", ingredients=["cheese", "bread"]))
+    assert ids(engine.search("garlic")) == ["5", "2"]
+    assert ids(engine.search("cheese")) == ["1"]
+
+    engine.add(make_recipe("5", "Garlic Knots", deleted=True))
+    assert engine.remove("2") is True
+    assert engine.remove("2") is False
+    assert engine.search("garlic") == []
+    assert len(engine) == 2
+
+
+def test_add_dict(engine):
+    """
+    GIVEN an engine over recipes
+    WHEN adding a recipe as a dict of its fields, as created in bulk
+    THEN assert it is searchable
+    """
+    engine.add({"_id": "9", "name": "Basil Lemonade", "cook_time": 0, "tags": ["drink"],
+                "ingredients": ["lemons", "basil"], "directions": ["stir"]})
+    assert engine.search("lemonade", summary=True)[0].tags == ["drink"]
+
+
+def test_save_load(tmp_path, engine, make_recipe):
+    """
+    GIVEN a saved engine
+    WHEN loading it, and writing to it
+    THEN assert it searches the same as the one saved, and follows the writes
+    """
+    path = str(tmp_path / "recipes.idx")
+    engine.save(path)
+    loaded = SearchEngine.load(path)
+    assert loaded.search("garlic basil") == engine.search("garlic basil")
+    assert loaded.search("so", prefix=True, summary=True) == engine.search(
+        "so", prefix=True, summary=True
+    )
+
+    loaded.remove("1")
+    loaded.add(make_recipe("6", "Garlic Soup", ingredients=["garlic"]))
+    assert ids(loaded.search("garlic")) == ["6", "2"]
+    assert ids(SearchEngine.load(path).search("garlic")) == ["1", "2"]
@@ -0,0 +1,111 @@
+"""Tests for the services/search/index.py module."""
+
+from array import array
+
+import pytest
+
+from pyrecipe.services.search.index import FIELDS
+from pyrecipe.services.search.index import InvertedIndex
+
+
+def fields(name=(), tags=(), ingredients=(), directions=()):
+    return {"name": list(name), "tags": list(tags), "ingredients": list(ingredients),
+            "directions": list(directions)}
+
+
+@pytest.fixture(scope="function")
+def index():
+    index = InvertedIndex()
+    index.add("a", fields(name=["garlic", "bread"], ingredients=["garlic", "garlic"]), ["A"])
+    index.add("b", fields(name=["pesto"], ingredients=["basil", "garlic"]), ["B"])
+    return index
+
+
+def test_add(index):
+    """
+    GIVEN an index of two documents
+    WHEN reading the postings of a term
+    THEN assert they hold each document's term frequency per field
+    """
+    docs, tfs = index.postings(index.terms["garlic"])
+    assert list(docs) == [0, 1]
+    assert list(tfs) == [1, 0, 2, 0, 0, 0, 1, 0]
+    assert list(index.lengths) == [2, 0, 2, 0, 1, 0, 2, 0]
+    assert index.field_totals == [3, 0, 4, 0]
+    assert index.sorted_terms() == ["basil", "bread", "garlic", "pesto"]
+    assert len(index) == 2
+
+
+def test_remove_and_readd(index):
+    """
+    GIVEN an index of two documents
+    WHEN removing one, and re-adding the other with new terms
+    THEN assert their postings and field totals follow
+    """
+    assert index.remove("b") is True
+    assert index.remove("b") is False
+    index.add("a", fields(name=["garlic"]), ["A2"])
+
+    docs, _ = index.postings(index.terms["garlic"])
+    assert [index.doc_ids[doc] for doc in docs] == ["a"]
+    assert list(index.postings(index.terms["bread"])[0]) == []
+    assert index.field_totals == [1, 0, 0, 0]
+    assert index.doc_numbers == {"a": 2}
+
+
+def test_save_load(tmp_path, index):
+    """
+    GIVEN a saved index with a removed document
+    WHEN loading it
+    THEN assert its postings are read from the mapped file, without the removed document
+    """
+    index.remove("a")
+    path = str(tmp_path / "recipes.idx")
+    index.save(path)
+
+    loaded = InvertedIndex.load(path)
+    assert loaded._mmap is not None
+    assert loaded.doc_ids == ["b"]
+    assert "bread" not in loaded.terms
+    docs, tfs = loaded.postings(loaded.terms["garlic"])
+    assert isinstance(docs, memoryview)
+    assert list(docs) == [0]
+    assert list(tfs) == [0, 0, 1, 0]
+    assert loaded.field_totals == [1, 0, 2, 0]
+    assert len(loaded.lengths) == len(FIELDS)
+
+
+def test_load_copy_on_write(tmp_path, index):
+    """
+    GIVEN a loaded index
+    WHEN adding and removing documents
+    THEN assert only the written terms are copied out of the mapping, and the file is untouched
+    """
+    path = str(tmp_path / "recipes.idx")
+    index.save(path)
+    before = open(path, "rb").read()
+
+    loaded = InvertedIndex.load(path)
+    loaded.add("c", fields(name=["garlic", "soup"]), ["C"])
+    loaded.remove("a")
+
+    docs, _ = loaded.postings(loaded.terms["garlic"])
+    assert isinstance(docs, array)
+    assert isinstance(loaded.postings(loaded.terms["basil"])[0], memoryview)
+    assert [loaded.doc_ids[doc] for doc in docs if loaded.is_live(doc)] == ["b", "c"]
+    assert open(path, "rb").read() == before
+
+    loaded.save(path)
+    assert InvertedIndex.load(path).doc_ids == ["b", "c"]
+
+
+def test_load_not_an_index(tmp_path):
+    """
+    GIVEN a file that is not a search index
+    WHEN loading it
+    THEN assert ValueError is raised
+    """
+    path = tmp_path / "recipes.idx"
+    path.write_bytes(b"not an index at all")
+    with pytest.raises(ValueError):
+        InvertedIndex.load(str(path))
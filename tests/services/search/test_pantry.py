@@ -0,0 +1,120 @@
+"""Tests for the services/search/pantry.py module."""
+
+import random
+
+import pytest
+
+from pyrecipe.services.search.pantry import PantryIndex
+from pyrecipe.services.search.pantry import ingredient_key
+
+
+@pytest.mark.parametrize(
+    "ingredient, expected",
+    [
+        ("6 tomatoes, diced", "tomato"),
+        ("2 cups Cherries", "cherry"),
+        ("3 eggs", "egg"),
+        ("asparagus", "asparagus"),
+        ("basil, a handful", "basil"),
+    ],
+)
+def test_ingredient_key(ingredient, expected):
+    """
+    GIVEN an ingredient string
+    WHEN getting its key
+    THEN assert it is the singular name of the ingredient
+    """
+    assert ingredient_key(ingredient) == expected
+
+
+def names(results):
+    return [(summary.name, missing) for summary, missing in results]
+
+
+def test_cookable(recipes):
+    """
+    GIVEN a pantry index over recipes, one of them deleted
+    WHEN asking what can be cooked with some ingredients
+    THEN assert the recipes missing at most the given number of ingredients
+        are returned, fewest missing first, with what they miss
+    """
+    pantry = PantryIndex.build(recipes)
+    have = ["Garlic", "butter", "1 loaf bread", "basil"]
+    assert names(pantry.cookable(have)) == [("Garlic Bread", [])]
+    assert names(pantry.cookable(have, missing=1)) == [("Garlic Bread", [])]
+    assert names(pantry.cookable(have, missing=2)) == [
+        ("Garlic Bread", []),
+        ("Pesto", ["olive oil", "pine nut"]),
+        ("Tomato Basil Soup", ["onion", "tomato"]),
+    ]
+    assert names(pantry.cookable(have, missing=2, limit=2)) == [
+        ("Garlic Bread", []),
+        ("Pesto", ["olive oil", "pine nut"]),
+    ]
+    assert pantry.cookable([]) == []
+    assert names(pantry.cookable(["tomatoes", "onions"], missing=1)) == [
+        ("Tomato Basil Soup", ["basil"])
+    ]
+
+
+def test_cookable_staples(make_recipe):
+    """
+    GIVEN a recipe needing salt and water
+    WHEN asking what can be cooked without them
+    THEN assert they are assumed to be in the pantry
+    """
+    pantry = PantryIndex.build([make_recipe("1", "Rice", ingredients=["rice", "salt", "water"])])
+    assert names(pantry.cookable(["rice"])) == [("Rice", [])]
+
+
+def test_add_edit_remove(recipes, make_recipe):
+    """
+    GIVEN a pantry index over recipes
+    WHEN recipes are created, edited and deleted
+    THEN assert what can be cooked follows, reusing the numbers of removed recipes
+    """
+    pantry = PantryIndex.build(recipes)
+    pantry.add(make_recipe("5", "Toast", ingredients=["bread", "butter"]))
+    assert names(pantry.cookable(["bread", "butter"])) == [("Toast", [])]
+
+    assert pantry.remove("1") is True
+    assert pantry.remove("1") is False
+    assert names(pantry.cookable(["bread", "butter", "garlic"])) == [("Toast", [])]
+
+    pantry.add(make_recipe("5", "Toast", ingredients=["bread", "butter", "jam"]))
+    pantry.add(make_recipe("6", "Buttered Bread", ingredients=["bread", "butter"]))
+    assert pantry._numbers["6"] == 0
+    assert names(pantry.cookable(["bread", "butter"], missing=1)) == [
+        ("Buttered Bread", []),
+        ("Toast", ["jam"]),
+    ]
+    pantry.add(make_recipe("6", "Buttered Bread", deleted=True))
+    assert len(pantry) == 3
+
+
+def test_cookable_matches_scan():
+    """
+    GIVEN many random recipes, indexed both at once and one by one
+    WHEN asking what can be cooked
+    THEN assert both return the same recipes as checking each recipe's ingredients
+    """
+    rng = random.Random(3)
+    words = ["egg", "flour", "milk", "sugar", "rice", "bean", "corn", "lime", "oat"]
+    recipes = [
+        {"_id": str(n), "name": str(n), "ingredients": rng.sample(words, rng.randint(0, 6))}
+        for n in range(300)
+    ]
+    built = PantryIndex.build(recipes)
+    added = PantryIndex()
+    for recipe in recipes:
+        added.add(recipe)
+
+    for have in (["egg", "flour", "milk"], words[3:], []):
+        for missing in range(3):
+            expected = sorted(
+                recipe["_id"] for recipe in recipes
+                if len(set(recipe["ingredients"]) - set(have)) <= missing
+            )
+            for pantry in (built, added):
+                found = pantry.cookable(have, missing=missing)
+                assert sorted(summary.id for summary, _ in found) == expected
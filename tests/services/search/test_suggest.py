@@ -0,0 +1,93 @@
+"""Tests for the services/search/suggest.py module."""
+
+import pytest
+
+from pyrecipe.services.search.suggest import PrefixIndex
+from pyrecipe.services.search.suggest import Suggester
+from pyrecipe.services.search.suggest import ingredient_name
+
+
+@pytest.mark.parametrize(
+    "ingredient, expected",
+    [
+        ("garlic, 2 cloves", "garlic"),
+        ("2 cups flour, sifted", "flour"),
+        ("1 can of Black Beans", "black beans"),
+        ("3 tbsp", ""),
+    ],
+)
+def test_ingredient_name(ingredient, expected):
+    """
+    GIVEN an ingredient string
+    WHEN getting its name
+    THEN assert the quantity, unit and preparation are left out
+    """
+    assert ingredient_name(ingredient) == expected
+
+
+def test_prefix_index():
+    """
+    GIVEN a prefix index of counted values
+    WHEN completing prefixes
+    THEN assert values match by any of their words, the most counted first
+    """
+    index = PrefixIndex()
+    index.update([("olive oil", "olive oil"), ("oregano", "oregano"), ("oil", "oil")])
+    index.update([("oregano", "oregano")])
+
+    assert index.complete("o", limit=2) == ["oregano", "oil"]
+    assert index.complete("OI") == ["oil", "olive oil"]
+    assert index.complete("olive o") == ["olive oil"]
+    assert index.complete("o", by_count=False) == ["oil", "olive oil", "oregano"]
+    assert index.complete("  ") == []
+    assert index.complete("x") == []
+
+    index.discard("oregano")
+    assert index.complete("or") == ["oregano"]
+    index.discard("oregano")
+    assert index.complete("or") == []
+    assert len(index) == 2
+
+
+def test_prefix_index_update_many():
+    """
+    GIVEN more new keys than are inserted in place
+    WHEN adding them all at once
+    THEN assert the keys are still sorted
+    """
+    index = PrefixIndex()
+    index.update([("b", "b"), ("z", "z")])
+    index.update((str(n), "item {}".format(n)) for n in range(PrefixIndex.INSORT_MAX))
+    assert index._keys == sorted(index._keys)
+    assert index.complete("item 1", limit=3, by_count=False) == ["1", "10", "11"]
+
+
+def test_suggester(recipes, make_recipe):
+    """
+    GIVEN a suggester over recipes, one of them deleted
+    WHEN recipes are suggested, created, edited and deleted
+    THEN assert the suggestions follow
+    """
+    suggester = Suggester.build(recipes)
+    assert len(suggester) == 3
+    assert suggester.suggest("ga") == {
+        "names": [{"_id": "1", "name": "Garlic Bread"}],
+        "tags": [],
+        "ingredients": ["garlic"],
+    }
+    assert suggester.suggest("so")["tags"] == ["soup"]
+    assert suggester.suggest("bas")["names"] == [{"_id": "3", "name": "Tomato Basil Soup"}]
+
+    suggester.add(make_recipe("5", "Garlic Knots", tags=["bread"], ingredients=["dough"]))
+    assert [n["_id"] for n in suggester.suggest("garlic")["names"]] == ["1", "5"]
+    assert suggester.suggest("b")["tags"] == ["bread"]
+    assert suggester.tags.counts["bread"] == 2
+
+    suggester.add(make_recipe("1", "Cheese Bread", ingredients=["cheese"]))
+    assert suggester.suggest("garlic")["ingredients"] == ["garlic"]
+    assert suggester.suggest("gar")["names"] == [{"_id": "5", "name": "Garlic Knots"}]
+
+    assert suggester.remove("2") is True
+    assert suggester.remove("2") is False
+    assert suggester.suggest("garlic")["ingredients"] == []
+    assert suggester.suggest("ga", limit=0) == {"names": [], "tags": [], "ingredients": []}
@@ -0,0 +1,43 @@
+"""Fixtures for the pyrecipe/storage/cache tests."""
+
+import pytest
+
+from pyrecipe.storage.cache import CachingDriver
+from pyrecipe.storage.memory import MemoryDriver
+
+
+@pytest.fixture(scope="function")
+def cachedb():
+    """
+    Select a fresh, empty in-memory database wrapped in a CachingDriver.
+    Drop it upon test completion.
+    """
+    driver = CachingDriver.wrap(MemoryDriver, maxsize=16, ttl=60)
+    driver.db_initialize(db_name="pyrecipe_testing", verbose=False)
+    yield driver
+    MemoryDriver._stores.pop("pyrecipe_testing", None)
+    MemoryDriver._store = None
+
+
+@pytest.fixture(scope="function")
+def recipes(cachedb):
+    """Return two recipes for testing."""
+    recipe_1 = cachedb.recipe_create(
+        name="spam and eggs",
+        ingredients=["spam", "eggs"],
+        directions=["fry eggs", "add spam", "eat"],
+        prep_time=10,
+        cook_time=5,
+        servings="1",
+        tags=["breakfast", "fast"],
+    )
+    recipe_2 = cachedb.recipe_create(
+        name="spam and oatmeal",
+        ingredients=["spam", "oatmeal"],
+        directions=["microwave oatmeal", "add spam"],
+        prep_time=0,
+        cook_time=0,
+        servings="1",
+        tags=["breakfast", "slow"],
+    )
+    yield [recipe_1, recipe_2]
@@ -0,0 +1,431 @@
+"""
+Tests for the pyrecipe.storage.cache.cachingdriver module.
+"""
+
+import datetime
+
+import pytest
+
+from pyrecipe.errors import RecipeConflictError
+from pyrecipe.storage.cache import CachingDriver
+from pyrecipe.storage.memory import MemoryDriver
+from pyrecipe.storage.mongo import MongoDriver
+
+
+class GenerationMemoryDriver(MemoryDriver):
+    """MemoryDriver with a generation, that tests bump for "other processes"."""
+
+    generation = 0
+    user_generation = 0
+
+    @classmethod
+    def recipes_generation(cls) -> int:
+        return cls.generation
+
+    @classmethod
+    def users_generation(cls) -> int:
+        return cls.user_generation
+
+
+class OwnGenerationMemoryDriver(GenerationMemoryDriver):
+    """GenerationMemoryDriver telling the generations in own as this process's writes."""
+
+    own = set()
+
+    @classmethod
+    def recipes_generation_is_own(cls, since: int, until: int) -> bool:
+        return all(g in cls.own for g in range(since + 1, until + 1))
+
+
+def _edit_kwargs(recipe, **changes):
+    kwargs = {
+        "_id": recipe.id,
+        "name": recipe.name,
+        "prep_time": recipe.prep_time,
+        "cook_time": recipe.cook_time,
+        "servings": recipe.servings,
+        "ingredients": recipe.ingredients,
+        "directions": recipe.directions,
+        "tags": recipe.tags,
+        "notes": recipe.notes,
+    }
+    kwargs.update(changes)
+    return kwargs
+
+
+def test_cachingdriver_interfaces(cachedb):
+    """
+    GIVEN a wrapped CachingDriver
+    WHEN checking it against the DB interfaces
+    THEN assert every abstract method is implemented, and each wrap has its own cache
+    """
+    assert not cachedb.__abstractmethods__
+    assert issubclass(cachedb, CachingDriver)
+    assert cachedb.__name__ == "CachingMemoryDriver"
+    assert CachingDriver.wrap(MemoryDriver)._cache is not cachedb._cache
+
+
+def test_generation_passed_through():
+    """
+    GIVEN drivers with and without generations
+    WHEN wrapping them
+    THEN assert only the wrapped generations are exposed, for other caches to poll
+    """
+    driver = CachingDriver.wrap(GenerationMemoryDriver)
+    GenerationMemoryDriver.generation = 5
+    try:
+        assert driver.recipes_generation() == 5
+    finally:
+        GenerationMemoryDriver.generation = 0
+    assert driver.users_generation() == 0
+    assert not hasattr(CachingDriver.wrap(MemoryDriver), "recipes_generation")
+
+
+def test_find_by_id_cached(cachedb, recipes):
+    """
+    GIVEN a recipe
+    WHEN finding it twice
+    THEN assert the second read is a hit, returning an independent copy
+    """
+    recipe = cachedb.recipe_find_by_id(recipes[0].id)
+    recipe.tags.append("modified")
+    again = cachedb.recipe_find_by_id(recipes[0].id)
+    assert again.tags == ["breakfast", "fast"]
+    assert cachedb.cache_stats()["hits"] == 1
+    assert cachedb.cache_stats()["misses"] == 1
+
+
+def test_find_by_id_none_not_cached(cachedb):
+    """
+    GIVEN a recipe id that doesn't exist
+    WHEN finding it
+    THEN assert None is returned and not cached
+    """
+    assert cachedb.recipe_find_by_id("nope") is None
+    assert cachedb.cache_stats()["size"] == 0
+
+
+def test_edit_invalidates(cachedb, recipes):
+    """
+    GIVEN cached reads of a recipe
+    WHEN editing it
+    THEN assert the reads holding it are reloaded, and unrelated reads are kept
+    """
+    cachedb.recipe_find_by_id(recipes[0].id)
+    cachedb.recipe_find_by_id(recipes[1].id)
+    assert len(cachedb.recipes_find_by_tag(["Fast"])) == 1
+    assert len(cachedb.recipes_find_by_tag(["lunch"])) == 0
+
+    cachedb.recipe_edit(**_edit_kwargs(recipes[0], name="ham", tags=["lunch"]))
+
+    assert cachedb.recipe_find_by_id(recipes[0].id).name == "ham"
+    assert cachedb.recipes_find_by_tag(["fast"]) == []
+    assert len(cachedb.recipes_find_by_tag(["lunch"])) == 1
+    assert cachedb.recipes_get_tags() == ["breakfast", "lunch", "slow"]
+    hits = cachedb.cache_stats()["hits"]
+    cachedb.recipe_find_by_id(recipes[1].id)
+    assert cachedb.cache_stats()["hits"] == hits + 1
+
+
+def test_edit_conflict_invalidates(cachedb, recipes):
+    """
+    GIVEN a cached recipe
+    WHEN editing it with a stale last_modified
+    THEN assert the conflict is raised and the recipe dropped from the cache
+    """
+    cachedb.recipe_find_by_id(recipes[0].id)
+    stale = recipes[0].last_modified_date - datetime.timedelta(seconds=1)
+    with pytest.raises(RecipeConflictError):
+        cachedb.recipe_edit(**_edit_kwargs(recipes[0], name="ham", last_modified=stale))
+    assert cachedb.cache_stats()["size"] == 0
+
+
+def test_create_invalidates_lists(cachedb, recipes):
+    """
+    GIVEN cached list, tag and page reads
+    WHEN creating a recipe
+    THEN assert they include it, while cached single recipes are kept
+    """
+    cachedb.recipe_find_by_id(recipes[0].id)
+    assert len(cachedb.recipes_active()) == 2
+    assert len(cachedb.recipes_active_summary()) == 2
+    assert len(cachedb.recipes_find_by_tag_summary(["breakfast"])) == 2
+    assert len(cachedb.recipes_page(page_size=5).items) == 2
+
+    cachedb.recipe_copy(recipes[0])
+
+    assert len(cachedb.recipes_active()) == 3
+    assert len(cachedb.recipes_active_summary()) == 3
+    assert len(cachedb.recipes_find_by_tag_summary(["breakfast"])) == 3
+    assert len(cachedb.recipes_page(page_size=5).items) == 3
+    assert cachedb.cache_stats()["size"] == 5
+
+
+def test_create_many_invalidates_stored_tags(cachedb, recipes):
+    """
+    GIVEN a cached tag query
+    WHEN creating recipes in bulk with the tag given unnormalized
+    THEN assert the query is invalidated by the tag as it was stored
+    """
+    kwargs = {
+        "name": "bulk", "prep_time": 1, "cook_time": 1, "servings": "1",
+        "ingredients": ["spam"], "directions": ["fry"], "tags": [" Breakfast "],
+    }
+    assert len(cachedb.recipes_find_by_tag_summary(["breakfast"])) == 2
+
+    results = cachedb.recipe_create_many([kwargs])
+
+    assert results[0].recipe.tags == ["breakfast"]
+    assert len(cachedb.recipes_find_by_tag_summary(["breakfast"])) == 3
+
+
+def test_delete_invalidates(cachedb, recipes):
+    """
+    GIVEN cached active and deleted lists
+    WHEN deleting a recipe
+    THEN assert both lists are reloaded
+    """
+    assert len(cachedb.recipes_active()) == 2
+    assert cachedb.recipes_deleted() == []
+    assert len(cachedb.recipes_all()) == 2
+
+    cachedb.recipe_delete(recipes[0].id)
+
+    assert [r.id for r in cachedb.recipes_active()] == [recipes[1].id]
+    assert [r.id for r in cachedb.recipes_deleted()] == [recipes[0].id]
+    assert len(cachedb.recipes_page(page_size=5, deleted=True).items) == 1
+    assert len(cachedb.recipes_all()) == 2
+
+
+def test_tags_and_mark_made_invalidate(cachedb, recipes):
+    """
+    GIVEN cached reads
+    WHEN adding and deleting tags, deleting and marking a recipe made
+    THEN assert the reads holding it are reloaded
+    """
+    assert cachedb.recipes_get_tags() == ["breakfast", "fast", "slow"]
+    assert cachedb.recipes_find_by_tag(["new"]) == []
+
+    cachedb.recipe_add_tag(recipes[1], "new")
+    assert cachedb.recipes_get_tags() == ["breakfast", "fast", "new", "slow"]
+    assert len(cachedb.recipes_find_by_tag(["new"])) == 1
+
+    cachedb.recipe_delete_tag(recipes[1], "new")
+    assert cachedb.recipes_find_by_tag(["new"]) == []
+    assert cachedb.recipes_tag_counts() == {"breakfast": 2, "fast": 1, "slow": 1}
+    cachedb.recipe_delete(recipes[0].id)
+    assert cachedb.recipes_tag_counts() == {"breakfast": 1, "slow": 1}
+    assert cachedb.recipes_rebuild_tag_stats() is None
+
+    assert cachedb.recipe_find_by_id(recipes[1].id).when_made == []
+    cachedb.recipe_mark_made(recipes[1])
+    assert len(cachedb.recipe_find_by_id(recipes[1].id).when_made) == 1
+
+
+def test_ingredients_passed_through(cachedb, recipes):
+    """
+    GIVEN cached reads
+    WHEN finding recipes by ingredient and backfilling the parsed ingredients
+    THEN assert the finds go to the wrapped driver and the backfill empties
+        the cache
+    """
+    assert len(cachedb.recipes_find_by_ingredient(["spam"])) == 2
+    assert [s.name for s in cachedb.recipes_find_by_ingredient_summary(["eggs"])] == [
+        "spam and eggs"
+    ]
+
+    cachedb.recipes_active()
+    assert cachedb.cache_stats()["size"] == 1
+    assert cachedb.recipes_backfill_ingredients(reparse=True) == 2
+    assert cachedb.cache_stats()["size"] == 0
+
+
+def test_eviction_counted(recipes, cachedb):
+    """
+    GIVEN a cache of 16 entries
+    WHEN caching more reads than that
+    THEN assert the evictions are counted
+    """
+    for size in range(1, 21):
+        cachedb.recipes_page(page_size=size)
+    stats = cachedb.cache_stats()
+    assert stats["size"] == 16
+    assert stats["evictions"] == 4
+
+
+def test_db_initialize_clears(cachedb, recipes):
+    """
+    GIVEN cached reads
+    WHEN initializing the DB again
+    THEN assert the cache is emptied
+    """
+    cachedb.recipes_active()
+    cachedb.db_initialize(db_name="pyrecipe_testing")
+    assert cachedb.cache_stats()["size"] == 0
+
+
+@pytest.mark.parametrize("check_ms, reloaded", [(0, True), (60000, False)])
+def test_generation_check(recipes, check_ms, reloaded):
+    """
+    GIVEN a cached recipe
+    WHEN another process edits it and bumps the generation
+    THEN assert it is reloaded on the next read if the check interval
+        passed, and served from the cache otherwise
+    """
+    cachedb = CachingDriver.wrap(GenerationMemoryDriver, check_ms=check_ms)
+    assert cachedb.recipe_find_by_id(recipes[0].id).name == "spam and eggs"
+    assert cachedb.cache_stats()["generation"] == 0
+
+    MemoryDriver.recipe_edit(**_edit_kwargs(recipes[0], name="ham"))
+    GenerationMemoryDriver.generation += 1
+    try:
+        name = cachedb.recipe_find_by_id(recipes[0].id).name
+    finally:
+        GenerationMemoryDriver.generation = 0
+    assert name == ("ham" if reloaded else "spam and eggs")
+    assert cachedb.cache_stats()["resets"] == int(reloaded)
+
+
+def test_own_writes_keep_cache(recipes):
+    """
+    GIVEN cached recipes
+    WHEN this process writes one, then another process writes
+    THEN assert the own write only drops what it affects, and the other
+        process's write empties the cache
+    """
+    cachedb = CachingDriver.wrap(OwnGenerationMemoryDriver, check_ms=0, lag_ms=0)
+    cachedb.recipe_find_by_id(recipes[0].id)
+    cachedb.recipe_find_by_id(recipes[1].id)
+
+    cachedb.recipe_edit(**_edit_kwargs(recipes[0], name="ham"))
+    OwnGenerationMemoryDriver.generation = 1
+    OwnGenerationMemoryDriver.own = {1}
+    try:
+        assert cachedb.recipe_find_by_id(recipes[1].id).name == "spam and oatmeal"
+        assert cachedb.recipe_find_by_id(recipes[0].id).name == "ham"
+        stats = cachedb.cache_stats()
+        assert (stats["hits"], stats["resets"], stats["generation"]) == (1, 0, 1)
+
+        OwnGenerationMemoryDriver.generation = 2
+        cachedb.recipe_find_by_id(recipes[1].id)
+        stats = cachedb.cache_stats()
+        assert (stats["hits"], stats["resets"], stats["generation"]) == (1, 1, 2)
+    finally:
+        OwnGenerationMemoryDriver.generation = 0
+        OwnGenerationMemoryDriver.own = set()
+
+
+@pytest.mark.parametrize("lag_ms, cached", [(0, True), (60000, False)])
+def test_replication_lag_not_cached(recipes, lag_ms, cached):
+    """
+    GIVEN a recipe write dropping cached reads
+    WHEN reading again within the replication lag
+    THEN assert the reads are passed through instead of cached, since a
+        secondary may not have the write yet
+    """
+    cachedb = CachingDriver.wrap(MemoryDriver, check_ms=60000, lag_ms=lag_ms)
+    cachedb.recipe_edit(**_edit_kwargs(recipes[0], name="ham"))
+    cachedb.recipes_find_by_tag(["fast"])
+    assert [r.name for r in cachedb.recipes_find_by_tag(["fast"])] == ["ham"]
+    assert cachedb.cache_stats()["hits"] == int(cached)
+
+
+def test_replication_lag_default():
+    """
+    GIVEN drivers reading from secondaries or not
+    WHEN wrapping them
+    THEN assert only those reading from secondaries wait out the replication lag
+    """
+    assert CachingDriver.wrap(MongoDriver).REPLICATION_LAG_MS == CachingDriver.REPLICATION_LAG_MS
+    assert CachingDriver.wrap(MemoryDriver).REPLICATION_LAG_MS == 0
+
+
+@pytest.fixture(scope="function")
+def usercachedb(cachedb):
+    """cachedb with the user cache enabled, and a user."""
+    driver = CachingDriver.wrap(GenerationMemoryDriver, maxsize=16, user_maxsize=4, check_ms=0)
+    user = driver.user_create(name="tester", email="tester@example.com", password="pw")
+    yield driver, user
+    GenerationMemoryDriver.user_generation = 0
+
+
+def test_user_cache_disabled(cachedb):
+    """
+    GIVEN a CachingDriver without a user cache
+    WHEN finding a user
+    THEN assert it is not cached
+    """
+    user = cachedb.user_create(name="tester", email="tester@example.com", password="pw")
+    assert cachedb.user_find_by_id(user.id).name == "tester"
+    assert cachedb.cache_stats()["users"] is None
+    assert cachedb.cache_stats()["size"] == 0
+
+
+def test_recipe_cache_disabled(cachedb, recipes):
+    """
+    GIVEN a CachingDriver caching only users
+    WHEN reading and writing recipes
+    THEN assert they are passed through, without a recipe cache
+    """
+    driver = CachingDriver.wrap(GenerationMemoryDriver, maxsize=None, user_maxsize=4)
+    assert driver._cache is None
+    assert driver.recipe_find_by_id(recipes[0].id).name == "spam and eggs"
+    driver.recipe_edit(**_edit_kwargs(recipes[0], name="ham"))
+    assert driver.recipe_find_by_id(recipes[0].id).name == "ham"
+    assert [r.name for r in driver.recipes_find_by_tag(["fast"])] == ["ham"]
+    stats = driver.cache_stats()
+    assert "hits" not in stats
+    assert stats["users"]["size"] == 0
+
+
+def test_user_find_by_id_cached(usercachedb):
+    """
+    GIVEN a CachingDriver with a user cache
+    WHEN finding a user twice
+    THEN assert the second read is a hit, returning an independent copy
+    """
+    driver, user = usercachedb
+    driver.user_find_by_id(user.id).name = "modified"
+    assert driver.user_find_by_id(user.id).name == "tester"
+    assert driver.cache_stats()["users"]["hits"] == 1
+    assert driver.user_find_by_id("nope") is None
+
+
+@pytest.mark.parametrize(
+    "write",
+    [
+        lambda driver, user: driver.user_set_password(user, "new password"),
+        lambda driver, user: driver.user_add_recipe(user, "recipe id"),
+    ],
+    ids=["user_set_password", "user_add_recipe"],
+)
+def test_user_writes_invalidate(usercachedb, write):
+    """
+    GIVEN a cached user
+    WHEN changing its password or adding it a recipe
+    THEN assert the user is reloaded on the next read
+    """
+    driver, user = usercachedb
+    before = driver.user_find_by_id(user.id)
+    write(driver, user)
+    after = driver.user_find_by_id(user.id)
+    assert driver.cache_stats()["users"]["hits"] == 0
+    assert driver.cache_stats()["users"]["invalidations"] == 1
+    assert (after.password_hash, after.recipe_ids) != (before.password_hash, before.recipe_ids)
+
+
+def test_users_generation_check(usercachedb):
+    """
+    GIVEN a cached user
+    WHEN another process bumps the users generation
+    THEN assert only the user cache is emptied
+    """
+    driver, user = usercachedb
+    driver.user_find_by_id(user.id)
+    driver.recipes_get_tags()
+    GenerationMemoryDriver.user_generation += 1
+    driver.user_find_by_id(user.id)
+    stats = driver.cache_stats()
+    assert stats["resets"] == 1
+    assert stats["users"]["hits"] == 0
+    assert stats["size"] == 1
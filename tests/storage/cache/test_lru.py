@@ -0,0 +1,106 @@
+"""
+Tests for the pyrecipe.storage.cache.lru module.
+"""
+
+from pyrecipe.storage.cache import LRUCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_get_set():
+    """
+    GIVEN an empty LRUCache
+    WHEN setting and getting keys
+    THEN assert hits and misses are returned and counted
+    """
+    cache = LRUCache()
+    assert cache.get("a") == (False, None)
+    cache.set("a", 1)
+    assert cache.get("a") == (True, 1)
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_evicts_least_recently_used():
+    """
+    GIVEN a full LRUCache
+    WHEN setting a new key
+    THEN assert the least recently used key is evicted
+    """
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1)
+    assert len(cache) == 2
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl():
+    """
+    GIVEN a cached key
+    WHEN its ttl has passed
+    THEN assert it is expired
+    """
+    clock = Clock()
+    cache = LRUCache(ttl=10, clock=clock)
+    cache.set("a", 1)
+    clock.now = 9.9
+    assert cache.get("a") == (True, 1)
+    clock.now = 10
+    assert cache.get("a") == (False, None)
+    assert cache.stats()["expirations"] == 1
+    assert len(cache) == 0
+
+
+def test_invalidate():
+    """
+    GIVEN cached keys with dependencies
+    WHEN invalidating a dependency
+    THEN assert only the keys depending on it are dropped
+    """
+    cache = LRUCache()
+    cache.set("a", 1, deps={"recipe:1", "tags"})
+    cache.set("b", 2, deps={"recipe:2"})
+    cache.invalidate({"recipe:1"})
+    assert cache.get("a") == (False, None)
+    assert cache.get("b") == (True, 2)
+    assert cache.stats()["invalidations"] == 1
+    assert "tags" not in cache._deps
+
+
+def test_set_skipped_if_stale():
+    """
+    GIVEN a version read before loading a value
+    WHEN something is invalidated before it is set
+    THEN assert the stale value is not cached
+    """
+    cache = LRUCache()
+    version = cache.version
+    cache.invalidate({"recipe:1"})
+    cache.set("a", 1, deps={"recipe:1"}, version=version)
+    assert cache.get("a") == (False, None)
+
+    cache.set("a", 1, deps={"recipe:1"}, version=cache.version)
+    assert cache.get("a") == (True, 1)
+
+
+def test_clear():
+    """
+    GIVEN a cache with entries
+    WHEN clearing it
+    THEN assert it is empty
+    """
+    cache = LRUCache()
+    cache.set("a", 1, deps={"recipe:1"})
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.stats()["size"] == 0
@@ -0,0 +1,48 @@
+"""Fixtures for the pyrecipe/storage/memory tests."""
+
+import pytest
+
+from pyrecipe.storage.memory import MemoryDriver
+
+
+@pytest.fixture(scope="function")
+def memdb():
+    """Select a fresh, empty in-memory database.  Drop it upon test completion."""
+    MemoryDriver.db_initialize(db_name="pyrecipe_testing", verbose=False)
+    yield MemoryDriver
+    MemoryDriver._stores.pop("pyrecipe_testing", None)
+    MemoryDriver._store = None
+
+
+@pytest.fixture(scope="function")
+def recipes(memdb):
+    """Return two recipes for testing."""
+    recipe_1 = memdb.recipe_create(
+        name="spam and eggs",
+        ingredients=["spam", "eggs"],
+        directions=["fry eggs", "add spam", "eat"],
+        prep_time=10,
+        cook_time=5,
+        servings="1",
+        tags=["breakfast", "fast"],
+        images=["/path/to/image"],
+    )
+    recipe_2 = memdb.recipe_create(
+        name="spam and oatmeal",
+        ingredients=["spam", "oatmeal"],
+        directions=["microwave oatmeal", "add spam"],
+        prep_time=0,
+        cook_time=0,
+        servings="1",
+        tags=["breakfast", "slow"],
+    )
+    yield [recipe_1, recipe_2]
+
+
+@pytest.fixture(scope="function")
+def users(memdb):
+    """Return two users for testing."""
+    yield [
+        memdb.user_create("King Arthur", "kingarthur@mail.com", "123456abcdef"),
+        memdb.user_create("Black Knight", "blackknight@mail.com", "123456abcdef"),
+    ]
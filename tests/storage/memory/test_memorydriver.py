@@ -0,0 +1,517 @@
+"""
+Tests for the pyrecipe.storage.memory.memorydriver module.
+"""
+
+import datetime
+
+import pytest
+
+from pyrecipe.errors import PageTokenError
+from pyrecipe.errors import RecipeConflictError
+from pyrecipe.storage.memory import MemoryDriver
+from pyrecipe.storage.shared import BulkResult
+from pyrecipe.storage.shared import PageModel
+from pyrecipe.storage.shared import RecipeModel
+from pyrecipe.storage.shared import RecipeSummary
+from pyrecipe.storage.shared import UserModel
+
+
+def _recipe_kwargs(name, ingredients=("spam",), tags=("bulk",)):
+    return {
+        "name": name,
+        "prep_time": 5,
+        "cook_time": 10,
+        "servings": "1",
+        "ingredients": list(ingredients),
+        "directions": ["cook", "eat"],
+        "tags": list(tags),
+    }
+
+
+#### DBInitInt ###############################################################
+
+
+def test_memorydriver_interfaces():
+    """
+    GIVEN the MemoryDriver
+    WHEN checking it against the DB interfaces
+    THEN assert every abstract method is implemented
+    """
+    assert not MemoryDriver.__abstractmethods__
+
+
+def test_db_initialize(memdb, capsys):
+    """
+    GIVEN two in-memory database names
+    WHEN switching between them with db_initialize
+    THEN assert each keeps its own data
+    """
+    MemoryDriver.recipe_create(**_recipe_kwargs("kept"))
+    MemoryDriver.db_initialize(db_name="pyrecipe_other", verbose=True)
+    assert "pyrecipe_other" in capsys.readouterr().out
+    assert MemoryDriver.recipes_all() == []
+
+    MemoryDriver.db_initialize(db_name="pyrecipe_testing")
+    assert [r.name for r in MemoryDriver.recipes_all()] == ["kept"]
+    MemoryDriver._stores.pop("pyrecipe_other")
+
+
+#### RecipeDBInt #############################################################
+
+
+def test_recipe_create(memdb):
+    """
+    GIVEN recipe params
+    WHEN calling MemoryDriver.recipe_create(**kwargs)
+    THEN assert the RecipeModel is returned and stored
+    """
+    r = MemoryDriver.recipe_create(**_recipe_kwargs("Tester", ["a", "b"]))
+    assert isinstance(r, RecipeModel)
+    assert r.num_ingredients == 2
+    assert r.prep_time == 5.0
+    assert r.deleted is False
+    assert MemoryDriver.recipe_find_by_id(r.id) == r
+
+
+def test_recipe_create_invalid(memdb):
+    """
+    GIVEN a recipe without ingredients
+    WHEN calling MemoryDriver.recipe_create(**kwargs)
+    THEN assert a ValueError is raised and nothing is stored
+    """
+    with pytest.raises(ValueError):
+        MemoryDriver.recipe_create(**_recipe_kwargs("bad", ingredients=[]))
+    assert MemoryDriver.recipes_all() == []
+
+
+def test_recipe_models_are_copies(recipes):
+    """
+    GIVEN a recipe in the DB
+    WHEN mutating the returned RecipeModel
+    THEN assert the stored recipe is unchanged
+    """
+    r = MemoryDriver.recipe_find_by_id(recipes[0].id)
+    r.tags.append("mutated")
+    assert MemoryDriver.recipe_find_by_id(recipes[0].id).tags == ["breakfast", "fast"]
+
+
+def test_recipe_create_many(memdb):
+    """
+    GIVEN a batch of recipes, one of them invalid
+    WHEN calling MemoryDriver.recipe_create_many(recipes, chunk_size)
+    THEN assert a BulkResult per recipe and only the valid ones stored
+    """
+    batch = [_recipe_kwargs("r{}".format(i)) for i in range(5)]
+    batch[2]["ingredients"] = []
+    batch[3] = {"name": "missing params"}
+
+    results = MemoryDriver.recipe_create_many(batch, chunk_size=2)
+    assert all(isinstance(r, BulkResult) for r in results)
+    assert [r.index for r in results] == [0, 1, 2, 3, 4]
+    assert [r.ok for r in results] == [True, True, False, False, True]
+    assert "ingredients" in results[2].error
+    assert sorted(r.name for r in MemoryDriver.recipes_all()) == ["r0", "r1", "r4"]
+    assert [r.recipe is None for r in results] == [False, False, True, True, False]
+    assert results[0].recipe == MemoryDriver.recipe_find_by_id(results[0].id)
+
+
+def test_recipe_edit(recipes):
+    """
+    GIVEN two editors that loaded the same recipe
+    WHEN both submit an edit
+    THEN assert the first is saved and the second raises RecipeConflictError
+    """
+    r = recipes[0]
+    kwargs = {
+        "_id": r.id,
+        "name": "NewName",
+        "prep_time": r.prep_time,
+        "cook_time": r.cook_time,
+        "servings": r.servings,
+        "ingredients": ["spam", "eggs", "salt"],
+        "directions": r.directions,
+        "tags": r.tags,
+        "notes": r.notes,
+        "last_modified": r.last_modified_date,
+    }
+    result = MemoryDriver.recipe_edit(**kwargs)
+    assert result.name == "NewName"
+    assert result.num_ingredients == 3
+    assert result.last_modified_date > r.last_modified_date
+    assert MemoryDriver.recipes_search("newname")[0].id == r.id
+
+    with pytest.raises(RecipeConflictError):
+        MemoryDriver.recipe_edit(**{**kwargs, "name": "Other"})
+    assert MemoryDriver.recipe_edit(**{**kwargs, "_id": "unknown"}) is None
+
+
+def test_recipe_edit_converts_form(recipes):
+    """
+    GIVEN an existing recipe
+    WHEN editing it with the string values of a submitted form
+    THEN assert they are converted and validated like recipe_create's,
+        so equal values are not written and bad ones raise
+    """
+    r = recipes[0]
+    kwargs = {
+        "_id": r.id,
+        "name": r.name,
+        "prep_time": str(r.prep_time),
+        "cook_time": str(r.cook_time),
+        "servings": r.servings,
+        "ingredients": r.ingredients,
+        "directions": r.directions,
+        "tags": [tag.upper() for tag in r.tags],
+        "notes": r.notes,
+    }
+    assert MemoryDriver.recipe_edit(**kwargs).last_modified_date == r.last_modified_date
+
+    result = MemoryDriver.recipe_edit(**{**kwargs, "prep_time": "15", "tags": [" Lunch "]})
+    assert result.prep_time == 15.0
+    assert result.tags == ["lunch"]
+    assert MemoryDriver.recipe_find_by_id(r.id) == result
+
+    with pytest.raises(ValueError):
+        MemoryDriver.recipe_edit(**{**kwargs, "cook_time": "abc"})
+    with pytest.raises(ValueError):
+        MemoryDriver.recipe_edit(**{**kwargs, "cook_time": "-1"})
+    assert MemoryDriver.recipe_find_by_id(r.id) == result
+
+
+def test_recipe_find_by_id_knownBad(recipes):
+    """
+    GIVEN a recipe id that is not in the DB
+    WHEN calling MemoryDriver.recipe_find_by_id(recipe_id)
+    THEN assert None is returned
+    """
+    assert MemoryDriver.recipe_find_by_id("ffffffffffffffffffffffff") is None
+
+
+def test_recipes_find_by_name(recipes):
+    """
+    GIVEN recipes in the DB, one of them deleted
+    WHEN searching for a case insensitive substring of the names
+    THEN assert only the active matches are returned
+    """
+    MemoryDriver.recipe_delete(recipes[1].id)
+    result = MemoryDriver.recipes_find_by_name("SPAM")
+    assert [r.name for r in result] == ["spam and eggs"]
+    summaries = MemoryDriver.recipes_find_by_name_summary("eggs")
+    assert summaries == [
+        RecipeSummary(recipes[0].id, "spam and eggs", 5.0, ["breakfast", "fast"])
+    ]
+
+
+def test_recipes_find_by_tag(recipes):
+    """
+    GIVEN recipes in the DB with tags
+    WHEN searching by tags (case insensitive, all must match)
+    THEN assert the correct recipes are returned
+    """
+    assert len(MemoryDriver.recipes_find_by_tag(["Breakfast"])) == 2
+    result = MemoryDriver.recipes_find_by_tag(["breakfast", "slow"])
+    assert [r.name for r in result] == ["spam and oatmeal"]
+    assert MemoryDriver.recipes_find_by_tag(["breakfast", "nope"]) == []
+    summaries = MemoryDriver.recipes_find_by_tag_summary(["fast"])
+    assert [s.id for s in summaries] == [recipes[0].id]
+
+
+def test_recipes_find_by_ingredient(recipes):
+    """
+    GIVEN recipes in the DB, with their ingredients parsed on create
+    WHEN searching by ingredients (by name, all must match), before and
+        after editing and deleting a recipe
+    THEN assert the recipes having them are returned, through the index
+    """
+    assert [i["name"] for i in recipes[0].parsed_ingredients] == ["spam", "egg"]
+    assert len(MemoryDriver.recipes_find_by_ingredient(["Spam"])) == 2
+    result = MemoryDriver.recipes_find_by_ingredient(["spam", "2 large eggs"])
+    assert [r.name for r in result] == ["spam and eggs"]
+    assert MemoryDriver.recipes_find_by_ingredient(["spam", "nope"]) == []
+    assert MemoryDriver.recipes_find_by_ingredient([]) == []
+
+    r = recipes[1]
+    MemoryDriver.recipe_edit(
+        _id=r.id, name=r.name, prep_time=r.prep_time, cook_time=r.cook_time,
+        servings=r.servings, ingredients=["1 cup oatmeal", "3 eggs"],
+        directions=r.directions, tags=r.tags, notes=r.notes,
+    )
+    summaries = MemoryDriver.recipes_find_by_ingredient_summary(["eggs"])
+    assert sorted(s.name for s in summaries) == ["spam and eggs", "spam and oatmeal"]
+    assert MemoryDriver.recipes_find_by_ingredient(["spam", "oatmeal"]) == []
+
+    MemoryDriver.recipe_delete(recipes[0].id)
+    assert [s.id for s in MemoryDriver.recipes_find_by_ingredient_summary(["egg"])] == [r.id]
+
+
+def test_recipes_backfill_ingredients(recipes):
+    """
+    GIVEN recipes without parsed ingredients, i.e. written before they were
+    WHEN backfilling them, one per batch
+    THEN assert each is parsed and indexed, with the progress reported
+    """
+    db = MemoryDriver._db()
+    for r in recipes:
+        db.recipes.update(r.id, {"parsed_ingredients": []})
+    assert MemoryDriver.recipes_find_by_ingredient(["spam"]) == []
+
+    progress = []
+    updated = MemoryDriver.recipes_backfill_ingredients(
+        batch_size=1, progress=lambda done, total: progress.append((done, total))
+    )
+    assert updated == 2
+    assert progress == [(1, 2), (2, 2)]
+    assert len(MemoryDriver.recipes_find_by_ingredient(["spam"])) == 2
+
+    assert MemoryDriver.recipes_backfill_ingredients() == 0
+    assert MemoryDriver.recipes_backfill_ingredients(reparse=True) == 2
+
+
+def test_recipes_get_tags(recipes):
+    """
+    GIVEN recipes in the DB with tags
+    WHEN one is deleted
+    THEN assert only the tags of active recipes are returned
+    """
+    assert MemoryDriver.recipes_get_tags() == ["breakfast", "fast", "slow"]
+    MemoryDriver.recipe_delete(recipes[0].id)
+    assert MemoryDriver.recipes_get_tags() == ["breakfast", "slow"]
+
+
+def test_recipes_tag_counts(recipes):
+    """
+    GIVEN recipes in the DB with tags
+    WHEN one is deleted
+    THEN assert the active recipes of each tag are counted, most used first
+    """
+    counts = MemoryDriver.recipes_tag_counts()
+    assert counts == {"breakfast": 2, "fast": 1, "slow": 1}
+    assert list(counts) == ["breakfast", "fast", "slow"]
+    MemoryDriver.recipe_delete(recipes[0].id)
+    assert MemoryDriver.recipes_tag_counts() == {"breakfast": 1, "slow": 1}
+
+
+def test_recipes_active_deleted(recipes):
+    """
+    GIVEN recipes in the DB
+    WHEN one is marked deleted
+    THEN assert recipes_active/deleted/all split them correctly
+    """
+    assert MemoryDriver.recipe_delete(recipes[0].id) == 1
+    assert MemoryDriver.recipe_delete("unknown") == 0
+    assert [r.id for r in MemoryDriver.recipes_active()] == [recipes[1].id]
+    assert [r.id for r in MemoryDriver.recipes_deleted()] == [recipes[0].id]
+    assert [s.id for s in MemoryDriver.recipes_active_summary()] == [recipes[1].id]
+    assert len(MemoryDriver.recipes_all()) == 2
+
+
+def test_recipes_page_created_date(memdb):
+    """
+    GIVEN more recipes than fit on a page, some with equal created_date
+    WHEN paging through them newest first
+    THEN assert every active recipe is returned exactly once, in order
+    """
+    created = [MemoryDriver.recipe_create(**_recipe_kwargs("r{}".format(i))) for i in range(7)]
+    MemoryDriver.recipe_delete(created[3].id)
+
+    seen, token = [], None
+    while True:
+        page = MemoryDriver.recipes_page(page_size=2, token=token)
+        assert isinstance(page, PageModel)
+        seen.extend(r.name for r in page)
+        if not page.has_next:
+            break
+        token = page.next_token
+    assert seen == ["r6", "r5", "r4", "r2", "r1", "r0"]
+
+
+def test_recipes_page_name_tags_summary(memdb):
+    """
+    GIVEN recipes with different names and tags
+    WHEN paging A-Z by name, filtered by tag, as summaries
+    THEN assert the correct RecipeSummary's are returned
+    """
+    for name, tags in [("b", ["x"]), ("a", ["x"]), ("c", ["y"]), ("d", ["X", "y"])]:
+        MemoryDriver.recipe_create(**_recipe_kwargs(name, tags=[t.lower() for t in tags]))
+
+    page = MemoryDriver.recipes_page(page_size=2, sort_by="name", tags=["X"], summary=True)
+    assert [s.name for s in page] == ["a", "b"]
+    assert all(isinstance(s, RecipeSummary) for s in page)
+    page = MemoryDriver.recipes_page(
+        page_size=2, sort_by="name", tags=["X"], summary=True, token=page.next_token
+    )
+    assert [s.name for s in page] == ["d"]
+    assert page.next_token is None
+
+
+def test_recipes_page_bad_token(recipes):
+    """
+    GIVEN a malformed token or one for another sort
+    WHEN calling MemoryDriver.recipes_page
+    THEN assert PageTokenError is raised
+    """
+    page = MemoryDriver.recipes_page(page_size=1)
+    with pytest.raises(PageTokenError):
+        MemoryDriver.recipes_page(page_size=1, token="garbage")
+    with pytest.raises(PageTokenError):
+        MemoryDriver.recipes_page(page_size=1, token=page.next_token, sort_by="name")
+
+
+def test_recipe_copy(recipes):
+    """
+    GIVEN a recipe
+    WHEN calling MemoryDriver.recipe_copy(recipe)
+    THEN assert a new recipe is stored with a modified name
+    """
+    copy = MemoryDriver.recipe_copy(recipes[0])
+    assert copy.id != recipes[0].id
+    assert copy.name == "spam and eggs_COPY"
+    assert copy.ingredients == recipes[0].ingredients
+    assert copy.images == []
+    assert len(MemoryDriver.recipes_all()) == 3
+
+
+def test_recipe_add_delete_tag(recipes):
+    """
+    GIVEN a recipe to add/delete a tag
+    WHEN calling MemoryDriver.recipe_add/delete_tag(recipe, tag)
+    THEN assert it is added once, deleted, and the tag index follows
+    """
+    r = recipes[0]
+    assert MemoryDriver.recipe_add_tag(r, "Added") == 1
+    assert MemoryDriver.recipe_add_tag(r, "added") == 1
+    assert MemoryDriver.recipe_find_by_id(r.id).tags == ["breakfast", "fast", "added"]
+    assert [x.id for x in MemoryDriver.recipes_find_by_tag(["added"])] == [r.id]
+
+    assert MemoryDriver.recipe_delete_tag(r, "added") == 1
+    assert MemoryDriver.recipe_find_by_id(r.id).tags == ["breakfast", "fast"]
+    assert MemoryDriver.recipes_find_by_tag(["added"]) == []
+
+
+def test_recipe_mark_made(recipes):
+    """
+    GIVEN a recipe in the DB
+    WHEN marking it made twice on the same day, then on another day
+    THEN assert the same-day duplicate is rejected
+    """
+    r = recipes[0]
+    assert MemoryDriver.recipe_mark_made(r, datetime.datetime(2020, 1, 1, 8)) == 1
+    assert MemoryDriver.recipe_mark_made(r, datetime.datetime(2020, 1, 1, 20)) == 0
+    assert MemoryDriver.recipe_mark_made(r, datetime.datetime(2020, 1, 2)) == 1
+    assert MemoryDriver.recipe_find_by_id(r.id).when_made == [
+        datetime.datetime(2020, 1, 1, 8),
+        datetime.datetime(2020, 1, 2),
+    ]
+
+
+def test_recipes_search(recipes):
+    """
+    GIVEN recipes in the DB
+    WHEN searching by text
+    THEN assert matches are ranked by the weighted fields
+    """
+    # "oatmeal": name (10) + ingredients (4) + directions (2) for recipe 2 only
+    assert [r.id for r in MemoryDriver.recipes_search("Oatmeal")] == [recipes[1].id]
+    # "eggs" is in recipe 1's name, "spam" is in both names
+    result = MemoryDriver.recipes_search("spam eggs")
+    assert [r.id for r in result] == [recipes[0].id, recipes[1].id]
+    summaries = MemoryDriver.recipes_search_summary("fast")
+    assert [s.id for s in summaries] == [recipes[0].id]
+    assert MemoryDriver.recipes_search("nothing") == []
+
+
+def test_recipes_search_ranked(recipes):
+    """
+    GIVEN recipes in the DB
+    WHEN searching them by name and text at once
+    THEN assert each match is returned once, name matches first, deleted
+        recipes excluded, and limit/skip select a window of the ranking
+    """
+    text_only = MemoryDriver.recipe_create(
+        name="ham sandwich",
+        ingredients=["bread", "spam"],
+        directions=["stack"],
+        prep_time=1,
+        cook_time=0,
+        servings="1",
+    )
+    result = MemoryDriver.recipes_search_ranked("spam")
+    assert {r.id for r in result[:2]} == {recipes[0].id, recipes[1].id}
+    assert [r.id for r in result[2:]] == [text_only.id]
+
+    # "oat" is only a substring of a name, not a word the text index knows
+    assert [r.id for r in MemoryDriver.recipes_search_ranked("OAT")] == [recipes[1].id]
+
+    window = MemoryDriver.recipes_search_ranked("spam", limit=1, skip=1, summary=True)
+    assert [s.id for s in window] == [result[1].id]
+    assert isinstance(window[0], RecipeSummary)
+
+    MemoryDriver.recipe_delete(recipes[0].id)
+    assert recipes[0].id not in [r.id for r in MemoryDriver.recipes_search_ranked("spam")]
+    assert MemoryDriver.recipes_search_ranked(" ") == []
+
+
+#### UserDBInt ###############################################################
+
+
+def test_user_create(memdb):
+    """
+    GIVEN a new user
+    WHEN calling MemoryDriver.user_create twice with the same email
+    THEN assert the UserModel is returned first, then None
+    """
+    user = MemoryDriver.user_create("tester", "tester@mail.com", "p@ssw0rd")
+    assert isinstance(user, UserModel)
+    assert user.username == "tester"
+    assert user.password_hash != "p@ssw0rd"
+    assert MemoryDriver.user_create("other", "tester@mail.com", "p@ssw0rd") is None
+
+
+def test_user_find_and_login(users):
+    """
+    GIVEN users in the DB
+    WHEN finding them by id/email and logging in
+    THEN assert the correct user (or None) is returned
+    """
+    u = users[0]
+    assert MemoryDriver.user_find_by_id(u.id) == u
+    assert MemoryDriver.user_find_by_id(None) is None
+    assert MemoryDriver.user_find_by_email("kingarthur@mail.com") == u
+    assert MemoryDriver.user_find_by_email("nobody@mail.com") is None
+    assert MemoryDriver.user_login("kingarthur@mail.com", "123456abcdef") == u
+    assert MemoryDriver.user_login("kingarthur@mail.com", "wrong") is None
+    assert MemoryDriver.user_login("nobody@mail.com", "123456abcdef") is None
+    assert [x.id for x in MemoryDriver.users_list()] == [u.id, users[1].id]
+
+
+def test_users_list_empty(memdb):
+    """
+    GIVEN no users in the DB
+    WHEN calling MemoryDriver.users_list()
+    THEN assert None is returned
+    """
+    assert MemoryDriver.users_list() is None
+
+
+def test_user_add_recipe(recipes, users):
+    """
+    GIVEN a recipe to add to a user
+    WHEN calling MemoryDriver.user_add_recipe(user, recipe_id) twice
+    THEN assert the recipe is referenced once
+    """
+    u = users[0]
+    assert MemoryDriver.user_add_recipe(u, recipes[0].id) == 1
+    assert MemoryDriver.user_add_recipe(u, recipes[0].id) == 1
+    assert MemoryDriver.user_find_by_id(u.id).recipe_ids == [recipes[0].id]
+
+
+def test_user_set_password(users):
+    """
+    GIVEN a user changing their password
+    WHEN calling MemoryDriver.user_set_password()
+    THEN assert the new password logs in
+    """
+    u = users[0]
+    assert MemoryDriver.user_set_password(u, "n3wp@ss") is not None
+    assert MemoryDriver.user_login("kingarthur@mail.com", "n3wp@ss").id == u.id
+    assert MemoryDriver.user_login("kingarthur@mail.com", "123456abcdef") is None
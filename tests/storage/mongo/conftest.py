@@ -1,11 +1,17 @@
 """Fixtures for various test modules."""
 
+import asyncio
 import datetime
+import functools
 
 import pytest
 import mongoengine
+import pymongo
+from mongomock.collection import Collection
 
+from pyrecipe.storage.mongo import MongoDriver
 from pyrecipe.storage.mongo.recipe import Recipe
+from pyrecipe.storage.mongo.tag_stat import TagStat
 from pyrecipe.storage.mongo.user import User
 
 
@@ -24,9 +30,86 @@ def mongodb(request):
     mongoengine.disconnect()
 
 
+class RoundTrips:
+    """
+    Records every operation a test sends to the (mocked) DB.  Only the
+    outermost Collection call is recorded, since each one maps to a single
+    round-trip to a real server (mongomock calls its own methods internally).
+
+    roundtrips.reset()
+    ...
+    assert roundtrips.commands == ["update_one"]
+    """
+
+    METHODS = (
+        "aggregate",
+        "bulk_write",
+        "count_documents",
+        "delete_many",
+        "delete_one",
+        "distinct",
+        "find",
+        "find_one",
+        "find_one_and_delete",
+        "find_one_and_replace",
+        "find_one_and_update",
+        "insert_many",
+        "insert_one",
+        "replace_one",
+        "update_many",
+        "update_one",
+    )
+
+    def __init__(self, monkeypatch):
+        self.commands = []
+        self._depth = 0
+        for name in self.METHODS:
+            monkeypatch.setattr(Collection, name, self._record(getattr(Collection, name)))
+
+    def _record(self, method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            if self._depth == 0:
+                self.commands.append(method.__name__)
+            self._depth += 1
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self._depth -= 1
+
+        return wrapper
+
+    @property
+    def count(self) -> int:
+        return len(self.commands)
+
+    def reset(self):
+        self.commands.clear()
+
+
+@pytest.fixture(autouse=True)
+def tag_stats_unflushed(monkeypatch):
+    """
+    Write queued tag_stats changes only when flushed or read, not from a
+    timer thread in the middle of another test, and drop what is left.
+    """
+    monkeypatch.setattr(MongoDriver, "TAG_STATS_FLUSH_MS", None)
+    yield
+    MongoDriver._pending_tags.clear()
+
+
+@pytest.fixture(scope="function")
+def roundtrips(mongodb, monkeypatch):
+    """Count the DB round-trips issued during a test."""
+    yield RoundTrips(monkeypatch)
+
+
 @pytest.fixture(scope="function")
 def recipes(mongodb):
-    """Return two recipes for testing.  Delete upon test completion."""
+    """
+    Return two recipes for testing, counted in tag_stats.  Delete upon test
+    completion.
+    """
     recipe_1 = Recipe()
     recipe_1.name = "spam and eggs"
     recipe_1.ingredients = ["spam", "eggs"]
@@ -46,10 +129,12 @@ def recipes(mongodb):
     recipe_2.directions = ["microwave oatmeal", "add spam"]
     recipe_2.tags = ["breakfast", "slow"]
     recipe_2.save()
+    MongoDriver.recipes_rebuild_tag_stats()
 
     yield [recipe_1, recipe_2]
     recipe_1.delete()
     recipe_2.delete()
+    TagStat.objects().delete()
 
 
 @pytest.fixture(scope="function")
@@ -72,3 +157,37 @@ def users(mongodb):
     yield [user_1, user_2]
     user_1.delete()
     user_2.delete()
+
+
+@pytest.fixture(scope="function")
+def read_replica(mongodb):
+    """
+    Register the "core_read" alias with secondaryPreferred on its own mocked
+    client, standing in for a secondary that hasn't caught up with "core".
+    Yields the stand-in's database.  Disconnect upon test completion.
+    """
+    mongoengine.connect(
+        db="pyrecipe_testing",
+        alias="core_read",
+        host="mongomock://localhost",
+        read_preference=pymongo.ReadPreference.SECONDARY_PREFERRED,
+    )
+    yield mongoengine.get_db("core_read")
+    mongoengine.disconnect("core_read")
+
+
+@pytest.fixture(scope="function")
+def motordb():
+    """
+    Initialize the MotorDriver against a fresh "mongomock_motor" client, with
+    the Recipe and User indexes created.  Tests drive it with asyncio.run().
+    """
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    from pyrecipe.storage.mongo import MotorDriver
+
+    MotorDriver.db_initialize(
+        db_name="pyrecipe_testing", client=mongomock_motor.AsyncMongoMockClient()
+    )
+    asyncio.run(MotorDriver.db_ensure_indexes())
+    yield MotorDriver
+    MotorDriver.db_close()
@@ -0,0 +1,34 @@
+"""Tests for the pyrecipe/storage/mongo/generation.py module."""
+
+from pyrecipe.storage.mongo.generation import OwnGenerations
+
+
+def test_own_generations_covers():
+    """
+    GIVEN generations bumped by this process's writes
+    WHEN asking whether a move of the generation was made by them only
+    THEN assert it is only if every generation in between is its own
+    """
+    own = OwnGenerations()
+    for value in (3, 4, 6):
+        own.add("recipes", value)
+    assert own.covers("recipes", 2, 4)
+    assert own.covers("recipes", 4, 4)
+    assert not own.covers("recipes", 2, 6)
+    assert not own.covers("recipes", 4, 3)
+    assert not own.covers("users", 2, 3)
+
+
+def test_own_generations_maxlen(monkeypatch):
+    """
+    GIVEN more own generations than MAXLEN
+    WHEN asking about the oldest ones
+    THEN assert they were forgotten, and too long moves are never own
+    """
+    monkeypatch.setattr(OwnGenerations, "MAXLEN", 2)
+    own = OwnGenerations()
+    for value in (1, 2, 3):
+        own.add("recipes", value)
+    assert not own.covers("recipes", 0, 1)
+    assert own.covers("recipes", 1, 3)
+    assert not own.covers("recipes", 0, 3)
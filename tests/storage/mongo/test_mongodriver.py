@@ -9,13 +9,25 @@ import datetime
 
 import pytest
 
+import bson
 import mongoengine
+import pymongo
 
 from pyrecipe.storage.mongo import MongoDriver
+from pyrecipe.storage.mongo import RawMongoDriver
+from pyrecipe.storage.mongo.generation import Generation
 from pyrecipe.storage.mongo.recipe import Recipe
+from pyrecipe.storage.mongo.tag_stat import TagStat
 from pyrecipe.storage.mongo.user import User
 from pyrecipe.storage.shared import RecipeModel
 from pyrecipe.storage.shared import UserModel
+from pyrecipe.storage.shared import ModelCursor
+from pyrecipe.storage.shared import PageModel
+from pyrecipe.storage.shared import BulkResult
+from pyrecipe.storage.shared import RecipeSummary
+from pyrecipe.storage.shared.page_model import encode_token
+from pyrecipe.errors import PageTokenError
+from pyrecipe.errors import RecipeConflictError
 from pyrecipe.security import auth
 
 
@@ -30,7 +42,7 @@ def test_db_initialize_verboseFalse(mocker):
     reg_mock = mocker.patch.object(mongoengine, "register_connection")
 
     MongoDriver.db_initialize(db_name="pyrecipe_tester", verbose=False)
-    assert reg_mock.call_count == 1
+    assert reg_mock.call_count == 2
 
 
 def test_db_initialize_verboseTrue(mocker, capsys):
@@ -44,7 +56,88 @@ def test_db_initialize_verboseTrue(mocker, capsys):
     MongoDriver.db_initialize(db_name="pyrecipe_tester", verbose=True)
     out, err = capsys.readouterr()
     assert "[+] MongoDB connection registered to database: pyrecipe_tester" in out
-    assert reg_mock.call_count == 1
+    assert reg_mock.call_count == 2
+
+
+def test_db_initialize_options(mocker):
+    """
+    GIVEN connection pool, timeout, write concern and read preference settings
+    WHEN a connection is registered with them
+    THEN assert they are passed on to the core and core_read clients with
+        their pool listeners
+    """
+    reg_mock = mocker.patch.object(mongoengine, "register_connection")
+
+    MongoDriver.db_initialize(
+        db_name="pyrecipe_tester",
+        host="mongodb://db1,db2/?replicaSet=rs0",
+        maxPoolSize=50,
+        minPoolSize=5,
+        w="majority",
+        readPreference="primaryPreferred",
+    )
+    core, read = [call[1] for call in reg_mock.call_args_list]
+    assert core["alias"] == "core"
+    assert core["host"] == "mongodb://db1,db2/?replicaSet=rs0"
+    assert core["maxPoolSize"] == 50
+    assert core["minPoolSize"] == 5
+    assert core["w"] == "majority"
+    assert core["read_preference"] == pymongo.ReadPreference.PRIMARY_PREFERRED
+    assert core["event_listeners"] == [MongoDriver.POOL_STATS["core"]]
+    assert read["alias"] == "core_read"
+    assert read["maxPoolSize"] == 50
+    assert read["read_preference"] == pymongo.ReadPreference.SECONDARY_PREFERRED
+    assert read["event_listeners"] == [MongoDriver.POOL_STATS["core_read"]]
+
+    with pytest.raises(ValueError):
+        MongoDriver.db_initialize(db_name="pyrecipe_tester", readPreference="anywhere")
+
+
+def test_db_initialize_warmup(mocker, capsys):
+    """
+    GIVEN a mongoDB server
+    WHEN a connection is registered with warmup=True
+    THEN assert the server is pinged at once and the pool stats printed
+    """
+    mocker.patch.object(mongoengine, "register_connection")
+    conn_mock = mocker.patch.object(mongoengine, "get_connection")
+
+    MongoDriver.db_initialize(db_name="pyrecipe_tester", verbose=True, warmup=True)
+    conn_mock.return_value.admin.command.assert_called_once_with("ping")
+    out, err = capsys.readouterr()
+    assert "[+] MongoDB connection pool warmed up" in out
+
+
+def test_read_routing(recipes, read_replica):
+    """
+    GIVEN a "core_read" connection whose secondary hasn't replicated the recipes yet
+    WHEN reading lists, tags and searches, and reading a recipe by id
+    THEN assert the list reads go to "core_read" and find_by_id stays on "core"
+    """
+    read_replica.recipes.insert_one(
+        {"name": "replicated spam", "tags": ["lunch"], "deleted": False}
+    )
+    read_replica.tag_stats.insert_one({"_id": "lunch", "count": 1})
+
+    assert [r.name for r in MongoDriver.recipes_active()] == ["replicated spam"]
+    assert [r.name for r in MongoDriver.recipes_active_summary()] == ["replicated spam"]
+    assert [r.name for r in MongoDriver.recipes_find_by_tag(["lunch"])] == ["replicated spam"]
+    assert len(MongoDriver.recipes_find_by_tag_summary(["lunch"])) == 1
+    assert [r.name for r in MongoDriver.recipes_find_by_name("spam")] == ["replicated spam"]
+    assert len(MongoDriver.recipes_find_by_name_summary("spam")) == 1
+    assert MongoDriver.recipes_get_tags() == ["lunch"]
+
+    recipe = MongoDriver.recipe_find_by_id(str(recipes[0].id))
+    assert recipe.name == "spam and eggs"
+
+
+def test_read_routing_unregistered(recipes):
+    """
+    GIVEN no "core_read" connection registered
+    WHEN reading lists
+    THEN assert they fall back to "core"
+    """
+    assert len(MongoDriver.recipes_active()) == 2
 
 
 #######  Recipe Tests #######################################################3
@@ -68,6 +161,27 @@ def test_recipe_to_dict(recipes):
     assert r["images"] == ["/path/to/image"]
 
 
+def test_recipe_to_summary():
+    """
+    GIVEN a raw recipe document projected to the summary fields
+    WHEN calling MongoDriver._recipe_to_summary
+    THEN assert it is turned into a RecipeSummary, with defaults for
+        fields missing from the document
+    """
+    s = MongoDriver._recipe_to_summary(
+        {"_id": "123", "name": "spam", "cook_time": 5.0, "tags": ["fast"]}
+    )
+    assert isinstance(s, RecipeSummary)
+    assert s.id == "123"
+    assert s.name == "spam"
+    assert s.cook_time == 5.0
+    assert s.tags == ["fast"]
+
+    s = MongoDriver._recipe_to_summary({"_id": "123", "name": "spam"})
+    assert s.cook_time == 0
+    assert s.tags == []
+
+
 def test_recipe_create(mongodb):
     """
     GIVEN recipe params
@@ -87,6 +201,125 @@ def test_recipe_create(mongodb):
     Recipe.objects().filter(id=r.id).first().delete()
     assert isinstance(r, RecipeModel)
 
+def test_recipe_save_roundtrips(recipes, roundtrips):
+    """
+    GIVEN a recipe already in the DB
+    WHEN changing a field and calling save()
+    THEN assert the change and a refreshed last_modified_date go out
+        in a single write that matches what is stored
+    """
+    r = recipes[0]
+    last_mod = r.last_modified_date
+    r.name = "saved"
+
+    roundtrips.reset()
+    r.save()
+    assert roundtrips.commands == ["update_one"]
+
+    stored = Recipe.objects(id=r.id).as_pymongo().first()
+    assert stored["name"] == "saved"
+    assert stored["last_modified_date"] == r.last_modified_date
+    assert r.last_modified_date >= last_mod
+
+
+def test_recipe_create_roundtrips(mongodb, roundtrips):
+    """
+    GIVEN recipe params
+    WHEN calling MongoDriver.recipe_create(**kwargs)
+    THEN assert a single insert is issued, plus the generation bump, with
+        the tag count queued, and the returned dates match the stored ones
+    """
+    r = MongoDriver.recipe_create(**_recipe_kwargs("roundtrip"))
+    stored = MongoDriver.recipe_find_by_id(r.id)
+    Recipe.objects(id=r.id).delete()
+    TagStat.objects().delete()
+    assert roundtrips.commands[:3] == ["insert_one", "find_one_and_update", "find"]
+    assert stored.created_date == r.created_date
+    assert stored.last_modified_date == r.last_modified_date
+
+
+def _recipe_kwargs(name, ingredients=("spam",)):
+    return {
+        "name": name,
+        "prep_time": 5,
+        "cook_time": 10,
+        "servings": "1",
+        "ingredients": list(ingredients),
+        "directions": ["cook", "eat"],
+        "tags": ["bulk"],
+    }
+
+
+def test_recipe_create_many(mongodb):
+    """
+    GIVEN a batch of recipes, one of them invalid
+    WHEN calling MongoDriver.recipe_create_many(recipes)
+    THEN assert the valid ones are saved and the result of each is
+        reported in input order
+    """
+    batch = [
+        _recipe_kwargs("bulk 1"),
+        _recipe_kwargs("bulk 2", ingredients=()),
+        _recipe_kwargs("bulk 3"),
+    ]
+    results = MongoDriver.recipe_create_many(batch)
+    stored = MongoDriver.recipe_find_by_id(results[0].id)
+    saved = Recipe.objects(tags="bulk")
+    names = sorted(r.name for r in saved)
+    saved.delete()
+    counts = MongoDriver.recipes_tag_counts()
+    TagStat.objects().delete()
+
+    assert [r.index for r in results] == [0, 1, 2]
+    assert all(isinstance(r, BulkResult) for r in results)
+    assert results[0].ok and results[2].ok
+    assert not results[1].ok
+    assert results[1].id is None
+    assert "ingredients" in results[1].error
+    assert results[1].recipe is None
+    assert results[0].recipe == stored
+    assert names == ["bulk 1", "bulk 3"]
+    assert counts == {"bulk": 2}
+    assert {str(r.id) for r in saved} == {results[0].id, results[2].id}
+
+
+def test_recipe_create_many_chunks(mongodb, mocker):
+    """
+    GIVEN a batch of recipes
+    WHEN calling MongoDriver.recipe_create_many(recipes, chunk_size)
+    THEN assert they are sent in unordered chunks of chunk_size
+    """
+    collection = Recipe._get_collection()
+    insert = mocker.spy(type(collection), "insert_many")
+    batch = [_recipe_kwargs("bulk {}".format(i)) for i in range(5)]
+    results = MongoDriver.recipe_create_many(batch, chunk_size=2)
+    Recipe.objects(tags="bulk").delete()
+
+    assert all(r.ok for r in results)
+    assert [len(c[0][1]) for c in insert.call_args_list] == [2, 2, 1]
+    assert all(c[1]["ordered"] == False for c in insert.call_args_list)
+
+
+def test_recipe_create_many_writeerrors(mongodb, mocker):
+    """
+    GIVEN a batch of recipes where the server rejects one of them
+    WHEN calling MongoDriver.recipe_create_many(recipes)
+    THEN assert only the rejected recipe is reported as failed
+    """
+    batch = [_recipe_kwargs("bulk {}".format(i)) for i in range(3)]
+    error = pymongo.errors.BulkWriteError(
+        {"writeErrors": [{"index": 1, "errmsg": "E11000 duplicate key"}]}
+    )
+    collection = Recipe._get_collection()
+    mocker.patch.object(type(collection), "insert_many", side_effect=error)
+    results = MongoDriver.recipe_create_many(batch)
+
+    assert [r.ok for r in results] == [True, False, True]
+    assert results[1].error == "E11000 duplicate key"
+    assert results[1].id is None
+    assert results[1].recipe is None
+
+
 @pytest.mark.xfail(strict=False)
 def test_recipe_edit(recipes):
     """
@@ -119,6 +352,127 @@ def test_recipe_edit(recipes):
     assert result.tags == ["breakfast", "fast"]
 
 
+def _edit_kwargs(recipe: RecipeModel, **changes) -> dict:
+    """Return the recipe_edit kwargs for the recipe, with any changes."""
+    kwargs = {
+        "_id": recipe.id,
+        "name": recipe.name,
+        "prep_time": recipe.prep_time,
+        "cook_time": recipe.cook_time,
+        "servings": recipe.servings,
+        "ingredients": recipe.ingredients,
+        "directions": recipe.directions,
+        "tags": recipe.tags,
+        "notes": recipe.notes,
+        "last_modified": recipe.last_modified_date,
+    }
+    kwargs.update(changes)
+    return kwargs
+
+
+def test_recipe_edit_changed_fields_only(recipes, roundtrips, mocker):
+    """
+    GIVEN an existing recipe
+    WHEN editing the recipe's name and ingredients
+    THEN assert only the changed fields are $set, in one guarded update,
+        followed by the generation bump
+    """
+    r = MongoDriver.recipe_find_by_id(str(recipes[0].id))
+    spy = mocker.spy(Recipe._get_collection(), "find_one_and_update")
+
+    roundtrips.reset()
+    result = MongoDriver.recipe_edit(
+        **_edit_kwargs(r, name="NewName", ingredients=["spam", "eggs", "salt"])
+    )
+    assert roundtrips.commands == ["find", "find_one_and_update", "find_one_and_update"]
+
+    guard, update = spy.call_args[0]
+    assert guard["last_modified_date"] == r.last_modified_date
+    assert sorted(update["$set"]) == [
+        "ingredients",
+        "last_modified_date",
+        "name",
+        "num_ingredients",
+        "parsed_ingredients",
+    ]
+
+    assert isinstance(result, RecipeModel)
+    assert result.name == "NewName"
+    assert result.num_ingredients == 3
+    assert [i["name"] for i in result.parsed_ingredients] == ["spam", "egg", "salt"]
+    assert result.directions == ["fry eggs", "add spam", "eat"]
+    assert result.last_modified_date > r.last_modified_date
+    assert MongoDriver.recipe_find_by_id(r.id) == result
+
+
+def test_recipe_edit_unchanged(recipes, roundtrips):
+    """
+    GIVEN an existing recipe
+    WHEN submitting the edit form without changes
+    THEN assert nothing is written to the DB
+    """
+    r = MongoDriver.recipe_find_by_id(str(recipes[0].id))
+    roundtrips.reset()
+    result = MongoDriver.recipe_edit(**_edit_kwargs(r))
+    assert roundtrips.commands == ["find"]
+    assert result == r
+
+
+def test_recipe_edit_converts_form(recipes):
+    """
+    GIVEN an existing recipe
+    WHEN editing it with the string values of a submitted form
+    THEN assert they are converted and validated like recipe_create's,
+        so equal values are not written and bad ones raise
+    """
+    r = MongoDriver.recipe_find_by_id(str(recipes[0].id))
+    same = _edit_kwargs(r, prep_time="10", cook_time="5", tags=[" Breakfast", "FAST"])
+    assert MongoDriver.recipe_edit(**same) == MongoDriver.recipe_find_by_id(r.id)
+
+    result = MongoDriver.recipe_edit(**_edit_kwargs(r, prep_time="15", tags=["Lunch"]))
+    assert result.prep_time == 15.0
+    assert result.tags == ["lunch"]
+    assert Recipe._get_collection().find_one({"_id": recipes[0].id})["prep_time"] == 15.0
+
+    with pytest.raises(ValueError):
+        MongoDriver.recipe_edit(**_edit_kwargs(result, cook_time="abc"))
+    assert MongoDriver.recipe_find_by_id(r.id) == result
+
+
+def test_recipe_edit_conflict(recipes):
+    """
+    GIVEN two editors that loaded the same recipe
+    WHEN both submit an edit
+    THEN assert the second raises RecipeConflictError and the first
+        edit is kept; an edit chained off the first result succeeds
+    """
+    r = MongoDriver.recipe_find_by_id(str(recipes[0].id))
+    first = MongoDriver.recipe_edit(**_edit_kwargs(r, name="first"))
+
+    with pytest.raises(RecipeConflictError):
+        MongoDriver.recipe_edit(**_edit_kwargs(r, name="second"))
+    assert MongoDriver.recipe_find_by_id(r.id).name == "first"
+
+    again = MongoDriver.recipe_edit(**_edit_kwargs(first, name="again"))
+    assert again.name == "again"
+
+
+def test_recipe_edit_unknown(mongodb):
+    """
+    GIVEN a recipe id that is not in the DB
+    WHEN editing it
+    THEN assert None is returned
+    """
+    r = RecipeModel(
+        _id="ffffffffffffffffffffffff", name="name", num_ingredients=1,
+        ingredients=["i"], directions=["d"], prep_time=0, cook_time=0,
+        servings="1", images=[], tags=[], notes=[], rating=None,
+        favorite=False, when_made=[], deleted=False,
+        created_date=None, last_modified_date=None,
+    )
+    assert MongoDriver.recipe_edit(**_edit_kwargs(r)) is None
+
+
 def test_recipe_find_by_id_knownGood(recipes):
     """
     GIVEN a recipe id as a string
@@ -193,6 +547,77 @@ def test_recipes_find_by_tags_multiple(recipes):
     assert isinstance(r[1], RecipeModel)
 
 
+def test_recipes_find_by_tag_summary(recipes, mocker):
+    """
+    GIVEN a tag to search recipes with
+    WHEN calling MongoDriver.recipes_find_by_tag_summary([tag])
+    THEN assert RecipeSummary's are returned built only from the
+        projected fields
+    """
+    to_summary = mocker.spy(MongoDriver, "_recipe_to_summary")
+    r = MongoDriver.recipes_find_by_tag_summary(["breakfast"])
+    assert len(r) == 2
+    assert all(isinstance(recipe, RecipeSummary) for recipe in r)
+    assert r[0].name == "spam and eggs"
+    assert r[0].tags == ["breakfast", "fast"]
+    assert r[0].id == str(recipes[0].id)
+    son = to_summary.call_args[0][0]
+    assert set(son) == {"_id", "name", "cook_time", "tags"}
+
+
+def test_recipes_backfill_ingredients(recipes):
+    """
+    GIVEN recipes saved without their parsed ingredients
+    WHEN calling MongoDriver.recipes_backfill_ingredients()
+    THEN assert they are parsed in batches, with progress reported, and
+        found by ingredient afterwards
+    """
+    assert MongoDriver.recipes_find_by_ingredient(["eggs"]) == []
+    calls = []
+    updated = MongoDriver.recipes_backfill_ingredients(
+        batch_size=1, progress=lambda done, total: calls.append((done, total))
+    )
+    assert updated == 2
+    assert calls == [(1, 2), (2, 2)]
+    recipes[0].reload()
+    assert [i["name"] for i in recipes[0].parsed_ingredients] == ["spam", "egg"]
+
+    assert MongoDriver.recipes_backfill_ingredients() == 0
+    assert MongoDriver.recipes_backfill_ingredients(reparse=True) == 0
+
+
+def test_recipes_find_by_ingredient(recipes):
+    """
+    GIVEN recipes with parsed ingredients
+    WHEN calling MongoDriver.recipes_find_by_ingredient(ingredients)
+    THEN assert the recipes having all of them are returned
+    """
+    MongoDriver.recipes_backfill_ingredients()
+    r = MongoDriver.recipes_find_by_ingredient(["2 Eggs"])
+    assert [recipe.name for recipe in r] == ["spam and eggs"]
+    assert isinstance(r[0], RecipeModel)
+    assert r[0].parsed_ingredients[1]["name"] == "egg"
+    assert len(MongoDriver.recipes_find_by_ingredient(["spam"])) == 2
+    assert MongoDriver.recipes_find_by_ingredient(["spam", "toast"]) == []
+    assert MongoDriver.recipes_find_by_ingredient([]) == []
+
+    s = MongoDriver.recipes_find_by_ingredient_summary(["oatmeal"])
+    assert [recipe.name for recipe in s] == ["spam and oatmeal"]
+    assert isinstance(s[0], RecipeSummary)
+
+
+def test_recipes_find_by_name_summary(recipes):
+    """
+    GIVEN a search string for a recipe name
+    WHEN calling MongoDriver.recipes_find_by_name_summary(search_string)
+    THEN assert the correct RecipeSummary's are returned
+    """
+    r = MongoDriver.recipes_find_by_name_summary("oatmeal")
+    assert len(r) == 1
+    assert isinstance(r[0], RecipeSummary)
+    assert r[0].name == "spam and oatmeal"
+
+
 def test_recipes_get_tags(recipes):
     """
     GIVEN recipes in the DB with tags
@@ -206,6 +631,82 @@ def test_recipes_get_tags(recipes):
     assert "slow" in tags
 
 
+def test_recipes_tag_counts(recipes, roundtrips):
+    """
+    GIVEN recipes in the DB with tags
+    WHEN creating, copying, editing, tagging and deleting recipes
+    THEN assert tag_stats is kept up to date by each write, matches a full
+        rebuild, and is read without touching the recipes
+    """
+    assert MongoDriver.recipes_tag_counts() == {"breakfast": 2, "fast": 1, "slow": 1}
+
+    new = MongoDriver.recipe_create(**dict(_recipe_kwargs("lunch"), tags=["lunch", "fast"]))
+    try:
+        MongoDriver.recipe_copy(Recipe.objects(id=new.id).first())
+        MongoDriver.recipe_edit(**_edit_kwargs(new, tags=["lunch", "slow"]))
+        r = MongoDriver.recipe_find_by_id(str(recipes[0].id))
+        MongoDriver.recipe_add_tag(r, "Lunch")
+        MongoDriver.recipe_add_tag(r, "lunch")
+        MongoDriver.recipe_delete_tag(r, "breakfast")
+        MongoDriver.recipe_delete_tag(r, "breakfast")
+        MongoDriver.recipe_delete(str(recipes[1].id))
+        MongoDriver.recipe_delete(str(recipes[1].id))
+        MongoDriver.recipe_add_tag(MongoDriver.recipe_find_by_id(str(recipes[1].id)), "gone")
+
+        counts = MongoDriver.recipes_tag_counts()
+        assert counts == {"lunch": 3, "fast": 2, "slow": 1}
+        assert list(counts) == ["lunch", "fast", "slow"]
+        assert MongoDriver.recipes_get_tags() == ["fast", "lunch", "slow"]
+
+        roundtrips.reset()
+        MongoDriver.recipes_get_tags()
+        assert roundtrips.commands == ["find"]
+
+        TagStat.objects(tag="lunch").update_one(set__count=99)
+        assert MongoDriver.recipes_rebuild_tag_stats() == counts
+        assert MongoDriver.recipes_tag_counts() == counts
+    finally:
+        Recipe.objects(name__startswith="lunch").delete()
+
+
+def test_flush_tag_stats(recipes, roundtrips):
+    """
+    GIVEN tag count changes queued by recipe writes
+    WHEN flushing them
+    THEN assert they are written in a single bulk write, plus the
+        generation bump, and nothing is written when none are queued
+    """
+    r = MongoDriver.recipe_find_by_id(str(recipes[0].id))
+    MongoDriver.recipe_add_tag(r, "lunch")
+    MongoDriver.recipe_delete_tag(r, "fast")
+    MongoDriver.recipe_delete(str(recipes[1].id))
+    assert TagStat.objects(tag="lunch").first() is None
+
+    roundtrips.reset()
+    assert MongoDriver.flush_tag_stats() == 4
+    assert roundtrips.commands == ["bulk_write", "find_one_and_update"]
+    assert MongoDriver.recipes_tag_counts() == {"breakfast": 1, "lunch": 1}
+
+    roundtrips.reset()
+    assert MongoDriver.flush_tag_stats() == 0
+    assert roundtrips.commands == []
+
+
+def test_flush_tag_stats_timer(recipes, monkeypatch):
+    """
+    GIVEN a TAG_STATS_FLUSH_MS
+    WHEN a recipe write queues tag count changes
+    THEN assert a timer flushes them, without a read
+    """
+    monkeypatch.setattr(MongoDriver, "TAG_STATS_FLUSH_MS", 10)
+    r = MongoDriver.recipe_find_by_id(str(recipes[0].id))
+    MongoDriver.recipe_add_tag(r, "lunch")
+    timer = MongoDriver._flush_timer
+    timer.join(5)
+    assert TagStat.objects(tag="lunch").first().count == 1
+    assert MongoDriver._flush_timer is None
+
+
 def test_recipes_all(recipes):
     """
     GIVEN a DB with recipes
@@ -232,6 +733,22 @@ def test_recipes_active(recipes):
     assert active[1].deleted == False
 
 
+def test_recipes_active_summary(recipes):
+    """
+    GIVEN a DB with recipes, one of them marked as deleted
+    WHEN calling MongoDriver.recipes_active_summary()
+    THEN assert a lazy ModelCursor of RecipeSummary's is returned for the
+        active recipes only
+    """
+    recipes[1].update(deleted=True)
+    active = MongoDriver.recipes_active_summary()
+    assert isinstance(active, ModelCursor)
+    assert len(active) == 1
+    assert isinstance(active[0], RecipeSummary)
+    assert [r.name for r in active] == ["spam and eggs"]
+    assert active[0].cook_time == 5
+
+
 def test_recipes_deleted(recipes):
     """
     GIVEN a DB with recipes
@@ -242,6 +759,123 @@ def test_recipes_deleted(recipes):
     assert len(deleted) == 0
 
 
+def test_recipes_active_lazy(recipes, mocker):
+    """
+    GIVEN a DB with recipes
+    WHEN calling MongoDriver.recipes_active()
+    THEN assert a ModelCursor is returned and no recipes are converted
+        until it is iterated over
+    """
+    to_dict = mocker.spy(MongoDriver, "_recipe_to_dict")
+    active = MongoDriver.recipes_active()
+    assert isinstance(active, ModelCursor)
+    assert to_dict.call_count == 0
+
+    names = [r.name for r in active]
+    assert names == ["spam and eggs", "spam and oatmeal"]
+    assert to_dict.call_count == 2
+
+
+def test_recipes_active_deleted_filtered(recipes):
+    """
+    GIVEN a DB with a recipe marked as deleted
+    WHEN calling MongoDriver.recipes_active() and recipes_deleted()
+    THEN assert each only returns the recipes matching the deleted flag
+    """
+    recipes[1].update(deleted=True)
+
+    active = MongoDriver.recipes_active()
+    assert len(active) == 1
+    assert active[0].name == "spam and eggs"
+
+    deleted = MongoDriver.recipes_deleted()
+    assert len(deleted) == 1
+    assert deleted[0].name == "spam and oatmeal"
+    assert deleted[0].deleted == True
+
+
+def test_recipes_page_created_date(recipes):
+    """
+    GIVEN a DB with recipes
+    WHEN paging through them newest first one recipe at a time
+    THEN assert each recipe is returned exactly once and the last page
+        has no next_token
+    """
+    first = MongoDriver.recipes_page(page_size=1)
+    assert isinstance(first, PageModel)
+    assert len(first.items) == 1
+    assert isinstance(first.items[0], RecipeModel)
+    assert first.has_next
+
+    second = MongoDriver.recipes_page(page_size=1, token=first.next_token)
+    assert len(second.items) == 1
+    assert second.next_token is None
+    assert {first.items[0].name, second.items[0].name} == {
+        "spam and eggs",
+        "spam and oatmeal",
+    }
+
+
+def test_recipes_page_name(recipes):
+    """
+    GIVEN a DB with recipes
+    WHEN paging through them by name
+    THEN assert they are returned in alphabetical order
+    """
+    first = MongoDriver.recipes_page(page_size=1, sort_by="name")
+    second = MongoDriver.recipes_page(page_size=1, sort_by="name", token=first.next_token)
+    assert first.items[0].name == "spam and eggs"
+    assert second.items[0].name == "spam and oatmeal"
+    assert not second.has_next
+
+
+def test_recipes_page_filters(recipes):
+    """
+    GIVEN a DB with recipes
+    WHEN paging by tag or with a recipe marked as deleted
+    THEN assert only the matching recipes are returned
+    """
+    page = MongoDriver.recipes_page(tags=["FAST"])
+    assert [r.name for r in page.items] == ["spam and eggs"]
+
+    recipes[0].update(deleted=True)
+    page = MongoDriver.recipes_page()
+    assert [r.name for r in page.items] == ["spam and oatmeal"]
+    page = MongoDriver.recipes_page(deleted=True)
+    assert [r.name for r in page.items] == ["spam and eggs"]
+
+
+@pytest.mark.parametrize("sort_by", ["created_date", "name"])
+def test_recipes_page_summary(recipes, sort_by):
+    """
+    GIVEN a DB with recipes
+    WHEN paging through them with summary=True
+    THEN assert RecipeSummary's are returned and the tokens still page
+    """
+    first = MongoDriver.recipes_page(page_size=1, sort_by=sort_by, summary=True)
+    assert isinstance(first.items[0], RecipeSummary)
+    second = MongoDriver.recipes_page(
+        page_size=1, sort_by=sort_by, summary=True, token=first.next_token
+    )
+    assert isinstance(second.items[0], RecipeSummary)
+    assert not second.has_next
+    assert {first.items[0].name, second.items[0].name} == {
+        "spam and eggs",
+        "spam and oatmeal",
+    }
+
+
+@pytest.mark.parametrize("token", ["garbage", encode_token("name", "spam", "123")])
+def test_recipes_page_badtoken(recipes, token):
+    """
+    GIVEN a malformed token, or one from a different sort order
+    WHEN requesting a page
+    THEN assert PageTokenError is raised
+    """
+    with pytest.raises(PageTokenError):
+        MongoDriver.recipes_page(token=token)
+
+
 def test_recipe_copy(recipes):
     """
     GIVEN a recipe to copy in the DB
@@ -335,6 +969,109 @@ def test_recipe_delete(recipes):
     assert result == 1
     assert r.deleted == True
 
+def test_recipe_tag_roundtrips(recipes, roundtrips):
+    """
+    GIVEN a recipe to add/delete a tag
+    WHEN calling MongoDriver.recipe_add/delete_tag(recipe, tag)
+    THEN assert each is a single update that also refreshes the
+        last_modified_date, plus the generation bump, with the tag count
+        queued instead of written
+    """
+    r = MongoDriver.recipe_find_by_id(str(recipes[0].id))
+    last_mod = r.last_modified_date
+
+    roundtrips.reset()
+    assert MongoDriver.recipe_add_tag(r, "Added") == 1
+    assert roundtrips.commands == ["find_one_and_update", "find_one_and_update"]
+    r = MongoDriver.recipe_find_by_id(str(recipes[0].id))
+    assert r.tags == ["breakfast", "fast", "added"]
+    assert r.last_modified_date >= last_mod
+
+    roundtrips.reset()
+    assert MongoDriver.recipe_delete_tag(r, "added") == 1
+    assert roundtrips.commands == ["find_one_and_update", "find_one_and_update"]
+    r = MongoDriver.recipe_find_by_id(str(recipes[0].id))
+    assert r.tags == ["breakfast", "fast"]
+
+
+def test_recipe_mark_made_roundtrips(recipes, roundtrips):
+    """
+    GIVEN a recipe in the DB
+    WHEN marking it made twice on the same day, then on another day
+    THEN assert each call is a single update (plus the generation bump on
+        success), and the same-day duplicate is rejected by the DB
+    """
+    r = MongoDriver.recipe_find_by_id(str(recipes[0].id))
+
+    roundtrips.reset()
+    assert MongoDriver.recipe_mark_made(r, datetime.datetime(2020, 1, 1, 8)) == 1
+    assert roundtrips.commands == ["update_one", "find_one_and_update"]
+
+    roundtrips.reset()
+    assert MongoDriver.recipe_mark_made(r, datetime.datetime(2020, 1, 1, 20)) == 0
+    assert roundtrips.commands == ["update_one"]
+
+    assert MongoDriver.recipe_mark_made(r, datetime.datetime(2020, 1, 2)) == 1
+    r = MongoDriver.recipe_find_by_id(str(recipes[0].id))
+    assert r.when_made == [
+        datetime.datetime(2020, 1, 1, 8),
+        datetime.datetime(2020, 1, 2),
+    ]
+
+
+def test_recipe_delete_roundtrips(recipes, roundtrips):
+    """
+    GIVEN a recipe in the DB the user wants to delete
+    WHEN calling MongoDriver.recipe_delete(recipe_id)
+    THEN assert it is marked deleted in a single update, plus the
+        generation bump, with the tag count queued, and an unknown id
+        returns 0
+    """
+    roundtrips.reset()
+    assert MongoDriver.recipe_delete(str(recipes[0].id)) == 1
+    assert roundtrips.commands == ["find_one_and_update", "find_one_and_update"]
+    assert MongoDriver.recipe_find_by_id(str(recipes[0].id)).deleted is True
+
+    assert MongoDriver.recipe_delete(str(bson.ObjectId())) == 0
+
+
+def test_recipes_generation(recipes):
+    """
+    GIVEN a recipe in the DB
+    WHEN writing to the recipes
+    THEN assert each successful write bumps the generation, and failed
+        writes and reads don't
+    """
+    r = MongoDriver.recipe_find_by_id(str(recipes[0].id))
+    start = MongoDriver.recipes_generation()
+
+    MongoDriver.recipe_add_tag(r, "bumped")
+    MongoDriver.recipe_mark_made(r, datetime.datetime(2020, 1, 1))
+    assert MongoDriver.recipes_generation() == start + 2
+
+    MongoDriver.recipe_mark_made(r, datetime.datetime(2020, 1, 1))
+    MongoDriver.recipe_delete(str(bson.ObjectId()))
+    MongoDriver.recipe_edit(**_edit_kwargs(MongoDriver.recipe_find_by_id(r.id)))
+    MongoDriver.recipes_active()
+    assert MongoDriver.recipes_generation() == start + 2
+
+
+def test_recipes_generation_is_own(recipes):
+    """
+    GIVEN a recipe in the DB
+    WHEN this process writes recipes, then another process does
+    THEN assert only the generations of this process's writes are its own
+    """
+    r = MongoDriver.recipe_find_by_id(str(recipes[0].id))
+    start = MongoDriver.recipes_generation()
+    MongoDriver.recipe_add_tag(r, "own")
+    MongoDriver.recipe_mark_made(r, datetime.datetime(2020, 1, 1))
+    assert MongoDriver.recipes_generation_is_own(start, start + 2)
+
+    Generation.objects(name="recipes").update_one(inc__value=1)
+    assert not MongoDriver.recipes_generation_is_own(start, start + 3)
+
+
 @pytest.mark.xfail(strict=False)
 def test_recipes_search(recipes):
     """
@@ -354,6 +1091,175 @@ def test_recipes_search(recipes):
     assert len(r) == 1
     assert r.name == "spam and oatmeal"
 
+@pytest.mark.xfail(strict=False)
+def test_recipes_search_summary(recipes):
+    """
+    GIVEN recipes in the DB the user wants find by search
+    WHEN supplying a search string
+    THEN assert RecipeSummary's for the matching recipes are returned
+
+    MongoMock does not support $text queries.
+    """
+    r = MongoDriver.recipes_search_summary("oatmeal")
+    assert len(r) == 1
+    assert isinstance(r[0], RecipeSummary)
+
+
+def test_search_pipeline():
+    """
+    GIVEN a search string
+    WHEN building the recipes_search_ranked aggregation
+    THEN assert a single $text-or-name $match on active recipes comes first,
+        name matches are boosted, and skip/limit/summary shape the output
+    """
+    pipeline = MongoDriver._search_pipeline("spam (eggs)", limit=10, skip=20, summary=True)
+    match = pipeline[0]["$match"]
+    assert match["deleted"] is False
+    assert match["$or"] == [
+        {"$text": {"$search": "spam (eggs)"}},
+        {"name": {"$regex": r"spam\ \(eggs\)", "$options": "i"}},
+    ]
+    assert MongoDriver.SEARCH_NAME_BOOST in pipeline[1]["$addFields"]["_score"]["$add"][1]["$cond"]
+    assert pipeline[2:] == [
+        {"$sort": {"_score": -1, "_id": 1}},
+        {"$skip": 20},
+        {"$limit": 10},
+        {"$project": {"name": 1, "cook_time": 1, "tags": 1}},
+    ]
+    assert MongoDriver._search_pipeline("spam")[-1] == {"$project": {"_score": 0}}
+
+
+def test_recipes_search_ranked_blank(recipes):
+    """
+    GIVEN a blank search string
+    WHEN calling MongoDriver.recipes_search_ranked
+    THEN assert nothing is returned
+    """
+    assert MongoDriver.recipes_search_ranked("  ") == []
+
+
+@pytest.mark.xfail(strict=False)
+def test_recipes_search_ranked(recipes):
+    """
+    GIVEN recipes in the DB
+    WHEN searching them by name and text at once
+    THEN assert each is returned once, and deleted recipes are excluded
+
+    MongoMock does not support $text queries.
+    """
+    assert len(MongoDriver.recipes_search_ranked("spam")) == 2
+    MongoDriver.recipe_delete(str(recipes[0].id))
+    summaries = MongoDriver.recipes_search_ranked("spam", summary=True)
+    assert [s.id for s in summaries] == [str(recipes[1].id)]
+
+
+#######  Raw Read Tests ######################################################
+
+def test_recipe_son_to_dict(recipes):
+    """
+    GIVEN a raw recipe document
+    WHEN calling MongoDriver._recipe_son_to_dict
+    THEN assert it matches the dict built from the hydrated Recipe
+    """
+    son = Recipe.objects(id=recipes[0].id).as_pymongo().first()
+    recipe = Recipe.objects(id=recipes[0].id).first()
+    assert MongoDriver._recipe_son_to_dict(son) == MongoDriver._recipe_to_dict(recipe)
+
+
+def test_recipe_son_to_dict_defaults():
+    """
+    GIVEN a raw recipe document missing the optional fields
+    WHEN calling MongoDriver._recipe_son_to_dict
+    THEN assert the Recipe field defaults are filled in
+    """
+    r = MongoDriver._recipe_son_to_dict(
+        {"_id": "123", "name": "spam", "num_ingredients": 1, "ingredients": ["spam"]}
+    )
+    assert r["_id"] == "123"
+    assert r["tags"] == []
+    assert r["notes"] == []
+    assert r["prep_time"] == 0
+    assert r["favorite"] == False
+    assert r["deleted"] == False
+    assert isinstance(RecipeModel.from_dict(r), RecipeModel)
+
+
+def test_user_son_to_dict(users):
+    """
+    GIVEN a raw user document
+    WHEN calling MongoDriver._user_son_to_dict
+    THEN assert it matches the dict built from the hydrated User
+    """
+    son = User.objects(id=users[0].id).as_pymongo().first()
+    user = User.objects(id=users[0].id).first()
+    assert MongoDriver._user_son_to_dict(son) == MongoDriver._user_to_dict(user)
+
+
+@pytest.mark.parametrize(
+    "method, args",
+    [
+        ("recipes_all", ()),
+        ("recipes_active", ()),
+        ("recipes_deleted", ()),
+        ("recipes_find_by_tag", (["breakfast"],)),
+        ("recipes_find_by_name", ("spam",)),
+    ],
+)
+def test_raw_reads_recipes(recipes, mocker, method, args):
+    """
+    GIVEN a DB with recipes
+    WHEN reading them with the RawMongoDriver
+    THEN assert the same RecipeModel's are returned without hydrating
+        any Recipe documents
+    """
+    expected = list(getattr(MongoDriver, method)(*args))
+    from_son = mocker.spy(Recipe, "_from_son")
+    result = list(getattr(RawMongoDriver, method)(*args))
+    assert result == expected
+    assert from_son.call_count == 0
+
+
+def test_raw_reads_recipe_find_by_id(recipes, mocker):
+    """
+    GIVEN a recipe id
+    WHEN reading it with the RawMongoDriver
+    THEN assert the same RecipeModel is returned without hydration
+    """
+    expected = MongoDriver.recipe_find_by_id(str(recipes[0].id))
+    from_son = mocker.spy(Recipe, "_from_son")
+    assert RawMongoDriver.recipe_find_by_id(str(recipes[0].id)) == expected
+    assert RawMongoDriver.recipe_find_by_id("ffffffffffffffffffffffff") is None
+    assert from_son.call_count == 0
+
+
+def test_raw_reads_recipes_page(recipes):
+    """
+    GIVEN a DB with recipes
+    WHEN paging through them with the RawMongoDriver
+    THEN assert the same pages are returned
+    """
+    raw = RawMongoDriver.recipes_page(page_size=1)
+    assert raw == MongoDriver.recipes_page(page_size=1)
+    raw = RawMongoDriver.recipes_page(page_size=1, token=raw.next_token)
+    assert isinstance(raw.items[0], RecipeModel)
+    assert not raw.has_next
+
+
+def test_raw_reads_users(users, mocker):
+    """
+    GIVEN a DB with users
+    WHEN reading them with the RawMongoDriver
+    THEN assert the same UserModel's are returned without hydration
+    """
+    expected = MongoDriver.users_list()
+    from_son = mocker.spy(User, "_from_son")
+    assert RawMongoDriver.users_list() == expected
+    assert RawMongoDriver.user_find_by_id(str(users[0].id)) == expected[0]
+    assert RawMongoDriver.user_find_by_email(users[1].email) == expected[1]
+    assert RawMongoDriver.user_find_by_id("ffffffffffffffffffffffff") is None
+    assert from_son.call_count == 0
+
+
 #######  User Tests ##########################################################
 
 def test_user_to_dict(users):
@@ -516,3 +1422,61 @@ def test_user_set_password(users, mocker):
     assert result == "asdfjkl;"
     user = MongoDriver.user_find_by_id(users[0].id)
     assert user.password_hash == "asdfjkl;"
+
+
+def test_user_add_recipe_roundtrips(recipes, users, roundtrips):
+    """
+    GIVEN a recipe to add to a user
+    WHEN calling MongoDriver.user_add_recipe(user, recipe_id)
+    THEN assert a single update, plus the generation bump, adds the
+        reference (once) and refreshes the user's last_modified_date
+    """
+    u = MongoDriver.user_find_by_id(users[0].id)
+    recipe_id = str(recipes[0].id)
+
+    roundtrips.reset()
+    assert MongoDriver.user_add_recipe(u, recipe_id) == 1
+    assert roundtrips.commands == ["update_one", "find_one_and_update"]
+    assert MongoDriver.user_add_recipe(u, recipe_id) == 1
+
+    stored = User.objects(id=u.id).as_pymongo().first()
+    assert stored["recipe_ids"] == [recipes[0].id]
+    assert stored["last_modified_date"] >= users[0].last_modified_date
+
+
+def test_user_set_password_roundtrips(users, roundtrips, mocker):
+    """
+    GIVEN a user changing their password
+    WHEN calling MongoDriver.user_set_password()
+    THEN assert the hash is written in a single update, plus the
+        generation bump, and an unknown user returns None
+    """
+    auth_mock = mocker.patch.object(auth, "hash_password")
+    auth_mock.return_value = "asdfjkl;"
+    user = MongoDriver.user_find_by_id(users[0].id)
+
+    roundtrips.reset()
+    assert MongoDriver.user_set_password(user, "p@ssw0rd") == "asdfjkl;"
+    assert roundtrips.commands == ["update_one", "find_one_and_update"]
+    assert User.objects(id=user.id).first().password_hash == "asdfjkl;"
+
+    user._id = str(bson.ObjectId())
+    assert MongoDriver.user_set_password(user, "p@ssw0rd") is None
+
+
+def test_users_generation(recipes, users):
+    """
+    GIVEN users in the DB
+    WHEN writing to the users
+    THEN assert each successful write bumps the users generation, and
+        leaves the recipes generation alone
+    """
+    u = MongoDriver.user_find_by_id(users[0].id)
+    start = MongoDriver.users_generation()
+    recipes_start = MongoDriver.recipes_generation()
+
+    MongoDriver.user_add_recipe(u, str(recipes[0].id))
+    MongoDriver.user_set_password(u, "p@ssw0rd")
+    MongoDriver.user_find_by_email(u.email)
+    assert MongoDriver.users_generation() == start + 2
+    assert MongoDriver.recipes_generation() == recipes_start
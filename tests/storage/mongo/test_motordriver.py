@@ -0,0 +1,293 @@
+"""Tests for the pyrecipe/storage/mongo/motordriver.py module."""
+
+import asyncio
+import datetime
+
+import mongoengine
+import pytest
+
+from pyrecipe.errors import PageTokenError
+from pyrecipe.errors import RecipeConflictError
+from pyrecipe.storage.mongo import MotorDriver
+from pyrecipe.storage.shared.recipe_model import RecipeModel
+from pyrecipe.storage.shared.recipe_summary_model import RecipeSummary
+
+
+RECIPE = {
+    "name": "spam and eggs",
+    "ingredients": ["spam", "eggs"],
+    "directions": ["fry eggs", "add spam", "eat"],
+    "prep_time": 10,
+    "cook_time": 5,
+    "servings": "1",
+    "tags": ["breakfast", "fast"],
+}
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_motordriver_implements_interfaces():
+    """
+    GIVEN the MotorDriver
+    WHEN checking the abstract methods of the DB interfaces
+    THEN assert every one of them is implemented
+    """
+    assert not MotorDriver.__abstractmethods__
+
+
+def test_recipe_create_and_find(motordb):
+    """
+    GIVEN a recipe to create
+    WHEN creating it and finding it by id
+    THEN assert the same RecipeModel comes back
+    """
+    recipe = run(motordb.recipe_create(**RECIPE))
+    assert isinstance(recipe, RecipeModel)
+    assert recipe.num_ingredients == 2
+    assert recipe.prep_time == 10.0
+
+    found = run(motordb.recipe_find_by_id(recipe.id))
+    assert found == recipe
+    assert run(motordb.recipe_find_by_id("not-an-id")) is None
+
+
+def test_recipe_create_validates(motordb):
+    """
+    GIVEN a recipe without ingredients
+    WHEN creating it
+    THEN assert the same ValidationError as MongoDriver is raised
+    """
+    with pytest.raises(mongoengine.errors.ValidationError):
+        run(motordb.recipe_create(**dict(RECIPE, ingredients=[])))
+    assert run(motordb.recipes_all()) == []
+
+
+def test_recipe_create_many(motordb):
+    """
+    GIVEN a batch of recipes with one invalid recipe
+    WHEN creating them in chunks
+    THEN assert the valid ones are created and the invalid one reported
+    """
+    batch = [dict(RECIPE, name="spam {}".format(i)) for i in range(5)]
+    batch[2]["ingredients"] = []
+    results = run(motordb.recipe_create_many(batch, chunk_size=2))
+
+    assert [r.ok for r in results] == [True, True, False, True, True]
+    assert len(run(motordb.recipes_all())) == 4
+    assert results[2].recipe is None
+    assert results[0].recipe == run(motordb.recipe_find_by_id(results[0].id))
+
+
+def test_recipes_find(motordb):
+    """
+    GIVEN recipes, one of them deleted
+    WHEN finding by name and tag, in full and as summaries
+    THEN assert only the active matches are returned
+    """
+    spam = run(motordb.recipe_create(**RECIPE))
+    run(motordb.recipe_create(**dict(RECIPE, name="spam (old)", tags=["fast"])))
+    deleted = run(motordb.recipe_create(**dict(RECIPE, name="spam (deleted)")))
+    run(motordb.recipe_delete(deleted.id))
+
+    assert len(run(motordb.recipes_find_by_name("SPAM ("))) == 1
+    assert [r.id for r in run(motordb.recipes_find_by_tag(["Breakfast"]))] == [spam.id]
+    summaries = run(motordb.recipes_find_by_tag_summary(["fast"]))
+    assert len(summaries) == 2
+    assert all(isinstance(s, RecipeSummary) for s in summaries)
+    assert len(run(motordb.recipes_find_by_name_summary("spam"))) == 2
+    assert sorted(run(motordb.recipes_get_tags())) == ["breakfast", "fast"]
+    assert len(run(motordb.recipes_active())) == 2
+    assert len(run(motordb.recipes_active_summary())) == 2
+    assert [r.id for r in run(motordb.recipes_deleted())] == [deleted.id]
+    assert len(run(motordb.recipes_all())) == 3
+
+
+def test_recipes_find_by_ingredient(motordb):
+    """
+    GIVEN recipes, their ingredients parsed as they are created
+    WHEN finding them by ingredient and backfilling the parsed ingredients
+    THEN assert the matches are returned and there is nothing to backfill
+    """
+    spam = run(motordb.recipe_create(**RECIPE))
+    run(motordb.recipe_create(**dict(RECIPE, name="toast", ingredients=["2 slices bread"])))
+
+    assert spam.parsed_ingredients[1]["name"] == "egg"
+    assert [r.id for r in run(motordb.recipes_find_by_ingredient(["Eggs", "spam"]))] == [spam.id]
+    summaries = run(motordb.recipes_find_by_ingredient_summary(["bread"]))
+    assert [s.name for s in summaries] == ["toast"]
+    assert all(isinstance(s, RecipeSummary) for s in summaries)
+    assert run(motordb.recipes_find_by_ingredient([])) == []
+
+    assert run(motordb.recipes_backfill_ingredients()) == 0
+    calls = []
+    updated = run(motordb.recipes_backfill_ingredients(
+        batch_size=1, reparse=True, progress=lambda done, total: calls.append(done)
+    ))
+    assert updated == 0  # parsed the same as on create
+    assert calls[-1] == 2
+
+
+@pytest.mark.parametrize("sort_by", ["created_date", "name"])
+def test_recipes_page(motordb, sort_by):
+    """
+    GIVEN recipes
+    WHEN paging through them with continuation tokens
+    THEN assert every recipe is returned once, in order
+    """
+    batch = [dict(RECIPE, name="spam {}".format(i)) for i in range(7)]
+    run(motordb.recipe_create_many(batch))
+
+    seen, token = [], None
+    while True:
+        page = run(motordb.recipes_page(page_size=3, token=token, sort_by=sort_by))
+        seen.extend(page.items)
+        token = page.next_token
+        if not token:
+            break
+
+    assert len(seen) == 7
+    assert len({r.id for r in seen}) == 7
+    if sort_by == "name":
+        assert [r.name for r in seen] == sorted(b["name"] for b in batch)
+
+    page = run(motordb.recipes_page(page_size=3, tags=["FAST"], summary=True))
+    assert all(isinstance(r, RecipeSummary) for r in page.items)
+    with pytest.raises(PageTokenError):
+        run(motordb.recipes_page(token="garbage"))
+
+
+def test_recipe_edit(motordb):
+    """
+    GIVEN an existing recipe
+    WHEN editing it with its last_modified_date, then with a stale one
+    THEN assert the first edit applies and the second raises a conflict
+    """
+    recipe = run(motordb.recipe_create(**RECIPE))
+    form = {k: v for k, v in RECIPE.items()}
+    form.update(ingredients=["spam", "eggs", "toast"], _id=recipe.id)
+
+    edited = run(motordb.recipe_edit(**form, last_modified=recipe.last_modified_date))
+    assert edited.num_ingredients == 3
+    assert edited.last_modified_date >= recipe.last_modified_date
+
+    stale = edited.last_modified_date - datetime.timedelta(seconds=1)
+    with pytest.raises(RecipeConflictError):
+        run(motordb.recipe_edit(**form, last_modified=stale))
+
+    form["_id"] = "5f0000000000000000000000"
+    assert run(motordb.recipe_edit(**form)) is None
+
+
+def test_recipe_updates(motordb):
+    """
+    GIVEN a recipe in the DB
+    WHEN tagging, marking made and copying it
+    THEN assert each update applies once
+    """
+    recipe = run(motordb.recipe_create(**RECIPE))
+
+    assert run(motordb.recipe_add_tag(recipe, "Lunch")) == 1
+    assert run(motordb.recipe_delete_tag(recipe, "fast")) == 1
+    assert run(motordb.recipe_find_by_id(recipe.id)).tags == ["breakfast", "lunch"]
+
+    date = datetime.datetime(2020, 1, 1, 8)
+    assert run(motordb.recipe_mark_made(recipe, date)) == 1
+    assert run(motordb.recipe_mark_made(recipe, date.replace(hour=20))) == 0
+    assert run(motordb.recipe_find_by_id(recipe.id)).when_made == [date]
+
+    copy = run(motordb.recipe_copy(recipe))
+    assert copy.name == "spam and eggs_COPY"
+    assert copy.id != recipe.id
+
+
+def test_recipes_generation(motordb):
+    """
+    GIVEN an empty DB
+    WHEN writing recipes
+    THEN assert each successful write bumps the generation
+    """
+    assert run(motordb.recipes_generation()) == 0
+    recipe = run(motordb.recipe_create(**RECIPE))
+    assert run(motordb.recipe_add_tag(recipe, "lunch")) == 1
+    assert run(motordb.recipe_delete("5f0000000000000000000000")) == 0
+    assert run(motordb.recipes_generation()) == 2
+
+
+def test_recipes_tag_counts(motordb):
+    """
+    GIVEN recipes in the DB
+    WHEN tagging, editing and deleting them
+    THEN assert tag_stats is kept up to date, and matches a full rebuild
+    """
+    first = run(motordb.recipe_create(**RECIPE))
+    second = run(motordb.recipe_copy(first))
+    run(motordb.recipe_add_tag(first, "Lunch"))
+    run(motordb.recipe_delete_tag(first, "breakfast"))
+    form = dict(RECIPE, _id=second.id, tags=["fast", "slow"])
+    run(motordb.recipe_edit(**form))
+    run(motordb.recipe_delete(second.id))
+    run(motordb.recipe_create_many([dict(RECIPE, tags=["lunch"])]))
+
+    counts = run(motordb.recipes_tag_counts())
+    assert counts == {"lunch": 2, "fast": 1}
+    assert run(motordb.recipes_get_tags()) == ["fast", "lunch"]
+    assert run(motordb.recipes_rebuild_tag_stats()) == counts
+
+
+def test_concurrent_reads(motordb):
+    """
+    GIVEN recipes
+    WHEN many reads are awaited concurrently on one loop
+    THEN assert they all complete with the right results
+    """
+    ids = [r._id for r in run(motordb.recipe_create_many([RECIPE] * 20))]
+
+    async def load_all():
+        return await asyncio.gather(*(motordb.recipe_find_by_id(_id) for _id in ids))
+
+    assert [r.id for r in run(load_all())] == ids
+
+
+@pytest.mark.xfail(strict=False)
+def test_recipes_search(motordb):
+    """
+    GIVEN recipes
+    WHEN searching the text index
+    THEN assert the matches are returned (needs a real mongod for $text)
+    """
+    run(motordb.recipe_create(**RECIPE))
+    assert len(run(motordb.recipes_search("eggs"))) == 1
+    assert len(run(motordb.recipes_search_summary("eggs"))) == 1
+    assert len(run(motordb.recipes_search_ranked("eggs", limit=5))) == 1
+
+
+def test_users(motordb):
+    """
+    GIVEN users to register
+    WHEN creating, logging in, finding and updating them
+    THEN assert each operation works and duplicate emails are refused
+    """
+    user = run(motordb.user_create("King Arthur", "kingarthur@mail.com", "123456abcdef"))
+    assert user.email == "kingarthur@mail.com"
+    assert run(motordb.user_create("Arthur", "kingarthur@mail.com", "pw")) is None
+
+    assert run(motordb.user_login("kingarthur@mail.com", "123456abcdef")) == user
+    assert run(motordb.user_login("kingarthur@mail.com", "wrong")) is None
+    assert run(motordb.user_login("nobody@mail.com", "123456abcdef")) is None
+    assert run(motordb.user_find_by_id(str(user.id))) == user
+    assert run(motordb.user_find_by_id("bad-id")) is None
+    assert run(motordb.user_find_by_email("kingarthur@mail.com")) == user
+    assert len(run(motordb.users_list())) == 1
+
+    recipe = run(motordb.recipe_create(**RECIPE))
+    assert run(motordb.user_add_recipe(user, recipe.id)) == 1
+    assert [str(_id) for _id in run(motordb.user_find_by_id(user.id)).recipe_ids] == [
+        recipe.id
+    ]
+
+    password_hash = run(motordb.user_set_password(user, "newpass"))
+    assert password_hash is not None
+    assert run(motordb.user_login("kingarthur@mail.com", "newpass")) is not None
+    assert run(motordb.users_generation()) == 3
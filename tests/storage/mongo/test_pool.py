@@ -0,0 +1,55 @@
+"""Tests for the pyrecipe/storage/mongo/pool.py module."""
+
+from pymongo import monitoring
+
+from pyrecipe.storage.mongo.pool import PoolStats
+
+
+ADDRESS = ("localhost", 27017)
+
+
+def test_pool_stats_utilisation():
+    """
+    GIVEN a pool of 4 connections
+    WHEN connections are created, checked out and checked back in
+    THEN assert the open, in use and peak counts are tracked
+    """
+    stats = PoolStats()
+    stats.pool_created(monitoring.PoolCreatedEvent(ADDRESS, {"maxPoolSize": 4}))
+    for i in range(3):
+        stats.connection_created(monitoring.ConnectionCreatedEvent(ADDRESS, i))
+        stats.connection_checked_out(monitoring.ConnectionCheckedOutEvent(ADDRESS, i))
+    stats.connection_checked_in(monitoring.ConnectionCheckedInEvent(ADDRESS, 0))
+    stats.connection_closed(monitoring.ConnectionClosedEvent(ADDRESS, 0, "idle"))
+
+    server = stats.snapshot()["localhost:27017"]
+    assert server["max_pool_size"] == 4
+    assert server["open"] == 2
+    assert server["in_use"] == 2
+    assert server["peak_in_use"] == 3
+    assert server["checkouts"] == 3
+    assert server["utilisation"] == 0.75
+
+
+def test_pool_stats_checkout_timeout(caplog):
+    """
+    GIVEN an exhausted pool
+    WHEN a checkout times out
+    THEN assert it is counted and logged
+    """
+    stats = PoolStats()
+    stats.pool_created(monitoring.PoolCreatedEvent(ADDRESS, {}))
+    stats.connection_check_out_failed(
+        monitoring.ConnectionCheckOutFailedEvent(
+            ADDRESS, monitoring.ConnectionCheckOutFailedReason.TIMEOUT
+        )
+    )
+
+    server = stats.snapshot()["localhost:27017"]
+    assert server["max_pool_size"] == 100
+    assert server["checkout_failures"] == 1
+    assert server["checkout_timeouts"] == 1
+    assert "exhausted" in caplog.text
+
+    stats.reset()
+    assert stats.snapshot() == {}
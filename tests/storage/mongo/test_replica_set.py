@@ -0,0 +1,89 @@
+"""
+Read/write routing tests for the MongoDriver against a real replica set.
+
+Skipped unless PYRECIPE_TEST_REPLICA_SET holds the replica set URI.  A local
+three member set can be started with:
+
+    for port in 27018 27019 27020; do
+        mkdir -p /tmp/rs0-$port
+        mongod --replSet rs0 --port $port --dbpath /tmp/rs0-$port --fork \
+            --logpath /tmp/rs0-$port/mongod.log
+    done
+    mongo --port 27018 --eval 'rs.initiate({_id: "rs0", members: [
+        {_id: 0, host: "localhost:27018"},
+        {_id: 1, host: "localhost:27019"},
+        {_id: 2, host: "localhost:27020"}]})'
+
+    PYRECIPE_TEST_REPLICA_SET="mongodb://localhost:27018,localhost:27019,localhost:27020/?replicaSet=rs0" pytest
+"""
+
+import os
+import time
+
+import mongoengine
+import pymongo
+import pytest
+
+from pyrecipe.storage.mongo import MongoDriver
+
+
+REPLICA_SET = os.environ.get("PYRECIPE_TEST_REPLICA_SET")
+
+pytestmark = pytest.mark.skipif(
+    not REPLICA_SET, reason="PYRECIPE_TEST_REPLICA_SET is not set"
+)
+
+
+@pytest.fixture(scope="module")
+def replica_set():
+    """
+    Point the "core" and "core_read" aliases at the replica set.  Drop the
+    test database and restore the mocked "core" connection upon completion.
+    """
+    mongoengine.disconnect("core")
+    MongoDriver.db_initialize(
+        db_name="pyrecipe_rs_testing", host=REPLICA_SET, w="majority", warmup=True
+    )
+    yield MongoDriver
+    mongoengine.get_connection("core").drop_database("pyrecipe_rs_testing")
+    mongoengine.disconnect("core_read")
+    mongoengine.disconnect("core")
+    mongoengine.connect(db="pyrecipe_testing", alias="core", host="mongomock://localhost")
+
+
+def test_connections(replica_set):
+    """
+    GIVEN the registered connections
+    WHEN checking their read preferences
+    THEN assert "core" reads from the primary and "core_read" from secondaries
+    """
+    core = mongoengine.get_connection("core")
+    read = mongoengine.get_connection("core_read")
+    assert core.read_preference == pymongo.ReadPreference.PRIMARY
+    assert read.read_preference == pymongo.ReadPreference.SECONDARY_PREFERRED
+    assert core.is_primary
+
+
+def test_read_your_own_write(replica_set):
+    """
+    GIVEN a recipe that was just created
+    WHEN finding it by id, and then listing recipes by its tag
+    THEN assert it is found on the primary at once and the list reads
+        see it once it has replicated
+    """
+    recipe = replica_set.recipe_create(
+        name="replicated spam",
+        prep_time=1,
+        cook_time=1,
+        servings="1",
+        ingredients=["spam"],
+        directions=["eat"],
+        tags=["replicated"],
+    )
+    assert replica_set.recipe_find_by_id(recipe.id).name == "replicated spam"
+
+    deadline = time.time() + 10
+    while not replica_set.recipes_find_by_tag(["replicated"]):
+        assert time.time() < deadline, "recipe never replicated to the secondaries"
+        time.sleep(0.1)
+    assert "replicated" in replica_set.recipes_get_tags()
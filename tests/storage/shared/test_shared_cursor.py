@@ -0,0 +1,54 @@
+from unittest.mock import Mock
+
+import pytest
+
+from pyrecipe.storage.shared import ModelCursor
+
+
+###### helpers #########
+
+class FakeQuerySet(list):
+    """Minimal stand-in for a mongoengine QuerySetNoCache."""
+
+    def clone(self):
+        return FakeQuerySet(self)
+
+    def count(self, with_limit_and_skip=False):
+        return len(self)
+
+
+###### test funcs #########
+
+def test_modelcursor_lazy():
+    """Verifies records are only converted as they are iterated over."""
+    to_model = Mock(side_effect=lambda r: r * 10)
+    cursor = ModelCursor(FakeQuerySet([1, 2, 3]), to_model)
+    assert to_model.call_count == 0
+
+    it = iter(cursor)
+    assert next(it) == 10
+    assert to_model.call_count == 1
+
+
+def test_modelcursor_reiterable():
+    """Verifies the cursor can be iterated over more than once."""
+    cursor = ModelCursor(FakeQuerySet([1, 2, 3]), lambda r: r)
+    assert list(cursor) == [1, 2, 3]
+    assert list(cursor) == [1, 2, 3]
+
+
+def test_modelcursor_len_bool():
+    """Verifies len() and truthiness are based on the queryset count."""
+    assert len(ModelCursor(FakeQuerySet([1, 2]), lambda r: r)) == 2
+    assert ModelCursor(FakeQuerySet([1]), lambda r: r)
+    assert not ModelCursor(FakeQuerySet([]), lambda r: r)
+
+
+def test_modelcursor_getitem():
+    """Verifies index and slice access convert the records."""
+    cursor = ModelCursor(FakeQuerySet([1, 2, 3]), lambda r: r * 10)
+    assert cursor[0] == 10
+    assert cursor[-1] == 30
+    assert cursor[1:] == [20, 30]
+    with pytest.raises(IndexError):
+        cursor[5]
@@ -0,0 +1,66 @@
+import pytest
+
+from pyrecipe.storage.shared import parse_ingredient
+from pyrecipe.storage.shared import parse_ingredients
+from pyrecipe.storage.shared.ingredient_parser import ingredient_key
+
+
+###### test funcs #########
+
+@pytest.mark.parametrize(
+    "text, quantity, unit, name, preparation",
+    [
+        ("2 cups flour, sifted", 2.0, "cup", "flour", "sifted"),
+        ("1 1/2 Tablespoons olive oil", 1.5, "tbsp", "olive oil", None),
+        ("½ tsp Baking Soda", 0.5, "tsp", "baking soda", None),
+        ("2-3 cloves garlic, minced", 2.0, "clove", "garlic", "minced"),
+        ("garlic, 2 cloves, minced", 2.0, "clove", "garlic", "minced"),
+        ("basil, a handful", 1.0, "handful", "basil", None),
+        ("a pinch of salt", 1.0, "pinch", "salt", None),
+        ("1 (14 oz) can of diced tomatoes", 1.0, "can", "tomato", "diced"),
+        ("2 large eggs, beaten", 2.0, None, "egg", "beaten"),
+        ("finely chopped onion", None, None, "onion", "finely chopped"),
+        ("a dozen eggs", 12.0, None, "egg", None),
+        ("salt, to taste", None, None, "salt", "to taste"),
+        ("asparagus", None, None, "asparagus", None),
+        ("3 tbsp", 3.0, "tbsp", "", None),
+    ],
+)
+def test_parse_ingredient(text, quantity, unit, name, preparation):
+    """
+    GIVEN an ingredient string
+    WHEN parsing it
+    THEN assert its quantity, canonical unit, singular name and preparation
+        are split out of it
+    """
+    ingredient = parse_ingredient(text)
+    assert ingredient.text == text
+    assert ingredient.quantity == quantity
+    assert ingredient.unit == unit
+    assert ingredient.name == name
+    assert ingredient.preparation == preparation
+
+
+def test_parse_ingredients():
+    """
+    GIVEN a recipe's ingredients
+    WHEN parsing them all
+    THEN assert one dict is returned per ingredient, in order
+    """
+    parsed = parse_ingredients(["6 tomatoes", "1 lb spaghetti"])
+    assert [(i["text"], i["quantity"], i["unit"], i["name"]) for i in parsed] == [
+        ("6 tomatoes", 6.0, None, "tomato"),
+        ("1 lb spaghetti", 1.0, "lb", "spaghetti"),
+    ]
+    parsed[0]["name"] = "spam"
+    assert parse_ingredients(["6 tomatoes"])[0]["name"] == "tomato"
+
+
+@pytest.mark.parametrize("text", ["Tomatoes", "6 tomatoes, diced", "1 can tomatoes"])
+def test_ingredient_key(text):
+    """
+    GIVEN the same ingredient written different ways
+    WHEN getting its key
+    THEN assert it is the same name
+    """
+    assert ingredient_key(text) == "tomato"
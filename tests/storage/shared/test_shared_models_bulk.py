@@ -0,0 +1,24 @@
+import pytest
+
+from pyrecipe.storage.shared import BulkResult
+
+
+###### test funcs #########
+
+def test_bulkresult_ok():
+    """Verifies a successful BulkResult is properly instantiated."""
+    result = BulkResult(index=3, _id="123456")
+    assert result.index == 3
+    assert result.id == "123456"
+    assert result.ok
+    assert result.to_dict() == {"index": 3, "_id": "123456", "error": None}
+
+    result.recipe = object()
+    assert result.to_dict() == {"index": 3, "_id": "123456", "error": None}
+
+
+def test_bulkresult_error():
+    """Verifies a failed BulkResult reports the error."""
+    result = BulkResult(index=0, error="bad recipe")
+    assert result.id is None
+    assert not result.ok
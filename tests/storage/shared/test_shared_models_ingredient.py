@@ -0,0 +1,32 @@
+import pytest
+
+from pyrecipe.storage.shared import IngredientModel
+
+
+####### globals #########
+
+INGREDIENT = {
+    "text": "2 cups flour, sifted",
+    "quantity": 2.0,
+    "unit": "cup",
+    "name": "flour",
+    "preparation": "sifted",
+}
+
+
+###### test funcs #########
+
+def test_ingredientmodel_fromdict():
+    """Verifies an IngredientModel is properly instantiated via the
+    from_dict() method."""
+    ingredient = IngredientModel.from_dict(INGREDIENT)
+    assert ingredient.quantity == 2.0
+    assert ingredient.unit == "cup"
+    assert ingredient.name == "flour"
+    assert ingredient.preparation == "sifted"
+
+
+def test_ingredientmodel_todict():
+    """Verifies a properly formed dict is returned from the
+    IngredientModel.to_dict() method."""
+    assert IngredientModel(**INGREDIENT).to_dict() == INGREDIENT
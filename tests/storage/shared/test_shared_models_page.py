@@ -0,0 +1,38 @@
+import datetime
+
+import pytest
+
+from pyrecipe.errors import PageTokenError
+from pyrecipe.storage.shared import PageModel
+from pyrecipe.storage.shared.page_model import decode_token
+from pyrecipe.storage.shared.page_model import encode_token
+
+
+###### test funcs #########
+
+def test_pagemodel_init():
+    """Verifies a PageModel is properly instantiated."""
+    page = PageModel(items=[1, 2], next_token="abc")
+    assert page.items == [1, 2]
+    assert page.has_next
+    assert len(page) == 2
+    assert list(page) == [1, 2]
+    assert not PageModel(items=[]).has_next
+
+
+@pytest.mark.parametrize(
+    "sort_by, value",
+    [("created_date", datetime.datetime(2020, 1, 2, 3, 4, 5, 678000)), ("name", "spam")],
+)
+def test_token_roundtrip(sort_by, value):
+    """Verifies a token decodes back into the keyset position."""
+    token = encode_token(sort_by, value, "5e1f")
+    assert "=" not in token
+    assert decode_token(token, sort_by) == (value, "5e1f")
+
+
+@pytest.mark.parametrize("token", ["", "not a token", encode_token("name", "a", "1")])
+def test_token_invalid(token):
+    """Verifies malformed tokens or tokens for a different sort raise."""
+    with pytest.raises(PageTokenError):
+        decode_token(token, "created_date")
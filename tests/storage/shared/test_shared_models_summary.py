@@ -0,0 +1,34 @@
+import pytest
+
+from pyrecipe.storage.shared import RecipeSummary
+
+####### globals #########
+
+SUMMARY = {
+    "_id": "123456",
+    "name": "test recipe",
+    "cook_time": 20,
+    "tags": ["spicy", "tester"],
+}
+
+
+###### test funcs #########
+
+def test_recipesummary_init():
+    """Verifies a RecipeSummary is properly instantiated."""
+    recipe = RecipeSummary(**SUMMARY)
+    assert recipe.id == "123456"
+    assert recipe.name == "test recipe"
+    assert recipe.cook_time == 20
+    assert recipe.tags == ["spicy", "tester"]
+
+
+def test_recipesummary_from_dict():
+    """Verifies a RecipeSummary is properly instantiated via from_dict()."""
+    recipe = RecipeSummary.from_dict(SUMMARY)
+    assert recipe.to_dict() == SUMMARY
+
+
+def test_recipesummary_fields():
+    """Verifies the projected DB fields cover what list views render."""
+    assert set(RecipeSummary.FIELDS) == {"name", "cook_time", "tags"}
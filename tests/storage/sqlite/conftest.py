@@ -0,0 +1,48 @@
+"""Fixtures for the pyrecipe/storage/sqlite tests."""
+
+import pytest
+
+from pyrecipe.storage.sqlite import SQLiteDriver
+
+
+@pytest.fixture(scope="function")
+def sqlitedb(tmp_path):
+    """Initialize a fresh SQLite database file.  Closed upon test completion."""
+    SQLiteDriver.db_initialize(db_name=str(tmp_path / "pyrecipe_testing"), verbose=False)
+    yield SQLiteDriver
+    SQLiteDriver.db_close()
+    SQLiteDriver._path = None
+
+
+@pytest.fixture(scope="function")
+def recipes(sqlitedb):
+    """Return two recipes for testing."""
+    recipe_1 = sqlitedb.recipe_create(
+        name="spam and eggs",
+        ingredients=["spam", "eggs"],
+        directions=["fry eggs", "add spam", "eat"],
+        prep_time=10,
+        cook_time=5,
+        servings="1",
+        tags=["breakfast", "fast"],
+        images=["/path/to/image"],
+    )
+    recipe_2 = sqlitedb.recipe_create(
+        name="spam and oatmeal",
+        ingredients=["spam", "oatmeal"],
+        directions=["microwave oatmeal", "add spam"],
+        prep_time=0,
+        cook_time=0,
+        servings="1",
+        tags=["breakfast", "slow"],
+    )
+    yield [recipe_1, recipe_2]
+
+
+@pytest.fixture(scope="function")
+def users(sqlitedb):
+    """Return two users for testing."""
+    yield [
+        sqlitedb.user_create("King Arthur", "kingarthur@mail.com", "123456abcdef"),
+        sqlitedb.user_create("Black Knight", "blackknight@mail.com", "123456abcdef"),
+    ]
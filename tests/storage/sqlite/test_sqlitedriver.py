@@ -0,0 +1,601 @@
+"""
+Tests for the pyrecipe.storage.sqlite.sqlitedriver module.
+"""
+
+import datetime
+import sqlite3
+import threading
+
+import pytest
+
+from pyrecipe.errors import PageTokenError
+from pyrecipe.errors import RecipeConflictError
+from pyrecipe.storage.sqlite import SQLiteDriver
+from pyrecipe.storage.shared import BulkResult
+from pyrecipe.storage.shared import PageModel
+from pyrecipe.storage.shared import RecipeModel
+from pyrecipe.storage.shared import RecipeSummary
+from pyrecipe.storage.shared import UserModel
+
+
+def _recipe_kwargs(name, ingredients=("spam",), tags=("bulk",)):
+    return {
+        "name": name,
+        "prep_time": 5,
+        "cook_time": 10,
+        "servings": "1",
+        "ingredients": list(ingredients),
+        "directions": ["cook", "eat"],
+        "tags": list(tags),
+    }
+
+
+#### DBInitInt ###############################################################
+
+
+def test_sqlitedriver_interfaces():
+    """
+    GIVEN the SQLiteDriver
+    WHEN checking it against the DB interfaces
+    THEN assert every abstract method is implemented
+    """
+    assert not SQLiteDriver.__abstractmethods__
+
+
+def test_db_initialize(tmp_path, capsys):
+    """
+    GIVEN a database name without an extension
+    WHEN calling SQLiteDriver.db_initialize(db_name)
+    THEN assert the file is created in WAL mode with the schema
+    """
+    SQLiteDriver.db_initialize(db_name=str(tmp_path / "pyrecipe_init"), verbose=True)
+    assert "pyrecipe_init.sqlite3" in capsys.readouterr().out
+    assert (tmp_path / "pyrecipe_init.sqlite3").exists()
+
+    conn = SQLiteDriver._conn()
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master")}
+    assert {"recipes", "recipe_tags", "recipes_fts", "users"} <= tables
+
+    # initializing an existing database keeps its data
+    SQLiteDriver.recipe_create(**_recipe_kwargs("kept"))
+    SQLiteDriver.db_initialize(db_name=str(tmp_path / "pyrecipe_init"))
+    assert [r.name for r in SQLiteDriver.recipes_all()] == ["kept"]
+    SQLiteDriver.db_close()
+
+
+def test_db_initialize_adds_columns(tmp_path):
+    """
+    GIVEN a database created before the recipes.parsed_ingredients column
+    WHEN calling SQLiteDriver.db_initialize(db_name)
+    THEN assert the column is added, keeping the recipes, to be backfilled
+    """
+    from pyrecipe.storage.sqlite.schema import SCHEMA
+
+    path = str(tmp_path / "pyrecipe_old.sqlite3")
+    old_recipes = SCHEMA[:SCHEMA.index(");") + 2].replace(",\n    parsed_ingredients TEXT", "")
+    conn = sqlite3.connect(path)
+    conn.execute(old_recipes)
+    conn.execute(
+        "INSERT INTO recipes (id, name, num_ingredients, ingredients, directions,"
+        " created_date, last_modified_date) VALUES ('1', 'old', 1, '[\"2 eggs\"]',"
+        " '[\"fry\"]', '2020-01-01T00:00:00.000000', '2020-01-01T00:00:00.000000')"
+    )
+    conn.commit()
+    conn.close()
+
+    SQLiteDriver.db_initialize(db_name=path)
+    recipe = SQLiteDriver.recipe_find_by_id("1")
+    assert recipe.name == "old"
+    assert recipe.parsed_ingredients == []
+    assert SQLiteDriver.recipes_backfill_ingredients() == 1
+    assert [r.id for r in SQLiteDriver.recipes_find_by_ingredient(["egg"])] == ["1"]
+    SQLiteDriver.db_close()
+
+
+def test_connection_per_thread(recipes):
+    """
+    GIVEN an initialized database
+    WHEN reading from another thread
+    THEN assert that thread uses its own connection and sees the data
+    """
+    found = {}
+
+    def read():
+        found["conn"] = SQLiteDriver._conn()
+        found["recipe"] = SQLiteDriver.recipe_find_by_id(recipes[0].id)
+        SQLiteDriver.db_close()
+
+    thread = threading.Thread(target=read)
+    thread.start()
+    thread.join()
+    assert found["conn"] is not SQLiteDriver._conn()
+    assert found["recipe"] == recipes[0]
+
+
+#### RecipeDBInt #############################################################
+
+
+def test_recipe_create(sqlitedb):
+    """
+    GIVEN recipe params
+    WHEN calling SQLiteDriver.recipe_create(**kwargs)
+    THEN assert the RecipeModel is returned and stored
+    """
+    r = SQLiteDriver.recipe_create(**_recipe_kwargs("Tester", ["a", "b"]))
+    assert isinstance(r, RecipeModel)
+    assert r.num_ingredients == 2
+    assert r.prep_time == 5.0
+    assert r.deleted is False
+    assert SQLiteDriver.recipe_find_by_id(r.id) == r
+
+
+def test_recipe_create_invalid(sqlitedb):
+    """
+    GIVEN a recipe without ingredients
+    WHEN calling SQLiteDriver.recipe_create(**kwargs)
+    THEN assert a ValueError is raised and nothing is stored
+    """
+    with pytest.raises(ValueError):
+        SQLiteDriver.recipe_create(**_recipe_kwargs("bad", ingredients=[]))
+    assert SQLiteDriver.recipes_all() == []
+
+
+def test_recipe_create_many(sqlitedb):
+    """
+    GIVEN a batch of recipes, one of them invalid
+    WHEN calling SQLiteDriver.recipe_create_many(recipes, chunk_size)
+    THEN assert a BulkResult per recipe and only the valid ones stored
+    """
+    batch = [_recipe_kwargs("r{}".format(i)) for i in range(5)]
+    batch[2]["ingredients"] = []
+    batch[3] = {"name": "missing params"}
+
+    results = SQLiteDriver.recipe_create_many(batch, chunk_size=2)
+    assert all(isinstance(r, BulkResult) for r in results)
+    assert [r.index for r in results] == [0, 1, 2, 3, 4]
+    assert [r.ok for r in results] == [True, True, False, False, True]
+    assert "ingredients" in results[2].error
+    assert sorted(r.name for r in SQLiteDriver.recipes_all()) == ["r0", "r1", "r4"]
+    assert [r.recipe is None for r in results] == [False, False, True, True, False]
+    assert results[0].recipe == SQLiteDriver.recipe_find_by_id(results[0].id)
+
+
+def test_recipe_edit(recipes):
+    """
+    GIVEN two editors that loaded the same recipe
+    WHEN both submit an edit
+    THEN assert the first is saved and the second raises RecipeConflictError
+    """
+    r = recipes[0]
+    kwargs = {
+        "_id": r.id,
+        "name": "NewName",
+        "prep_time": r.prep_time,
+        "cook_time": r.cook_time,
+        "servings": r.servings,
+        "ingredients": ["spam", "eggs", "salt"],
+        "directions": r.directions,
+        "tags": r.tags,
+        "notes": r.notes,
+        "last_modified": r.last_modified_date,
+    }
+    result = SQLiteDriver.recipe_edit(**kwargs)
+    assert result.name == "NewName"
+    assert result.num_ingredients == 3
+    assert result.last_modified_date > r.last_modified_date
+    assert SQLiteDriver.recipes_search("newname")[0].id == r.id
+
+    with pytest.raises(RecipeConflictError):
+        SQLiteDriver.recipe_edit(**{**kwargs, "name": "Other"})
+    assert SQLiteDriver.recipe_edit(**{**kwargs, "_id": "unknown"}) is None
+
+
+def test_recipe_edit_converts_form(recipes):
+    """
+    GIVEN an existing recipe
+    WHEN editing it with the string values of a submitted form
+    THEN assert they are converted and validated like recipe_create's,
+        so equal values are not written and bad ones raise
+    """
+    r = recipes[0]
+    kwargs = {
+        "_id": r.id,
+        "name": r.name,
+        "prep_time": str(r.prep_time),
+        "cook_time": str(r.cook_time),
+        "servings": r.servings,
+        "ingredients": r.ingredients,
+        "directions": r.directions,
+        "tags": [tag.upper() for tag in r.tags],
+        "notes": r.notes,
+    }
+    assert SQLiteDriver.recipe_edit(**kwargs).last_modified_date == r.last_modified_date
+
+    result = SQLiteDriver.recipe_edit(**{**kwargs, "prep_time": "15", "tags": [" Lunch "]})
+    assert result.prep_time == 15.0
+    assert result.tags == ["lunch"]
+    assert SQLiteDriver.recipe_find_by_id(r.id) == result
+
+    with pytest.raises(ValueError):
+        SQLiteDriver.recipe_edit(**{**kwargs, "cook_time": "abc"})
+    with pytest.raises(ValueError):
+        SQLiteDriver.recipe_edit(**{**kwargs, "cook_time": "-1"})
+    assert SQLiteDriver.recipe_find_by_id(r.id) == result
+
+
+def test_recipe_find_by_id_knownBad(recipes):
+    """
+    GIVEN a recipe id that is not in the DB
+    WHEN calling SQLiteDriver.recipe_find_by_id(recipe_id)
+    THEN assert None is returned
+    """
+    assert SQLiteDriver.recipe_find_by_id("ffffffffffffffffffffffff") is None
+
+
+def test_recipes_find_by_name(recipes):
+    """
+    GIVEN recipes in the DB, one of them deleted
+    WHEN searching for a case insensitive substring of the names
+    THEN assert only the active matches are returned
+    """
+    SQLiteDriver.recipe_delete(recipes[1].id)
+    result = SQLiteDriver.recipes_find_by_name("SPAM")
+    assert [r.name for r in result] == ["spam and eggs"]
+    summaries = SQLiteDriver.recipes_find_by_name_summary("eggs")
+    assert summaries == [
+        RecipeSummary(recipes[0].id, "spam and eggs", 5.0, ["breakfast", "fast"])
+    ]
+
+
+def test_recipes_find_by_tag(recipes):
+    """
+    GIVEN recipes in the DB with tags
+    WHEN searching by tags (case insensitive, all must match)
+    THEN assert the correct recipes are returned
+    """
+    assert len(SQLiteDriver.recipes_find_by_tag(["Breakfast"])) == 2
+    result = SQLiteDriver.recipes_find_by_tag(["breakfast", "slow"])
+    assert [r.name for r in result] == ["spam and oatmeal"]
+    assert SQLiteDriver.recipes_find_by_tag(["breakfast", "nope"]) == []
+    summaries = SQLiteDriver.recipes_find_by_tag_summary(["fast"])
+    assert [s.id for s in summaries] == [recipes[0].id]
+
+
+def test_recipes_find_by_ingredient(recipes):
+    """
+    GIVEN recipes in the DB, with their ingredients parsed on create
+    WHEN searching by ingredients (by name, all must match), before and
+        after editing and deleting a recipe
+    THEN assert the recipes having them are returned, through recipe_ingredients
+    """
+    assert [i["name"] for i in recipes[0].parsed_ingredients] == ["spam", "egg"]
+    assert len(SQLiteDriver.recipes_find_by_ingredient(["Spam"])) == 2
+    result = SQLiteDriver.recipes_find_by_ingredient(["spam", "2 large eggs"])
+    assert [r.name for r in result] == ["spam and eggs"]
+    assert result[0] == SQLiteDriver.recipe_find_by_id(recipes[0].id)
+    assert SQLiteDriver.recipes_find_by_ingredient(["spam", "nope"]) == []
+    assert SQLiteDriver.recipes_find_by_ingredient([]) == []
+
+    r = recipes[1]
+    edited = SQLiteDriver.recipe_edit(
+        _id=r.id, name=r.name, prep_time=r.prep_time, cook_time=r.cook_time,
+        servings=r.servings, ingredients=["1 cup oatmeal", "3 eggs"],
+        directions=r.directions, tags=r.tags, notes=r.notes,
+    )
+    assert edited.parsed_ingredients[0]["unit"] == "cup"
+    summaries = SQLiteDriver.recipes_find_by_ingredient_summary(["eggs"])
+    assert [s.name for s in summaries] == ["spam and eggs", "spam and oatmeal"]
+    assert SQLiteDriver.recipes_find_by_ingredient(["spam", "oatmeal"]) == []
+
+    SQLiteDriver.recipe_delete(recipes[0].id)
+    assert [s.id for s in SQLiteDriver.recipes_find_by_ingredient_summary(["egg"])] == [r.id]
+
+
+def test_recipes_backfill_ingredients(recipes):
+    """
+    GIVEN recipes without parsed ingredients, i.e. written before they were
+    WHEN backfilling them, one per batch
+    THEN assert each is parsed and indexed, with the progress reported
+    """
+    conn = SQLiteDriver._conn()
+    with conn:
+        conn.execute("UPDATE recipes SET parsed_ingredients = NULL")
+    assert SQLiteDriver.recipe_find_by_id(recipes[0].id).parsed_ingredients == []
+    assert SQLiteDriver.recipes_find_by_ingredient(["spam"]) == []
+
+    progress = []
+    updated = SQLiteDriver.recipes_backfill_ingredients(
+        batch_size=1, progress=lambda done, total: progress.append((done, total))
+    )
+    assert updated == 2
+    assert progress == [(1, 2), (2, 2)]
+    assert len(SQLiteDriver.recipes_find_by_ingredient(["spam"])) == 2
+    assert SQLiteDriver.recipe_find_by_id(recipes[0].id) == recipes[0]
+
+    assert SQLiteDriver.recipes_backfill_ingredients() == 0
+    assert SQLiteDriver.recipes_backfill_ingredients(reparse=True) == 2
+
+
+def test_recipes_get_tags(recipes):
+    """
+    GIVEN recipes in the DB with tags
+    WHEN one is deleted
+    THEN assert only the tags of active recipes are returned
+    """
+    assert SQLiteDriver.recipes_get_tags() == ["breakfast", "fast", "slow"]
+    SQLiteDriver.recipe_delete(recipes[0].id)
+    assert SQLiteDriver.recipes_get_tags() == ["breakfast", "slow"]
+
+
+def test_recipes_tag_counts(recipes):
+    """
+    GIVEN recipes in the DB with tags
+    WHEN one is deleted
+    THEN assert the active recipes of each tag are counted, most used first
+    """
+    counts = SQLiteDriver.recipes_tag_counts()
+    assert counts == {"breakfast": 2, "fast": 1, "slow": 1}
+    assert list(counts) == ["breakfast", "fast", "slow"]
+    SQLiteDriver.recipe_delete(recipes[0].id)
+    assert SQLiteDriver.recipes_tag_counts() == {"breakfast": 1, "slow": 1}
+
+
+def test_recipes_active_deleted(recipes):
+    """
+    GIVEN recipes in the DB
+    WHEN one is marked deleted
+    THEN assert recipes_active/deleted/all split them correctly
+    """
+    assert SQLiteDriver.recipe_delete(recipes[0].id) == 1
+    assert SQLiteDriver.recipe_delete("unknown") == 0
+    assert [r.id for r in SQLiteDriver.recipes_active()] == [recipes[1].id]
+    assert [r.id for r in SQLiteDriver.recipes_deleted()] == [recipes[0].id]
+    assert [s.id for s in SQLiteDriver.recipes_active_summary()] == [recipes[1].id]
+    assert len(SQLiteDriver.recipes_all()) == 2
+
+
+def test_recipes_page_created_date(sqlitedb):
+    """
+    GIVEN more recipes than fit on a page, some with equal created_date
+    WHEN paging through them newest first
+    THEN assert every active recipe is returned exactly once, in order
+    """
+    created = [SQLiteDriver.recipe_create(**_recipe_kwargs("r{}".format(i))) for i in range(7)]
+    SQLiteDriver.recipe_delete(created[3].id)
+
+    seen, token = [], None
+    while True:
+        page = SQLiteDriver.recipes_page(page_size=2, token=token)
+        assert isinstance(page, PageModel)
+        seen.extend(r.name for r in page)
+        if not page.has_next:
+            break
+        token = page.next_token
+    assert seen == ["r6", "r5", "r4", "r2", "r1", "r0"]
+
+
+def test_recipes_page_name_tags_summary(sqlitedb):
+    """
+    GIVEN recipes with different names and tags
+    WHEN paging A-Z by name, filtered by tag, as summaries
+    THEN assert the correct RecipeSummary's are returned
+    """
+    for name, tags in [("b", ["x"]), ("a", ["x"]), ("c", ["y"]), ("d", ["X", "y"])]:
+        SQLiteDriver.recipe_create(**_recipe_kwargs(name, tags=[t.lower() for t in tags]))
+
+    page = SQLiteDriver.recipes_page(page_size=2, sort_by="name", tags=["X"], summary=True)
+    assert [s.name for s in page] == ["a", "b"]
+    assert all(isinstance(s, RecipeSummary) for s in page)
+    page = SQLiteDriver.recipes_page(
+        page_size=2, sort_by="name", tags=["X"], summary=True, token=page.next_token
+    )
+    assert [s.name for s in page] == ["d"]
+    assert page.next_token is None
+
+
+def test_recipes_page_bad_token(recipes):
+    """
+    GIVEN a malformed token or one for another sort
+    WHEN calling SQLiteDriver.recipes_page
+    THEN assert PageTokenError is raised
+    """
+    page = SQLiteDriver.recipes_page(page_size=1)
+    with pytest.raises(PageTokenError):
+        SQLiteDriver.recipes_page(page_size=1, token="garbage")
+    with pytest.raises(PageTokenError):
+        SQLiteDriver.recipes_page(page_size=1, token=page.next_token, sort_by="name")
+
+
+def test_recipe_copy(recipes):
+    """
+    GIVEN a recipe
+    WHEN calling SQLiteDriver.recipe_copy(recipe)
+    THEN assert a new recipe is stored with a modified name
+    """
+    copy = SQLiteDriver.recipe_copy(recipes[0])
+    assert copy.id != recipes[0].id
+    assert copy.name == "spam and eggs_COPY"
+    assert copy.ingredients == recipes[0].ingredients
+    assert copy.images == []
+    assert len(SQLiteDriver.recipes_all()) == 3
+
+
+def test_recipe_add_delete_tag(recipes):
+    """
+    GIVEN a recipe to add/delete a tag
+    WHEN calling SQLiteDriver.recipe_add/delete_tag(recipe, tag)
+    THEN assert it is added once, deleted, and the tag index follows
+    """
+    r = recipes[0]
+    assert SQLiteDriver.recipe_add_tag(r, "Added") == 1
+    assert SQLiteDriver.recipe_add_tag(r, "added") == 1
+    assert SQLiteDriver.recipe_find_by_id(r.id).tags == ["breakfast", "fast", "added"]
+    assert [x.id for x in SQLiteDriver.recipes_find_by_tag(["added"])] == [r.id]
+
+    assert SQLiteDriver.recipe_delete_tag(r, "added") == 1
+    assert SQLiteDriver.recipe_find_by_id(r.id).tags == ["breakfast", "fast"]
+    assert SQLiteDriver.recipes_find_by_tag(["added"]) == []
+
+
+def test_recipe_mark_made(recipes):
+    """
+    GIVEN a recipe in the DB
+    WHEN marking it made twice on the same day, then on another day
+    THEN assert the same-day duplicate is rejected
+    """
+    r = recipes[0]
+    assert SQLiteDriver.recipe_mark_made(r, datetime.datetime(2020, 1, 1, 8)) == 1
+    assert SQLiteDriver.recipe_mark_made(r, datetime.datetime(2020, 1, 1, 20)) == 0
+    assert SQLiteDriver.recipe_mark_made(r, datetime.datetime(2020, 1, 2)) == 1
+    assert SQLiteDriver.recipe_find_by_id(r.id).when_made == [
+        datetime.datetime(2020, 1, 1, 8),
+        datetime.datetime(2020, 1, 2),
+    ]
+
+
+def test_recipes_search(recipes):
+    """
+    GIVEN recipes in the DB
+    WHEN searching by text
+    THEN assert matches are ranked by the weighted fields
+    """
+    # "oatmeal": name (10) + ingredients (4) + directions (2) for recipe 2 only
+    assert [r.id for r in SQLiteDriver.recipes_search("Oatmeal")] == [recipes[1].id]
+    # "eggs" is in recipe 1's name, "spam" is in both names
+    result = SQLiteDriver.recipes_search("spam eggs")
+    assert [r.id for r in result] == [recipes[0].id, recipes[1].id]
+    summaries = SQLiteDriver.recipes_search_summary("fast")
+    assert [s.id for s in summaries] == [recipes[0].id]
+    assert SQLiteDriver.recipes_search("nothing") == []
+
+
+def test_recipes_search_ranked(recipes):
+    """
+    GIVEN recipes in the DB
+    WHEN searching them by name and text at once
+    THEN assert each match is returned once, name matches first, deleted
+        recipes excluded, and limit/skip select a window of the ranking
+    """
+    text_only = SQLiteDriver.recipe_create(
+        name="ham sandwich",
+        ingredients=["bread", "spam"],
+        directions=["stack"],
+        prep_time=1,
+        cook_time=0,
+        servings="1",
+    )
+    result = SQLiteDriver.recipes_search_ranked("spam")
+    assert {r.id for r in result[:2]} == {recipes[0].id, recipes[1].id}
+    assert [r.id for r in result[2:]] == [text_only.id]
+
+    # "oat" is only a substring of a name, not a word the text index knows
+    assert [r.id for r in SQLiteDriver.recipes_search_ranked("OAT")] == [recipes[1].id]
+
+    window = SQLiteDriver.recipes_search_ranked("spam", limit=1, skip=1, summary=True)
+    assert [s.id for s in window] == [result[1].id]
+    assert isinstance(window[0], RecipeSummary)
+
+    SQLiteDriver.recipe_delete(recipes[0].id)
+    assert recipes[0].id not in [r.id for r in SQLiteDriver.recipes_search_ranked("spam")]
+    assert SQLiteDriver.recipes_search_ranked(" ") == []
+
+
+#### UserDBInt ###############################################################
+
+
+def test_user_create(sqlitedb):
+    """
+    GIVEN a new user
+    WHEN calling SQLiteDriver.user_create twice with the same email
+    THEN assert the UserModel is returned first, then None
+    """
+    user = SQLiteDriver.user_create("tester", "tester@mail.com", "p@ssw0rd")
+    assert isinstance(user, UserModel)
+    assert user.username == "tester"
+    assert user.password_hash != "p@ssw0rd"
+    assert SQLiteDriver.user_create("other", "tester@mail.com", "p@ssw0rd") is None
+
+
+def test_user_find_and_login(users):
+    """
+    GIVEN users in the DB
+    WHEN finding them by id/email and logging in
+    THEN assert the correct user (or None) is returned
+    """
+    u = users[0]
+    assert SQLiteDriver.user_find_by_id(u.id) == u
+    assert SQLiteDriver.user_find_by_id(None) is None
+    assert SQLiteDriver.user_find_by_email("kingarthur@mail.com") == u
+    assert SQLiteDriver.user_find_by_email("nobody@mail.com") is None
+    assert SQLiteDriver.user_login("kingarthur@mail.com", "123456abcdef") == u
+    assert SQLiteDriver.user_login("kingarthur@mail.com", "wrong") is None
+    assert SQLiteDriver.user_login("nobody@mail.com", "123456abcdef") is None
+    assert [x.id for x in SQLiteDriver.users_list()] == [u.id, users[1].id]
+
+
+def test_users_list_empty(sqlitedb):
+    """
+    GIVEN no users in the DB
+    WHEN calling SQLiteDriver.users_list()
+    THEN assert None is returned
+    """
+    assert SQLiteDriver.users_list() is None
+
+
+def test_user_add_recipe(recipes, users):
+    """
+    GIVEN a recipe to add to a user
+    WHEN calling SQLiteDriver.user_add_recipe(user, recipe_id) twice
+    THEN assert the recipe is referenced once
+    """
+    u = users[0]
+    assert SQLiteDriver.user_add_recipe(u, recipes[0].id) == 1
+    assert SQLiteDriver.user_add_recipe(u, recipes[0].id) == 1
+    assert SQLiteDriver.user_find_by_id(u.id).recipe_ids == [recipes[0].id]
+
+
+def test_user_set_password(users):
+    """
+    GIVEN a user changing their password
+    WHEN calling SQLiteDriver.user_set_password()
+    THEN assert the new password logs in
+    """
+    u = users[0]
+    assert SQLiteDriver.user_set_password(u, "n3wp@ss") is not None
+    assert SQLiteDriver.user_login("kingarthur@mail.com", "n3wp@ss").id == u.id
+    assert SQLiteDriver.user_login("kingarthur@mail.com", "123456abcdef") is None
+
+
+def test_recipes_search_ranking(sqlitedb):
+    """
+    GIVEN recipes matching the search term in different fields
+    WHEN searching by text
+    THEN assert they are ranked by the field weights, and stemmed terms match
+    """
+    in_directions = SQLiteDriver.recipe_create(
+        **{**_recipe_kwargs("stew"), "directions": ["add the garlic"]}
+    )
+    in_name = SQLiteDriver.recipe_create(**_recipe_kwargs("garlic bread"))
+    in_tags = SQLiteDriver.recipe_create(**_recipe_kwargs("soup", tags=["garlic"]))
+
+    result = SQLiteDriver.recipes_search("garlic")
+    assert [r.id for r in result] == [in_name.id, in_tags.id, in_directions.id]
+    assert [r.id for r in SQLiteDriver.recipes_search("breads")] == [in_name.id]
+    assert SQLiteDriver.recipes_search("  ") == []
+
+
+def test_recipe_tags_follow_updates(recipes):
+    """
+    GIVEN a recipe whose tags are edited
+    WHEN finding recipes by tag
+    THEN assert the recipe_tags index is kept in sync by the triggers
+    """
+    r = recipes[0]
+    SQLiteDriver.recipe_edit(
+        _id=r.id, name=r.name, prep_time=r.prep_time, cook_time=r.cook_time,
+        servings=r.servings, ingredients=r.ingredients, directions=r.directions,
+        tags=["dinner"], notes=r.notes,
+    )
+    assert SQLiteDriver.recipes_find_by_tag(["fast"]) == []
+    assert [x.id for x in SQLiteDriver.recipes_find_by_tag(["dinner"])] == [r.id]
@@ -0,0 +1,92 @@
+"""
+Import time budget for the app.
+
+Importing pyrecipe.app (what every worker and test run does first) must not
+load the services' heavy dependencies, which are imported on first use, and
+must fit in IMPORT_BUDGET_MS.  Measured in a fresh interpreter with
+python -X importtime.
+"""
+
+import os
+import pathlib
+import subprocess
+import sys
+
+import pytest
+
+import pyrecipe
+
+
+IMPORT_BUDGET_MS = int(os.environ.get("PYRECIPE_IMPORT_BUDGET_MS") or 600)
+
+# Only loaded by the use cases that need them.  PIL is not listed, since
+# mongoengine imports it for its ImageField.
+LAZY_MODULES = [
+    "pyrecipe.services.export",
+    "pyrecipe.services.images",
+    "pyrecipe.services.importer",
+    "pyrecipe.services.search",
+    "reportlab",
+    "recipe_scrapers",
+    "requests",
+]
+
+
+def importtime(module: str) -> dict:
+    """Import module in a fresh interpreter and return {module: cumulative us}."""
+    root = str(pathlib.Path(pyrecipe.__file__).parents[1])
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [root, env.get("PYTHONPATH")]))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import " + module],
+        env=env,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line.split("|")
+            if cumulative.strip().isdigit():
+                name = name.strip()
+                times[name] = max(times.get(name, 0), int(cumulative))
+    return times
+
+
+@pytest.fixture(scope="module")
+def app_importtime():
+    return importtime("pyrecipe.app")
+
+
+@pytest.mark.parametrize("module", LAZY_MODULES)
+def test_app_import_is_lazy(app_importtime, module):
+    """
+    GIVEN a fresh interpreter
+    WHEN importing pyrecipe.app
+    THEN assert the services' heavy dependencies are not imported
+    """
+    assert module not in app_importtime
+
+
+def test_app_import_budget(app_importtime):
+    """
+    GIVEN a fresh interpreter
+    WHEN importing pyrecipe.app
+    THEN assert it takes less than IMPORT_BUDGET_MS
+    """
+    assert app_importtime["pyrecipe.app"] / 1000 < IMPORT_BUDGET_MS
+
+
+def test_services_load_on_first_use():
+    """
+    GIVEN the pyrecipe.services package
+    WHEN accessing its subpackages
+    THEN assert they are imported, and unknown names still raise AttributeError
+    """
+    import pyrecipe.services as services
+
+    assert services.export.export_to_pdf
+    assert "importer" in dir(services)
+    with pytest.raises(AttributeError):
+        services.nothing_here
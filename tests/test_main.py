@@ -18,7 +18,7 @@ def test_main_prod(mocker):
     app_run_mock = mocker.patch.object(app, "run")
     main.main(app, prod=True)
 
-    assert app_cfg_mock.call_count == 3
+    assert app_cfg_mock.call_count == 5
     assert app_run_mock.call_count == 1
 
 
@@ -32,5 +32,210 @@ def test_main_dev(mocker):
     app_run_mock = mocker.patch.object(app, "run")
     main.main(app, prod=False)
 
-    assert app_cfg_mock.call_count == 3
+    assert app_cfg_mock.call_count == 5
     assert app_run_mock.call_count == 1
+
+
+def test_serve(mocker):
+    """
+    GIVEN the pyrecipe application
+    WHEN main.serve() is called with workers and threads
+    THEN assert the production server is run with them and the config defaults
+    """
+    server_mock = mocker.patch("pyrecipe.server.PyRecipeServer")
+    main.serve(app, workers=3, threads=8, timeout=None)
+
+    server_app, options, init_db = server_mock.call_args[0]
+    assert server_app is app
+    assert options["workers"] == 3
+    assert options["threads"] == 8
+    assert options["bind"] == app.config["BIND"]
+    assert init_db is main.init_db
+    assert server_mock.return_value.run.call_count == 1
+
+
+@pytest.mark.parametrize(
+    "driver, workers, enabled",
+    [("memory", 1, True), ("memory", 3, False), ("mongo", 3, True)],
+)
+def test_serve_in_process_indexes(mocker, driver, workers, enabled):
+    """
+    GIVEN a DB driver with or without a recipes generation
+    WHEN main.serve() forks one or more workers
+    THEN assert the in-process search indexes are only turned off for
+        several workers that can't tell each other's writes
+    """
+    from pyrecipe.config import config
+
+    mocker.patch("pyrecipe.server.PyRecipeServer")
+    mocker.patch.object(config.ProdConfig, "DB_DRIVER", config.DB_DRIVERS[driver])
+    mocker.patch.dict(app.config, {})
+    main.serve(app, workers=workers)
+    assert app.config["IN_PROCESS_INDEXES"] is enabled
+
+
+@pytest.mark.parametrize(
+    "argv, serve_count, main_count", [([], 0, 1), (["dev"], 0, 1), (["serve"], 1, 0)]
+)
+def test_cli(mocker, argv, serve_count, main_count):
+    """
+    GIVEN the pyrecipe console script
+    WHEN it is run with no command, "dev" or "serve"
+    THEN assert the matching server is started
+    """
+    serve_mock = mocker.patch.object(main, "serve")
+    main_mock = mocker.patch.object(main, "main")
+    main.cli(argv)
+
+    assert serve_mock.call_count == serve_count
+    assert main_mock.call_count == main_count
+
+
+def test_cli_serve_options(mocker):
+    """
+    GIVEN the pyrecipe console script
+    WHEN it is run as "pyrecipe serve --workers N --threads M"
+    THEN assert the options are passed to serve()
+    """
+    serve_mock = mocker.patch.object(main, "serve")
+    main.cli(["serve", "--workers", "4", "--threads", "16", "--bind", "0.0.0.0:80"])
+
+    kwargs = serve_mock.call_args[1]
+    assert kwargs["workers"] == 4
+    assert kwargs["threads"] == 16
+    assert kwargs["bind"] == "0.0.0.0:80"
+    assert kwargs["timeout"] is None
+
+
+@pytest.mark.parametrize(
+    "argv, prod", [(["rebuild-tag-stats"], True), (["rebuild-tag-stats", "--dev"], False)]
+)
+def test_cli_rebuild_tag_stats(mocker, argv, prod):
+    """
+    GIVEN the pyrecipe console script
+    WHEN it is run as "pyrecipe rebuild-tag-stats"
+    THEN assert the tag counts are rebuilt
+    """
+    rebuild_mock = mocker.patch.object(main, "rebuild_tag_stats")
+    main.cli(argv)
+
+    assert rebuild_mock.call_args[1]["prod"] is prod
+
+
+def test_rebuild_tag_stats(mocker, capsys):
+    """
+    GIVEN the configured DB driver
+    WHEN main.rebuild_tag_stats() is called
+    THEN assert the driver's tag counts are rebuilt, if it keeps any
+    """
+    init_mock = mocker.patch.object(main, "init_db")
+    driver = mocker.Mock(__name__="MongoDriver")
+    driver.recipes_rebuild_tag_stats.return_value = {"spam": 2}
+    mocker.patch.dict(app.config, {"DB_DRIVER": driver})
+    mocker.patch.object(app.config, "from_object")
+
+    main.rebuild_tag_stats(app)
+    assert init_mock.call_count == 1
+    assert "1 tags" in capsys.readouterr().out
+
+    driver.recipes_rebuild_tag_stats.return_value = None
+    main.rebuild_tag_stats(app)
+    assert "nothing to rebuild" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize(
+    "argv, expected",
+    [
+        (["backfill-ingredients"], {"prod": True, "batch_size": None, "reparse": False}),
+        (
+            ["backfill-ingredients", "--dev", "--batch-size", "100", "--reparse"],
+            {"prod": False, "batch_size": 100, "reparse": True},
+        ),
+    ],
+)
+def test_cli_backfill_ingredients(mocker, argv, expected):
+    """
+    GIVEN the pyrecipe console script
+    WHEN it is run as "pyrecipe backfill-ingredients"
+    THEN assert the recipes' ingredients are backfilled with the given options
+    """
+    backfill_mock = mocker.patch.object(main, "backfill_ingredients")
+    main.cli(argv)
+
+    assert backfill_mock.call_args[1] == expected
+
+
+def test_backfill_ingredients(mocker, capsys):
+    """
+    GIVEN the configured DB driver
+    WHEN main.backfill_ingredients() is called
+    THEN assert the driver's recipes are backfilled, with the progress of
+        each batch printed
+    """
+
+    def backfill(batch_size, reparse, progress):
+        progress(2, 3)
+        progress(3, 3)
+        return 3
+
+    init_mock = mocker.patch.object(main, "init_db")
+    driver = mocker.Mock(__name__="MongoDriver")
+    driver.recipes_backfill_ingredients.side_effect = backfill
+    mocker.patch.dict(app.config, {"DB_DRIVER": driver})
+    mocker.patch.object(app.config, "from_object")
+
+    main.backfill_ingredients(app, batch_size=2)
+    assert init_mock.call_count == 1
+    assert driver.recipes_backfill_ingredients.call_args[1]["batch_size"] == 2
+    out = capsys.readouterr().out
+    assert "Parsed 2/3 recipes" in out
+    assert "Parsed 3/3 recipes" in out
+    assert "3 recipes updated" in out
+
+
+@pytest.mark.parametrize(
+    "argv, prod, path",
+    [
+        (["build-search-index"], True, None),
+        (["build-search-index", "--dev", "--path", "recipes.idx"], False, "recipes.idx"),
+    ],
+)
+def test_cli_build_search_index(mocker, argv, prod, path):
+    """
+    GIVEN the pyrecipe console script
+    WHEN it is run as "pyrecipe build-search-index"
+    THEN assert the search index is built
+    """
+    build_mock = mocker.patch.object(main, "build_search_index")
+    main.cli(argv)
+
+    assert build_mock.call_args[1] == {"prod": prod, "path": path}
+
+
+def test_build_search_index(mocker, tmp_path, capsys):
+    """
+    GIVEN the configured DB driver
+    WHEN main.build_search_index() is called
+    THEN assert the active recipes are indexed and saved, if there is an index file
+    """
+    from pyrecipe.services.search import SearchEngine
+
+    init_mock = mocker.patch.object(main, "init_db")
+    driver = mocker.Mock()
+    driver.recipes_active.return_value = [
+        {"_id": "1", "name": "pasta", "cook_time": 5, "tags": []}
+    ]
+    driver.recipes_generation.return_value = 3
+    mocker.patch.dict(app.config, {"DB_DRIVER": driver, "SEARCH_INDEX": None})
+    mocker.patch.object(app.config, "from_object")
+
+    main.build_search_index(app)
+    assert init_mock.call_count == 0
+    assert "No search index" in capsys.readouterr().out
+
+    path = str(tmp_path / "recipes.idx")
+    main.build_search_index(app, path=path)
+    assert init_mock.call_count == 1
+    engine = SearchEngine.load(path)
+    assert engine.search("pasta")[0][0] == "1"
+    assert engine.index.generation == 3
@@ -0,0 +1,42 @@
+"""
+Test for the server.py module, the production gunicorn server.
+"""
+
+from unittest.mock import Mock
+
+import pytest
+
+pytest.importorskip("gunicorn")
+
+from pyrecipe.app import app
+from pyrecipe.server import PyRecipeServer
+
+
+def test_server_config():
+    """
+    GIVEN gunicorn options
+    WHEN the server is created
+    THEN assert they are applied, the app preloaded and unset options left alone
+    """
+    server = PyRecipeServer(
+        app, {"bind": "127.0.0.1:8001", "workers": 3, "threads": 8, "timeout": None}, Mock()
+    )
+    assert server.cfg.bind == ["127.0.0.1:8001"]
+    assert server.cfg.workers == 3
+    assert server.cfg.threads == 8
+    assert server.cfg.timeout == 30
+    assert server.cfg.preload_app
+    assert server.load() is app
+
+
+def test_server_post_fork():
+    """
+    GIVEN the server
+    WHEN a worker is forked
+    THEN assert the DB is initialized in the worker
+    """
+    init_db = Mock()
+    server = PyRecipeServer(app, {"workers": 2}, init_db)
+
+    server.cfg.post_fork(Mock(), Mock())
+    init_db.assert_called_once_with(app)
@@ -1,10 +1,13 @@
 """Test for the usecases/account_uc.py module."""
 
+import asyncio
+from unittest.mock import AsyncMock
 from unittest.mock import Mock
 
 import pytest
 
 from pyrecipe.usecases.account_uc import AccountUC
+from pyrecipe.usecases.account_uc import AsyncAccountUC
 
 
 def test_accountuc_instantiation():
@@ -49,3 +52,24 @@ def test_find_user_by_id():
 
     result = a.find_user_by_id("12345")
     assert result == "UserModel"
+
+
+def test_async_accountuc():
+    """
+    GIVEN an async DB driver
+    WHEN awaiting the AsyncAccountUC use cases
+    THEN assert the driver coroutines' results are returned
+    """
+    a = AsyncAccountUC(AsyncMock())
+    a._driver.user_login.return_value = "UserModel"
+    a._driver.user_create.return_value = "UserModel"
+    a._driver.user_find_by_id.return_value = "UserModel"
+
+    async def run():
+        return [
+            await a.login_user("bob@mail.com", "bobrulz"),
+            await a.register_user("bob", "bob@mail.com", "bobrulz"),
+            await a.find_user_by_id("12345"),
+        ]
+
+    assert asyncio.run(run()) == ["UserModel"] * 3
@@ -1,8 +1,10 @@
 """Test for the usecases/recipe_uc.py module."""
 
+import asyncio
 import builtins
 import datetime
 import uuid
+from unittest.mock import AsyncMock
 from unittest.mock import Mock
 
 import pytest
@@ -10,8 +12,10 @@ import pytest
 import requests
 
 import pyrecipe.usecases.recipe_uc as ruc
+from pyrecipe.usecases.recipe_uc import AsyncRecipeUC
 from pyrecipe.usecases.recipe_uc import RecipeUC
 from pyrecipe.services import export
+from pyrecipe.storage.shared.bulk_model import BulkResult
 
 
 def test_recipeuc_instantiation():
@@ -38,6 +42,19 @@ def test_get_all_recipes(deleted, expected):
     assert r._driver.recipes_all.call_count == expected[2]
 
 
+def test_get_recipes_page():
+    """
+    GIVEN recipes
+    WHEN asking for a page of recipes with a continuation token
+    THEN assert the paginated db function is called with the token
+    """
+    r = RecipeUC(Mock())
+    page = r.get_recipes_page(page_size=10, token="abc")
+    assert r._driver.recipes_page.call_count == 1
+    assert r._driver.recipes_page.call_args[1]["token"] == "abc"
+    assert r._driver.recipes_page.call_args[1]["page_size"] == 10
+
+
 def test_find_recipe_by_id():
     """
     GIVEN recipes
@@ -62,7 +79,7 @@ def test_create_recipe(mocker):
     THEN assert the correct sequence of events occur
     """
     r = RecipeUC(Mock())
-    proc_img_mock = mocker.patch.object(ruc, "process_image")
+    proc_img_mock = mocker.patch("pyrecipe.services.images.process_image")
 
     recipe = r.create_recipe(
         name="test",
@@ -79,6 +96,29 @@ def test_create_recipe(mocker):
     assert r._driver.recipe_create.call_count == 1
 
 
+def test_create_recipes(mocker):
+    """
+    GIVEN a batch of recipes to create
+    WHEN creating them at once
+    THEN assert images are processed and a single bulk DB call is made
+    """
+    r = RecipeUC(Mock())
+    proc_img_mock = mocker.patch("pyrecipe.services.images.process_image")
+    proc_img_mock.return_value = "processed.jpg"
+    batch = [
+        {"name": "one", "images": ["imagefile1.jpg"]},
+        {"name": "two"},
+    ]
+
+    results = r.create_recipes(batch, chunk_size=100)
+    assert proc_img_mock.call_count == 1
+    assert r._driver.recipe_create_many.call_count == 1
+    sent = r._driver.recipe_create_many.call_args[0][0]
+    assert sent[0]["images"] == ["processed.jpg"]
+    assert batch[0]["images"] == ["imagefile1.jpg"]
+    assert r._driver.recipe_create_many.call_args[1]["chunk_size"] == 100
+
+
 def test_edit_recipe():
     """
     GIVEN a recipe to edit
@@ -96,8 +136,10 @@ def test_edit_recipe():
         directions=["make food"],
         tags=["quick", "spicy"],
         notes=["notes"],
+        last_modified="LASTMOD",
     )
     assert r._driver.recipe_edit.call_count == 1
+    assert r._driver.recipe_edit.call_args[1]["last_modified"] == "LASTMOD"
 
 
 def test_find_recipes_by_tags():
@@ -111,6 +153,18 @@ def test_find_recipes_by_tags():
     assert r._driver.recipes_find_by_tag.call_count == 1
 
 
+def test_find_recipes_by_tags_summary():
+    """
+    GIVEN recipes in the DB with tags
+    WHEN searching by given tag for a list view
+    THEN assert the summary DB call is made
+    """
+    r = RecipeUC(Mock())
+    result = r.find_recipes_by_tag(["tag1"], summary=True)
+    assert r._driver.recipes_find_by_tag_summary.call_count == 1
+    assert r._driver.recipes_find_by_tag.call_count == 0
+
+
 def test_get_tags():
     """
     GIVEN a db with recipes
@@ -122,6 +176,18 @@ def test_get_tags():
     assert r._driver.recipes_get_tags.call_count == 1
 
 
+def test_get_tag_counts():
+    """
+    GIVEN a db with recipes
+    WHEN requesting the number of recipes of each tag
+    THEN assert the correct DB call is made
+    """
+    r = RecipeUC(Mock())
+    result = r.get_tag_counts()
+    assert r._driver.recipes_tag_counts.call_count == 1
+    assert result is r._driver.recipes_tag_counts.return_value
+
+
 def test_delete_recipe():
     """
     GIVEN a db with recipes
@@ -138,13 +204,142 @@ def test_recipes_search():
     """
     GIVEN a db with recipes
     WHEN the user supplies a search string
-    THEN assert the correct DB calls are made and combined upon return
+    THEN assert a single ranked search is made and returned
     """
     r = RecipeUC(Mock())
-    r._driver.recipes_find_by_name.return_value = ["test_recipe"]
-    r._driver.recipes_search.return_value = ["testing_recipe"]
+    r._driver.recipes_search_ranked.return_value = ["test_recipe", "testing_recipe"]
     result = r.recipes_search("test")
     assert result == ["test_recipe", "testing_recipe"]
+    r._driver.recipes_search_ranked.assert_called_once_with(
+        "test", limit=None, skip=0, summary=False
+    )
+    assert r._driver.recipes_find_by_name.call_count == 0
+
+
+def test_recipes_search_summary():
+    """
+    GIVEN a db with recipes
+    WHEN the user supplies a search string for a list view, with a page window
+    THEN assert the ranked search is made for summaries of that window
+    """
+    r = RecipeUC(Mock())
+    r._driver.recipes_search_ranked.return_value = ["test_recipe"]
+    result = r.recipes_search("test", summary=True, limit=10, skip=20)
+    assert result == ["test_recipe"]
+    r._driver.recipes_search_ranked.assert_called_once_with(
+        "test", limit=10, skip=20, summary=True
+    )
+
+
+def test_recipes_search_engine():
+    """
+    GIVEN a search engine over the recipes in the DB
+    WHEN the user supplies a search string
+    THEN assert the engine is searched instead of the driver, full recipes
+        are read by id, and recipes deleted meanwhile are left out
+    """
+    from pyrecipe.services.search import SearchEngine
+
+    engine = SearchEngine()
+    for _id, name in (("1", "pasta"), ("2", "pasta salad"), ("3", "pasta bake")):
+        engine.add({"_id": _id, "name": name, "cook_time": 5, "tags": ["dinner"]})
+    r = RecipeUC(Mock(), search_engine=engine)
+    r._driver.recipe_find_by_id.side_effect = lambda _id: (
+        None if _id == "3" else Mock(id=_id, deleted=_id == "2")
+    )
+
+    summaries = r.recipes_search("pasta", summary=True, limit=2)
+    assert [summary.id for summary in summaries] == ["1", "2"]
+    assert summaries[0].tags == ["dinner"]
+    assert [recipe.id for recipe in r.recipes_search("pasta")] == ["1"]
+    assert r._driver.recipes_search_ranked.call_count == 0
+
+
+def test_recipe_writes_update_search_engine():
+    """
+    GIVEN a use case with a search engine, a suggester and a pantry index
+    WHEN recipes are created, created in bulk, edited and deleted
+    THEN assert all of them are updated with them
+    """
+    engine = Mock()
+    suggester = Mock()
+    pantry = Mock()
+    r = RecipeUC(Mock(), search_engine=engine, suggester=suggester, pantry=pantry)
+    fields = dict(
+        name="test", prep_time=5, cook_time=10, servings=4, ingredients=["garlic"],
+        directions=["make food"],
+    )
+
+    created = r.create_recipe(**fields)
+    edited = r.edit_recipe(_id="1", **fields)
+    assert engine.add.call_args_list[0][0][0] is created
+    assert engine.add.call_args_list[1][0][0] is edited
+
+    stored = Mock()
+    r._driver.recipe_create_many.return_value = [
+        BulkResult(index=0, _id="7", recipe=stored), BulkResult(index=1, error="invalid")
+    ]
+    r.create_recipes([{"name": "seven"}, {"name": "broken"}])
+    assert engine.add.call_args[0][0] is stored
+    assert engine.add.call_count == 3
+
+    r._driver.recipe_delete.return_value = 0
+    r.delete_recipe("1")
+    assert engine.remove.call_count == 0
+    r._driver.recipe_delete.return_value = 1
+    r.delete_recipe("1")
+    engine.remove.assert_called_once_with("1")
+    suggester.remove.assert_called_once_with("1")
+    pantry.remove.assert_called_once_with("1")
+    assert suggester.add.call_args_list == engine.add.call_args_list
+    assert pantry.add.call_args_list == engine.add.call_args_list
+
+
+def test_create_recipes_indexes_stored_records():
+    """
+    GIVEN a use case over a DB with a search engine and a pantry index
+    WHEN recipes are created in bulk with unnormalized tags
+    THEN assert they are indexed as the driver stored them, with
+        normalized tags and parsed ingredients
+    """
+    from pyrecipe.services.search import PantryIndex
+    from pyrecipe.services.search import SearchEngine
+    from pyrecipe.storage.memory import MemoryDriver
+
+    MemoryDriver.db_initialize(db_name="pyrecipe_testing", verbose=False)
+    try:
+        r = RecipeUC(MemoryDriver, search_engine=SearchEngine(), pantry=PantryIndex())
+        r.create_recipes([{
+            "name": "garlic bread", "prep_time": 5, "cook_time": 10, "servings": "2",
+            "ingredients": ["2 cloves garlic", "1 loaf bread"],
+            "directions": ["bake"], "tags": [" Snack ", "SNACK"],
+        }])
+
+        summaries = r.recipes_search("garlic", summary=True)
+        assert [summary.tags for summary in summaries] == [["snack"]]
+        cookable = r.recipes_cookable(["garlic", "bread"])
+        assert [summary.name for summary, _ in cookable] == ["garlic bread"]
+    finally:
+        MemoryDriver._stores.pop("pyrecipe_testing", None)
+        MemoryDriver._store = None
+
+
+def test_autocomplete():
+    """
+    GIVEN a use case with, then without, a suggester
+    WHEN asking for the suggestions of a prefix
+    THEN assert they come from the suggester, built from the active recipes if there was none
+    """
+    suggester = Mock()
+    r = RecipeUC(Mock(), suggester=suggester)
+    assert r.autocomplete("gar", limit=3) is suggester.suggest.return_value
+    suggester.suggest.assert_called_once_with("gar", limit=3)
+
+    r = RecipeUC(Mock())
+    r._driver.recipes_active.return_value = [{"_id": "1", "name": "Garlic Bread"}]
+    assert r.autocomplete("gar")["names"] == [{"_id": "1", "name": "Garlic Bread"}]
+    r.autocomplete("bre")
+    assert r._driver.recipes_active.call_count == 1
 
 
 def test_export_recipe_fileDoesNotExist(mocker):
@@ -191,7 +386,7 @@ def test_import_recipe_from_url(mocker):
     THEN assert it is sent to the database
     """
     r = RecipeUC(Mock())
-    import_mock = mocker.patch.object(ruc, "import_from_url")
+    import_mock = mocker.patch("pyrecipe.services.importer.import_from_url")
     import_mock.return_value = {
         "images": "path_to_an_image"
     }
@@ -221,3 +416,65 @@ def test_save_image(mocker):
     result = r._save_image("url")
     assert result == "12345.jpg"
 
+
+
+def test_async_recipeuc_reads():
+    """
+    GIVEN an async DB driver
+    WHEN awaiting the AsyncRecipeUC read use cases
+    THEN assert the driver coroutines are awaited and their results returned
+    """
+    r = AsyncRecipeUC(AsyncMock())
+    r._driver.recipe_find_by_id.return_value = Mock(images=["img.jpg"])
+    r._driver.recipes_search_ranked.return_value = ["by name", "by text"]
+
+    async def run():
+        recipe = await r.find_recipe_by_id("12345")
+        found = await r.recipes_search("spam")
+        await r.get_all_recipes(deleted=False)
+        await r.get_recipes_page(page_size=10, token="abc")
+        await r.get_tag_counts()
+        return recipe, found
+
+    recipe, found = asyncio.run(run())
+    assert recipe.images == ["../../static/img/recipe_images/img.jpg"]
+    assert found == ["by name", "by text"]
+    r._driver.recipes_active.assert_awaited_once()
+    assert r._driver.recipes_page.call_args[1]["token"] == "abc"
+    r._driver.recipes_tag_counts.assert_awaited_once()
+
+
+def test_async_recipeuc_create_recipe(mocker):
+    """
+    GIVEN a new recipe with images
+    WHEN creating it with the AsyncRecipeUC
+    THEN assert the images are processed and the recipe sent to the DB
+    """
+    r = AsyncRecipeUC(AsyncMock())
+    image_mock = mocker.patch("pyrecipe.services.images.process_image")
+    image_mock.return_value = "processed.jpg"
+
+    asyncio.run(r.create_recipe("spam", 1, 1, "1", ["spam"], ["eat"], images=["a.jpg"]))
+    assert image_mock.call_count == 1
+    assert r._driver.recipe_create.call_args[1]["images"] == ["processed.jpg"]
+
+
+def test_recipes_cookable():
+    """
+    GIVEN a use case with, then without, a pantry index
+    WHEN asking which recipes can be made with some ingredients
+    THEN assert the pantry index answers, built from the active recipes if there was none
+    """
+    pantry = Mock()
+    r = RecipeUC(Mock(), pantry=pantry)
+    assert r.recipes_cookable(["eggs"], missing=1, limit=5) is pantry.cookable.return_value
+    pantry.cookable.assert_called_once_with(["eggs"], missing=1, limit=5)
+
+    r = RecipeUC(Mock())
+    r._driver.recipes_active.return_value = [
+        {"_id": "1", "name": "Omelette", "ingredients": ["eggs", "cheese"]}
+    ]
+    [(summary, missing)] = r.recipes_cookable(["eggs"], missing=1)
+    assert (summary.id, missing) == ("1", ["cheese"])
+    assert r.recipes_cookable(["eggs"]) == []
+    assert r._driver.recipes_active.call_count == 1